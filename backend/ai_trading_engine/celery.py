@@ -1,6 +1,8 @@
 import os
+import logging
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init
 from kombu import Queue
 from django.conf import settings
 
@@ -72,6 +74,12 @@ app.conf.update(
         #     'schedule': crontab(minute='*/30'),  # Every 30 minutes
         #     'options': {'queue': 'data', 'priority': 10},  # Explicitly route to data queue
         # },
+        # ENABLED: Keep the live price cache warm so readers never wait on Binance/CoinGecko
+        'refresh-live-prices': {
+            'task': 'apps.data.tasks.refresh_live_prices_task',
+            'schedule': 60.0,  # Every minute (the cache treats prices as fresh for 60s)
+            'options': {'queue': 'data', 'priority': 9},
+        },
         # ENABLED: Signal generation every 4 hours – 5 best signals per run, 30 per day max (UTC 00, 04, 08, 12, 16, 20)
         'every-4h-signal-generation': {
             'task': 'apps.signals.tasks.generate_signals_for_all_symbols',
@@ -158,6 +166,14 @@ app.conf.update(
             'options': {'queue': 'data', 'priority': 8},
             'kwargs': {'days': 90, 'max_symbols_per_run': 30, 'timeframes': ('1h', '4h', '1d')},
         },
+        # ACTIVE: Fold newly closed 1h candles into the incremental indicator state (IndicatorState)
+        # that TechnicalAnalysisService and DatabaseTechnicalAnalysis read before recomputing
+        'advance-indicator-state': {
+            'task': 'apps.data.tasks.advance_indicator_state_task',
+            'schedule': crontab(minute=15),  # Every hour at :15, after the :10 market data load
+            'options': {'queue': 'data', 'priority': 7},
+            'kwargs': {'timeframe': '1h'},
+        },
         # Keep active-signal list clean by expiring old signals
         # This updates `is_valid=False` for signals past `expires_at`.
         'cleanup-expired-signals': {
@@ -196,6 +212,24 @@ def debug_task(self):
     print(f'Request: {self.request!r}')
 
 
+@worker_init.connect
+def preload_ml_models(**kwargs):
+    """Load deployed ML models once in the worker's main process, before the pool forks,
+    so every child shares the memory-mapped artifacts (apps.signals.model_registry)."""
+    from django.conf import settings as django_settings
+    if not getattr(django_settings, 'ML_MODEL_REGISTRY', {}).get('PRELOAD_ON_WORKER_INIT', True):
+        return
+    try:
+        import django
+        django.setup()
+        from apps.signals.model_registry import get_model_registry
+        report = get_model_registry().preload()
+        logging.getLogger(__name__).info(f"Preloaded {len(report)} ML models")
+    except Exception as e:
+        # A missing model must not keep the worker from starting
+        logging.getLogger(__name__).error(f"Error preloading ML models: {e}")
+
+
 # Phase 5: Task monitoring and health checks
 @app.task(bind=True)
 def health_check(self):
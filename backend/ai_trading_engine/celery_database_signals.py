@@ -103,6 +103,13 @@ app.conf.update(
             'priority': 6,
         },
         
+        # NEW: Incremental indicator state (every hour, once the hourly candles are in)
+        'advance-indicator-state': {
+            'task': 'apps.data.tasks.advance_indicator_state_task',
+            'schedule': crontab(minute=5),  # Every hour at minute 5
+            'priority': 6,
+        },
+        
         # NEW: Data quality monitoring (every 10 minutes)
         'monitor-data-freshness': {
             'task': 'apps.signals.data_quality_validation_tasks.monitor_data_freshness',
@@ -398,6 +398,124 @@ TRADING_SETTINGS = {
     'MODEL_UPDATE_FREQUENCY': config('MODEL_UPDATE_FREQUENCY', default=3600, cast=int),
 }
 
+# 4h signal run (apps.signals.tasks.generate_signals_for_all_symbols)
+# FANOUT_MODE: 'serial' (in-process loop), 'process' (forked pool) or 'chord' (Celery group + callback)
+SIGNAL_GENERATION_SETTINGS = {
+    'FANOUT_MODE': config('SIGNAL_FANOUT_MODE', default='serial'),
+    'MAX_WORKERS': config('SIGNAL_FANOUT_MAX_WORKERS', default=0, cast=int),  # 0 = all cores
+    'SYMBOL_TIME_BUDGET_SECONDS': config('SIGNAL_SYMBOL_TIME_BUDGET_SECONDS', default=45, cast=int),
+    'MAX_CANDIDATES_SERIAL': 50,
+    'MAX_CANDIDATES_FANOUT': config('SIGNAL_FANOUT_MAX_CANDIDATES', default=0, cast=int),  # 0 = every eligible coin
+}
+
+# OHLCV bulk ingestion (apps.data.market_data_ingestion)
+MARKET_DATA_INGESTION = {
+    'CHUNK_SIZE': config('MARKET_DATA_INGESTION_CHUNK_SIZE', default=1000, cast=int),
+}
+
+# Shared in-process OHLCV window store (apps.data.candle_store)
+CANDLE_STORE = {
+    'MAX_ENTRIES': 512,  # (symbol, timeframe) windows kept per process, LRU-evicted
+    'MIN_BARS': 500,  # bars loaded on first access
+    'MAX_BARS': 2000,
+    'REFRESH_SECONDS': 30,  # serve from memory this long before checking for new bars
+}
+
+# Live price cache (apps.data.real_price_service, apps.data.single_flight_cache)
+LIVE_PRICE_CACHE = {
+    'FRESH_SECONDS': 60,  # older prices are still served while one background refresh runs
+    'MAX_STALE_SECONDS': 600,  # never serve prices older than this
+    'LOCK_SECONDS': 60,  # refresh lock TTL, in case the refreshing process dies
+    'WAIT_SECONDS': 10,  # block=True callers wait this long for an in-flight refresh
+}
+
+# WebSocket market-data fan-out (apps.core.market_broadcast)
+MARKET_BROADCAST = {
+    'CONFLATION_SECONDS': 0.25,  # latest update per symbol wins within a window
+    'MODE': 'delta',  # 'delta': symbols updated this window; 'snapshot': every symbol's latest
+}
+
+# Live target/stop detection for open signals (apps.signals.outcome_tracker)
+SIGNAL_OUTCOME_TRACKER = {
+    'FLUSH_SECONDS': 1,  # persist and broadcast buffered hits this often
+    'RELOAD_SECONDS': 30,  # rebuild the level index from the database (new/expired signals)
+}
+
+# Concurrent REST kline backfill (apps.data.backfill_engine)
+BACKFILL_ENGINE = {
+    'KLINES_URL': 'https://fapi.binance.com/fapi/v1/klines',
+    'MAX_WORKERS': config('BACKFILL_MAX_WORKERS', default=8, cast=int),
+    'MAX_CONCURRENCY_PER_HOST': 8,
+    'WEIGHT_LIMIT_1M': 2400,  # Binance Futures REQUEST_WEIGHT per minute per IP
+    'WEIGHT_HEADROOM': 0.9,  # fraction of the limit the backfill may use
+    'KLINE_WEIGHT': 5,  # weight of a klines request with limit=1000
+    'MAX_RETRIES': 3,
+}
+
+# Binance Futures kline stream ingestion (apps.data.kline_stream)
+KLINE_STREAM = {
+    'URL': 'wss://fstream.binance.com/stream',
+    'STREAMS_PER_CONNECTION': 200,
+    'TIMEFRAMES': ('15m', '1h', '4h', '1d'),  # rolled up from the 1m stream
+    'FLUSH_SECONDS': 5,  # write buffered closed bars at least this often
+    'FLUSH_BARS': 500,  # ... or as soon as this many are buffered
+    'MAX_BACKFILL_MINUTES': 1440,  # REST backfill limit after a reconnect
+    'RECONNECT_MAX_SECONDS': 60,
+}
+
+# Incremental indicator engine (apps.data.indicator_engine)
+INDICATOR_ENGINE = {
+    'SMOOTHING': 'sma',  # 'sma' matches the pandas services; 'wilder' for Wilder RSI/ATR/ADX
+    'WARMUP_BARS': 500,  # closed bars replayed when state is (re)built
+    'PERIODS': {},  # overrides for apps.data.indicator_engine.DEFAULT_PERIODS
+}
+
+# Signals API response caching (apps.signals.signal_cache); writes invalidate by generation bump
+SIGNAL_API_CACHE = {
+    'LIST_TTL': 120,  # seconds; bounds how stale the embedded current prices can get
+    'EMPTY_LIST_TTL': 10,
+    'STATISTICS_TTL': 300,
+}
+
+# Online feature cache for batched ML inference (apps.signals.ml_feature_cache)
+ML_FEATURE_CACHE = {
+    'LOOKBACK_DAYS': 30,  # history loaded when a symbol is first seen
+    'WARMUP_BARS': 250,  # bars features are generated over; bounds sma_50 and converges the EMAs
+    'MAX_STEPS': 64,  # longest LSTM/GRU input sequence served
+    'REFRESH_SECONDS': 60,  # serve from memory this long before checking for new bars
+    'MAX_ENTRIES': 512,  # symbols kept per process, LRU-evicted
+}
+
+# Columnar training/backtest dataset snapshots (apps.signals.ml_dataset_store); needs pyarrow
+ML_DATASETS = {
+    'ENABLED': True,
+    'ROOT': BASE_DIR / 'ml_datasets',
+    'FORMAT': 'feather',  # 'feather' (uncompressed, memory-mapped) or 'parquet' (smaller, decoded on read)
+    'CHUNK_SIZE': 5000,  # rows fetched per database round trip
+    'MAX_PARTS': 16,  # appended parts kept before a snapshot is compacted
+    'VERIFY_SECONDS': 300,  # reuse a verified data version this long while no source gained rows
+}
+
+# Shared ML model artifacts (apps.signals.model_registry)
+ML_MODEL_REGISTRY = {
+    'MMAP_MODE': 'r',  # joblib mmap_mode; None loads artifacts fully into memory
+    'PRELOAD_ON_WORKER_INIT': True,  # load deployed models before the Celery pool forks
+    'PRELOAD_SIGNAL_MODELS': ['signal_xgboost'],  # ml_models/signals/<name>_model.pkl files to preload
+    'EVICT_SECONDS': 300,  # how often deactivated model versions are dropped
+}
+
+# Parallel parameter optimisation (apps.analytics.optimization_runner)
+STRATEGY_OPTIMIZATION = {
+    'MAX_WORKERS': config('STRATEGY_OPTIMIZATION_MAX_WORKERS', default=0, cast=int),  # 0 = all cores, 1 = in-process
+    'SEED': None,  # seed for GA/random search draws; None = unseeded
+}
+
+# Background backtest jobs (apps.signals.backtest_jobs)
+BACKTEST_JOBS = {
+    'ASYNC_BY_DEFAULT': False,  # run backtests as Celery jobs even without "async": true
+    'STALE_AFTER_SECONDS': 3600,  # pending/running jobs older than this are not reused
+}
+
 # API Keys for external services
 NEWS_API_KEY = config('NEWS_API_KEY', default=None)
 CRYPTOPANIC_API_KEY = config('CRYPTOPANIC_API_KEY', default=None)
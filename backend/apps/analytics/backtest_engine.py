@@ -0,0 +1,325 @@
+"""
+Columnar backtest engine.
+
+Strategy signals are computed for every bar up front as an int8 array (BUY/SELL/0),
+then positions and equity are written into preallocated NumPy buffers. The fill loop
+walks trades rather than bars: each entry is the next BUY after the previous exit,
+each exit the first SELL, stop or target after the entry (found with
+``searchsorted``/``argmax``), and the start-of-bar cash/share state between them is a
+slice assignment. Fills, commission and slippage are therefore settled in a single
+pass over the trades, and the metrics are array reductions over the equity curve.
+
+Conventions shared with the per-bar loops this replaces:
+  * equity[i] is the portfolio before bar i's signal executes, valued at close[i]
+  * positions are long only and sized at ``position_fraction`` of current capital
+  * a BUY while long is ignored; any position still open is closed on the last bar
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from apps.signals.pattern_kernels import rolling_mean, shift
+
+BUY = 1
+SELL = -1
+
+# Exit reason codes (names match TradeLog.exit_reason)
+EXIT_SIGNAL = 1
+EXIT_STOP_LOSS = 2
+EXIT_TAKE_PROFIT = 3
+EXIT_END = 4
+EXIT_REASONS = {
+    EXIT_SIGNAL: 'SIGNAL_EXIT',
+    EXIT_STOP_LOSS: 'STOP_LOSS',
+    EXIT_TAKE_PROFIT: 'TAKE_PROFIT',
+    EXIT_END: 'TIME_EXIT',
+}
+
+SignalBuilder = Callable[[np.ndarray], np.ndarray]
+
+
+def sma_trend_signals(close: np.ndarray, fast: int = 20, slow: int = 50) -> np.ndarray:
+    """Trend filter on the SMAs of the bars *before* each bar.
+
+    BUY when SMA(fast) > SMA(slow) and the close is above SMA(fast), SELL on the
+    mirror condition. Until ``slow`` bars exist SMA(slow) falls back to SMA(fast),
+    so no signal fires before then.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    bars = np.arange(len(close))
+    fast_mean = shift(rolling_mean(close, fast))
+    slow_mean = np.where(bars >= slow, shift(rolling_mean(close, slow)), fast_mean)
+    with np.errstate(invalid='ignore'):
+        ready = bars >= fast
+        buy = ready & (fast_mean > slow_mean) & (close > fast_mean)
+        sell = ready & ~buy & (fast_mean < slow_mean) & (close < fast_mean)
+    return (buy.astype(np.int8) - sell.astype(np.int8))
+
+
+def sma_crossover_signals(close: np.ndarray, fast: int = 20, slow: int = 50) -> np.ndarray:
+    """BUY on the bar SMA(fast) crosses above SMA(slow) with the close above SMA(fast); SELL on the mirror."""
+    close = np.asarray(close, dtype=np.float64)
+    fast_mean = rolling_mean(close, fast)
+    slow_mean = rolling_mean(close, slow)
+    was_fast, was_slow = shift(fast_mean), shift(slow_mean)
+    with np.errstate(invalid='ignore'):
+        ready = np.arange(len(close)) >= slow
+        buy = ready & (fast_mean > slow_mean) & (was_fast <= was_slow) & (close > fast_mean)
+        sell = ready & ~buy & (fast_mean < slow_mean) & (was_fast >= was_slow) & (close < fast_mean)
+    return (buy.astype(np.int8) - sell.astype(np.int8))
+
+
+@dataclass(frozen=True)
+class Trades:
+    """Round trips as parallel arrays; ``cost`` is cash paid at entry and ``proceeds`` cash received at exit."""
+    entry_bar: np.ndarray
+    exit_bar: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    shares: np.ndarray
+    position_size: np.ndarray
+    entry_commission: np.ndarray
+    exit_commission: np.ndarray
+    cost: np.ndarray
+    proceeds: np.ndarray
+    pnl: np.ndarray
+    exit_reason: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.entry_bar)
+
+
+@dataclass(frozen=True)
+class BacktestRun:
+    """Per-bar buffers and trades of one simulated symbol."""
+    close: np.ndarray
+    equity: np.ndarray
+    cash: np.ndarray
+    shares: np.ndarray
+    trades: Trades
+    initial_capital: float
+    final_capital: float
+    timestamps: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.equity)
+
+    @property
+    def returns(self) -> np.ndarray:
+        """Bar-over-bar equity returns, the first measured against the initial capital."""
+        previous = np.concatenate(([self.initial_capital], self.equity[:-1]))
+        return self.equity / previous - 1
+
+    def metrics(self, risk_free_rate: float = 0.02, periods_per_year: int = 252) -> Dict:
+        """Return, risk and trade statistics as plain floats/ints."""
+        return performance_metrics(self.equity, self.trades.pnl, self.initial_capital,
+                                   risk_free_rate, periods_per_year)
+
+    def equity_records(self) -> list:
+        """``[{'timestamp', 'equity', 'capital'}]`` rows for reports."""
+        timestamps = self.timestamps if self.timestamps is not None else range(len(self))
+        return [
+            {'timestamp': timestamp, 'equity': equity, 'capital': cash}
+            for timestamp, equity, cash in zip(timestamps, self.equity.tolist(), self.cash.tolist())
+        ]
+
+    def timestamp_at(self, bar: int):
+        return self.timestamps[bar] if self.timestamps is not None else bar
+
+
+def performance_metrics(equity: np.ndarray, pnl: np.ndarray, initial_capital: float,
+                        risk_free_rate: float = 0.02, periods_per_year: int = 252) -> Dict:
+    """Metrics of an equity curve and the P&L of its round trips.
+
+    Percentages (returns, drawdown, volatility, win rate) are in percent; ``days`` for the
+    annualised return is the number of bars, as in ``BacktestingService``.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    pnl = np.asarray(pnl, dtype=np.float64)
+    wins, losses = pnl[pnl > 0], pnl[pnl < 0]
+    metrics = {
+        'total_return': 0.0,
+        'annualized_return': 0.0,
+        'sharpe_ratio': 0.0,
+        'sortino_ratio': 0.0,
+        'calmar_ratio': 0.0,
+        'max_drawdown': 0.0,
+        'max_drawdown_duration': 0,
+        'volatility': 0.0,
+        'win_rate': len(wins) / len(pnl) * 100 if len(pnl) else 0.0,
+        'profit_factor': float(wins.sum() / abs(losses.sum())) if len(losses) else 0.0,
+        'total_trades': int(len(pnl)),
+        'winning_trades': int(len(wins)),
+        'losing_trades': int(len(losses)),
+        'average_win': float(wins.mean()) if len(wins) else 0.0,
+        'average_loss': float(losses.mean()) if len(losses) else 0.0,
+        'final_capital': float(initial_capital),
+    }
+    if not len(equity):
+        return metrics
+
+    final_equity = float(equity[-1])
+    growth = final_equity / initial_capital
+    metrics['final_capital'] = final_equity
+    metrics['total_return'] = (growth - 1) * 100
+    metrics['annualized_return'] = (growth ** (365 / len(equity)) - 1) * 100
+
+    returns = equity / np.concatenate(([initial_capital], equity[:-1])) - 1
+    excess = returns - risk_free_rate / periods_per_year
+    annualiser = np.sqrt(periods_per_year)
+    if np.std(excess) > 0:
+        metrics['sharpe_ratio'] = float(np.mean(excess) / np.std(excess) * annualiser)
+    downside = excess[excess < 0]
+    if len(downside) and np.std(downside) > 0:
+        metrics['sortino_ratio'] = float(np.mean(excess) / np.std(downside) * annualiser)
+    metrics['volatility'] = float(np.std(returns) * annualiser * 100)
+
+    peak = np.maximum.accumulate(equity)
+    if len(equity) >= 2:
+        metrics['max_drawdown'] = float(abs(np.min((equity - peak) / peak)) * 100)
+    # Longest run of bars that did not set a new equity high
+    new_high = np.concatenate(([False], equity[1:] > peak[:-1]))
+    streak = np.bincount(np.cumsum(new_high)[~new_high])
+    metrics['max_drawdown_duration'] = int(streak.max()) if len(streak) else 0
+    if metrics['max_drawdown'] > 0:
+        metrics['calmar_ratio'] = metrics['annualized_return'] / metrics['max_drawdown']
+    return metrics
+
+
+class ColumnarBacktestEngine:
+    """Simulate long-only fills for precomputed signal arrays"""
+
+    def __init__(self, initial_capital: float = 10000, commission_rate: float = 0.001,
+                 slippage: float = 0.0005, position_fraction: float = 0.1,
+                 stop_loss: Optional[float] = None, take_profit: Optional[float] = None):
+        """
+        Args:
+            initial_capital: Starting cash
+            commission_rate: Fraction of traded value charged on entry and exit
+            slippage: Fraction the fill moves against the order on market entries/exits
+            position_fraction: Fraction of current capital committed per entry
+            stop_loss: Exit when a close falls this fraction below the signal close (filled at the stop)
+            take_profit: Exit when a close rises this fraction above the signal close (filled at the target)
+        """
+        self.initial_capital = float(initial_capital)
+        self.commission_rate = float(commission_rate)
+        self.slippage = float(slippage)
+        self.position_fraction = float(position_fraction)
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+
+    def run(self, close, signals, timestamps=None) -> BacktestRun:
+        """Simulate one symbol; ``signals`` is aligned with ``close`` (BUY=1, SELL=-1, else 0)."""
+        close = np.asarray(close, dtype=np.float64)
+        signals = np.asarray(signals)
+        n = len(close)
+        buys = np.flatnonzero(signals == BUY)
+        sells = np.flatnonzero(signals == SELL)
+
+        cash = np.empty(n)
+        shares = np.zeros(n)
+        capacity = len(buys)
+        trade = {name: np.empty(capacity) for name in (
+            'entry_price', 'exit_price', 'shares', 'position_size', 'entry_commission',
+            'exit_commission', 'cost', 'proceeds')}
+        entry_bars = np.empty(capacity, dtype=np.int64)
+        exit_bars = np.empty(capacity, dtype=np.int64)
+        reasons = np.empty(capacity, dtype=np.int8)
+
+        capital = self.initial_capital
+        settled = 0  # bars [0, settled) have their start-of-bar state written
+        count = 0
+        next_buy = 0
+        while capital > 0:
+            next_buy = np.searchsorted(buys, settled, side='left') if count else 0
+            if next_buy >= len(buys):
+                break
+            entry = int(buys[next_buy])
+            position_size = capital * self.position_fraction
+            entry_commission = position_size * self.commission_rate
+            cost = position_size + entry_commission
+            if cost > capital:
+                break
+            entry_price = close[entry] * (1 + self.slippage)
+            quantity = position_size / entry_price
+
+            exit_bar, reason, exit_price = self._find_exit(close, sells, entry)
+            exit_commission = quantity * exit_price * self.commission_rate
+            proceeds = quantity * exit_price - exit_commission
+
+            cash[settled:entry + 1] = capital
+            cash[entry + 1:exit_bar + 1] = capital - cost
+            shares[entry + 1:exit_bar + 1] = quantity
+
+            entry_bars[count], exit_bars[count], reasons[count] = entry, exit_bar, reason
+            for name, value in (('entry_price', entry_price), ('exit_price', exit_price),
+                                ('shares', quantity), ('position_size', position_size),
+                                ('entry_commission', entry_commission),
+                                ('exit_commission', exit_commission),
+                                ('cost', cost), ('proceeds', proceeds)):
+                trade[name][count] = value
+            count += 1
+
+            capital = capital - cost + proceeds
+            settled = exit_bar + 1
+            if settled >= n:
+                break
+        cash[settled:] = capital
+
+        trade = {name: values[:count] for name, values in trade.items()}
+        trades = Trades(
+            entry_bar=entry_bars[:count],
+            exit_bar=exit_bars[:count],
+            pnl=trade['proceeds'] - trade['cost'],
+            exit_reason=reasons[:count],
+            **trade,
+        )
+        return BacktestRun(
+            close=close,
+            equity=cash + shares * close,
+            cash=cash,
+            shares=shares,
+            trades=trades,
+            initial_capital=self.initial_capital,
+            final_capital=float(capital),
+            timestamps=timestamps,
+        )
+
+    def run_many(self, frames: Mapping[str, pd.DataFrame],
+                 signal_builder: SignalBuilder = sma_trend_signals) -> Dict[str, BacktestRun]:
+        """Simulate several symbols with the same settings.
+
+        ``frames`` maps each symbol to a frame with a ``close`` column, indexed by (or
+        carrying a ``timestamp`` column of) bar times.
+        """
+        runs = {}
+        for symbol, frame in frames.items():
+            close = frame['close'].to_numpy(dtype=np.float64)
+            timestamps = frame['timestamp'].to_numpy() if 'timestamp' in frame.columns else frame.index.to_numpy()
+            runs[symbol] = self.run(close, signal_builder(close), timestamps)
+        return runs
+
+    def _find_exit(self, close: np.ndarray, sells: np.ndarray, entry: int):
+        """(bar, reason, fill price) of the first SELL, stop or target after ``entry``."""
+        last = len(close) - 1
+        next_sell = np.searchsorted(sells, entry, side='right')
+        signal_bar = int(sells[next_sell]) if next_sell < len(sells) else last + 1
+
+        # Signals execute before stops, so levels are only checked on bars before the SELL
+        if self.stop_loss or self.take_profit:
+            stop = close[entry] * (1 - self.stop_loss) if self.stop_loss else -np.inf
+            target = close[entry] * (1 + self.take_profit) if self.take_profit else np.inf
+            held = close[entry + 1:min(signal_bar, last + 1)]
+            stopped, reached = held <= stop, held >= target
+            touched = stopped | reached
+            if touched.any():
+                offset = int(touched.argmax())
+                if stopped[offset]:
+                    return entry + 1 + offset, EXIT_STOP_LOSS, stop
+                return entry + 1 + offset, EXIT_TAKE_PROFIT, target
+
+        if signal_bar <= last:
+            return signal_bar, EXIT_SIGNAL, close[signal_bar] * (1 - self.slippage)
+        return last, EXIT_END, close[last] * (1 - self.slippage)
@@ -0,0 +1,368 @@
+"""
+Parallel fitness evaluation for strategy parameter optimisation.
+
+``OptimizationRunner`` loads the candles for a symbol once and keeps them on the runner.
+Batches of parameter sets are spread over a forked process pool: workers inherit the
+runner (and its DataFrame) copy-on-write, look it up by token and return only a float per
+parameter set, so the data is never pickled or re-queried. Results are memoised by
+(parameter set, date range), so elites carried across GA generations and repeated
+random draws are not backtested again. Walk-forward windows are fanned out over the
+same pool, each window optimising serially inside its worker.
+
+Every random choice comes from a ``random.Random`` seeded by the caller, so a seeded run
+reproduces the same candidates (and therefore results) regardless of worker count.
+"""
+import copy
+import itertools
+import logging
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_OPTIMIZATION = getattr(settings, 'STRATEGY_OPTIMIZATION', {})
+
+# Runners visible to forked workers, keyed by token (set in the parent before forking)
+_shared_runners: Dict[int, 'OptimizationRunner'] = {}
+_tokens = itertools.count(1)
+
+
+def fitness_score(metrics: Dict) -> float:
+    """Composite fitness of a backtest's performance metrics"""
+    return (
+        float(metrics['sharpe_ratio']) * 0.4 +  # Sharpe ratio (40% weight)
+        float(metrics['total_return']) * 0.3 +  # Total return (30% weight)
+        (100 - float(metrics['max_drawdown'])) * 0.2 +  # Lower drawdown is better (20% weight)
+        float(metrics['win_rate']) * 0.1  # Win rate (10% weight)
+    )
+
+
+def parameter_key(parameters: Optional[Dict]) -> Tuple[Tuple[str, Hashable], ...]:
+    return tuple(sorted((parameters or {}).items()))
+
+
+def _evaluate_in_worker(token: int, parameters: Dict, start_date, end_date) -> float:
+    return _shared_runners[token].evaluate_one(parameters, start_date, end_date)
+
+
+def _walk_forward_window_in_worker(token: int, window: Dict, param_ranges: Dict,
+                                   population_size: int, generations: int, seed: Optional[int]) -> Optional[Dict]:
+    return _shared_runners[token].run_walk_forward_window(window, param_ranges, population_size, generations, seed)
+
+
+class OptimizationRunner:
+    """Evaluate parameter sets for one strategy and symbol against candles loaded once"""
+
+    def __init__(self, backtesting_service, strategy, symbol, historical_data: pd.DataFrame,
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            backtesting_service: BacktestingService used for every evaluation
+            strategy: Strategy object whose attributes the parameter sets override
+            symbol: Symbol the candles belong to (used in reports)
+            historical_data: Candles with ``timestamp`` and ``close`` columns, sorted by time
+            max_workers: Pool size; 0/None = STRATEGY_OPTIMIZATION['MAX_WORKERS'] (0 = all cores),
+                1 = evaluate in-process
+        """
+        self.backtesting_service = backtesting_service
+        self.strategy = strategy
+        self.symbol = symbol
+        self.historical_data = historical_data
+        if not max_workers:
+            max_workers = STRATEGY_OPTIMIZATION.get('MAX_WORKERS', 0) or os.cpu_count() or 1
+        self.max_workers = max_workers
+        self.memo: Dict[Tuple, float] = {}
+        self.evaluations = 0
+        self.cache_hits = 0
+        self.elapsed = 0.0
+        self._slices: Dict[Tuple, pd.DataFrame] = {}
+        self._executor = None
+        self._token = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._token is not None:
+            _shared_runners.pop(self._token, None)
+            self._token = None
+
+    @property
+    def parallel(self) -> bool:
+        return self.max_workers > 1 and 'fork' in multiprocessing.get_all_start_methods()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """
+        Lazily start the pool. Workers fork on first submit, after the runner is registered,
+        so they inherit it; DB connections are closed first so none is shared with a child.
+        """
+        if self._executor is None:
+            from django.db import connections
+
+            connections.close_all()
+            self._token = next(_tokens)
+            _shared_runners[self._token] = self
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('fork'),
+            )
+        return self._executor
+
+    def data_between(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """Candles with start_date <= timestamp <= end_date (cached per range)"""
+        if start_date is None and end_date is None:
+            return self.historical_data
+        key = (start_date, end_date)
+        if key not in self._slices:
+            timestamps = self.historical_data['timestamp']
+            mask = pd.Series(True, index=self.historical_data.index)
+            if start_date is not None:
+                mask &= timestamps >= start_date
+            if end_date is not None:
+                mask &= timestamps <= end_date
+            self._slices[key] = self.historical_data[mask].reset_index(drop=True)
+        return self._slices[key]
+
+    def backtest(self, parameters: Optional[Dict], start_date=None, end_date=None) -> Optional[Dict]:
+        """Full backtest report for one parameter set on the in-memory candles"""
+        data = self.data_between(start_date, end_date)
+        if data.empty:
+            return None
+        return self.backtesting_service.backtest_data(
+            self.strategy, self.symbol, data,
+            start_date or data['timestamp'].iloc[0], end_date or data['timestamp'].iloc[-1], parameters
+        )
+
+    def evaluate_one(self, parameters: Optional[Dict], start_date=None, end_date=None) -> float:
+        try:
+            result = self.backtest(parameters, start_date, end_date)
+            return fitness_score(result['performance_metrics']) if result else float('-inf')
+        except Exception as e:
+            logger.error(f"Error evaluating fitness: {e}")
+            return float('-inf')
+
+    def evaluate(self, parameter_sets: Iterable[Dict], start_date=None, end_date=None) -> List[float]:
+        """Fitness of each parameter set, in order; unseen sets are evaluated across the pool"""
+        parameter_sets = list(parameter_sets)
+        keys = [(parameter_key(parameters), start_date, end_date) for parameters in parameter_sets]
+        pending = {}
+        for key, parameters in zip(keys, parameter_sets):
+            if key in self.memo or key in pending:
+                self.cache_hits += 1
+            else:
+                pending[key] = parameters
+
+        started = time.perf_counter()
+        if self.parallel and len(pending) > 1:
+            executor = self._pool()
+            futures = {
+                key: executor.submit(_evaluate_in_worker, self._token, parameters, start_date, end_date)
+                for key, parameters in pending.items()
+            }
+            for key, future in futures.items():
+                try:
+                    self.memo[key] = future.result()
+                except Exception as e:
+                    logger.error(f"Pool worker failed for parameters {dict(key[0])}: {e}")
+                    self.memo[key] = float('-inf')
+        else:
+            for key, parameters in pending.items():
+                self.memo[key] = self.evaluate_one(parameters, start_date, end_date)
+        self.elapsed += time.perf_counter() - started
+        self.evaluations += len(pending)
+
+        return [self.memo[key] for key in keys]
+
+    def throughput(self) -> Dict:
+        """Evaluation counters and evaluations per second of pool/loop wall time"""
+        return {
+            'evaluations': self.evaluations,
+            'cache_hits': self.cache_hits,
+            'workers': self.max_workers if self.parallel else 1,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'evaluations_per_second': round(self.evaluations / self.elapsed, 2) if self.elapsed > 0 else 0.0,
+        }
+
+    # Search strategies
+
+    def grid_search(self, param_ranges: Dict, start_date=None, end_date=None) -> Dict:
+        param_names = list(param_ranges.keys())
+        candidates = [dict(zip(param_names, combo)) for combo in itertools.product(*param_ranges.values())]
+        logger.info(f"Grid search: testing {len(candidates)} parameter combinations")
+        return self._best_of(candidates, self.evaluate(candidates, start_date, end_date))
+
+    def random_search(self, param_ranges: Dict, iterations: int, rng: random.Random,
+                      start_date=None, end_date=None) -> Dict:
+        candidates = [random_parameters(param_ranges, rng) for _ in range(iterations)]
+        return self._best_of(candidates, self.evaluate(candidates, start_date, end_date))
+
+    def genetic(self, param_ranges: Dict, population_size: int, generations: int,
+                crossover_rate: float, mutation_rate: float, rng: random.Random,
+                start_date=None, end_date=None) -> Dict:
+        population = [random_parameters(param_ranges, rng) for _ in range(population_size)]
+        best_individual = None
+        best_fitness = float('-inf')
+        generation_results = []
+
+        for generation in range(generations):
+            fitnesses = self.evaluate(population, start_date, end_date)
+            fitness_scores = list(zip(population, fitnesses))
+            for individual, fitness in fitness_scores:
+                if fitness > best_fitness:
+                    best_fitness = fitness
+                    best_individual = copy.deepcopy(individual)
+
+            generation_results.append({
+                'generation': generation + 1,
+                'best_fitness': best_fitness,
+                'avg_fitness': sum(fitnesses) / len(fitnesses),
+                'best_parameters': best_individual
+            })
+
+            # Elitism: keep best individual, fill the rest by selection, crossover and mutation
+            new_population = [best_individual]
+            while len(new_population) < population_size:
+                parent1 = tournament_selection(fitness_scores, rng)
+                parent2 = tournament_selection(fitness_scores, rng)
+                if rng.random() < crossover_rate:
+                    child1, child2 = crossover(parent1, parent2, rng)
+                else:
+                    child1, child2 = copy.deepcopy(parent1), copy.deepcopy(parent2)
+                if rng.random() < mutation_rate:
+                    child1 = mutate(child1, param_ranges, rng)
+                if rng.random() < mutation_rate:
+                    child2 = mutate(child2, param_ranges, rng)
+                new_population.extend([child1, child2])
+            population = new_population[:population_size]
+
+            if (generation + 1) % 10 == 0:
+                logger.info(f"Generation {generation + 1}: Best Fitness = {best_fitness:.4f}")
+
+        return {
+            'best_parameters': best_individual,
+            'best_fitness': best_fitness,
+            'generation_results': generation_results,
+        }
+
+    @staticmethod
+    def _best_of(candidates: List[Dict], fitnesses: List[float]) -> Dict:
+        best_params, best_fitness = None, float('-inf')
+        for params, fitness in zip(candidates, fitnesses):
+            if fitness > best_fitness:
+                best_params, best_fitness = params, fitness
+        return {
+            'best_parameters': best_params,
+            'best_fitness': best_fitness,
+            'all_results': [{'parameters': p, 'fitness': f} for p, f in zip(candidates, fitnesses)],
+        }
+
+    # Walk-forward
+
+    def walk_forward(self, windows: List[Dict], param_ranges: Dict, population_size: int,
+                     generations: int, seed: Optional[int] = None) -> List[Optional[Dict]]:
+        """Optimise and test every window; windows run concurrently, results come back in order"""
+        seeds = [None if seed is None else seed + i for i in range(len(windows))]
+        started = time.perf_counter()
+        if self.parallel and len(windows) > 1:
+            executor = self._pool()
+            futures = [
+                executor.submit(_walk_forward_window_in_worker, self._token, window, param_ranges,
+                                population_size, generations, window_seed)
+                for window, window_seed in zip(windows, seeds)
+            ]
+            results = []
+            for window, future in zip(windows, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Walk-forward window starting {window['training_start']} failed: {e}")
+                    results.append(None)
+        else:
+            results = [
+                self.run_walk_forward_window(window, param_ranges, population_size, generations, window_seed)
+                for window, window_seed in zip(windows, seeds)
+            ]
+        self.elapsed += time.perf_counter() - started
+        self.evaluations += sum(result['evaluations'] for result in results if result)
+        return results
+
+    def run_walk_forward_window(self, window: Dict, param_ranges: Dict, population_size: int,
+                                generations: int, seed: Optional[int]) -> Optional[Dict]:
+        """Optimise on the training range and backtest the winner on the testing range (in-process)"""
+        window_runner = OptimizationRunner(
+            self.backtesting_service, self.strategy, self.symbol,
+            self.data_between(window['training_start'], window['testing_end']), max_workers=1
+        )
+        optimization = window_runner.genetic(
+            param_ranges, population_size, generations, crossover_rate=0.8, mutation_rate=0.1,
+            rng=random.Random(seed), start_date=window['training_start'], end_date=window['training_end']
+        )
+        if not optimization['best_parameters']:
+            return None
+        training = window_runner.backtest(optimization['best_parameters'], window['training_start'], window['training_end'])
+        testing = window_runner.backtest(optimization['best_parameters'], window['training_end'], window['testing_end'])
+        if not training or not testing:
+            return None
+        return {
+            'optimized_parameters': optimization['best_parameters'],
+            'training_performance': training['performance_metrics'],
+            'testing_performance': testing['performance_metrics'],
+            'evaluations': window_runner.evaluations,
+        }
+
+
+def random_parameters(param_ranges: Dict, rng: random.Random) -> Dict:
+    """One parameter set drawn uniformly from each (low, high) range; ints stay ints"""
+    parameters = {}
+    for param_name, param_range in param_ranges.items():
+        if isinstance(param_range[0], int):
+            parameters[param_name] = rng.randint(param_range[0], param_range[1])
+        else:
+            parameters[param_name] = rng.uniform(param_range[0], param_range[1])
+    return parameters
+
+
+def tournament_selection(fitness_scores: List[Tuple[Dict, float]], rng: random.Random,
+                         tournament_size: int = 3) -> Dict:
+    """Best individual of a random tournament"""
+    tournament = rng.sample(fitness_scores, tournament_size)
+    return max(tournament, key=lambda x: x[1])[0]
+
+
+def crossover(parent1: Dict, parent2: Dict, rng: random.Random) -> Tuple[Dict, Dict]:
+    """Uniform crossover: each parameter is swapped between the children with probability 0.5"""
+    child1, child2 = {}, {}
+    for param_name in parent1.keys():
+        if rng.random() < 0.5:
+            child1[param_name], child2[param_name] = parent1[param_name], parent2[param_name]
+        else:
+            child1[param_name], child2[param_name] = parent2[param_name], parent1[param_name]
+    return child1, child2
+
+
+def mutate(individual: Dict, param_ranges: Dict, rng: random.Random, mutation_strength: float = 0.1) -> Dict:
+    """Nudge each parameter with probability ``mutation_strength``, clamped to its range"""
+    mutated = individual.copy()
+    for param_name, param_range in param_ranges.items():
+        if rng.random() < mutation_strength:
+            current_value = mutated[param_name]
+            if isinstance(param_range[0], int):
+                mutation = rng.randint(-2, 2)
+            else:
+                range_size = param_range[1] - param_range[0]
+                mutation = rng.uniform(-range_size * 0.1, range_size * 0.1)
+            mutated[param_name] = max(param_range[0], min(param_range[1], current_value + mutation))
+    return mutated
@@ -8,6 +8,11 @@ import math
 import logging
 import random
 
+from apps.analytics.backtest_engine import ColumnarBacktestEngine, sma_trend_signals
+from apps.analytics.optimization_runner import OptimizationRunner, STRATEGY_OPTIMIZATION
+
+logger = logging.getLogger(__name__)
+
 class PortfolioAnalytics:
     """Advanced portfolio analytics and risk management"""
     
@@ -201,6 +206,7 @@ class BacktestingService:
         self.trades = []
         self.equity_curve = []
         self.daily_returns = []
+        self.last_run = None
         
     def backtest_strategy(self, strategy, symbol, start_date, end_date, parameters=None):
         """Run comprehensive backtest for a given strategy"""
@@ -210,24 +216,58 @@ class BacktestingService:
             
             # Get historical data for the symbol
             historical_data = self._get_historical_data(symbol, start_date, end_date)
-            if not historical_data:
+            if historical_data.empty:
                 raise ValueError(f"No historical data available for {symbol} from {start_date} to {end_date}")
             
-            # Run strategy simulation
-            self._simulate_strategy_execution(strategy, historical_data, parameters)
-            
-            # Calculate comprehensive performance metrics
-            performance_metrics = self._calculate_performance_metrics()
-            
-            # Generate detailed backtest report
-            backtest_report = self._generate_backtest_report(strategy, symbol, start_date, end_date, performance_metrics)
-            
-            return backtest_report
+            return self.backtest_data(strategy, symbol, historical_data, start_date, end_date, parameters)
             
         except Exception as e:
             logger.error(f"Error during backtest: {e}")
             return None
-    
+
+    def backtest_data(self, strategy, symbol, historical_data, start_date, end_date, parameters=None):
+        """Run the backtest on candles already in memory (``timestamp``/``close`` columns)"""
+        # Reset backtest state
+        self._reset_backtest_state()
+        
+        # Run strategy simulation
+        self._simulate_strategy_execution(strategy, historical_data, parameters)
+        
+        # Calculate comprehensive performance metrics
+        performance_metrics = self._calculate_performance_metrics()
+        
+        # Generate detailed backtest report
+        return self._generate_backtest_report(strategy, symbol, start_date, end_date, performance_metrics)
+
+    def backtest_symbols(self, strategy, symbols, start_date, end_date, parameters=None):
+        """Run the same backtest over several symbols, loading their candles in one query
+
+        Returns a report per symbol (as ``backtest_strategy``); symbols without data are omitted.
+        """
+        try:
+            if parameters:
+                for key, value in parameters.items():
+                    if hasattr(strategy, key):
+                        setattr(strategy, key, value)
+
+            frames = self._get_historical_data_many(symbols, start_date, end_date)
+            runs = self._engine().run_many(
+                frames, signal_builder=lambda close: self._generate_strategy_signals(strategy, close)
+            )
+
+            reports = {}
+            for symbol, run in runs.items():
+                self._reset_backtest_state()
+                self._record_run(run)
+                reports[symbol] = self._generate_backtest_report(
+                    strategy, symbol, start_date, end_date, self._calculate_performance_metrics()
+                )
+            return reports
+
+        except Exception as e:
+            logger.error(f"Error during multi-symbol backtest: {e}")
+            return {}
+
     def _reset_backtest_state(self):
         """Reset backtest state for new run"""
         self.current_capital = self.initial_capital
@@ -235,10 +275,21 @@ class BacktestingService:
         self.trades = []
         self.equity_curve = []
         self.daily_returns = []
+        self.last_run = None
     
     def _get_historical_data(self, symbol, start_date, end_date):
         """Get historical market data for backtesting"""
         try:
+            frames = self._get_snapshot_data([symbol], start_date, end_date)
+            if frames is not None:
+                if symbol not in frames:
+                    logger.error(
+                        f"No historical data found for {symbol} in range {start_date} to {end_date}. "
+                        f"Populate historical data before running backtests."
+                    )
+                    return pd.DataFrame()
+                return frames[symbol]
+
             # Query the database for historical data
             from apps.data.models import MarketData
             
@@ -274,7 +325,64 @@ class BacktestingService:
             logger.error(f"Error getting historical data: {e}")
             # Enforce real-data-only policy
             return pd.DataFrame()
-    
+
+    def _get_snapshot_data(self, symbols, start_date, end_date):
+        """``{symbol: DataFrame}`` read from the on-disk dataset snapshot, or None when snapshots are off"""
+        from apps.signals.ml_dataset_store import MARKET_COLUMNS, get_snapshot_store
+        from apps.trading.models import Symbol
+
+        store = get_snapshot_store()
+        if not store.available:
+            return None
+        try:
+            symbol_objects = list(Symbol.objects.filter(symbol__in=list(symbols)).only('id', 'symbol'))
+            bars = store.load(symbol_objects, start_date, end_date,
+                              indicators=False, sentiment=False, columns=MARKET_COLUMNS)
+        except Exception as e:
+            logger.warning(f"Dataset snapshot unavailable, querying the database: {e}")
+            return None
+        codes = {s.id: s.symbol for s in symbol_objects}
+        return {
+            codes[symbol_id]: frame[MARKET_COLUMNS].reset_index()
+            for symbol_id, frame in bars.items() if not frame.empty
+        }
+
+    def _get_historical_data_many(self, symbols, start_date, end_date):
+        """``{symbol: DataFrame}`` of candles for several symbols from a single query"""
+        try:
+            frames = self._get_snapshot_data(symbols, start_date, end_date)
+            if frames is not None:
+                if not frames:
+                    logger.error(f"No historical data found for {list(symbols)} in range {start_date} to {end_date}")
+                return frames
+
+            from apps.data.models import MarketData
+
+            rows = MarketData.objects.filter(
+                symbol__symbol__in=list(symbols),
+                timestamp__gte=start_date,
+                timestamp__lte=end_date
+            ).order_by('symbol__symbol', 'timestamp').values_list(
+                'symbol__symbol', 'timestamp', 'open_price', 'high_price', 'low_price', 'close_price', 'volume'
+            )
+            data = pd.DataFrame.from_records(
+                list(rows), columns=['symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume']
+            )
+            if data.empty:
+                logger.error(f"No historical data found for {list(symbols)} in range {start_date} to {end_date}")
+                return {}
+
+            price_columns = ['open', 'high', 'low', 'close', 'volume']
+            data[price_columns] = data[price_columns].astype(np.float64)
+            return {
+                symbol: frame.drop(columns='symbol').reset_index(drop=True)
+                for symbol, frame in data.groupby('symbol', sort=False)
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting historical data: {e}")
+            return {}
+
     def _generate_synthetic_data(self, start_date, end_date):
         """Generate synthetic market data for testing when real data unavailable"""
         import random
@@ -319,222 +427,70 @@ class BacktestingService:
                     if hasattr(strategy, key):
                         setattr(strategy, key, value)
             
-            # Process each data point
-            for index, row in historical_data.iterrows():
-                current_price = row['close']
-                current_timestamp = row['timestamp']
-                
-                # Update equity curve
-                self._update_equity_curve(current_price, current_timestamp)
-                
-                # Generate signals for current data point
-                signals = self._generate_strategy_signals(strategy, historical_data, index)
-                
-                # Execute signals
-                for signal in signals:
-                    self._execute_signal(signal, current_price, current_timestamp)
-                
-                # Update positions and calculate daily returns
-                self._update_positions(current_price, current_timestamp)
-            
-            # Close any remaining positions at the end
-            self._close_all_positions(historical_data.iloc[-1]['close'], historical_data.iloc[-1]['timestamp'])
+            close = historical_data['close'].to_numpy(dtype=np.float64)
+            signals = self._generate_strategy_signals(strategy, close)
+            run = self._engine().run(close, signals, historical_data['timestamp'].to_numpy())
+            self._record_run(run)
             
         except Exception as e:
             logger.error(f"Error simulating strategy execution: {e}")
     
-    def _generate_strategy_signals(self, strategy, data, current_index):
-        """Generate trading signals based on strategy logic"""
-        try:
-            # This is a simplified signal generation
-            # In a real implementation, you would call the actual strategy methods
-            
-            signals = []
-            current_price = data.iloc[current_index]['close']
-            
-            # Simple moving average crossover example
-            if current_index >= 20:  # Need at least 20 data points
-                sma_20 = data.iloc[current_index-20:current_index]['close'].mean()
-                sma_50 = data.iloc[current_index-50:current_index]['close'].mean() if current_index >= 50 else sma_20
-                
-                # Generate buy signal on crossover
-                if sma_20 > sma_50 and current_price > sma_20:
-                    signals.append({
-                        'type': 'BUY',
-                        'price': current_price,
-                        'confidence': 0.8,
-                        'reason': 'SMA crossover bullish'
-                    })
-                
-                # Generate sell signal on crossover
-                elif sma_20 < sma_50 and current_price < sma_20:
-                    signals.append({
-                        'type': 'SELL',
-                        'price': current_price,
-                        'confidence': 0.8,
-                        'reason': 'SMA crossover bearish'
-                    })
-            
-            return signals
-            
-        except Exception as e:
-            logger.error(f"Error generating signals: {e}")
-            return []
+    def _generate_strategy_signals(self, strategy, close):
+        """Signal array (BUY=1, SELL=-1) for every bar of ``close``"""
+        # Simple moving average trend filter: SMA(short) vs SMA(long) of the preceding bars
+        return sma_trend_signals(close, fast=int(getattr(strategy, 'sma_short_period', 20)),
+                                 slow=int(getattr(strategy, 'sma_long_period', 50)))
     
-    def _execute_signal(self, signal, current_price, timestamp):
-        """Execute a trading signal"""
-        try:
-            if signal['type'] == 'BUY' and self.current_capital > 0:
-                # Calculate position size (simple 10% of capital per trade)
-                position_size = self.current_capital * Decimal('0.1')
-                shares = position_size / Decimal(str(current_price))
-                
-                # Apply slippage and commission
-                execution_price = current_price * (1 + self.slippage)
-                total_cost = position_size + (position_size * self.commission_rate)
-                
-                if total_cost <= self.current_capital:
-                    # Record the trade
-                    self.trades.append({
-                        'timestamp': timestamp,
-                        'type': 'BUY',
-                        'price': execution_price,
-                        'shares': float(shares),
-                        'value': float(position_size),
-                        'commission': float(position_size * self.commission_rate)
-                    })
-                    
-                    # Update capital and positions
-                    self.current_capital -= total_cost
-                    self.positions['long'] = {
-                        'shares': shares,
-                        'entry_price': execution_price,
-                        'entry_timestamp': timestamp
-                    }
-            
-            elif signal['type'] == 'SELL' and 'long' in self.positions:
-                position = self.positions['long']
-                shares = position['shares']
-                
-                # Apply slippage and commission
-                execution_price = current_price * (1 - self.slippage)
-                gross_proceeds = shares * Decimal(str(execution_price))
-                commission = gross_proceeds * self.commission_rate
-                net_proceeds = gross_proceeds - commission
-                
-                # Record the trade
-                self.trades.append({
-                    'timestamp': timestamp,
-                    'type': 'SELL',
-                    'price': execution_price,
-                    'shares': float(shares),
-                    'value': float(gross_proceeds),
-                    'commission': float(commission),
-                    'pnl': float(net_proceeds - (shares * position['entry_price']))
-                })
-                
-                # Update capital and close position
-                self.current_capital += net_proceeds
-                del self.positions['long']
-                
-        except Exception as e:
-            logger.error(f"Error executing signal: {e}")
+    def _engine(self):
+        return ColumnarBacktestEngine(
+            initial_capital=float(self.initial_capital),
+            commission_rate=float(self.commission_rate),
+            slippage=float(self.slippage),
+            position_fraction=0.1,
+        )
     
-    def _update_equity_curve(self, current_price, timestamp):
-        """Update equity curve with current portfolio value"""
-        try:
-            portfolio_value = self.current_capital
-            
-            # Add value of open positions
-            for position_type, position in self.positions.items():
-                if position_type == 'long':
-                    portfolio_value += position['shares'] * Decimal(str(current_price))
-            
-            self.equity_curve.append({
-                'timestamp': timestamp,
-                'equity': float(portfolio_value),
-                'capital': float(self.current_capital)
+    def _record_run(self, run):
+        """Expose a simulated run through the service's state attributes"""
+        trades = run.trades
+        for i in range(len(trades)):
+            entry_bar, exit_bar = int(trades.entry_bar[i]), int(trades.exit_bar[i])
+            self.trades.append({
+                'timestamp': run.timestamp_at(entry_bar),
+                'type': 'BUY',
+                'price': float(trades.entry_price[i]),
+                'shares': float(trades.shares[i]),
+                'value': float(trades.position_size[i]),
+                'commission': float(trades.entry_commission[i]),
             })
-            
-        except Exception as e:
-            logger.error(f"Error updating equity curve: {e}")
-    
-    def _update_positions(self, current_price, timestamp):
-        """Update position values and calculate daily returns"""
-        try:
-            if self.equity_curve:
-                current_equity = self.equity_curve[-1]['equity']
-                previous_equity = self.equity_curve[-2]['equity'] if len(self.equity_curve) > 1 else self.initial_capital
-                
-                daily_return = (current_equity - previous_equity) / previous_equity
-                self.daily_returns.append(daily_return)
-            
-        except Exception as e:
-            logger.error(f"Error updating positions: {e}")
-    
-    def _close_all_positions(self, final_price, timestamp):
-        """Close all remaining positions at the end of backtest"""
-        try:
-            for position_type, position in list(self.positions.items()):
-                if position_type == 'long':
-                    # Execute sell signal to close position
-                    signal = {
-                        'type': 'SELL',
-                        'price': final_price,
-                        'confidence': 1.0,
-                        'reason': 'End of backtest - closing position'
-                    }
-                    self._execute_signal(signal, final_price, timestamp)
-                    
-        except Exception as e:
-            logger.error(f"Error closing positions: {e}")
+            self.trades.append({
+                'timestamp': run.timestamp_at(exit_bar),
+                'type': 'SELL',
+                'price': float(trades.exit_price[i]),
+                'shares': float(trades.shares[i]),
+                'value': float(trades.shares[i] * trades.exit_price[i]),
+                'commission': float(trades.exit_commission[i]),
+                'pnl': float(trades.pnl[i]),
+            })
+        self.equity_curve = run.equity_records()
+        self.daily_returns = run.returns.tolist()
+        self.current_capital = Decimal(str(run.final_capital))
+        self.last_run = run
     
     def _calculate_performance_metrics(self):
         """Calculate comprehensive performance metrics"""
         try:
-            if not self.equity_curve:
+            if self.last_run is None or not len(self.last_run):
                 return self._get_default_metrics()
             
-            # Extract equity values
-            equity_values = [point['equity'] for point in self.equity_curve]
-            initial_equity = float(self.initial_capital)
-            final_equity = equity_values[-1]
-            
-            # Basic return metrics
-            total_return = ((final_equity - initial_equity) / initial_equity) * 100
-            
-            # Calculate annualized return
-            days = len(self.equity_curve)
-            annualized_return = ((final_equity / initial_equity) ** (365 / days) - 1) * 100 if days > 0 else 0
-            
-            # Calculate Sharpe ratio
-            sharpe_ratio = self._calculate_sharpe_ratio()
-            
-            # Calculate maximum drawdown
-            max_drawdown = self._calculate_max_drawdown(equity_values)
-            
-            # Calculate win rate and profit factor
-            win_rate, profit_factor = self._calculate_trade_statistics()
-            
-            # Calculate additional metrics
-            volatility = self._calculate_volatility()
-            calmar_ratio = annualized_return / max_drawdown if max_drawdown > 0 else 0
-            sortino_ratio = self._calculate_sortino_ratio()
-            
+            metrics = self.last_run.metrics()
+            decimal_fields = ('total_return', 'annualized_return', 'sharpe_ratio', 'sortino_ratio',
+                              'calmar_ratio', 'max_drawdown', 'volatility', 'win_rate',
+                              'profit_factor', 'final_capital')
             return {
-                'total_return': Decimal(str(total_return)),
-                'annualized_return': Decimal(str(annualized_return)),
-                'sharpe_ratio': Decimal(str(sharpe_ratio)),
-                'sortino_ratio': Decimal(str(sortino_ratio)),
-                'calmar_ratio': Decimal(str(calmar_ratio)),
-                'max_drawdown': Decimal(str(max_drawdown)),
-                'volatility': Decimal(str(volatility)),
-                'win_rate': Decimal(str(win_rate)),
-                'profit_factor': Decimal(str(profit_factor)),
-                'total_trades': len(self.trades),
-                'winning_trades': len([t for t in self.trades if t.get('pnl', 0) > 0]),
-                'losing_trades': len([t for t in self.trades if t.get('pnl', 0) < 0]),
-                'final_capital': Decimal(str(final_equity)),
+                **{field: Decimal(str(metrics[field])) for field in decimal_fields},
+                'total_trades': metrics['total_trades'],
+                'winning_trades': metrics['winning_trades'],
+                'losing_trades': metrics['losing_trades'],
                 'equity_curve': self.equity_curve,
                 'trades': self.trades
             }
@@ -543,102 +499,6 @@ class BacktestingService:
             logger.error(f"Error calculating performance metrics: {e}")
             return self._get_default_metrics()
     
-    def _calculate_sharpe_ratio(self, risk_free_rate=0.02):
-        """Calculate Sharpe ratio"""
-        try:
-            if not self.daily_returns:
-                return 0.0
-            
-            returns_array = np.array(self.daily_returns)
-            excess_returns = returns_array - (risk_free_rate / 252)  # Daily risk-free rate
-            
-            if np.std(excess_returns) == 0:
-                return 0.0
-            
-            sharpe = np.mean(excess_returns) / np.std(excess_returns) * np.sqrt(252)
-            return sharpe
-            
-        except Exception as e:
-            logger.error(f"Error calculating Sharpe ratio: {e}")
-            return 0.0
-    
-    def _calculate_sortino_ratio(self, risk_free_rate=0.02):
-        """Calculate Sortino ratio (downside deviation)"""
-        try:
-            if not self.daily_returns:
-                return 0.0
-            
-            returns_array = np.array(self.daily_returns)
-            excess_returns = returns_array - (risk_free_rate / 252)
-            
-            # Only consider negative returns for downside deviation
-            negative_returns = excess_returns[excess_returns < 0]
-            
-            if len(negative_returns) == 0 or np.std(negative_returns) == 0:
-                return 0.0
-            
-            sortino = np.mean(excess_returns) / np.std(negative_returns) * np.sqrt(252)
-            return sortino
-            
-        except Exception as e:
-            logger.error(f"Error calculating Sortino ratio: {e}")
-            return 0.0
-    
-    def _calculate_max_drawdown(self, equity_values):
-        """Calculate maximum drawdown from peak"""
-        try:
-            if len(equity_values) < 2:
-                return 0.0
-            
-            peak = np.maximum.accumulate(equity_values)
-            drawdown = (np.array(equity_values) - peak) / peak
-            max_drawdown = np.min(drawdown) * 100
-            
-            return abs(max_drawdown)
-            
-        except Exception as e:
-            logger.error(f"Error calculating max drawdown: {e}")
-            return 0.0
-    
-    def _calculate_volatility(self):
-        """Calculate annualized volatility"""
-        try:
-            if not self.daily_returns:
-                return 0.0
-            
-            returns_array = np.array(self.daily_returns)
-            volatility = np.std(returns_array) * np.sqrt(252) * 100
-            
-            return volatility
-            
-        except Exception as e:
-            logger.error(f"Error calculating volatility: {e}")
-            return 0.0
-    
-    def _calculate_trade_statistics(self):
-        """Calculate win rate and profit factor"""
-        try:
-            if not self.trades:
-                return 0.0, 0.0
-            
-            winning_trades = [t for t in self.trades if t.get('pnl', 0) > 0]
-            losing_trades = [t for t in self.trades if t.get('pnl', 0) < 0]
-            
-            # Calculate win rate
-            win_rate = (len(winning_trades) / len(self.trades)) * 100 if self.trades else 0
-            
-            # Calculate profit factor
-            total_profit = sum([t.get('pnl', 0) for t in winning_trades])
-            total_loss = abs(sum([t.get('pnl', 0) for t in losing_trades]))
-            
-            profit_factor = total_profit / total_loss if total_loss > 0 else 0
-            
-            return win_rate, profit_factor
-            
-        except Exception as e:
-            logger.error(f"Error calculating trade statistics: {e}")
-            return 0.0, 0.0
-    
     def _get_default_metrics(self):
         """Return default metrics when calculation fails"""
         return {
@@ -877,8 +737,16 @@ class BacktestEngine:
 class StrategyOptimizer:
     """Advanced strategy optimization with genetic algorithms and overfitting detection"""
     
-    def __init__(self, backtesting_service=None):
+    def __init__(self, backtesting_service=None, max_workers=None, seed=None):
+        """
+        Args:
+            backtesting_service: Service used for every backtest
+            max_workers: Evaluation pool size (None = STRATEGY_OPTIMIZATION['MAX_WORKERS'], 1 = in-process)
+            seed: Seed for every random draw, making searches reproducible (None = STRATEGY_OPTIMIZATION['SEED'])
+        """
         self.backtesting_service = backtesting_service or BacktestingService()
+        self.max_workers = max_workers
+        self.seed = seed if seed is not None else STRATEGY_OPTIMIZATION.get('SEED')
         self.optimization_history = []
         self.overfitting_detection_results = {}
         
@@ -907,94 +775,44 @@ class StrategyOptimizer:
             logger.error(f"Error during parameter optimization: {e}")
             return None
     
+    def _runner(self, strategy, symbol, start_date, end_date):
+        """OptimizationRunner over the symbol's candles, queried once for the whole search"""
+        historical_data = self.backtesting_service._get_historical_data(symbol, start_date, end_date)
+        if historical_data.empty:
+            raise ValueError(f"No historical data available for {symbol} from {start_date} to {end_date}")
+        return OptimizationRunner(self.backtesting_service, strategy, symbol, historical_data,
+                                  max_workers=self.max_workers)
+    
+    def _rng(self):
+        return random.Random(self.seed)
+    
     def _genetic_algorithm_optimization(self, strategy, symbol, start_date, end_date, 
                                       param_ranges, population_size, generations, 
                                       crossover_rate, mutation_rate):
         """Optimize parameters using genetic algorithm"""
         try:
-            import random
-            import copy
-            
-            # Initialize population with random parameter combinations
-            population = self._initialize_population(param_ranges, population_size)
-            best_individual = None
-            best_fitness = float('-inf')
-            
-            # Track optimization progress
-            generation_results = []
-            
-            for generation in range(generations):
-                # Evaluate fitness for current population
-                fitness_scores = []
-                for individual in population:
-                    fitness = self._evaluate_fitness(
-                        strategy, symbol, start_date, end_date, individual
-                    )
-                    fitness_scores.append((individual, fitness))
-                    
-                    # Track best individual
-                    if fitness > best_fitness:
-                        best_fitness = fitness
-                        best_individual = copy.deepcopy(individual)
-                
-                # Store generation results
-                generation_results.append({
-                    'generation': generation + 1,
-                    'best_fitness': best_fitness,
-                    'avg_fitness': sum(f[1] for f in fitness_scores) / len(fitness_scores),
-                    'best_parameters': best_individual
-                })
-                
-                # Selection, crossover, and mutation for next generation
-                new_population = []
+            with self._runner(strategy, symbol, start_date, end_date) as runner:
+                search = runner.genetic(param_ranges, population_size, generations,
+                                        crossover_rate, mutation_rate, self._rng())
                 
-                # Elitism: keep best individual
-                new_population.append(best_individual)
-                
-                # Generate rest of population through selection and crossover
-                while len(new_population) < population_size:
-                    # Tournament selection
-                    parent1 = self._tournament_selection(population, fitness_scores, tournament_size=3)
-                    parent2 = self._tournament_selection(population, fitness_scores, tournament_size=3)
-                    
-                    # Crossover
-                    if random.random() < crossover_rate:
-                        child1, child2 = self._crossover(parent1, parent2)
-                    else:
-                        child1, child2 = copy.deepcopy(parent1), copy.deepcopy(parent2)
-                    
-                    # Mutation
-                    if random.random() < mutation_rate:
-                        child1 = self._mutate(child1, param_ranges)
-                    if random.random() < mutation_rate:
-                        child2 = self._mutate(child2, param_ranges)
-                    
-                    new_population.extend([child1, child2])
-                
-                # Trim to population size
-                population = new_population[:population_size]
-                
-                # Log progress every 10 generations
-                if (generation + 1) % 10 == 0:
-                    logger.info(f"Generation {generation + 1}: Best Fitness = {best_fitness:.4f}")
-            
-            # Run final backtest with best parameters
-            final_result = self.backtesting_service.backtest_strategy(
-                strategy, symbol, start_date, end_date, best_individual
-            )
+                # Run final backtest with best parameters
+                final_result = runner.backtest(search['best_parameters'], start_date, end_date)
+                throughput = runner.throughput()
             
             optimization_result = {
-                'best_parameters': best_individual,
-                'best_fitness': best_fitness,
-                'generation_results': generation_results,
+                'best_parameters': search['best_parameters'],
+                'best_fitness': search['best_fitness'],
+                'generation_results': search['generation_results'],
                 'final_backtest': final_result,
                 'optimization_method': 'genetic_algorithm',
                 'parameters': {
                     'population_size': population_size,
                     'generations': generations,
                     'crossover_rate': crossover_rate,
-                    'mutation_rate': mutation_rate
-                }
+                    'mutation_rate': mutation_rate,
+                    'seed': self.seed
+                },
+                'throughput': throughput
             }
             
             # Store in optimization history
@@ -1009,54 +827,20 @@ class StrategyOptimizer:
     def _grid_search_optimization(self, strategy, symbol, start_date, end_date, param_ranges):
         """Optimize parameters using grid search"""
         try:
-            import itertools
-            
-            # Generate all parameter combinations
-            param_names = list(param_ranges.keys())
-            param_values = list(param_ranges.values())
-            param_combinations = list(itertools.product(*param_values))
-            
-            best_params = None
-            best_fitness = float('-inf')
-            all_results = []
-            
-            total_combinations = len(param_combinations)
-            logger.info(f"Grid search: testing {total_combinations} parameter combinations")
-            
-            for i, param_combo in enumerate(param_combinations):
-                # Create parameter dictionary
-                params = dict(zip(param_names, param_combo))
+            with self._runner(strategy, symbol, start_date, end_date) as runner:
+                search = runner.grid_search(param_ranges)
                 
-                # Evaluate fitness
-                fitness = self._evaluate_fitness(
-                    strategy, symbol, start_date, end_date, params
-                )
-                
-                all_results.append({
-                    'parameters': params,
-                    'fitness': fitness
-                })
-                
-                # Track best parameters
-                if fitness > best_fitness:
-                    best_fitness = fitness
-                    best_params = params
-                
-                # Log progress every 100 combinations
-                if (i + 1) % 100 == 0:
-                    logger.info(f"Grid search progress: {i + 1}/{total_combinations}")
-            
-            # Run final backtest with best parameters
-            final_result = self.backtesting_service.backtest_strategy(
-                strategy, symbol, start_date, end_date, best_params
-            )
+                # Run final backtest with best parameters
+                final_result = runner.backtest(search['best_parameters'], start_date, end_date)
+                throughput = runner.throughput()
             
             optimization_result = {
-                'best_parameters': best_params,
-                'best_fitness': best_fitness,
-                'all_results': all_results,
+                'best_parameters': search['best_parameters'],
+                'best_fitness': search['best_fitness'],
+                'all_results': search['all_results'],
                 'final_backtest': final_result,
-                'optimization_method': 'grid_search'
+                'optimization_method': 'grid_search',
+                'throughput': throughput
             }
             
             # Store in optimization history
@@ -1072,51 +856,21 @@ class StrategyOptimizer:
                                   param_ranges, iterations=1000):
         """Optimize parameters using random search"""
         try:
-            import random
-            
-            best_params = None
-            best_fitness = float('-inf')
-            all_results = []
-            
-            for i in range(iterations):
-                # Generate random parameter combination
-                params = {}
-                for param_name, param_range in param_ranges.items():
-                    if isinstance(param_range[0], int):
-                        params[param_name] = random.randint(param_range[0], param_range[1])
-                    else:
-                        params[param_name] = random.uniform(param_range[0], param_range[1])
-                
-                # Evaluate fitness
-                fitness = self._evaluate_fitness(
-                    strategy, symbol, start_date, end_date, params
-                )
+            with self._runner(strategy, symbol, start_date, end_date) as runner:
+                search = runner.random_search(param_ranges, iterations, self._rng())
                 
-                all_results.append({
-                    'parameters': params,
-                    'fitness': fitness
-                })
-                
-                # Track best parameters
-                if fitness > best_fitness:
-                    best_fitness = fitness
-                    best_params = params
-                
-                # Log progress every 100 iterations
-                if (i + 1) % 100 == 0:
-                    logger.info(f"Random search progress: {i + 1}/{iterations}")
-            
-            # Run final backtest with best parameters
-            final_result = self.backtesting_service.backtest_strategy(
-                strategy, symbol, start_date, end_date, best_params
-            )
+                # Run final backtest with best parameters
+                final_result = runner.backtest(search['best_parameters'], start_date, end_date)
+                throughput = runner.throughput()
             
             optimization_result = {
-                'best_parameters': best_params,
-                'best_fitness': best_fitness,
-                'all_results': all_results,
+                'best_parameters': search['best_parameters'],
+                'best_fitness': search['best_fitness'],
+                'all_results': search['all_results'],
                 'final_backtest': final_result,
-                'optimization_method': 'random_search'
+                'optimization_method': 'random_search',
+                'seed': self.seed,
+                'throughput': throughput
             }
             
             # Store in optimization history
@@ -1128,148 +882,53 @@ class StrategyOptimizer:
             logger.error(f"Error in random search optimization: {e}")
             return None
     
-    def _evaluate_fitness(self, strategy, symbol, start_date, end_date, parameters):
-        """Evaluate fitness of a parameter combination"""
-        try:
-            # Run backtest with given parameters
-            result = self.backtesting_service.backtest_strategy(
-                strategy, symbol, start_date, end_date, parameters
-            )
-            
-            if not result:
-                return float('-inf')
-            
-            metrics = result['performance_metrics']
-            
-            # Calculate composite fitness score
-            # Weighted combination of multiple metrics
-            fitness = (
-                float(metrics['sharpe_ratio']) * 0.4 +  # Sharpe ratio (40% weight)
-                float(metrics['total_return']) * 0.3 +  # Total return (30% weight)
-                (100 - float(metrics['max_drawdown'])) * 0.2 +  # Lower drawdown is better (20% weight)
-                float(metrics['win_rate']) * 0.1  # Win rate (10% weight)
-            )
-            
-            return fitness
-            
-        except Exception as e:
-            logger.error(f"Error evaluating fitness: {e}")
-            return float('-inf')
-    
-    def _initialize_population(self, param_ranges, population_size):
-        """Initialize population with random parameter combinations"""
-        import random
-        
-        population = []
-        
-        for _ in range(population_size):
-            individual = {}
-            for param_name, param_range in param_ranges.items():
-                if isinstance(param_range[0], int):
-                    individual[param_name] = random.randint(param_range[0], param_range[1])
-                else:
-                    individual[param_name] = random.uniform(param_range[0], param_range[1])
-            population.append(individual)
-        
-        return population
-    
-    def _tournament_selection(self, population, fitness_scores, tournament_size=3):
-        """Select individual using tournament selection"""
-        import random
-        
-        # Randomly select tournament participants
-        tournament = random.sample(fitness_scores, tournament_size)
-        
-        # Return the best individual from tournament
-        return max(tournament, key=lambda x: x[1])[0]
-    
-    def _crossover(self, parent1, parent2):
-        """Perform crossover between two parents"""
-        import random
-        
-        child1 = {}
-        child2 = {}
-        
-        for param_name in parent1.keys():
-            if random.random() < 0.5:
-                child1[param_name] = parent1[param_name]
-                child2[param_name] = parent2[param_name]
-            else:
-                child1[param_name] = parent2[param_name]
-                child2[param_name] = parent1[param_name]
-        
-        return child1, child2
-    
-    def _mutate(self, individual, param_ranges, mutation_strength=0.1):
-        """Mutate an individual"""
-        import random
-        
-        mutated = individual.copy()
-        
-        for param_name, param_range in param_ranges.items():
-            if random.random() < mutation_strength:
-                if isinstance(param_range[0], int):
-                    # Integer parameter
-                    current_value = mutated[param_name]
-                    mutation = random.randint(-2, 2)
-                    mutated[param_name] = max(param_range[0], min(param_range[1], current_value + mutation))
-                else:
-                    # Float parameter
-                    current_value = mutated[param_name]
-                    range_size = param_range[1] - param_range[0]
-                    mutation = random.uniform(-range_size * 0.1, range_size * 0.1)
-                    mutated[param_name] = max(param_range[0], min(param_range[1], current_value + mutation))
-        
-        return mutated
-    
     def walk_forward_analysis(self, strategy, symbol, start_date, end_date, 
                              param_ranges, window_size=252, step_size=63):
         """Perform walk-forward analysis to test strategy robustness"""
         try:
             from datetime import timedelta
             
-            walk_forward_results = []
+            # Define training and testing periods
+            windows = []
             current_start = start_date
-            
             while current_start + timedelta(days=window_size) <= end_date:
-                # Define training and testing periods
                 training_end = current_start + timedelta(days=window_size)
-                testing_end = min(training_end + timedelta(days=step_size), end_date)
-                
-                # Optimize parameters on training period
-                optimization_result = self.optimize_parameters(
-                    strategy, symbol, current_start, training_end, param_ranges,
-                    optimization_method='genetic', population_size=30, generations=50
-                )
-                
-                if optimization_result and optimization_result['best_parameters']:
-                    # Test optimized parameters on testing period
-                    test_result = self.backtesting_service.backtest_strategy(
-                        strategy, symbol, training_end, testing_end, 
-                        optimization_result['best_parameters']
-                    )
-                    
-                    if test_result:
-                        walk_forward_results.append({
-                            'training_period': {
-                                'start': current_start,
-                                'end': training_end
-                            },
-                            'testing_period': {
-                                'start': training_end,
-                                'end': testing_end
-                            },
-                            'optimized_parameters': optimization_result['best_parameters'],
-                            'training_performance': optimization_result['final_backtest']['performance_metrics'],
-                            'testing_performance': test_result['performance_metrics'],
-                            'parameter_stability': self._calculate_parameter_stability(
-                                walk_forward_results, optimization_result['best_parameters']
-                            )
-                        })
+                windows.append({
+                    'training_start': current_start,
+                    'training_end': training_end,
+                    'testing_end': min(training_end + timedelta(days=step_size), end_date)
+                })
                 
                 # Move to next window
                 current_start += timedelta(days=step_size)
             
+            # Optimize on each training period and test on the following one, windows in parallel
+            with self._runner(strategy, symbol, start_date, end_date) as runner:
+                window_results = runner.walk_forward(windows, param_ranges, population_size=30,
+                                                     generations=50, seed=self.seed)
+                throughput = runner.throughput()
+            
+            walk_forward_results = []
+            for window, result in zip(windows, window_results):
+                if not result:
+                    continue
+                walk_forward_results.append({
+                    'training_period': {
+                        'start': window['training_start'],
+                        'end': window['training_end']
+                    },
+                    'testing_period': {
+                        'start': window['training_end'],
+                        'end': window['testing_end']
+                    },
+                    'optimized_parameters': result['optimized_parameters'],
+                    'training_performance': result['training_performance'],
+                    'testing_performance': result['testing_performance'],
+                    'parameter_stability': self._calculate_parameter_stability(
+                        walk_forward_results, result['optimized_parameters']
+                    )
+                })
+            
             # Calculate walk-forward statistics
             walk_forward_stats = self._calculate_walk_forward_statistics(walk_forward_results)
             
@@ -1278,7 +937,8 @@ class StrategyOptimizer:
                 'statistics': walk_forward_stats,
                 'strategy': strategy.name if hasattr(strategy, 'name') else 'Unknown',
                 'symbol': symbol,
-                'total_periods': len(walk_forward_results)
+                'total_periods': len(walk_forward_results),
+                'throughput': throughput
             }
             
         except Exception as e:
@@ -0,0 +1,119 @@
+from django.test import TestCase
+from types import SimpleNamespace
+import random
+import numpy as np
+import pandas as pd
+
+from apps.analytics import backtest_engine
+from apps.analytics.backtest_engine import ColumnarBacktestEngine, performance_metrics, sma_trend_signals
+from apps.analytics.optimization_runner import OptimizationRunner
+from apps.analytics.services import BacktestingService
+
+
+class ColumnarBacktestEngineTestCase(TestCase):
+    """The columnar fill pass must match a bar-by-bar simulation"""
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+        self.signals = sma_trend_signals(self.close, fast=5, slow=15)
+
+    def _loop(self, close, signals, stop_loss=None, take_profit=None,
+              capital=10000.0, commission=0.001, slippage=0.0005):
+        equity, pnl = [], []
+        position = None
+        for i, price in enumerate(close):
+            equity.append(capital + (position['shares'] * price if position else 0.0))
+            if position is None and signals[i] == backtest_engine.BUY:
+                size = capital * 0.1
+                entry_price = price * (1 + slippage)
+                position = {'shares': size / entry_price, 'cost': size * (1 + commission), 'close': price}
+                capital -= position['cost']
+                if i < len(close) - 1:
+                    continue
+            if position is None:
+                continue
+            exit_price = None
+            if signals[i] == backtest_engine.SELL:
+                exit_price = price * (1 - slippage)
+            elif stop_loss and price <= position['close'] * (1 - stop_loss):
+                exit_price = position['close'] * (1 - stop_loss)
+            elif take_profit and price >= position['close'] * (1 + take_profit):
+                exit_price = position['close'] * (1 + take_profit)
+            elif i == len(close) - 1:
+                exit_price = price * (1 - slippage)
+            if exit_price is not None:
+                proceeds = position['shares'] * exit_price * (1 - commission)
+                capital += proceeds
+                pnl.append(proceeds - position['cost'])
+                position = None
+        return np.array(equity), np.array(pnl), capital
+
+    def test_matches_bar_loop(self):
+        """Test plain signal exits and stop/target exits"""
+        for stop_loss, take_profit in ((None, None), (0.03, 0.05)):
+            run = ColumnarBacktestEngine(stop_loss=stop_loss, take_profit=take_profit).run(self.close, self.signals)
+            equity, pnl, capital = self._loop(self.close, self.signals, stop_loss, take_profit)
+            np.testing.assert_allclose(run.equity, equity)
+            np.testing.assert_allclose(run.trades.pnl, pnl)
+            self.assertAlmostEqual(run.final_capital, capital)
+            self.assertGreater(len(run.trades), 3)
+
+    def test_metrics(self):
+        """Test the metrics of a hand-checkable equity curve"""
+        equity = np.array([100.0, 110.0, 99.0, 121.0, 120.0])
+        metrics = performance_metrics(equity, np.array([10.0, -5.0, 15.0]), 100.0)
+        self.assertAlmostEqual(metrics['total_return'], 20.0)
+        self.assertAlmostEqual(metrics['max_drawdown'], 10.0)
+        self.assertEqual(metrics['max_drawdown_duration'], 1)
+        self.assertEqual((metrics['total_trades'], metrics['winning_trades']), (3, 2))
+        self.assertAlmostEqual(metrics['profit_factor'], 5.0)
+
+    def test_run_many(self):
+        """Test several symbols in one call match running each alone"""
+        index = pd.date_range('2024-01-01', periods=len(self.close), freq='D', tz='UTC')
+        frames = {
+            'AAA': pd.DataFrame({'close': self.close}, index=index),
+            'BBB': pd.DataFrame({'close': self.close[::-1].copy()}, index=index),
+        }
+        engine = ColumnarBacktestEngine()
+        runs = engine.run_many(frames, signal_builder=lambda close: sma_trend_signals(close, 5, 15))
+        for symbol, frame in frames.items():
+            close = frame['close'].to_numpy()
+            np.testing.assert_allclose(runs[symbol].equity, engine.run(close, sma_trend_signals(close, 5, 15)).equity)
+        self.assertEqual(runs['AAA'].timestamp_at(0), index[0])
+
+
+class OptimizationRunnerTestCase(TestCase):
+    """Parameter sets are evaluated once against the candles loaded up front"""
+
+    def setUp(self):
+        rng = np.random.default_rng(9)
+        self.data = pd.DataFrame({
+            'timestamp': pd.date_range('2024-01-01', periods=300, freq='D', tz='UTC'),
+            'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300))),
+        })
+        self.strategy = SimpleNamespace(name='SMA', sma_short_period=20, sma_long_period=50)
+
+    def _runner(self):
+        return OptimizationRunner(BacktestingService(), self.strategy, 'BTC', self.data, max_workers=1)
+
+    def test_memoises_parameter_sets(self):
+        """Test repeated parameter sets are answered from the memo"""
+        runner = self._runner()
+        params = [{'sma_short_period': 5, 'sma_long_period': 15}, {'sma_long_period': 15, 'sma_short_period': 5},
+                  {'sma_short_period': 10, 'sma_long_period': 30}]
+        first = runner.evaluate(params)
+        self.assertEqual(first[0], first[1])
+        self.assertEqual(runner.evaluate(params[2:]), first[2:])
+        self.assertEqual(runner.throughput()['evaluations'], 2)
+        self.assertEqual(runner.throughput()['cache_hits'], 2)
+
+    def test_seeded_search_is_reproducible(self):
+        """Test the same seed gives the same candidates and best parameters"""
+        ranges = {'sma_short_period': (3, 20), 'sma_long_period': (25, 60)}
+        first = self._runner().random_search(ranges, 20, random.Random(7))
+        second = self._runner().random_search(ranges, 20, random.Random(7))
+        self.assertEqual(first['all_results'], second['all_results'])
+        self.assertEqual(first['best_parameters'], second['best_parameters'])
+        self.assertTrue(np.isfinite(first['best_fitness']))
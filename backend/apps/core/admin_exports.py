@@ -3,17 +3,25 @@ Admin Export Functionality
 Provides CSV, Excel, PDF, and JSON export capabilities
 """
 
-import csv
 import json
-from io import BytesIO, StringIO
-from django.http import HttpResponse
+import tempfile
+from io import BytesIO
+from itertools import chain, islice
+from django.db.models import QuerySet
+from django.http import FileResponse, HttpResponse
 from django.utils import timezone
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import logging
 
+from apps.core.streaming_exports import streaming_csv_response
+
 logger = logging.getLogger(__name__)
 
+# Rows fetched per query while exporting, and rows sampled to size Excel columns
+EXPORT_CHUNK_SIZE = 2000
+WIDTH_SAMPLE_ROWS = 100
+
 
 class BaseExporter:
     """Base class for export functionality"""
@@ -26,37 +34,29 @@ class BaseExporter:
     def export(self):
         """Export data - to be implemented by subclasses"""
         raise NotImplementedError
+    
+    def iterate(self):
+        """Objects of the queryset, fetched in chunks instead of cached all at once"""
+        if isinstance(self.queryset, QuerySet):
+            return self.queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        return iter(self.queryset)
 
 
 class CSVExporter(BaseExporter):
     """Export data to CSV format"""
     
     def export(self, filename=None):
-        """Export queryset to CSV"""
+        """Export queryset to CSV, streamed row chunk by row chunk"""
         if filename is None:
             timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
             filename = f"export_{timestamp}.csv"
         
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers
-        if self.headers:
-            writer.writerow(self.headers)
-        elif self.fields:
-            writer.writerow(self.fields)
-        
-        # Write data
-        for obj in self.queryset:
-            row = []
-            for field in self.fields:
-                value = self._get_field_value(obj, field)
-                row.append(value)
-            writer.writerow(row)
-        
-        return response
+        header = self.headers or self.fields or None
+        rows = (
+            [self._get_field_value(obj, field) for field in self.fields]
+            for obj in self.iterate()
+        )
+        return streaming_csv_response(filename, header, rows)
     
     def _get_field_value(self, obj, field):
         """Get field value from object"""
@@ -85,7 +85,9 @@ class ExcelExporter(BaseExporter):
         """Export queryset to Excel"""
         try:
             import openpyxl
+            from openpyxl.cell import WriteOnlyCell
             from openpyxl.styles import Font, PatternFill, Alignment
+            from openpyxl.utils import get_column_letter
         except ImportError:
             logger.warning("openpyxl not installed, falling back to CSV")
             csv_exporter = CSVExporter(self.queryset, self.fields, self.headers)
@@ -95,52 +97,48 @@ class ExcelExporter(BaseExporter):
             timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
             filename = f"export_{timestamp}.xlsx"
         
-        workbook = openpyxl.Workbook()
-        worksheet = workbook.active
-        worksheet.title = "Export"
+        # Write-only mode streams rows to a temporary file instead of keeping cells in memory
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Export")
         
         # Style for header
         header_font = Font(bold=True, color="FFFFFF")
         header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
         header_alignment = Alignment(horizontal="center", vertical="center")
         
-        # Write headers
         headers = self.headers if self.headers else self.fields
+        rows = ([self._get_field_value(obj, field) for field in self.fields] for obj in self.iterate())
+        
+        # Column widths must be set before the first row, so size them from the first rows
+        sample = list(islice(rows, WIDTH_SAMPLE_ROWS))
         for col_num, header in enumerate(headers, 1):
-            cell = worksheet.cell(row=1, column=col_num)
-            cell.value = header
+            max_length = max([len(str(header))] + [len(str(row[col_num - 1])) for row in sample if len(row) >= col_num])
+            worksheet.column_dimensions[get_column_letter(col_num)].width = min(max_length + 2, 50)
+        
+        # Write headers
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(worksheet, value=header)
             cell.font = header_font
             cell.fill = header_fill
             cell.alignment = header_alignment
+            header_cells.append(cell)
+        worksheet.append(header_cells)
         
         # Write data
-        for row_num, obj in enumerate(self.queryset, 2):
-            for col_num, field in enumerate(self.fields, 1):
-                value = self._get_field_value(obj, field)
-                cell = worksheet.cell(row=row_num, column=col_num)
-                cell.value = value
-        
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
+        for row in chain(sample, rows):
+            worksheet.append(row)
         
-        # Save to response
-        response = HttpResponse(
+        # Save to a temporary file and stream it back
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+        output.seek(0)
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=filename,
             content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        workbook.save(response)
-        return response
     
     def _get_field_value(self, obj, field):
         """Get field value from object"""
@@ -100,6 +100,15 @@ class MarketDataConsumer(AsyncWebsocketConsumer):
             'timestamp': event['timestamp']
         }))
     
+    async def market_batch(self, event):
+        """Send a batch of conflated market updates to WebSocket"""
+        await self.send(text_data=json.dumps({
+            'type': 'market_batch',
+            'mode': event['mode'],
+            'updates': event['updates'],
+            'sent_at': event['sent_at']
+        }))
+    
     async def price_alert(self, event):
         """Send price alerts to WebSocket"""
         await self.send(text_data=json.dumps({
@@ -304,12 +313,54 @@ class NotificationsConsumer(AsyncWebsocketConsumer):
         }))
 
 
-
-
-
-
-
-
-
-
-
+class BacktestJobConsumer(AsyncWebsocketConsumer):
+    """WebSocket consumer for background backtest job progress"""
+    
+    async def connect(self):
+        """Handle WebSocket connection"""
+        self.user = self.scope["user"]
+        
+        if isinstance(self.user, AnonymousUser):
+            await self.close()
+            return
+        
+        self.job_id = int(self.scope["url_route"]["kwargs"]["job_id"])
+        if not await self.owns_job():
+            await self.close()
+            return
+        
+        # Join the job's progress room
+        from apps.signals.backtest_jobs import progress_group
+        self.group_name = progress_group(self.job_id)
+        await self.channel_layer.group_add(
+            self.group_name,
+            self.channel_name
+        )
+        
+        await self.accept()
+        logger.info(f"Backtest job {self.job_id} WebSocket connected for user: {self.user.username}")
+        
+        # Send initial connection confirmation
+        await self.send(text_data=json.dumps({
+            'type': 'connection_established',
+            'message': f'Following backtest job {self.job_id}',
+            'timestamp': timezone.now().isoformat()
+        }))
+    
+    async def disconnect(self, close_code):
+        """Handle WebSocket disconnection"""
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(
+                self.group_name,
+                self.channel_name
+            )
+    
+    @database_sync_to_async
+    def owns_job(self):
+        """Whether the job exists and was requested by the connected user"""
+        from apps.signals.backtest_jobs import backtest_job_service
+        return backtest_job_service.jobs_for(self.user).filter(pk=self.job_id).exists()
+    
+    async def backtest_progress(self, event):
+        """Send backtest job progress to WebSocket"""
+        await self.send(text_data=json.dumps(event))
@@ -0,0 +1,141 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from channels.layers import InMemoryChannelLayer
+from apps.core.market_broadcast import ConflatingMarketBroadcaster, MARKET_GROUP
+import asyncio
+import statistics
+import time
+
+
+class _Clients:
+    """Simulated WebSocket clients: one channel each, all in the market group"""
+
+    def __init__(self, layer, count, symbols):
+        self.layer = layer
+        self.count = count
+        self.symbols = symbols
+        self.published_at = {}  # (symbol, price) -> perf_counter at publish
+        self.messages = 0
+        self.latencies = []
+
+    async def connect(self):
+        self.channels = []
+        for i in range(self.count):
+            channel = await self.layer.new_channel()
+            await self.layer.group_add(MARKET_GROUP, channel)
+            # Every client also follows one symbol, like MarketDataConsumer's subscribe
+            await self.layer.group_add(f'{MARKET_GROUP}_{self.symbols[i % len(self.symbols)]}', channel)
+            self.channels.append(channel)
+
+    async def _receive(self, channel):
+        while True:
+            message = await self.layer.receive(channel)
+            now = time.perf_counter()
+            self.messages += 1
+            updates = message['updates'] if message['type'] == 'market_batch' else [message]
+            for update in updates:
+                self.latencies.append(now - self.published_at[(update['symbol'], update['price'])])
+
+    def start(self):
+        self.tasks = [asyncio.create_task(self._receive(channel)) for channel in self.channels]
+
+    async def drain(self, layer_capacity):
+        # Let the receivers empty their queues, then stop them
+        for _ in range(layer_capacity):
+            if not any(queue for queue in self.layer.channels.values() if queue.qsize()):
+                break
+            await asyncio.sleep(0.01)
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+async def _legacy_publish(layer, symbol, price):
+    # RealTimeBroadcaster.broadcast_market_update, without the async_to_sync bridge
+    message = {
+        'type': 'market_update', 'symbol': symbol, 'price': price, 'change': 0.0,
+        'volume': 0.0, 'timestamp': timezone.now().isoformat(),
+    }
+    await layer.group_send(MARKET_GROUP, message)
+    await layer.group_send(f'{MARKET_GROUP}_{symbol}', message)
+
+
+async def _run(strategy, options):
+    capacity = options['capacity']
+    layer = InMemoryChannelLayer(capacity=capacity)
+    symbols = [f'SYM{i}USDT' for i in range(options['symbols'])]
+    clients = _Clients(layer, options['clients'], symbols)
+    await clients.connect()
+    clients.start()
+
+    broadcaster = None
+    if strategy != 'legacy':
+        broadcaster = ConflatingMarketBroadcaster(
+            channel_layer=layer, window_seconds=options['window'], mode=strategy,
+        )
+        broadcaster.start()
+
+    published = 0
+    tick = options['tick_ms'] / 1000
+    start = time.perf_counter()
+    deadline = start + options['seconds']
+    while time.perf_counter() < deadline:
+        for symbol in symbols:
+            published += 1
+            price = float(published)
+            clients.published_at[(symbol, price)] = time.perf_counter()
+            if broadcaster is None:
+                await _legacy_publish(layer, symbol, price)
+            else:
+                broadcaster.publish(symbol=symbol, price=price, change=0.0, volume=0.0)
+        await asyncio.sleep(tick)
+
+    if broadcaster is not None:
+        await broadcaster.stop()
+    await clients.drain(capacity)
+    elapsed = time.perf_counter() - start
+    return published, clients.messages, elapsed, clients.latencies
+
+
+class Command(BaseCommand):
+    help = 'Benchmark WebSocket market-data fan-out on the in-memory channel layer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=1000,
+                            help='Simulated WebSocket clients (default: 1000)')
+        parser.add_argument('--symbols', type=int, default=50,
+                            help='Symbols updated on every tick (default: 50)')
+        parser.add_argument('--seconds', type=float, default=5.0,
+                            help='How long to publish for (default: 5)')
+        parser.add_argument('--tick-ms', type=float, default=50.0,
+                            help='Interval between ticks of every symbol, in ms (default: 50)')
+        parser.add_argument('--window', type=float, default=0.25,
+                            help='Conflation window in seconds (default: 0.25)')
+        parser.add_argument('--capacity', type=int, default=1000,
+                            help='Per-channel capacity of the channel layer (default: 1000)')
+        parser.add_argument('--strategies', default='legacy,delta,snapshot',
+                            help='Comma-separated: legacy, delta, snapshot (default: all)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"Market broadcast benchmark: {options['clients']} clients, {options['symbols']} symbols, "
+            f"{options['tick_ms']:g} ms ticks for {options['seconds']:g}s, {options['window']:g}s window"
+        )
+        self.stdout.write(
+            f"{'strategy':<10}{'updates':>10}{'delivered':>12}{'msgs/s':>12}"
+            f"{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+        )
+        for strategy in options['strategies'].split(','):
+            strategy = strategy.strip()
+            published, messages, elapsed, latencies = asyncio.run(_run(strategy, options))
+            if latencies:
+                latencies.sort()
+                p50 = statistics.median(latencies) * 1000
+                p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+                worst = latencies[-1] * 1000
+            else:
+                p50 = p99 = worst = float('nan')
+            self.stdout.write(
+                f"{strategy:<10}{published:>10}{messages:>12}{messages / elapsed:>12.0f}"
+                f"{p50:>10.1f}{p99:>10.1f}{worst:>10.1f}"
+            )
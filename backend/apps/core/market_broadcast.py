@@ -0,0 +1,138 @@
+"""
+Conflating, batched market-data broadcaster for WebSocket fan-out.
+
+``RealTimeBroadcaster.broadcast_market_update`` makes two ``async_to_sync(group_send)``
+calls per symbol per tick. ``LiveDataService`` calls it for every matching ticker every
+five seconds, from inside its event loop, where the sync bridge is not allowed. With
+many symbols most of those frames are superseded before a browser can render them.
+
+``ConflatingMarketBroadcaster`` runs inside the event loop. ``publish`` only records
+the latest update per symbol. Every ``window_seconds`` a flush sends one
+``market_batch`` frame to the ``market_data`` group and one to each updated symbol's
+``market_data_<SYMBOL>`` group. All the frames of a window are sent concurrently with
+``await group_send``.
+
+In ``delta`` mode (the default) the market frame carries only the symbols updated during
+the window. In ``snapshot`` mode it carries the latest update of every symbol seen so
+far, so a client that joins late has the full board after one window.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+MARKET_BROADCAST = getattr(settings, 'MARKET_BROADCAST', {})
+CONFLATION_SECONDS = MARKET_BROADCAST.get('CONFLATION_SECONDS', 0.25)
+FRAME_MODE = MARKET_BROADCAST.get('MODE', 'delta')
+MARKET_GROUP = 'market_data'
+FRAME_MODES = ('delta', 'snapshot')
+
+
+class ConflatingMarketBroadcaster:
+    """Latest-value-wins market updates, flushed as one batch frame per group per window.
+
+    ``publish`` and ``flush`` must be called from the event loop's thread.
+    """
+
+    def __init__(self, channel_layer=None, window_seconds: float = CONFLATION_SECONDS,
+                 mode: str = FRAME_MODE, group: str = MARKET_GROUP) -> None:
+        if mode not in FRAME_MODES:
+            raise ValueError(f"mode must be one of {FRAME_MODES}, not {mode!r}")
+        self.channel_layer = channel_layer or get_channel_layer()
+        self.window_seconds = window_seconds
+        self.mode = mode
+        self.group = group
+        self._pending: Dict[str, Dict] = {}
+        self._latest: Dict[str, Dict] = {}
+        self._stopping: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'published': 0, 'conflated': 0, 'flushes': 0, 'frames': 0, 'errors': 0}
+
+    def publish(self, symbol, price, change, volume, timestamp=None) -> None:
+        """Queue a market update; replaces the symbol's update if it has not been sent yet"""
+        if timestamp is None:
+            timestamp = timezone.now()
+        if symbol in self._pending:
+            self.stats['conflated'] += 1
+        self._pending[symbol] = {
+            'symbol': symbol,
+            'price': price,
+            'change': change,
+            'volume': volume,
+            'timestamp': timestamp.isoformat(),
+        }
+        self.stats['published'] += 1
+
+    def frames(self) -> List[tuple]:
+        """(group, message) pairs for the pending updates, which are marked as sent"""
+        if not self._pending:
+            return []
+        updates, self._pending = self._pending, {}
+        self._latest.update(updates)
+        sent_at = timezone.now().isoformat()
+        board = self._latest if self.mode == 'snapshot' else updates
+        frames = [(self.group, self._frame(list(board.values()), sent_at))]
+        frames.extend(
+            (f'{self.group}_{symbol}', self._frame([update], sent_at))
+            for symbol, update in updates.items()
+        )
+        return frames
+
+    def _frame(self, updates: List[Dict], sent_at: str) -> Dict:
+        return {'type': 'market_batch', 'mode': self.mode, 'updates': updates, 'sent_at': sent_at}
+
+    async def flush(self) -> int:
+        """Send the pending updates now; returns the frames sent"""
+        frames = self.frames()
+        if not frames:
+            return 0
+        results = await asyncio.gather(
+            *(self.channel_layer.group_send(group, message) for group, message in frames),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            logger.error(f"Error broadcasting market batch: {error}")
+        self.stats['flushes'] += 1
+        self.stats['frames'] += len(frames) - len(errors)
+        self.stats['errors'] += len(errors)
+        logger.debug(f"Broadcasted {len(frames) - 1} market updates in {len(frames)} frames")
+        return len(frames) - len(errors)
+
+    async def run(self) -> None:
+        """Flush every window until ``stop`` is called"""
+        self._stopping = asyncio.Event()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.window_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                await self.flush()
+        finally:
+            self._stopping = None
+
+    def start(self) -> asyncio.Task:
+        """Start ``run`` as a task on the running loop (once)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the flush loop after sending what is pending"""
+        if self._task is None:
+            return
+        if self._stopping is not None:
+            self._stopping.set()
+        else:
+            # run() has not started yet
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
@@ -10,6 +10,9 @@ websocket_urlpatterns = [
     
     # Notifications WebSocket
     re_path(r'ws/notifications/$', consumers.NotificationsConsumer.as_asgi()),
+    
+    # Background backtest job progress
+    re_path(r'ws/backtest-jobs/(?P<job_id>\d+)/$', consumers.BacktestJobConsumer.as_asgi()),
 ]
 
 
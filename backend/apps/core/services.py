@@ -637,7 +637,7 @@ class RealTimeBroadcaster:
                 message
             )
             
-            logger.info(f"Broadcasted market update for {symbol}: ${price}")
+            logger.debug(f"Broadcasted market update for {symbol}: ${price}")
             
         except Exception as e:
             logger.error(f"Error broadcasting market update for {symbol}: {e}")
@@ -924,6 +924,21 @@ class TradingSignalsBroadcaster(RealTimeBroadcaster):
             timestamp=timestamp
         )
     
+    def broadcast_signal_outcome(self, signal_id, symbol, status, execution_price, pnl, timestamp=None):
+        """Broadcast a signal's target or stop loss hit"""
+        self.broadcast_signal_update(
+            signal_id=signal_id,
+            update_type='outcome',
+            new_value={
+                'symbol': symbol,
+                'status': status,
+                'execution_price': execution_price,
+                'pnl': pnl,
+                'is_profitable': pnl > 0
+            },
+            timestamp=timestamp
+        )
+
     def broadcast_hold_signal(self, signal_id, symbol, reason, confidence_score, timestamp=None):
         """Broadcast hold signal"""
         if timestamp is None:
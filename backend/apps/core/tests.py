@@ -1,3 +1,124 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+import io
+import zipfile
 
-# Create your tests here.
+from channels.layers import InMemoryChannelLayer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+
+from apps.core.consumers import BacktestJobConsumer
+from apps.core.market_broadcast import ConflatingMarketBroadcaster
+from apps.core.streaming_exports import csv_chunks, keyset_values, streaming_zip_response
+from apps.signals.models import BacktestJob
+from apps.trading.models import Symbol
+
+
+class ConflatingMarketBroadcasterTests(SimpleTestCase):
+    async def _subscribe(self, layer, *groups):
+        channel = await layer.new_channel()
+        for group in groups:
+            await layer.group_add(group, channel)
+        return channel
+
+    async def test_latest_update_per_symbol_wins(self):
+        layer = InMemoryChannelLayer()
+        market = await self._subscribe(layer, 'market_data')
+        btc = await self._subscribe(layer, 'market_data_BTCUSDT')
+        broadcaster = ConflatingMarketBroadcaster(channel_layer=layer)
+
+        broadcaster.publish('BTCUSDT', 100.0, 1.0, 10.0)
+        broadcaster.publish('ETHUSDT', 10.0, 0.1, 5.0)
+        broadcaster.publish('BTCUSDT', 101.0, 2.0, 11.0)
+        self.assertEqual(await broadcaster.flush(), 3)  # market group + two symbol groups
+
+        frame = await layer.receive(market)
+        self.assertEqual(frame['type'], 'market_batch')
+        self.assertEqual(frame['mode'], 'delta')
+        self.assertEqual({u['symbol']: u['price'] for u in frame['updates']},
+                         {'BTCUSDT': 101.0, 'ETHUSDT': 10.0})
+        self.assertEqual([u['price'] for u in (await layer.receive(btc))['updates']], [101.0])
+        self.assertEqual(broadcaster.stats['conflated'], 1)
+        self.assertEqual(await broadcaster.flush(), 0)
+
+    async def test_snapshot_mode_sends_every_symbol_seen(self):
+        layer = InMemoryChannelLayer()
+        market = await self._subscribe(layer, 'market_data')
+        broadcaster = ConflatingMarketBroadcaster(channel_layer=layer, mode='snapshot')
+
+        broadcaster.publish('BTCUSDT', 100.0, 1.0, 10.0)
+        await broadcaster.flush()
+        await layer.receive(market)
+        broadcaster.publish('ETHUSDT', 10.0, 0.1, 5.0)
+        await broadcaster.flush()
+
+        frame = await layer.receive(market)
+        self.assertEqual(frame['mode'], 'snapshot')
+        self.assertEqual(sorted(u['symbol'] for u in frame['updates']), ['BTCUSDT', 'ETHUSDT'])
+
+    async def test_stop_flushes_pending_updates(self):
+        layer = InMemoryChannelLayer()
+        market = await self._subscribe(layer, 'market_data')
+        broadcaster = ConflatingMarketBroadcaster(channel_layer=layer, window_seconds=60)
+
+        broadcaster.start()
+        broadcaster.publish('BTCUSDT', 100.0, 1.0, 10.0)
+        await broadcaster.stop()
+
+        frame = await layer.receive(market)
+        self.assertEqual(frame['updates'][0]['symbol'], 'BTCUSDT')
+
+    def test_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            ConflatingMarketBroadcaster(channel_layer=InMemoryChannelLayer(), mode='full')
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class BacktestJobConsumerTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create(username='owner')
+        self.other = User.objects.create(username='other')
+        symbol = Symbol.objects.create(symbol='BTC', name='Bitcoin', symbol_type='CRYPTO', exchange='Binance')
+        self.job = BacktestJob.objects.create(
+            kind='fixed', symbol=symbol, start_date='2024-01-01T00:00:00Z', end_date='2024-01-31T00:00:00Z',
+            data_version='v', content_key='k', requested_by=self.owner,
+        )
+
+    async def _connect(self, user, job_id):
+        communicator = WebsocketCommunicator(BacktestJobConsumer.as_asgi(), f'/ws/backtest-jobs/{job_id}/')
+        communicator.scope['user'] = user
+        communicator.scope['url_route'] = {'kwargs': {'job_id': str(job_id)}}
+        connected, _ = await communicator.connect()
+        await communicator.disconnect()
+        return connected
+
+    async def test_only_the_requester_can_follow_a_job(self):
+        self.assertTrue(await self._connect(self.owner, self.job.id))
+        self.assertFalse(await self._connect(self.other, self.job.id))
+        self.assertFalse(await self._connect(self.owner, self.job.id + 1))
+
+
+class StreamingExportsTests(TestCase):
+    def test_zip_of_csv_entries_round_trips(self):
+        rows = ([i, 'a,"b"'] for i in range(2000))
+        response = streaming_zip_response('export.zip', [
+            ('first.csv', csv_chunks(['n', 'text'], rows, rows_per_chunk=100)),
+            ('empty.csv', csv_chunks(['n'], [])),
+        ])
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="export.zip"')
+
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 2)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        self.assertIsNone(archive.testzip())
+        lines = archive.read('first.csv').decode().splitlines()
+        self.assertEqual(lines[:2], ['n,text', '0,"a,""b"""'])
+        self.assertEqual(len(lines), 2001)
+        self.assertEqual(archive.read('empty.csv').decode().splitlines(), ['n'])
+
+    def test_keyset_values_pages_through_ties(self):
+        for i in range(10):
+            Symbol.objects.create(symbol=f'S{i}', name=f'S{i}', symbol_type='CRYPTO', exchange=f'E{i % 3}')
+        expected = list(Symbol.objects.order_by('exchange', 'pk').values_list('symbol', flat=True))
+
+        rows = keyset_values(Symbol.objects.all(), ['symbol'], order_field='exchange', chunk_size=3)
+        self.assertEqual([row['symbol'] for row in rows], expected)
@@ -0,0 +1,367 @@
+"""
+Concurrent REST kline backfill for MarketData.
+
+``HistoricalDataManager`` and the multi-source backfill fetched one chunk at a time
+with a fixed ``time.sleep`` between requests, so a large backfill idled most of the
+time while Binance allowed far more request weight. ``KlineBackfillEngine`` splits each
+(symbol, timeframe, range) job into 1000-bar chunks and fetches them on a thread pool
+through one pooled ``requests.Session``.
+
+Request pacing comes from a token bucket per host (``WeightBucket``). It holds the
+host's per-minute request-weight budget and refills continuously. Each request takes its
+weight before it is sent. Every response's ``X-MBX-USED-WEIGHT-1M`` header corrects the
+bucket to what the server has counted, and a 429/418 pauses the host for its
+``Retry-After``. Concurrent requests per host are also capped.
+
+Fetched chunks are written on the calling thread (the one holding the DB connection) in
+time order per job, so ``MarketDataIngestionService`` range tracking sees the same
+sequence as a serial backfill.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.utils import timezone
+
+from apps.trading.models import Symbol
+from apps.data.models import DataSource, HistoricalDataRange
+from apps.data.market_data_ingestion import MarketDataIngestionService
+
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_ENGINE = getattr(settings, 'BACKFILL_ENGINE', {})
+KLINES_URL = BACKFILL_ENGINE.get('KLINES_URL', 'https://fapi.binance.com/fapi/v1/klines')
+MAX_WORKERS = BACKFILL_ENGINE.get('MAX_WORKERS', 8)
+MAX_CONCURRENCY_PER_HOST = BACKFILL_ENGINE.get('MAX_CONCURRENCY_PER_HOST', 8)
+WEIGHT_LIMIT_1M = BACKFILL_ENGINE.get('WEIGHT_LIMIT_1M', 2400)  # Binance Futures REQUEST_WEIGHT per minute
+WEIGHT_HEADROOM = BACKFILL_ENGINE.get('WEIGHT_HEADROOM', 0.9)  # leave room for other clients on this IP
+KLINE_WEIGHT = BACKFILL_ENGINE.get('KLINE_WEIGHT', 5)  # weight of a klines call with limit=1000
+MAX_RETRIES = BACKFILL_ENGINE.get('MAX_RETRIES', 3)
+
+KLINE_LIMIT = 1000
+INTERVAL_MS = {
+    '1m': 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '1h': 60 * 60_000,
+    '4h': 240 * 60_000,
+    '1d': 1440 * 60_000,
+}
+
+
+class WeightBucket:
+    """Token bucket over a per-minute request-weight budget"""
+
+    def __init__(self, limit_per_minute: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.capacity = float(limit_per_minute)
+        self.rate = self.capacity / 60.0  # tokens per second
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight: float) -> None:
+        """Block until ``weight`` tokens are available, then take them"""
+        weight = min(float(weight), self.capacity)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now >= self._paused_until and self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                wait = max(self._paused_until - now, (weight - self.tokens) / self.rate)
+            self.waited_seconds += wait
+            self._sleep(wait)
+
+    def observe(self, used_weight: float) -> None:
+        """Align with the server's count of weight used in the current minute"""
+        with self._lock:
+            self._refill(self._clock())
+            self.tokens = min(self.tokens, max(self.capacity - float(used_weight), 0.0))
+
+    def pause(self, seconds: float) -> None:
+        """Send nothing more to this host for ``seconds`` (after a 429/418)"""
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self.tokens = 0.0
+            self._updated = now
+
+
+class RateLimitedClient:
+    """Pooled HTTP client with a weight bucket and a concurrency cap per host"""
+
+    def __init__(self, weight_limit: float = WEIGHT_LIMIT_1M * WEIGHT_HEADROOM,
+                 max_concurrency: int = MAX_CONCURRENCY_PER_HOST, max_retries: int = MAX_RETRIES,
+                 timeout: float = 30) -> None:
+        self.weight_limit = weight_limit
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(max_concurrency, 1))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._buckets: Dict[str, WeightBucket] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0}
+
+    def bucket(self, host: str) -> WeightBucket:
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = WeightBucket(self.weight_limit)
+                self._slots[host] = threading.BoundedSemaphore(self.max_concurrency)
+            return self._buckets[host]
+
+    def _count(self, name: str) -> None:
+        # The client is shared by the engine's worker threads
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_json(self, url: str, params: Dict, weight: float = 1):
+        """GET ``url`` within the host's limits; returns the decoded JSON body.
+
+        Raises ``requests.HTTPError`` for 4xx responses other than 429/418 and after the
+        last retry of 5xx/network errors.
+        """
+        host = urlsplit(url).netloc
+        bucket = self.bucket(host)
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire(weight)
+            try:
+                with self._slots[host]:
+                    response = self.session.get(url, params=params, timeout=self.timeout)
+                self._count('requests')
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise
+                self._count('retries')
+                logger.warning(f"Request to {host} failed ({e}); retrying")
+                time.sleep(0.5 * (2 ** attempt))
+                continue
+
+            used = response.headers.get('X-MBX-USED-WEIGHT-1M') or response.headers.get('X-MBX-USED-WEIGHT')
+            if used is not None:
+                bucket.observe(float(used))
+            if response.status_code in (418, 429):
+                retry_after = float(response.headers.get('Retry-After', 60))
+                self._count('throttled')
+                logger.warning(f"{host} rate limit hit ({response.status_code}); pausing {retry_after:.0f}s")
+                bucket.pause(retry_after)
+                continue
+            if response.status_code >= 500 and attempt < self.max_retries:
+                self._count('retries')
+                time.sleep(0.5 * (2 ** attempt))
+                continue
+            response.raise_for_status()
+            return response.json()
+        raise requests.HTTPError(f"Gave up on {url} after {self.max_retries + 1} attempts")
+
+
+@dataclass
+class BackfillJob:
+    """One (symbol, timeframe, range) to fetch"""
+    symbol: Symbol
+    pair: str
+    timeframe: str
+    start: datetime
+    end: datetime
+    source: Optional[DataSource] = None
+
+    def chunks(self) -> List[Tuple[int, int]]:
+        """(start_ms, end_ms) windows of at most ``KLINE_LIMIT`` bars, oldest first"""
+        if self.timeframe not in INTERVAL_MS:
+            raise ValueError(f"Unsupported timeframe: {self.timeframe}")
+        step = INTERVAL_MS[self.timeframe]
+        start_ms = _to_ms(self.start)
+        end_ms = _to_ms(self.end)
+        return [
+            (chunk_start, min(chunk_start + (KLINE_LIMIT - 1) * step, end_ms))
+            for chunk_start in range(start_ms, end_ms, KLINE_LIMIT * step)
+        ]
+
+
+@dataclass
+class BackfillResult:
+    job: BackfillJob
+    inserted: int = 0
+    updated: int = 0
+    failed_chunks: int = 0
+    invalid_pair: bool = False
+    invalid_timeframe: bool = False
+    chunks: int = 0
+
+    @property
+    def ok(self) -> bool:
+        """Every chunk of the range was fetched and stored"""
+        return not self.invalid_pair and not self.invalid_timeframe and self.failed_chunks == 0
+
+    @property
+    def partial(self) -> bool:
+        """Some chunks were stored but the range has gaps"""
+        return not self.invalid_pair and 0 < self.failed_chunks < self.chunks
+
+
+def _to_ms(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=dt_timezone.utc)
+    return int(timestamp.timestamp() * 1000)
+
+
+def parse_klines(rows: List[List]) -> List[Dict]:
+    """Binance kline arrays -> the ``MarketDataIngestionService`` record shape"""
+    return [
+        {
+            'timestamp': datetime.fromtimestamp(k[0] / 1000, tz=dt_timezone.utc),
+            'open': Decimal(str(k[1])),
+            'high': Decimal(str(k[2])),
+            'low': Decimal(str(k[3])),
+            'close': Decimal(str(k[4])),
+            'volume': Decimal(str(k[5])) if k[5] is not None else Decimal('0'),
+        }
+        for k in rows
+    ]
+
+
+class KlineBackfillEngine:
+    """Fetch the chunks of many backfill jobs in parallel, write each job's rows in order"""
+
+    def __init__(self, client: Optional[RateLimitedClient] = None, klines_url: str = KLINES_URL,
+                 max_workers: int = MAX_WORKERS, ingestion: Optional[MarketDataIngestionService] = None) -> None:
+        self.client = client or RateLimitedClient()
+        self.klines_url = klines_url
+        self.max_workers = max(int(max_workers), 1)
+        self.ingestion = ingestion or MarketDataIngestionService()
+
+    def fetch_chunk(self, job: BackfillJob, start_ms: int, end_ms: int) -> List[Dict]:
+        params = {
+            'symbol': job.pair,
+            'interval': job.timeframe,
+            'startTime': start_ms,
+            'endTime': end_ms,
+            'limit': KLINE_LIMIT,
+        }
+        return parse_klines(self.client.get_json(self.klines_url, params, weight=KLINE_WEIGHT))
+
+    def run(self, jobs: Iterable[BackfillJob], mark_complete: bool = True) -> List[BackfillResult]:
+        jobs = list(jobs)
+        results = [BackfillResult(job=job) for job in jobs]
+        chunks = []
+        for result in results:
+            try:
+                job_chunks = result.job.chunks()
+            except ValueError as e:
+                # Only this job is skipped; the rest of the batch still runs
+                result.invalid_timeframe = True
+                logger.error(f"Skipping backfill of {result.job.pair}: {e}")
+                job_chunks = []
+            result.chunks = len(job_chunks)
+            chunks.append(job_chunks)
+        done: List[Dict[int, Optional[List[Dict]]]] = [{} for _ in jobs]
+        next_write = [0] * len(jobs)
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Round-robin across jobs so every job starts writing early
+            order = sorted(
+                (index, job_index) for job_index, job_chunks in enumerate(chunks) for index in range(len(job_chunks))
+            )
+            futures = {
+                executor.submit(self._fetch_safely, jobs[job_index], results[job_index], *chunks[job_index][index]):
+                    (job_index, index)
+                for index, job_index in order
+            }
+            for future in as_completed(futures):
+                job_index, index = futures[future]
+                done[job_index][index] = future.result()
+                self._write_ready(jobs[job_index], results[job_index], done[job_index], next_write, job_index)
+
+        if mark_complete:
+            self._update_ranges([r for r in results if not (r.invalid_pair or r.invalid_timeframe)])
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Backfilled {len(jobs)} jobs ({sum(len(c) for c in chunks)} chunks) in {elapsed:.1f}s: "
+            f"{sum(r.inserted for r in results)} inserted, {self.client.stats['requests']} requests, "
+            f"{self.client.stats['throttled']} throttled"
+        )
+        return results
+
+    def _fetch_safely(self, job: BackfillJob, result: BackfillResult, start_ms: int, end_ms: int) -> Optional[List[Dict]]:
+        if result.invalid_pair:
+            return None
+        try:
+            return self.fetch_chunk(job, start_ms, end_ms)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 400:
+                # Unknown pair: the remaining chunks would fail the same way
+                result.invalid_pair = True
+                logger.error(f"Invalid trading pair: {job.pair}. Skipping its remaining chunks.")
+            else:
+                logger.warning(f"Chunk {job.pair} {job.timeframe} @{start_ms} failed: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"Chunk {job.pair} {job.timeframe} @{start_ms} failed: {e}")
+            return None
+
+    def _write_ready(self, job: BackfillJob, result: BackfillResult, done: Dict[int, Optional[List[Dict]]],
+                     next_write: List[int], job_index: int) -> None:
+        """Write every consecutive finished chunk from the job's write cursor onwards"""
+        while next_write[job_index] in done:
+            records = done.pop(next_write[job_index])
+            next_write[job_index] += 1
+            if records is None:
+                result.failed_chunks += 1
+                continue
+            if not records:
+                continue
+            written = self.ingestion.upsert_candles(job.symbol, job.timeframe, records, source=job.source)
+            result.inserted += written.inserted
+            result.updated += written.updated
+            if written.failed:
+                result.failed_chunks += 1
+
+    @staticmethod
+    def _update_ranges(results: List[BackfillResult]) -> None:
+        """Flag each job's tracked range complete only if none of its chunks failed"""
+        for result in results:
+            try:
+                HistoricalDataRange.objects.filter(
+                    symbol=result.job.symbol, timeframe=result.job.timeframe
+                ).update(is_complete=result.ok, last_synced=timezone.now())
+            except Exception as e:
+                logger.error(f"Failed to update range tracking for {result.job.symbol.symbol} {result.job.timeframe}: {e}")
+
+
+_backfill_engine: Optional[KlineBackfillEngine] = None
+_backfill_engine_lock = threading.Lock()
+
+
+def get_backfill_engine() -> KlineBackfillEngine:
+    """Process-wide engine, so every backfill in the process shares one weight bucket"""
+    global _backfill_engine
+    if _backfill_engine is None:
+        with _backfill_engine_lock:
+            if _backfill_engine is None:
+                _backfill_engine = KlineBackfillEngine()
+    return _backfill_engine
@@ -0,0 +1,254 @@
+"""
+Shared in-process OHLCV window store.
+
+Signal generation asks for the same last-N candles many times per symbol (technical
+analysis, timeframe analysis, advanced indicators, the strategy engine). This module
+keeps one float64 window per (symbol, timeframe), loaded with a single ``values_list``
+query and topped up incrementally with only the bars newer than the last one held.
+Entries are evicted least-recently-used so memory stays bounded.
+
+The store is per process: each web/Celery worker keeps its own copy.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from apps.trading.models import Symbol
+from apps.data.models import MarketData
+
+
+logger = logging.getLogger(__name__)
+
+OHLCV_FIELDS = ('timestamp', 'open_price', 'high_price', 'low_price', 'close_price', 'volume')
+
+
+@dataclass(frozen=True)
+class CandleWindow:
+    """Oldest-first OHLCV arrays; ``timestamps`` are int64 nanoseconds since the epoch (UTC)."""
+    timestamps: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def empty(cls) -> 'CandleWindow':
+        floats = np.empty(0, dtype=np.float64)
+        return cls(np.empty(0, dtype=np.int64), floats, floats, floats, floats, floats)
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple]) -> 'CandleWindow':
+        """Build from oldest-first ``values_list(*OHLCV_FIELDS)`` rows."""
+        if not rows:
+            return cls.empty()
+        ts, o, h, l, c, v = zip(*rows)
+        return cls(
+            timestamps=pd.to_datetime(list(ts), utc=True).as_unit('ns').asi8,
+            open=np.array(o, dtype=np.float64),
+            high=np.array(h, dtype=np.float64),
+            low=np.array(l, dtype=np.float64),
+            close=np.array(c, dtype=np.float64),
+            volume=np.array([x or 0 for x in v], dtype=np.float64),
+        )
+
+    def tail(self, bars: int) -> 'CandleWindow':
+        if bars <= 0:
+            return CandleWindow.empty()
+        if bars >= len(self):
+            return self
+        return CandleWindow(*(arr[-bars:] for arr in self._arrays()))
+
+    def since(self, start: datetime) -> 'CandleWindow':
+        """Bars with timestamp >= start."""
+        start_ts = pd.Timestamp(start)
+        start_ts = start_ts.tz_localize('UTC') if start_ts.tzinfo is None else start_ts.tz_convert('UTC')
+        start_ns = start_ts.as_unit('ns').value
+        idx = int(np.searchsorted(self.timestamps, start_ns, side='left'))
+        return CandleWindow(*(arr[idx:] for arr in self._arrays()))
+
+    def append(self, newer: 'CandleWindow', max_bars: int) -> 'CandleWindow':
+        """Merge bars loaded after this window; an overlapping first bar replaces our last one."""
+        if not len(newer):
+            return self
+        keep = int(np.searchsorted(self.timestamps, newer.timestamps[0], side='left'))
+        merged = [np.concatenate((old[:keep], new)) for old, new in zip(self._arrays(), newer._arrays())]
+        return CandleWindow(*merged).tail(max_bars)
+
+    def datetimes(self) -> pd.DatetimeIndex:
+        return pd.to_datetime(self.timestamps, utc=True)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame with ``timestamp, open, high, low, close, volume`` columns, oldest first."""
+        if not len(self):
+            return pd.DataFrame()
+        return pd.DataFrame({
+            'timestamp': self.datetimes(),
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+        })
+
+    def to_records(self) -> List[Dict]:
+        """List of candle dicts (same keys as ``to_dataframe``), oldest first."""
+        return [
+            {'timestamp': ts, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for ts, o, h, l, c, v in zip(
+                self.datetimes(), self.open.tolist(), self.high.tolist(),
+                self.low.tolist(), self.close.tolist(), self.volume.tolist(),
+            )
+        ]
+
+    def _arrays(self) -> Tuple[np.ndarray, ...]:
+        return self.timestamps, self.open, self.high, self.low, self.close, self.volume
+
+
+@dataclass
+class _Entry:
+    window: CandleWindow
+    capacity: int  # bars requested from the DB on the last full load
+    exhausted: bool  # the DB had fewer bars than capacity
+    checked_at: float  # monotonic time of the last DB round-trip
+
+
+class CandleWindowStore:
+    """LRU map of (symbol_id, timeframe) -> CandleWindow.
+
+    ``get_window`` serves from memory while an entry is younger than ``refresh_seconds``;
+    after that it issues one query for bars at or after the last held timestamp (the
+    in-progress bar may have been rewritten) and appends them.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, min_bars: Optional[int] = None,
+                 max_bars: Optional[int] = None, refresh_seconds: Optional[float] = None) -> None:
+        configured = getattr(settings, 'CANDLE_STORE', {}) or {}
+        self.max_entries = int(max_entries or configured.get('MAX_ENTRIES', 512))
+        self.min_bars = int(min_bars or configured.get('MIN_BARS', 500))
+        self.max_bars = int(max_bars or configured.get('MAX_BARS', 2000))
+        self.refresh_seconds = float(
+            refresh_seconds if refresh_seconds is not None else configured.get('REFRESH_SECONDS', 30)
+        )
+        self._entries: 'OrderedDict[Tuple[int, str], _Entry]' = OrderedDict()
+        self._key_locks: Dict[Tuple[int, str], threading.Lock] = {}
+        self._generation = 0  # bumped by invalidate()
+        self._lock = threading.RLock()
+        self.stats = {'hits': 0, 'full_loads': 0, 'incremental_loads': 0, 'evictions': 0}
+
+    def get_window(self, symbol: Symbol, timeframe: str = '1h', bars: int = 100) -> CandleWindow:
+        """Last ``bars`` candles for symbol/timeframe (fewer if the DB has fewer)."""
+        key = (symbol.id, timeframe)
+        # The per-key lock makes concurrent misses on one key share a single load; the
+        # store-wide lock only guards the map, so other keys are served during the query
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                generation = self._generation
+            now = time.monotonic()
+
+            if entry is None or (bars > entry.capacity and not entry.exhausted):
+                entry = self._full_load(symbol.id, timeframe, bars, now)
+            elif now - entry.checked_at >= self.refresh_seconds:
+                entry = self._incremental_load(symbol.id, timeframe, entry, now)
+            else:
+                self._count('hits')
+
+            with self._lock:
+                # Don't put back a window loaded before an invalidate() that ran meanwhile
+                if generation == self._generation:
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+                    self.stats['evictions'] += 1
+
+            return entry.window.tail(bars)
+
+    def latest_close(self, symbol: Symbol, timeframes=('15m', '1h', '4h', '1d')) -> Optional[Tuple[datetime, float]]:
+        """(timestamp, close) of the freshest bar across ``timeframes``."""
+        best = None
+        for timeframe in timeframes:
+            window = self.get_window(symbol, timeframe, 1)
+            if len(window) and (best is None or window.timestamps[-1] > best[0]):
+                best = (window.timestamps[-1], float(window.close[-1]))
+        if best is None:
+            return None
+        return pd.Timestamp(best[0], tz='UTC').to_pydatetime(), best[1]
+
+    def invalidate(self, symbol: Optional[Symbol] = None, timeframe: Optional[str] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if symbol is None:
+                self._entries.clear()
+                self._key_locks.clear()
+                return
+            for key in [k for k in self._entries if k[0] == symbol.id and (timeframe is None or k[1] == timeframe)]:
+                del self._entries[key]
+                self._key_locks.pop(key, None)
+
+    def _key_lock(self, key: Tuple[int, str]) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _full_load(self, symbol_id: int, timeframe: str, bars: int, now: float) -> _Entry:
+        capacity = min(max(bars, self.min_bars), max(self.max_bars, bars))
+        rows = list(
+            MarketData.objects.filter(symbol_id=symbol_id, timeframe=timeframe)
+            .order_by('-timestamp')
+            .values_list(*OHLCV_FIELDS)[:capacity]
+        )
+        rows.reverse()
+        self._count('full_loads')
+        return _Entry(
+            window=CandleWindow.from_rows(rows),
+            capacity=capacity,
+            exhausted=len(rows) < capacity,
+            checked_at=now,
+        )
+
+    def _incremental_load(self, symbol_id: int, timeframe: str, entry: _Entry, now: float) -> _Entry:
+        queryset = MarketData.objects.filter(symbol_id=symbol_id, timeframe=timeframe)
+        if len(entry.window):
+            last = pd.Timestamp(entry.window.timestamps[-1], tz='UTC').to_pydatetime()
+            queryset = queryset.filter(timestamp__gte=last)
+        # Newest-first so a long outage still yields the latest `capacity` bars
+        rows = list(queryset.order_by('-timestamp').values_list(*OHLCV_FIELDS)[:entry.capacity])
+        rows.reverse()
+        self._count('incremental_loads')
+        return _Entry(
+            window=entry.window.append(CandleWindow.from_rows(rows), entry.capacity),
+            capacity=entry.capacity,
+            exhausted=entry.exhausted,
+            checked_at=now,
+        )
+
+
+_candle_store: Optional[CandleWindowStore] = None
+_candle_store_lock = threading.Lock()
+
+
+def get_candle_store() -> CandleWindowStore:
+    """Process-wide shared store."""
+    global _candle_store
+    if _candle_store is None:
+        with _candle_store_lock:
+            if _candle_store is None:
+                _candle_store = CandleWindowStore()
+    return _candle_store
@@ -0,0 +1,564 @@
+"""
+Incremental (streaming) technical indicators.
+
+``TechnicalAnalysisService`` and ``DatabaseTechnicalAnalysis`` recompute every indicator
+over the last 100-500 bars on each call. ``IndicatorEngine`` instead keeps the rolling
+state (window sums, EMA numerators, running extremes) for one symbol/timeframe and folds
+in each new closed candle in O(1). Its output matches the pandas implementations bar for
+bar when fed the same candle sequence:
+
+- SMA / Bollinger: ``rolling(n).mean()`` and ``rolling(n).std()`` (ddof=1)
+- EMA / MACD: ``ewm(span=n).mean()`` (adjust=True, as the services use)
+- RSI, ATR, ADX: rolling means of gains/losses, true range and DM, as in
+  ``DatabaseTechnicalAnalysis``; ``smoothing='wilder'`` switches them to Wilder's
+  averaging, i.e. ``ewm(alpha=1/n, adjust=False, min_periods=n)``
+- Stochastic: ``rolling(k).min()/max()`` for %K and ``rolling(d).mean()`` for %D
+
+``IncrementalIndicatorService`` persists the engine state in ``IndicatorState`` so any
+worker can resume from the last folded bar after a restart; ``advance_indicator_state_task``
+runs it from beat. ``TechnicalAnalysisService`` and both ``DatabaseTechnicalAnalysis``
+classes read the stored values through ``stored_values`` and only recompute from candles
+when the state is missing, built with other periods or behind the latest closed candle.
+"""
+import logging
+import math
+from collections import deque
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.trading.models import Symbol
+from apps.data.models import IndicatorState, MarketData
+from apps.data.candle_store import CandleWindow, get_candle_store
+
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+STATE_VERSION = 1
+
+DEFAULT_PERIODS = {
+    'sma_short': 20,
+    'sma_long': 50,
+    'ema_short': 12,
+    'ema_long': 26,
+    'macd_signal': 9,
+    'rsi_period': 14,
+    'bollinger_period': 20,
+    'bollinger_std': 2,
+    'stoch_k': 14,
+    'stoch_d': 3,
+    'atr_period': 14,
+    'adx_period': 14,
+}
+
+TIMEFRAME_DELTAS = {
+    '1m': timedelta(minutes=1),
+    '5m': timedelta(minutes=5),
+    '15m': timedelta(minutes=15),
+    '30m': timedelta(minutes=30),
+    '1h': timedelta(hours=1),
+    '4h': timedelta(hours=4),
+    '1d': timedelta(days=1),
+}
+
+
+def _dump(value: float) -> Optional[float]:
+    """JSON-safe float (MySQL JSON columns reject NaN)."""
+    return None if value is None or math.isnan(value) else value
+
+
+def _load(value: Optional[float]) -> float:
+    return NAN if value is None else float(value)
+
+
+class RollingWindow:
+    """Last ``size`` values with a running sum, like ``rolling(size).mean()``.
+
+    Any NaN inside the window makes the mean NaN. The sum is recomputed exactly once per
+    full rotation, which keeps floating-point drift bounded at amortised O(1) cost.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = int(size)
+        self.buffer: List[float] = []
+        self.pos = 0  # slot overwritten next once the window is full
+        self.total = 0.0
+        self.nan_count = 0
+        self.nonzero_count = 0  # lets an all-zero window report exactly 0.0
+
+    @property
+    def full(self) -> bool:
+        return len(self.buffer) == self.size
+
+    @property
+    def value(self) -> float:
+        if not self.full or self.nan_count:
+            return NAN
+        if not self.nonzero_count:
+            return 0.0
+        return self.total / self.size
+
+    def push(self, value: float) -> None:
+        if not self.full:
+            self.buffer.append(value)
+            self._add(value)
+            return
+        self._remove(self.buffer[self.pos])
+        self.buffer[self.pos] = value
+        self._add(value)
+        self.pos = (self.pos + 1) % self.size
+        if self.pos == 0:
+            self._resum()
+
+    def _add(self, value: float) -> None:
+        if math.isnan(value):
+            self.nan_count += 1
+            return
+        self.total += value
+        if value != 0:
+            self.nonzero_count += 1
+
+    def _remove(self, value: float) -> None:
+        if math.isnan(value):
+            self.nan_count -= 1
+            return
+        self.total -= value
+        if value != 0:
+            self.nonzero_count -= 1
+
+    def _resum(self) -> None:
+        self.total = math.fsum(v for v in self.buffer if not math.isnan(v))
+
+    def to_state(self) -> Dict:
+        return {'buffer': [_dump(v) for v in self.buffer], 'pos': self.pos}
+
+    def load_state(self, state: Dict) -> None:
+        self.buffer = []
+        self.pos = 0
+        self.total = 0.0
+        self.nan_count = self.nonzero_count = 0
+        for value in state['buffer']:
+            self.buffer.append(_load(value))
+            self._add(self.buffer[-1])
+        self.pos = int(state['pos'])
+        self._resum()
+
+
+class RollingMoments(RollingWindow):
+    """RollingWindow that also tracks the sample variance (``rolling(size).std()``, ddof=1).
+
+    Deviations are accumulated around a shift point re-centred on the window mean at every
+    rotation, so large prices with a small spread do not lose precision.
+    """
+
+    def __init__(self, size: int) -> None:
+        super().__init__(size)
+        self.shift = 0.0
+        self.dev_sum = 0.0
+        self.dev_sq_sum = 0.0
+
+    @property
+    def variance(self) -> float:
+        if not self.full or self.nan_count or self.size < 2:
+            return NAN
+        var = (self.dev_sq_sum - self.dev_sum * self.dev_sum / self.size) / (self.size - 1)
+        return max(var, 0.0)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def push(self, value: float) -> None:
+        if not self.buffer and not math.isnan(value):
+            self.shift = value
+        super().push(value)
+
+    def _add(self, value: float) -> None:
+        super()._add(value)
+        if not math.isnan(value):
+            d = value - self.shift
+            self.dev_sum += d
+            self.dev_sq_sum += d * d
+
+    def _remove(self, value: float) -> None:
+        super()._remove(value)
+        if not math.isnan(value):
+            d = value - self.shift
+            self.dev_sum -= d
+            self.dev_sq_sum -= d * d
+
+    def _resum(self) -> None:
+        super()._resum()
+        finite = [v for v in self.buffer if not math.isnan(v)]
+        self.shift = self.total / len(finite) if finite else 0.0
+        self.dev_sum = math.fsum(v - self.shift for v in finite)
+        self.dev_sq_sum = math.fsum((v - self.shift) ** 2 for v in finite)
+
+
+class RollingExtreme:
+    """Rolling max (or min) over ``size`` values via a monotonic deque, amortised O(1)."""
+
+    def __init__(self, size: int, mode: str = 'max') -> None:
+        self.size = int(size)
+        self.is_max = mode == 'max'
+        self.seq = 0
+        self.candidates: deque = deque()  # (seq, value), values monotonic from the left
+
+    @property
+    def value(self) -> float:
+        if self.seq < self.size or not self.candidates:
+            return NAN
+        return self.candidates[0][1]
+
+    def push(self, value: float) -> None:
+        if self.is_max:
+            while self.candidates and self.candidates[-1][1] <= value:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= value:
+                self.candidates.pop()
+        self.candidates.append((self.seq, value))
+        self.seq += 1
+        while self.candidates[0][0] <= self.seq - 1 - self.size:
+            self.candidates.popleft()
+
+    def to_state(self) -> Dict:
+        return {'seq': self.seq, 'candidates': [[s, v] for s, v in self.candidates]}
+
+    def load_state(self, state: Dict) -> None:
+        self.seq = int(state['seq'])
+        self.candidates = deque((int(s), float(v)) for s, v in state['candidates'])
+
+
+class ExponentialAverage:
+    """pandas ``ewm(alpha=...).mean()``; NaN inputs are skipped.
+
+    ``adjust=True`` keeps the weighted numerator/denominator so the early bars match
+    pandas' bias-corrected weights exactly; ``adjust=False`` is the plain recursion.
+    """
+
+    def __init__(self, alpha: float, adjust: bool = True, min_periods: int = 1) -> None:
+        self.alpha = float(alpha)
+        self.adjust = adjust
+        self.min_periods = int(min_periods)
+        self.count = 0
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.current = NAN
+
+    @classmethod
+    def from_span(cls, span: int, adjust: bool = True) -> 'ExponentialAverage':
+        return cls(alpha=2.0 / (span + 1), adjust=adjust)
+
+    @classmethod
+    def wilder(cls, period: int) -> 'ExponentialAverage':
+        return cls(alpha=1.0 / period, adjust=False, min_periods=period)
+
+    @property
+    def value(self) -> float:
+        return self.current if self.count >= self.min_periods else NAN
+
+    def push(self, value: float) -> None:
+        if math.isnan(value):
+            return
+        self.count += 1
+        decay = 1.0 - self.alpha
+        if self.adjust:
+            self.numerator = value + decay * self.numerator
+            self.denominator = 1.0 + decay * self.denominator
+            self.current = self.numerator / self.denominator
+        elif self.count == 1:
+            self.current = value
+        else:
+            self.current = self.current + self.alpha * (value - self.current)
+
+    def to_state(self) -> Dict:
+        return {
+            'count': self.count,
+            'numerator': self.numerator,
+            'denominator': self.denominator,
+            'current': _dump(self.current),
+        }
+
+    def load_state(self, state: Dict) -> None:
+        self.count = int(state['count'])
+        self.numerator = float(state['numerator'])
+        self.denominator = float(state['denominator'])
+        self.current = _load(state['current'])
+
+
+class IndicatorEngine:
+    """Streaming indicator state for one symbol/timeframe series.
+
+    Feed closed candles oldest-first through ``update``; each call is O(1) and returns the
+    indicator values as of that bar (``None`` while an indicator is still warming up).
+    Output keys follow ``DatabaseTechnicalAnalysis._calculate_all_indicators``.
+    """
+
+    def __init__(self, periods: Optional[Dict] = None, smoothing: str = 'sma') -> None:
+        if smoothing not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown smoothing '{smoothing}'")
+        self.periods = {**DEFAULT_PERIODS, **(periods or {})}
+        self.smoothing = smoothing
+        p = self.periods
+
+        self.sma_short = RollingWindow(p['sma_short'])
+        self.sma_long = RollingWindow(p['sma_long'])
+        self.ema_short = ExponentialAverage.from_span(p['ema_short'])
+        self.ema_long = ExponentialAverage.from_span(p['ema_long'])
+        self.macd_signal = ExponentialAverage.from_span(p['macd_signal'])
+        self.rsi_gain = self._smoother(p['rsi_period'])
+        self.rsi_loss = self._smoother(p['rsi_period'])
+        self.bollinger = RollingMoments(p['bollinger_period'])
+        self.stoch_high = RollingExtreme(p['stoch_k'], 'max')
+        self.stoch_low = RollingExtreme(p['stoch_k'], 'min')
+        self.stoch_d = RollingWindow(p['stoch_d'])
+        self.atr = self._smoother(p['atr_period'])
+        self.adx_tr = self._smoother(p['adx_period'])
+        self.adx_dm_plus = self._smoother(p['adx_period'])
+        self.adx_dm_minus = self._smoother(p['adx_period'])
+        self.adx = self._smoother(p['adx_period'])
+
+        self.bars = 0
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+        self.values: Dict[str, Optional[float]] = {}
+
+    def _smoother(self, period: int):
+        if self.smoothing == 'wilder':
+            return ExponentialAverage.wilder(period)
+        return RollingWindow(period)
+
+    def _components(self) -> Dict:
+        return {
+            name: component for name, component in vars(self).items()
+            if isinstance(component, (RollingWindow, RollingExtreme, ExponentialAverage))
+        }
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, Optional[float]]:
+        """Fold in one closed candle and return the indicator values as of that candle."""
+        high, low, close = float(high), float(low), float(close)
+        p = self.periods
+        first = self.bars == 0
+
+        # Moving averages and MACD
+        self.sma_short.push(close)
+        self.sma_long.push(close)
+        self.ema_short.push(close)
+        self.ema_long.push(close)
+        macd = self.ema_short.value - self.ema_long.value
+        self.macd_signal.push(macd)
+
+        # RSI: the first bar has no change and counts as a zero gain/loss, as
+        # delta.where(delta > 0, 0) does in the pandas versions
+        delta = 0.0 if first else close - self.prev_close
+        self.rsi_gain.push(delta if delta > 0 else 0.0)
+        self.rsi_loss.push(-delta if delta < 0 else 0.0)
+
+        # Bollinger Bands
+        self.bollinger.push(close)
+
+        # Stochastic
+        self.stoch_high.push(high)
+        self.stoch_low.push(low)
+        lowest, highest = self.stoch_low.value, self.stoch_high.value
+        stoch_k = 100 * self._ratio(close - lowest, highest - lowest)
+        self.stoch_d.push(stoch_k)
+
+        # ATR and ADX start on the second bar, once there is a previous close
+        if not first:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+            self.atr.push(true_range)
+            self.adx_tr.push(true_range)
+
+            up_move = high - self.prev_high
+            low_move = low - self.prev_low
+            # Same directional-movement rule as DatabaseTechnicalAnalysis._calculate_adx
+            self.adx_dm_plus.push(up_move if up_move > abs(low_move) and up_move > 0 else 0.0)
+            self.adx_dm_minus.push(abs(low_move) if abs(low_move) > up_move and low_move < 0 else 0.0)
+
+            tr_smooth = self.adx_tr.value
+            di_plus = 100 * self._ratio(self.adx_dm_plus.value, tr_smooth)
+            di_minus = 100 * self._ratio(self.adx_dm_minus.value, tr_smooth)
+            if not math.isnan(tr_smooth):
+                self.adx.push(100 * self._ratio(abs(di_plus - di_minus), di_plus + di_minus))
+
+        self.bars += 1
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        bollinger_middle = self.bollinger.value
+        bollinger_band = self.bollinger.std * p['bollinger_std']
+        ema_short = self.ema_short.value
+        ema_long = self.ema_long.value
+        macd_signal = self.macd_signal.value
+        values = {
+            f"sma_{p['sma_short']}": self.sma_short.value,
+            f"sma_{p['sma_long']}": self.sma_long.value,
+            f"ema_{p['ema_short']}": ema_short,
+            f"ema_{p['ema_long']}": ema_long,
+            'rsi': self._rsi(),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd - macd_signal,
+            'bollinger_upper': bollinger_middle + bollinger_band,
+            'bollinger_middle': bollinger_middle,
+            'bollinger_lower': bollinger_middle - bollinger_band,
+            'stoch_k': stoch_k,
+            'stoch_d': self.stoch_d.value,
+            'atr': self.atr.value,
+            'adx': self.adx.value,
+            'close_price': close,
+        }
+        self.values = {key: _dump(value) for key, value in values.items()}
+        return self.values
+
+    def _rsi(self) -> float:
+        gain, loss = self.rsi_gain.value, self.rsi_loss.value
+        if math.isnan(gain) or math.isnan(loss):
+            return NAN
+        if loss == 0:
+            return 100.0 if gain > 0 else NAN
+        return 100 - (100 / (1 + gain / loss))
+
+    @staticmethod
+    def _ratio(numerator: float, denominator: float) -> float:
+        """Division with pandas semantics for the cases that matter here (x/0 -> NaN)."""
+        if math.isnan(numerator) or math.isnan(denominator) or denominator == 0:
+            return NAN
+        return numerator / denominator
+
+    def to_state(self) -> Dict:
+        return {
+            'version': STATE_VERSION,
+            'periods': self.periods,
+            'smoothing': self.smoothing,
+            'bars': self.bars,
+            'previous': [_dump(self.prev_high), _dump(self.prev_low), _dump(self.prev_close)],
+            'components': {name: component.to_state() for name, component in self._components().items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'IndicatorEngine':
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported indicator state version {state.get('version')}")
+        engine = cls(periods=state['periods'], smoothing=state['smoothing'])
+        engine.bars = int(state['bars'])
+        engine.prev_high, engine.prev_low, engine.prev_close = (_load(v) for v in state['previous'])
+        components = engine._components()
+        for name, component_state in state['components'].items():
+            components[name].load_state(component_state)
+        return engine
+
+
+class IncrementalIndicatorService:
+    """Advances the persisted IndicatorEngine state of a symbol/timeframe with new closed candles.
+
+    State is loaded under ``select_for_update`` so concurrent workers never fold the same
+    bar twice. If the stored state cannot be continued (no state yet, different periods or
+    smoothing, or a gap wider than the candle store window) it is rebuilt from the last
+    ``warmup_bars`` closed candles.
+    """
+
+    def __init__(self, periods: Optional[Dict] = None, smoothing: Optional[str] = None,
+                 warmup_bars: Optional[int] = None) -> None:
+        configured = getattr(settings, 'INDICATOR_ENGINE', {}) or {}
+        self.periods = {**DEFAULT_PERIODS, **configured.get('PERIODS', {}), **(periods or {})}
+        self.smoothing = smoothing or configured.get('SMOOTHING', 'sma')
+        self.warmup_bars = int(warmup_bars or configured.get('WARMUP_BARS', 500))
+        self.candle_store = get_candle_store()
+
+    def advance(self, symbol: Symbol, timeframe: str = '1h', now=None) -> Dict[str, Optional[float]]:
+        """Fold every closed candle newer than the stored state and return the latest values."""
+        window = self._closed_bars(symbol, timeframe, now or timezone.now())
+
+        with transaction.atomic():
+            record, _ = IndicatorState.objects.select_for_update().get_or_create(
+                symbol=symbol, timeframe=timeframe
+            )
+            engine = self._restore(record, window)
+            if engine is None:
+                engine = IndicatorEngine(periods=self.periods, smoothing=self.smoothing)
+                pending = window
+                record.bars_processed = 0
+            else:
+                last_ns = pd.Timestamp(record.last_timestamp).as_unit('ns').value
+                start = int(np.searchsorted(window.timestamps, last_ns, side='right'))
+                pending = CandleWindow(*(arr[start:] for arr in window._arrays()))
+
+            if not len(pending):
+                return record.values
+
+            for high, low, close in zip(pending.high.tolist(), pending.low.tolist(), pending.close.tolist()):
+                engine.update(high, low, close)
+
+            record.last_timestamp = pending.datetimes()[-1].to_pydatetime()
+            record.bars_processed += len(pending)
+            record.state = engine.to_state()
+            record.values = engine.values
+            record.save()
+
+        logger.debug(f"Folded {len(pending)} {timeframe} bars into indicator state for {symbol.symbol}")
+        return record.values
+
+    def stored_values(self, symbol: Symbol, timeframe: str = '1h', periods: Optional[Dict] = None,
+                      smoothing: str = 'sma', now=None) -> Optional[Dict[str, Optional[float]]]:
+        """Persisted indicator values, or None when the caller has to recompute them.
+
+        The state must have been built with ``smoothing`` and every period in ``periods``
+        (keys of ``DEFAULT_PERIODS``), and must have folded the latest closed candle.
+        """
+        record = IndicatorState.objects.filter(symbol=symbol, timeframe=timeframe).first()
+        if record is None or record.last_timestamp is None or not record.values:
+            return None
+        state_periods = (record.state or {}).get('periods') or {}
+        if record.state.get('smoothing') != smoothing or any(
+            state_periods.get(name) != value for name, value in (periods or {}).items()
+        ):
+            return None
+
+        closed = MarketData.objects.filter(symbol=symbol, timeframe=timeframe)
+        duration = TIMEFRAME_DELTAS.get(timeframe.lower())
+        if duration is not None:
+            closed = closed.filter(timestamp__lte=(now or timezone.now()) - duration)
+        latest = closed.aggregate(latest=Max('timestamp'))['latest']
+        if latest is None or latest > record.last_timestamp:
+            return None
+        return record.values
+
+    def _closed_bars(self, symbol: Symbol, timeframe: str, now) -> CandleWindow:
+        window = self.candle_store.get_window(symbol, timeframe, self.warmup_bars)
+        duration = TIMEFRAME_DELTAS.get(timeframe.lower())
+        if len(window) and duration is not None:
+            # A bar is still forming until its full duration has elapsed
+            cutoff = pd.Timestamp(now - duration).as_unit('ns').value
+            end = int(np.searchsorted(window.timestamps, cutoff, side='right'))
+            window = CandleWindow(*(arr[:end] for arr in window._arrays()))
+        return window
+
+    def _restore(self, record: IndicatorState, window: CandleWindow) -> Optional[IndicatorEngine]:
+        if not record.state or record.last_timestamp is None:
+            return None
+        try:
+            engine = IndicatorEngine.from_state(record.state)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Discarding unreadable indicator state for {record}: {e}")
+            return None
+        if engine.periods != self.periods or engine.smoothing != self.smoothing:
+            return None
+        last_ns = pd.Timestamp(record.last_timestamp).as_unit('ns').value
+        if len(window) and window.timestamps[0] > last_ns:
+            # Bars between the stored state and the window are not available any more
+            return None
+        return engine
+
+
+def get_incremental_indicator_service() -> IncrementalIndicatorService:
+    return IncrementalIndicatorService()
@@ -0,0 +1,360 @@
+"""
+Streaming OHLCV ingestion from Binance Futures kline WebSockets.
+
+OHLCV otherwise arrives only through REST polling (``HistoricalDataManager``, the
+``/ticker/24hr`` loop in ``LiveDataService``). ``KlineStreamIngestionService`` subscribes
+to the combined ``<pair>@kline_1m`` streams of every USDT-perpetual pair reported by
+``binance_futures_service``. It builds 1m candles locally and rolls each closed minute
+into the 15m/1h/4h/1d bars. Closed bars are buffered and written to ``MarketData`` in
+batches through ``MarketDataIngestionService``.
+
+A higher-timeframe bar is written only when all of its minutes were seen. The bar that
+was already open when the stream started is skipped, so it never overwrites a complete
+REST bar with a partial one. When a closed minute arrives more than one minute after
+the previous one (a reconnect, or a dropped message), the missing minutes are fetched
+over REST and fed through the same aggregator.
+
+When given a ``SignalOutcomeTracker``, every kline event's close price is also fed to
+it as a tick, so open signals' targets and stops are checked several times a second.
+
+``replay`` reads recorded stream files (one combined-stream JSON message per line,
+optionally gzipped) through the same path, so no network is needed.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Max
+
+from apps.trading.models import Symbol
+from apps.data.models import MarketData
+from apps.data.market_data_ingestion import MarketDataIngestionService
+
+
+logger = logging.getLogger(__name__)
+
+KLINE_STREAM = getattr(settings, 'KLINE_STREAM', {})
+STREAM_URL = KLINE_STREAM.get('URL', 'wss://fstream.binance.com/stream')
+STREAMS_PER_CONNECTION = KLINE_STREAM.get('STREAMS_PER_CONNECTION', 200)  # Binance's limit per connection
+ROLLUP_TIMEFRAMES = tuple(KLINE_STREAM.get('TIMEFRAMES', ('15m', '1h', '4h', '1d')))
+FLUSH_SECONDS = KLINE_STREAM.get('FLUSH_SECONDS', 5)
+FLUSH_BARS = KLINE_STREAM.get('FLUSH_BARS', 500)
+MAX_BACKFILL_MINUTES = KLINE_STREAM.get('MAX_BACKFILL_MINUTES', 1440)
+RECONNECT_MAX_SECONDS = KLINE_STREAM.get('RECONNECT_MAX_SECONDS', 60)
+
+MINUTE_MS = 60_000
+TIMEFRAME_MS = {
+    '1m': MINUTE_MS,
+    '5m': 5 * MINUTE_MS,
+    '15m': 15 * MINUTE_MS,
+    '1h': 60 * MINUTE_MS,
+    '4h': 240 * MINUTE_MS,
+    '1d': 1440 * MINUTE_MS,
+}
+
+
+def _to_datetime(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, tz=dt_timezone.utc)
+
+
+def _to_ms(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=dt_timezone.utc)
+    return int(timestamp.timestamp() * 1000)
+
+
+def parse_kline(kline: Dict) -> Tuple[Dict, bool]:
+    """(candle record, is_closed) from the ``k`` object of a kline stream event"""
+    record = {
+        'timestamp': _to_datetime(int(kline['t'])),
+        'open': Decimal(str(kline['o'])),
+        'high': Decimal(str(kline['h'])),
+        'low': Decimal(str(kline['l'])),
+        'close': Decimal(str(kline['c'])),
+        'volume': Decimal(str(kline['v'])),
+    }
+    return record, bool(kline.get('x'))
+
+
+@dataclass
+class _Bucket:
+    start_ms: int
+    record: Dict
+    minutes: int
+
+
+class CandleAggregator:
+    """Rolls closed 1m candles per pair into higher-timeframe bars.
+
+    ``add_minute`` returns the bars it closed as ``(timeframe, record)`` pairs: the
+    minute itself, plus every higher bar whose last minute it was. Minutes must arrive
+    oldest first; a minute at or before the last one seen for the pair is ignored.
+    """
+
+    def __init__(self, timeframes: Iterable[str] = ROLLUP_TIMEFRAMES) -> None:
+        self.timeframes = tuple(timeframes)
+        self._open: Dict[Tuple[str, str], _Bucket] = {}
+        self.last_minute: Dict[str, int] = {}  # pair -> open time (ms) of the last closed minute
+        self.stats = {'minutes': 0, 'bars': 0, 'partial_bars': 0}
+
+    def add_minute(self, pair: str, record: Dict) -> List[Tuple[str, Dict]]:
+        start_ms = _to_ms(record['timestamp'])
+        if start_ms <= self.last_minute.get(pair, -1):
+            return []
+        self.last_minute[pair] = start_ms
+        self.stats['minutes'] += 1
+
+        closed = [('1m', record)]
+        for timeframe in self.timeframes:
+            span = TIMEFRAME_MS[timeframe]
+            bucket_start = start_ms - start_ms % span
+            key = (pair, timeframe)
+            bucket = self._open.get(key)
+
+            if bucket is not None and bucket.start_ms != bucket_start:
+                # The minutes closing the held bar never arrived
+                self.stats['partial_bars'] += 1
+                bucket = None
+            if bucket is None:
+                bucket = _Bucket(bucket_start, dict(record, timestamp=_to_datetime(bucket_start)), 0)
+                self._open[key] = bucket
+            else:
+                held = bucket.record
+                held['high'] = max(held['high'], record['high'])
+                held['low'] = min(held['low'], record['low'])
+                held['close'] = record['close']
+                held['volume'] = held['volume'] + record['volume']
+            bucket.minutes += 1
+
+            if start_ms + MINUTE_MS == bucket_start + span:
+                del self._open[key]
+                if bucket.minutes == span // MINUTE_MS:
+                    closed.append((timeframe, bucket.record))
+                else:
+                    self.stats['partial_bars'] += 1
+        self.stats['bars'] += len(closed)
+        return closed
+
+
+class KlineStreamIngestionService:
+    """Long-running kline stream consumer with batched ``MarketData`` writes"""
+
+    def __init__(self, pairs: Optional[Iterable[str]] = None, aggregator: Optional[CandleAggregator] = None,
+                 ingestion: Optional[MarketDataIngestionService] = None,
+                 flush_seconds: float = FLUSH_SECONDS, flush_bars: int = FLUSH_BARS,
+                 max_backfill_minutes: int = MAX_BACKFILL_MINUTES, outcome_tracker=None) -> None:
+        self.aggregator = aggregator or CandleAggregator()
+        self.ingestion = ingestion or MarketDataIngestionService()
+        self.flush_seconds = flush_seconds
+        self.flush_bars = flush_bars
+        self.max_backfill_minutes = max_backfill_minutes
+        self.outcome_tracker = outcome_tracker
+        self.symbols: Dict[str, Symbol] = self._load_symbols(pairs)
+        self._pending: Dict[Tuple[str, str], List[Dict]] = {}
+        self._pending_count = 0
+        self._flushed_at = time.monotonic()
+        self._running = False
+        self.stats = {'messages': 0, 'flushes': 0, 'written': 0, 'backfilled': 0, 'reconnects': 0}
+
+    @staticmethod
+    def _load_symbols(pairs: Optional[Iterable[str]]) -> Dict[str, Symbol]:
+        """pair -> Symbol for the USDT perpetuals that have an active Symbol row"""
+        if pairs is None:
+            from apps.trading.binance_futures_service import get_binance_usdt_perp_pairs
+            pairs = get_binance_usdt_perp_pairs()
+        bases = {pair.upper()[:-4]: pair.upper() for pair in pairs if pair.upper().endswith('USDT')}
+        return {
+            bases[symbol.symbol.upper()]: symbol
+            for symbol in Symbol.objects.filter(symbol__in=list(bases), is_active=True)
+        }
+
+    def seed_from_database(self) -> None:
+        """Start gap detection from the newest stored 1m bar of each pair"""
+        by_id = {symbol.id: pair for pair, symbol in self.symbols.items()}
+        latest = (
+            MarketData.objects.filter(symbol_id__in=list(by_id), timeframe='1m')
+            .values('symbol_id').annotate(last=Max('timestamp'))
+        )
+        for row in latest:
+            self.aggregator.last_minute[by_id[row['symbol_id']]] = _to_ms(row['last'])
+
+    def handle_message(self, message: Dict) -> None:
+        """Buffer the bars closed by one combined-stream message"""
+        self.stats['messages'] += 1
+        data = message.get('data', message)
+        if data.get('e') != 'kline':
+            return
+        pair = data['s'].upper()
+        if pair not in self.symbols:
+            return
+        record, is_closed = parse_kline(data['k'])
+        if self.outcome_tracker is not None:
+            event_time = _to_datetime(int(data['E'])) if 'E' in data else None
+            self.outcome_tracker.on_price(self.symbols[pair].symbol, float(record['close']), event_time)
+        if is_closed:
+            self._add_minute(pair, record)
+
+    def _add_minute(self, pair: str, record: Dict) -> None:
+        for timeframe, bar in self.aggregator.add_minute(pair, record):
+            self._pending.setdefault((pair, timeframe), []).append(bar)
+            self._pending_count += 1
+
+    def missing_minutes(self, message: Dict) -> Optional[Tuple[str, int, int]]:
+        """(pair, first_ms, last_ms) of the minutes before this closed kline that were never seen"""
+        data = message.get('data', message)
+        if data.get('e') != 'kline' or not data['k'].get('x'):
+            return None
+        pair = data['s'].upper()
+        last = self.aggregator.last_minute.get(pair)
+        start_ms = int(data['k']['t'])
+        if pair not in self.symbols or last is None or start_ms - last <= MINUTE_MS:
+            return None
+        first = max(last + MINUTE_MS, start_ms - self.max_backfill_minutes * MINUTE_MS)
+        return pair, first, start_ms - MINUTE_MS
+
+    def fetch_minutes(self, pair: str, first_ms: int, last_ms: int) -> List[Dict]:
+        """1m klines of ``pair`` opened in [first_ms, last_ms], fetched over REST"""
+        from apps.data.backfill_engine import BackfillJob, get_backfill_engine
+        engine = get_backfill_engine()
+        job = BackfillJob(self.symbols[pair], pair, '1m', _to_datetime(first_ms), _to_datetime(last_ms + MINUTE_MS))
+        records: List[Dict] = []
+        for chunk_start, chunk_end in job.chunks():
+            try:
+                records.extend(engine.fetch_chunk(job, chunk_start, min(chunk_end, last_ms)))
+            except Exception as e:
+                logger.warning(f"Backfill of {pair} from {_to_datetime(chunk_start)} failed: {e}")
+                break
+        return records
+
+    def add_backfill(self, pair: str, records: List[Dict]) -> int:
+        """Aggregate minutes fetched by ``fetch_minutes``; returns how many were added"""
+        for record in records:
+            self._add_minute(pair, record)
+        self.stats['backfilled'] += len(records)
+        logger.info(f"Backfilled {len(records)} 1m klines for {pair}")
+        return len(records)
+
+    def should_flush(self) -> bool:
+        return self._pending_count >= self.flush_bars or (
+            self._pending_count > 0 and time.monotonic() - self._flushed_at >= self.flush_seconds
+        )
+
+    def take_pending(self) -> Dict[Tuple[str, str], List[Dict]]:
+        pending, self._pending, self._pending_count = self._pending, {}, 0
+        self._flushed_at = time.monotonic()
+        return pending
+
+    def write(self, pending: Dict[Tuple[str, str], List[Dict]]) -> int:
+        """Upsert buffered bars, one bulk write per (pair, timeframe); returns rows written"""
+        written = 0
+        for (pair, timeframe), records in pending.items():
+            try:
+                written += self.ingestion.upsert_candles(self.symbols[pair], timeframe, records).total
+            except Exception as e:
+                logger.error(f"Error writing {len(records)} {timeframe} bars for {pair}: {e}")
+        self.stats['flushes'] += 1
+        self.stats['written'] += written
+        return written
+
+    def flush(self) -> int:
+        return self.write(self.take_pending())
+
+    def replay(self, paths: Iterable[str]) -> Dict:
+        """Feed recorded stream files through the aggregator and write the bars; returns stats"""
+        for path in paths:
+            opener = gzip.open if str(path).endswith('.gz') else open
+            with opener(path, 'rt', encoding='utf-8') as stream:
+                for line in stream:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self.handle_message(json.loads(line))
+                    except Exception as e:
+                        logger.warning(f"Skipping unreadable stream message in {path}: {e}")
+                    if self._pending_count >= self.flush_bars:
+                        self.flush()
+        self.flush()
+        return dict(self.stats, **self.aggregator.stats)
+
+    def stream_urls(self) -> List[str]:
+        streams = [f"{pair.lower()}@kline_1m" for pair in sorted(self.symbols)]
+        return [
+            f"{STREAM_URL}?streams={'/'.join(streams[i:i + STREAMS_PER_CONNECTION])}"
+            for i in range(0, len(streams), STREAMS_PER_CONNECTION)
+        ]
+
+    async def run(self) -> None:
+        """Consume every stream shard until ``stop`` is called"""
+        if not self.symbols:
+            logger.warning("No active Symbol rows match Binance USDT perpetuals; nothing to stream")
+            return
+        await asyncio.to_thread(self.seed_from_database)
+        self._running = True
+        logger.info(f"Streaming 1m klines for {len(self.symbols)} pairs")
+        if self.outcome_tracker is not None:
+            self.outcome_tracker.start()
+        try:
+            await asyncio.gather(
+                self._flush_loop(),
+                *(self._consume(url) for url in self.stream_urls()),
+            )
+        finally:
+            await asyncio.to_thread(self.flush)
+            if self.outcome_tracker is not None:
+                await self.outcome_tracker.stop()
+
+    def stop(self) -> None:
+        self._running = False
+
+    async def _flush_loop(self) -> None:
+        while self._running:
+            await asyncio.sleep(1)
+            if self.should_flush():
+                await asyncio.to_thread(self.write, self.take_pending())
+
+    async def _consume(self, url: str) -> None:
+        import websockets
+
+        delay = 1
+        while self._running:
+            try:
+                async with websockets.connect(url, ping_interval=20, max_queue=4096) as connection:
+                    delay = 1
+                    while self._running:
+                        try:
+                            raw = await asyncio.wait_for(connection.recv(), timeout=1)
+                        except asyncio.TimeoutError:
+                            continue
+                        message = json.loads(raw)
+                        gap = self.missing_minutes(message)
+                        if gap:
+                            # Fetch off the loop, aggregate on it like every other minute
+                            records = await asyncio.to_thread(self.fetch_minutes, *gap)
+                            self.add_backfill(gap[0], records)
+                        self.handle_message(message)
+            except Exception as e:
+                if not self._running:
+                    break
+                self.stats['reconnects'] += 1
+                logger.warning(f"Kline stream disconnected ({e}); reconnecting in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+
+def run_kline_stream(pairs: Optional[Iterable[str]] = None) -> KlineStreamIngestionService:
+    """Run the stream ingestion in this thread until interrupted (for management commands)"""
+    from apps.signals.outcome_tracker import SignalOutcomeTracker
+    service = KlineStreamIngestionService(pairs=pairs, outcome_tracker=SignalOutcomeTracker())
+    try:
+        asyncio.run(service.run())
+    except KeyboardInterrupt:
+        service.stop()
+    return service
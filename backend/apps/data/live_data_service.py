@@ -10,6 +10,8 @@ from decimal import Decimal
 from django.utils import timezone
 from django.conf import settings
 from apps.core.services import RealTimeBroadcaster
+from apps.core.market_broadcast import ConflatingMarketBroadcaster
+from apps.signals.outcome_tracker import SignalOutcomeTracker
 from apps.data.models import MarketData, DataSource
 from apps.trading.models import Symbol
 
@@ -21,6 +23,10 @@ class LiveDataService:
     
     def __init__(self):
         self.broadcaster = RealTimeBroadcaster()
+        # Conflated market_batch frames; flushed by a task on the collection loop
+        self.market_broadcaster = ConflatingMarketBroadcaster()
+        # Target/stop hits of open signals, detected on every ticker price
+        self.outcome_tracker = SignalOutcomeTracker()
         self.session = None
         self.is_running = False
         
@@ -47,11 +53,15 @@ class LiveDataService:
         
         try:
             # Start live data collection
+            self.market_broadcaster.start()
+            self.outcome_tracker.start()
             await self.collect_live_data()
         except Exception as e:
             logger.error(f"Error in live data service: {e}")
             self.is_running = False
         finally:
+            await self.market_broadcaster.stop()
+            await self.outcome_tracker.stop()
             if self.session:
                 await self.session.close()
     
@@ -138,14 +148,18 @@ class LiveDataService:
             prev_price = price - (price * change_24h / 100)
             change = price - prev_price
             
-            # Broadcast real-time update
-            self.broadcaster.broadcast_market_update(
+            # Broadcast real-time update (conflated with later ticks of this symbol)
+            self.market_broadcaster.publish(
                 symbol=symbol,
                 price=float(price),
                 change=float(change),
                 volume=float(volume_24h),
                 timestamp=timezone.now()
             )
+            # extract_base_symbol also maps ETHBTC, LINKETH, ... to their base; only a
+            # USDT-quoted price is comparable with the signals' entry/target/stop levels
+            if ticker.get('symbol') == f"{symbol}USDT":
+                self.outcome_tracker.on_price(symbol, float(price))
             
             # Save to database
             await self.save_market_data(symbol, price, change, volume_24h)
@@ -164,8 +178,8 @@ class LiveDataService:
             # Calculate price change
             change = price * (change_24h / 100)
             
-            # Broadcast real-time update
-            self.broadcaster.broadcast_market_update(
+            # Broadcast real-time update (conflated with later ticks of this symbol)
+            self.market_broadcaster.publish(
                 symbol=symbol,
                 price=float(price),
                 change=float(change),
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from apps.data.kline_stream import KlineStreamIngestionService, run_kline_stream
+
+
+class Command(BaseCommand):
+    help = "Stream Binance Futures 1m klines into MarketData, rolled up to 15m/1h/4h/1d"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pairs', type=str, help='Comma-separated pairs (e.g. BTCUSDT,ETHUSDT). Defaults to every USDT perpetual.')
+        parser.add_argument('--replay', nargs='+', metavar='FILE', help='Replay recorded stream files (.jsonl or .jsonl.gz) instead of connecting')
+
+    def handle(self, *args, **options):
+        pairs = [p.strip().upper() for p in options['pairs'].split(',')] if options.get('pairs') else None
+
+        if options.get('replay'):
+            if pairs is None:
+                self.stderr.write(self.style.ERROR("--replay needs --pairs so no network is used"))
+                return
+            stats = KlineStreamIngestionService(pairs=pairs).replay(options['replay'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Replayed {stats['messages']} messages: {stats['minutes']} minutes, "
+                f"{stats['written']} bars written, {stats['partial_bars']} partial bars skipped"
+            ))
+            return
+
+        self.stdout.write(self.style.SUCCESS("Streaming klines (Ctrl+C to stop)..."))
+        service = run_kline_stream(pairs)
+        self.stdout.write(f"Stopped: {service.stats}")
@@ -0,0 +1,196 @@
+"""
+Bulk OHLCV ingestion for MarketData.
+
+Replaces per-candle ``update_or_create`` (one SELECT + one INSERT/UPDATE per row) with
+one existence query and one ``bulk_create(update_conflicts=True)`` per chunk, keyed on
+the ``(symbol, timestamp, timeframe)`` unique constraint. On MySQL this compiles to
+``INSERT ... ON DUPLICATE KEY UPDATE``; on PostgreSQL/SQLite to ``ON CONFLICT DO UPDATE``.
+
+HistoricalDataRange is maintained incrementally from each chunk's bounds and insert
+count, so no full ``MarketData.count()`` is needed after a save.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from apps.trading.models import Symbol
+from apps.data.models import DataSource, MarketData, HistoricalDataRange
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+OHLCV_UPDATE_FIELDS = ['open_price', 'high_price', 'low_price', 'close_price', 'volume']
+
+
+@dataclass
+class IngestionResult:
+    """Outcome of one bulk upsert."""
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    earliest: Optional[datetime] = None
+    latest: Optional[datetime] = None
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated
+
+    def to_dict(self) -> Dict:
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'failed': self.failed,
+            'total': self.total,
+        }
+
+
+class MarketDataIngestionService:
+    """Chunked, idempotent OHLCV upserts with incremental range tracking.
+
+    Records use the shape produced by the kline fetchers:
+    ``{'timestamp', 'open', 'high', 'low', 'close', 'volume'}``.
+    """
+
+    def __init__(self, chunk_size: Optional[int] = None) -> None:
+        configured = getattr(settings, 'MARKET_DATA_INGESTION', {}) or {}
+        self.chunk_size = int(chunk_size or configured.get('CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+
+    def upsert_candles(
+        self,
+        symbol: Symbol,
+        timeframe: str,
+        records: Iterable[Dict],
+        source: Optional[DataSource] = None,
+        update_range: bool = True,
+    ) -> IngestionResult:
+        """Insert new candles and overwrite existing ones in chunks.
+
+        Duplicate timestamps within ``records`` collapse to the last occurrence. A failing
+        chunk is logged and counted in ``failed``; remaining chunks are still written.
+        """
+        by_timestamp: Dict[datetime, Dict] = {}
+        for record in records:
+            timestamp = record['timestamp']
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=dt_timezone.utc)
+            by_timestamp[timestamp] = record
+
+        result = IngestionResult()
+        if not by_timestamp:
+            return result
+
+        timestamps = sorted(by_timestamp)
+        for start in range(0, len(timestamps), self.chunk_size):
+            chunk = timestamps[start:start + self.chunk_size]
+            try:
+                inserted, updated = self._upsert_chunk(symbol, timeframe, chunk, by_timestamp, source)
+            except Exception as e:
+                logger.warning(
+                    f"Bulk upsert failed for {symbol.symbol} {timeframe} "
+                    f"({chunk[0]} -> {chunk[-1]}, {len(chunk)} rows): {e}"
+                )
+                result.failed += len(chunk)
+                continue
+
+            result.inserted += inserted
+            result.updated += updated
+            result.earliest = chunk[0] if result.earliest is None else min(result.earliest, chunk[0])
+            result.latest = chunk[-1] if result.latest is None else max(result.latest, chunk[-1])
+
+        if update_range and result.total:
+            self.record_range(symbol, timeframe, result.earliest, result.latest, result.inserted)
+
+        return result
+
+    def _upsert_chunk(
+        self,
+        symbol: Symbol,
+        timeframe: str,
+        chunk: List[datetime],
+        by_timestamp: Dict[datetime, Dict],
+        source: Optional[DataSource],
+    ) -> tuple:
+        """Write one chunk atomically; returns (inserted, updated)."""
+        rows = []
+        for timestamp in chunk:
+            r = by_timestamp[timestamp]
+            rows.append(MarketData(
+                symbol=symbol,
+                timestamp=timestamp,
+                timeframe=timeframe,
+                open_price=r['open'],
+                high_price=r['high'],
+                low_price=r['low'],
+                close_price=r['close'],
+                volume=r['volume'] if r.get('volume') is not None else 0,
+                source=source,
+            ))
+
+        update_fields = OHLCV_UPDATE_FIELDS + (['source'] if source is not None else [])
+        conflict_options = {'update_conflicts': True, 'update_fields': update_fields}
+        # MySQL's ON DUPLICATE KEY UPDATE cannot name a conflict target
+        if connection.features.supports_update_conflicts_with_target:
+            conflict_options['unique_fields'] = ['symbol', 'timestamp', 'timeframe']
+
+        with transaction.atomic():
+            existing = MarketData.objects.filter(
+                symbol=symbol,
+                timeframe=timeframe,
+                timestamp__gte=chunk[0],
+                timestamp__lte=chunk[-1],
+                timestamp__in=chunk,
+            ).count()
+            MarketData.objects.bulk_create(rows, batch_size=self.chunk_size, **conflict_options)
+
+        return len(chunk) - existing, existing
+
+    def record_range(
+        self,
+        symbol: Symbol,
+        timeframe: str,
+        earliest: datetime,
+        latest: datetime,
+        inserted: int,
+        is_complete: Optional[bool] = None,
+    ) -> None:
+        """Widen the tracked range and add ``inserted`` to its record count.
+
+        The first time a (symbol, timeframe) is tracked the count is seeded with a single
+        ``count()`` so rows written before range tracking existed are included.
+        """
+        try:
+            with transaction.atomic():
+                # get_or_create retries the lookup if a concurrent writer inserted the
+                # same (symbol, timeframe) first, so two backfills cannot both create it
+                range_obj, created = HistoricalDataRange.objects.select_for_update().get_or_create(
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    defaults={
+                        'earliest_date': earliest,
+                        'latest_date': latest,
+                        'total_records': lambda: MarketData.objects.filter(symbol=symbol, timeframe=timeframe).count(),
+                        'is_complete': bool(is_complete),
+                    },
+                )
+                if created:
+                    return
+
+                range_obj.earliest_date = min(range_obj.earliest_date, earliest)
+                range_obj.latest_date = max(range_obj.latest_date, latest)
+                range_obj.total_records += inserted
+                update_fields = ['earliest_date', 'latest_date', 'total_records', 'last_synced']
+                if is_complete is not None:
+                    range_obj.is_complete = is_complete
+                    update_fields.append('is_complete')
+                range_obj.save(update_fields=update_fields)
+        except Exception as e:
+            logger.error(f"Failed to update range tracking for {symbol.symbol} {timeframe}: {e}")
+
+
+def get_market_data_ingestion_service(chunk_size: Optional[int] = None) -> MarketDataIngestionService:
+    return MarketDataIngestionService(chunk_size=chunk_size)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 19:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0006_dataquality_historicaldatarange_and_more'),
+        ('trading', '0006_symbol_circulating_supply_symbol_total_supply'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicatorState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timeframe', models.CharField(max_length=10)),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('bars_processed', models.IntegerField(default=0)),
+                ('state', models.JSONField(default=dict)),
+                ('values', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('symbol', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trading.symbol')),
+            ],
+            options={
+                'unique_together': {('symbol', 'timeframe')},
+            },
+        ),
+    ]
@@ -142,6 +142,23 @@ class TechnicalIndicator(models.Model):
         return f"{self.symbol.symbol} {self.indicator_type}({self.period}) - {self.timestamp}"
 
 
+class IndicatorState(models.Model):
+    """Rolling state of the incremental indicator engine per symbol/timeframe."""
+    symbol = models.ForeignKey(Symbol, on_delete=models.CASCADE)
+    timeframe = models.CharField(max_length=10)
+    last_timestamp = models.DateTimeField(null=True, blank=True)  # last closed bar folded into the state
+    bars_processed = models.IntegerField(default=0)
+    state = models.JSONField(default=dict)
+    values = models.JSONField(default=dict)  # indicator values as of last_timestamp
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['symbol', 'timeframe']
+
+    def __str__(self):
+        return f"{self.symbol.symbol} {self.timeframe} indicators @ {self.last_timestamp}"
+
+
 class DataSyncLog(models.Model):
     """Log for data synchronization operations"""
     SYNC_TYPES = [
@@ -6,11 +6,15 @@ import requests
 import logging
 import time
 from decimal import Decimal
+from django.conf import settings
 from django.utils import timezone
-from django.core.cache import cache
+
+from apps.data.single_flight_cache import SingleFlightCache
 
 logger = logging.getLogger(__name__)
 
+LIVE_PRICE_CACHE = getattr(settings, 'LIVE_PRICE_CACHE', {})
+
 
 class RealPriceService:
     """Service for fetching real cryptocurrency prices"""
@@ -18,7 +22,15 @@ class RealPriceService:
     def __init__(self):
         self.binance_api = "https://api.binance.com/api/v3"
         self.coingecko_api = "https://api.coingecko.com/api/v3"
-        self.cache_timeout = 300  # Cache prices for 5 minutes instead of 30 seconds
+        self.cache_timeout = LIVE_PRICE_CACHE.get('MAX_STALE_SECONDS', 600)
+        self.price_cache = SingleFlightCache(
+            'live_crypto_prices',
+            self._load_live_prices,
+            fresh_seconds=LIVE_PRICE_CACHE.get('FRESH_SECONDS', 60),
+            max_stale_seconds=self.cache_timeout,
+            lock_seconds=LIVE_PRICE_CACHE.get('LOCK_SECONDS', 60),
+            wait_seconds=LIVE_PRICE_CACHE.get('WAIT_SECONDS', 10),
+        )
         
         # Supported symbols for live data - 200+ popular cryptocurrencies
         self.live_symbols = [
@@ -87,44 +99,43 @@ class RealPriceService:
             'XRP', 'XTZ', 'XVG', 'YFI', 'YGG', 'ZEC', 'ZEN', 'ZIL', 'ZRX', '1INCH'
         ]
     
-    def get_live_prices(self):
-        """Get live cryptocurrency prices from multiple sources"""
-        try:
-            # Try to get from cache first
-            cached_prices = cache.get('live_crypto_prices')
-            if cached_prices:
-                logger.debug("Returning cached prices")
-                return cached_prices
-            
-            # Fetch from Binance API
-            binance_prices = self._fetch_binance_prices()
-            
-            # Fetch from CoinGecko API
-            coingecko_prices = self._fetch_coingecko_prices()
-            
-            # Merge prices (Binance takes priority for USDT pairs)
-            live_prices = {}
-            
-            # Add Binance prices
-            for symbol, data in binance_prices.items():
-                if symbol in self.live_symbols:
-                    live_prices[symbol] = data
-            
-            # Add CoinGecko prices for missing symbols
-            for symbol, data in coingecko_prices.items():
-                if symbol in self.live_symbols and symbol not in live_prices:
-                    live_prices[symbol] = data
-            
-            # Cache the results
-            cache.set('live_crypto_prices', live_prices, self.cache_timeout)
-            
-            logger.info(f"Fetched live prices for {len(live_prices)} symbols")
-            return live_prices
-            
-        except Exception as e:
-            logger.error(f"Error fetching live prices: {e}")
-            # Return cached prices if available, otherwise empty dict
-            return cache.get('live_crypto_prices', {})
+    def get_live_prices(self, block=False):
+        """Get live cryptocurrency prices from multiple sources
+
+        Served from the cache without waiting on the external APIs: a stale entry is
+        returned while one background refresh runs, and with nothing cached the result
+        is ``{}`` (callers fall back to stored market data) until that refresh lands.
+        ``block=True`` waits for the in-flight fetch instead.
+        """
+        return self.price_cache.get(default={}, block=block)
+
+    def _load_live_prices(self):
+        """Fetch and merge prices from Binance and CoinGecko (the cache loader)"""
+        # Fetch from Binance API
+        binance_prices = self._fetch_binance_prices()
+        
+        # Fetch from CoinGecko API
+        coingecko_prices = self._fetch_coingecko_prices()
+        
+        # Merge prices (Binance takes priority for USDT pairs)
+        live_prices = {}
+        
+        # Add Binance prices
+        for symbol, data in binance_prices.items():
+            if symbol in self.live_symbols:
+                live_prices[symbol] = data
+        
+        # Add CoinGecko prices for missing symbols
+        for symbol, data in coingecko_prices.items():
+            if symbol in self.live_symbols and symbol not in live_prices:
+                live_prices[symbol] = data
+        
+        if not live_prices:
+            # Keep serving the previous prices rather than caching an empty result
+            raise RuntimeError("no prices returned by Binance or CoinGecko")
+        
+        logger.info(f"Fetched live prices for {len(live_prices)} symbols")
+        return live_prices
     
     def _fetch_binance_prices(self):
         """Fetch prices from Binance API"""
@@ -235,9 +246,8 @@ class RealPriceService:
         return prices.get(symbol, {})
     
     def refresh_prices(self):
-        """Force refresh of prices (clear cache)"""
-        cache.delete('live_crypto_prices')
-        return self.get_live_prices()
+        """Refresh prices now (joins the refresh already in flight, if any)"""
+        return self.price_cache.refresh(default={})
     
     @staticmethod
     def _extract_base_symbol(symbol):
@@ -579,9 +589,9 @@ class RealPriceService:
 real_price_service = RealPriceService()
 
 
-def get_live_prices():
+def get_live_prices(block=False):
     """Get live cryptocurrency prices"""
-    return real_price_service.get_live_prices()
+    return real_price_service.get_live_prices(block=block)
 
 
 def get_symbol_price(symbol):
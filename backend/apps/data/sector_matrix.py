@@ -0,0 +1,292 @@
+"""
+Batch sector analytics from one aligned symbols x days matrix.
+
+``SectorAnalysisService.calculate_sector_performance`` runs several queries per symbol
+(``_calculate_symbol_performance``, ``_calculate_relative_strength``,
+``_calculate_volume_trend``). ``calculate_sector_correlations`` runs two per sector
+pair. This module loads the daily closes and volumes of every active symbol in a sector
+with one query, pivots them into aligned ``(symbols, days)`` arrays, and computes every
+sector's metrics and the full correlation matrix from them.
+
+The per-symbol metrics follow ``_calculate_symbol_performance``: returns in percent,
+volatility annualised with sqrt(252). Sector figures are the mean over the sector's
+symbols. The other metrics are computed from the same matrix:
+
+- Relative strength compares each sector's return with the mean of the other sectors.
+- Momentum compares the last three days of that relative strength with the three days
+  a week earlier.
+- Volume trend compares the mean volume of the last three days with the three days a
+  week earlier.
+- Correlations are Pearson coefficients (``np.corrcoef``) of the sectors' mean daily
+  returns over the days every compared sector traded.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+
+from apps.trading.models import Symbol
+from apps.data.models import MarketData, Sector, SectorCorrelation, SectorPerformance
+
+
+logger = logging.getLogger(__name__)
+
+DAILY_TIMEFRAME = '1d'
+ANNUALISATION = np.sqrt(252)
+CORRELATION_TIMEFRAME_DAYS = {'1D': 1, '1W': 7, '1M': 30, '3M': 90, '6M': 180, '1Y': 365}
+MIN_CORRELATION_SAMPLES = 5
+
+
+@dataclass
+class DailyMatrix:
+    """Daily closes and volumes aligned on one calendar; NaN where a symbol has no bar"""
+    symbol_ids: np.ndarray  # (S,)
+    sector_ids: np.ndarray  # (S,) sector of each symbol
+    days: pd.DatetimeIndex  # (D,)
+    close: np.ndarray  # (S, D)
+    volume: np.ndarray  # (S, D)
+
+    def __len__(self) -> int:
+        return len(self.symbol_ids)
+
+
+def load_daily_matrix(start: datetime, end: Optional[datetime] = None,
+                      timeframe: str = DAILY_TIMEFRAME) -> DailyMatrix:
+    """One query for the daily bars of every active symbol in an active sector"""
+    end = end or timezone.now()
+    members = dict(
+        Symbol.objects.filter(is_active=True, sector__is_active=True).values_list('id', 'sector_id')
+    )
+    rows = list(
+        MarketData.objects.filter(
+            symbol_id__in=list(members), timeframe=timeframe, timestamp__gte=start, timestamp__lte=end
+        ).values_list('symbol_id', 'timestamp', 'close_price', 'volume')
+    )
+    if not rows:
+        return DailyMatrix(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), pd.DatetimeIndex([]),
+                           np.empty((0, 0)), np.empty((0, 0)))
+
+    frame = pd.DataFrame(rows, columns=['symbol_id', 'timestamp', 'close', 'volume'])
+    frame['day'] = pd.to_datetime(frame['timestamp'], utc=True).dt.floor('D')
+    frame['close'] = frame['close'].astype(np.float64)
+    frame['volume'] = frame['volume'].fillna(0).astype(np.float64)
+    # Last bar of each day wins, as a daily close would
+    frame = frame.sort_values('timestamp').drop_duplicates(['symbol_id', 'day'], keep='last')
+    close = frame.pivot(index='symbol_id', columns='day', values='close')
+    volume = frame.pivot(index='symbol_id', columns='day', values='volume').reindex_like(close)
+    symbol_ids = close.index.to_numpy()
+    return DailyMatrix(
+        symbol_ids=symbol_ids,
+        sector_ids=np.array([members[symbol_id] for symbol_id in symbol_ids]),
+        days=close.columns,
+        close=close.to_numpy(dtype=np.float64),
+        volume=volume.to_numpy(dtype=np.float64),
+    )
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs along the day axis"""
+    mask = np.isnan(values)
+    index = np.where(~mask, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    return values[np.arange(values.shape[0])[:, None], index]
+
+
+def _group_mean(values: np.ndarray, membership: np.ndarray) -> np.ndarray:
+    """Mean of ``values`` rows per group (NaN ignored); ``membership`` is (groups, rows) 0/1"""
+    valid = ~np.isnan(values)
+    sums = membership @ np.where(valid, values, 0.0)
+    counts = membership @ valid.astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def _window_mean(values: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """nanmean over columns [start, stop) (negative indices from the end), NaN when empty"""
+    window = values[:, start:stop if stop else None]
+    valid = ~np.isnan(window)
+    counts = valid.sum(axis=1)
+    sums = np.where(valid, window, 0.0).sum(axis=1)
+    return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def symbol_metrics(matrix: DailyMatrix) -> Dict[str, np.ndarray]:
+    """Per-symbol returns (percent), annualised volatility and volume trend; NaN if < 2 bars"""
+    close = matrix.close
+    valid = ~np.isnan(close)
+    counts = valid.sum(axis=1)
+    days = close.shape[1]
+    rows = np.arange(close.shape[0])
+
+    filled = _ffill(close)
+    first = close[rows, valid.argmax(axis=1)] if days else np.empty(0)
+    latest = filled[:, -1] if days else np.empty(0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily_returns = np.where(valid[:, 1:] & valid[:, :-1], close[:, 1:] / close[:, :-1] - 1.0, np.nan)
+        previous = filled[:, -2] if days > 1 else np.full(len(rows), np.nan)
+        daily = latest / previous - 1.0
+        week_ago = filled[:, -7] if days >= 7 else first
+        weekly = np.where(counts >= 7, latest / week_ago - 1.0, daily)
+        monthly = latest / first - 1.0
+        # Population std (np.std's default) of each row's returns, NaN days skipped
+        returned = ~np.isnan(daily_returns)
+        n = returned.sum(axis=1)
+        centred = np.where(returned, daily_returns - _window_mean(daily_returns, 0, 0)[:, None], 0.0)
+        volatility = np.where(n > 1, np.sqrt((centred ** 2).sum(axis=1) / np.maximum(n, 1)) * ANNUALISATION, 0.0)
+
+        recent_volume = _window_mean(matrix.volume, -3, 0)
+        older_volume = _window_mean(matrix.volume, -10, -7)
+        volume_trend = np.where(older_volume > 0, recent_volume / older_volume - 1.0, np.nan)
+
+    enough = counts >= 2
+    nan = np.full(len(rows), np.nan)
+    return {
+        'daily_return': np.where(enough, daily * 100, nan),
+        'weekly_return': np.where(enough, weekly * 100, nan),
+        'monthly_return': np.where(enough, monthly * 100, nan),
+        'volatility': np.where(enough, volatility, nan),
+        'volume_trend': volume_trend,
+        'daily_returns': daily_returns,
+    }
+
+
+@dataclass
+class SectorMetrics:
+    sector_ids: np.ndarray  # (G,)
+    daily_return: np.ndarray
+    weekly_return: np.ndarray
+    monthly_return: np.ndarray
+    volatility: np.ndarray
+    momentum_score: np.ndarray
+    relative_strength: np.ndarray
+    volume_trend: np.ndarray
+    sector_returns: np.ndarray  # (G, D-1) mean daily return of each sector's symbols
+
+
+def _relative_strength(returns: np.ndarray) -> np.ndarray:
+    """(return - mean of the other sectors) / 10, clipped to [-1, 1]; works on any trailing axis"""
+    present = ~np.isnan(returns)
+    total = np.where(present, returns, 0.0).sum(axis=0)
+    others = present.sum(axis=0) - present
+    with np.errstate(invalid='ignore', divide='ignore'):
+        market = np.where(others > 0, (total - np.where(present, returns, 0.0)) / np.maximum(others, 1), np.nan)
+    return np.clip((returns - market) / 10.0, -1.0, 1.0)
+
+
+def sector_metrics(matrix: DailyMatrix, timeframe_days: int = 30) -> SectorMetrics:
+    """Every sector's performance metrics over the last ``timeframe_days`` days of ``matrix``"""
+    window = matrix
+    if matrix.close.shape[1] > timeframe_days + 1:
+        window = DailyMatrix(matrix.symbol_ids, matrix.sector_ids, matrix.days[-(timeframe_days + 1):],
+                             matrix.close[:, -(timeframe_days + 1):], matrix.volume[:, -(timeframe_days + 1):])
+    per_symbol = symbol_metrics(window)
+    sector_ids = np.unique(window.sector_ids)
+    membership = (window.sector_ids[None, :] == sector_ids[:, None]).astype(np.float64)
+    # Symbols with fewer than two bars are left out of their sector's averages
+    membership *= ~np.isnan(per_symbol['monthly_return'])[None, :]
+
+    def mean(name):
+        return _group_mean(per_symbol[name][:, None], membership)[:, 0]
+
+    monthly = mean('monthly_return')
+    sector_returns = _group_mean(per_symbol['daily_returns'], membership)
+
+    # Relative strength per day from cumulative sector returns, for momentum
+    cumulative = (np.cumprod(1.0 + np.nan_to_num(sector_returns), axis=1) - 1.0) * 100
+    cumulative[np.isnan(sector_returns).all(axis=1)] = np.nan
+    rs_path = _relative_strength(cumulative)
+    momentum = np.clip((_window_mean(rs_path, -3, 0) - _window_mean(rs_path, -10, -7)) * 2, -1.0, 1.0)
+
+    return SectorMetrics(
+        sector_ids=sector_ids,
+        daily_return=mean('daily_return'),
+        weekly_return=mean('weekly_return'),
+        monthly_return=monthly,
+        volatility=mean('volatility'),
+        momentum_score=np.nan_to_num(momentum),
+        relative_strength=np.nan_to_num(_relative_strength(monthly)),
+        volume_trend=np.nan_to_num(np.clip(_group_mean(per_symbol['volume_trend'][:, None], membership)[:, 0], -1.0, 1.0)),
+        sector_returns=sector_returns,
+    )
+
+
+def correlation_matrix(sector_returns: np.ndarray, days: int,
+                       min_samples: int = MIN_CORRELATION_SAMPLES) -> Tuple[np.ndarray, np.ndarray, int]:
+    """(coefficients, included sector rows, sample size) over the last ``days`` daily returns.
+
+    Sectors with fewer than ``min_samples`` returns in the window are left out; the rest
+    are correlated over the days all of them have a return.
+    """
+    window = sector_returns[:, -days:] if days else sector_returns
+    included = np.flatnonzero((~np.isnan(window)).sum(axis=1) >= min_samples)
+    if len(included) < 2:
+        return np.empty((0, 0)), included, 0
+    common = ~np.isnan(window[included]).any(axis=0)
+    sample = window[included][:, common]
+    if sample.shape[1] < min_samples:
+        return np.empty((0, 0)), np.empty(0, dtype=np.int64), 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        coefficients = np.corrcoef(sample)
+    return np.nan_to_num(coefficients), included, sample.shape[1]
+
+
+def calculate_sector_analytics(timeframe_days: int = 30, correlation_timeframe: str = '1M',
+                               now: Optional[datetime] = None) -> Dict[str, List]:
+    """Compute and store every active sector's performance and all pairwise correlations.
+
+    Returns ``{'performances': [...], 'correlations': [...]}`` of the created rows.
+    """
+    now = now or timezone.now()
+    correlation_days = CORRELATION_TIMEFRAME_DAYS.get(correlation_timeframe, 30)
+    lookback = max(timeframe_days, correlation_days) + 2
+    matrix = load_daily_matrix(now - timedelta(days=lookback), now)
+    if not len(matrix):
+        logger.warning("No daily market data for sector symbols; skipping sector analytics")
+        return {'performances': [], 'correlations': []}
+
+    metrics = sector_metrics(matrix, timeframe_days)
+    sectors = Sector.objects.in_bulk(metrics.sector_ids.tolist())
+    performances = [
+        SectorPerformance(
+            sector=sectors[sector_id],
+            timestamp=now,
+            daily_return=float(metrics.daily_return[i]),
+            weekly_return=float(metrics.weekly_return[i]),
+            monthly_return=float(metrics.monthly_return[i]),
+            volatility=float(metrics.volatility[i]),
+            momentum_score=float(metrics.momentum_score[i]),
+            relative_strength=float(metrics.relative_strength[i]),
+            volume_trend=float(metrics.volume_trend[i]),
+        )
+        for i, sector_id in enumerate(metrics.sector_ids.tolist())
+        if not np.isnan(metrics.monthly_return[i])
+    ]
+
+    full = sector_metrics(matrix, lookback) if correlation_days > timeframe_days else metrics
+    coefficients, included, sample_size = correlation_matrix(full.sector_returns, correlation_days)
+    correlations = []
+    for a in range(len(included)):
+        for b in range(a + 1, len(included)):
+            coefficient = float(np.clip(coefficients[a, b], -1.0, 1.0))
+            correlations.append(SectorCorrelation(
+                sector_a=sectors[int(full.sector_ids[included[a]])],
+                sector_b=sectors[int(full.sector_ids[included[b]])],
+                timeframe=correlation_timeframe,
+                correlation_coefficient=coefficient,
+                # Same rule of thumb as SectorAnalysisService._calculate_pairwise_correlation
+                p_value=0.05 if abs(coefficient) > 0.5 else 0.1,
+                sample_size=sample_size,
+                calculated_at=now,
+            ))
+
+    SectorPerformance.objects.bulk_create(performances, batch_size=500)
+    SectorCorrelation.objects.bulk_create(correlations, batch_size=500)
+    logger.info(
+        f"Sector analytics: {len(performances)} sectors from {len(matrix)} symbols x {len(matrix.days)} days, "
+        f"{len(correlations)} correlations"
+    )
+    return {'performances': performances, 'correlations': correlations}
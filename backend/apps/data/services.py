@@ -21,6 +21,9 @@ from .models import (
     Sector, SectorPerformance, SectorRotation, SectorCorrelation
 )
 from apps.trading.models import Symbol
+from apps.data.candle_store import get_candle_store
+from apps.data.indicator_engine import get_incremental_indicator_service
+from apps.data.sector_matrix import calculate_sector_analytics
 
 logger = logging.getLogger(__name__)
 
@@ -261,45 +264,40 @@ class TechnicalAnalysisService:
             }
         )
     
-    def get_market_data_df(self, symbol: Symbol, limit: int = 100) -> pd.DataFrame:
-        """Get market data as pandas DataFrame"""
-        market_data = MarketData.objects.filter(
-            symbol=symbol
-        ).order_by('-timestamp')[:limit]
-        
-        if not market_data:
-            return pd.DataFrame()
-        
-        data = []
-        for md in market_data:
-            data.append({
-                'timestamp': md.timestamp,
-                'open': float(md.open_price),
-                'high': float(md.high_price),
-                'low': float(md.low_price),
-                'close': float(md.close_price),
-                'volume': float(md.volume)
-            })
-        
-        df = pd.DataFrame(data)
-        df = df.sort_values('timestamp')
-        return df
+    def get_market_data_df(self, symbol: Symbol, limit: int = 100, timeframe: str = '1h') -> pd.DataFrame:
+        """Get the last `limit` candles as a pandas DataFrame (oldest first) from the shared candle store"""
+        return get_candle_store().get_window(symbol, timeframe, limit).to_dataframe()
+    
+    def get_stored_indicators(self, symbol: Symbol, periods: Dict, keys: List[str]) -> Optional[Dict]:
+        """Values from the incremental indicator state, or None when it is missing, built with other periods or stale"""
+        try:
+            values = get_incremental_indicator_service().stored_values(symbol, '1h', periods)
+        except Exception as e:
+            logger.warning(f"Indicator state unavailable for {symbol.symbol}, recomputing: {e}")
+            return None
+        if values is None or any(values.get(key) is None for key in keys):
+            return None
+        return values
     
     def calculate_rsi(self, symbol: Symbol, period: int = 14) -> Optional[float]:
         """Calculate RSI for a symbol"""
         try:
-            df = self.get_market_data_df(symbol)
-            if df.empty or len(df) < period:
-                return None
-            
-            # Calculate RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            
-            latest_rsi = rsi.iloc[-1]
+            stored = self.get_stored_indicators(symbol, {'rsi_period': period}, ['rsi'])
+            if stored is not None:
+                latest_rsi = stored['rsi']
+            else:
+                df = self.get_market_data_df(symbol)
+                if df.empty or len(df) < period:
+                    return None
+                
+                # Calculate RSI
+                delta = df['close'].diff()
+                gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+                loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+                rs = gain / loss
+                rsi = 100 - (100 / (1 + rs))
+                
+                latest_rsi = rsi.iloc[-1]
             
             if not pd.isna(latest_rsi):
                 # Save to database
@@ -322,20 +320,29 @@ class TechnicalAnalysisService:
     def calculate_macd(self, symbol: Symbol, fast: int = 12, slow: int = 26, signal: int = 9) -> Optional[Dict]:
         """Calculate MACD for a symbol"""
         try:
-            df = self.get_market_data_df(symbol)
-            if df.empty or len(df) < slow:
-                return None
-            
-            # Calculate MACD
-            exp1 = df['close'].ewm(span=fast).mean()
-            exp2 = df['close'].ewm(span=slow).mean()
-            macd = exp1 - exp2
-            signal_line = macd.ewm(span=signal).mean()
-            histogram = macd - signal_line
-            
-            latest_macd = macd.iloc[-1]
-            latest_signal = signal_line.iloc[-1]
-            latest_histogram = histogram.iloc[-1]
+            stored = self.get_stored_indicators(
+                symbol, {'ema_short': fast, 'ema_long': slow, 'macd_signal': signal},
+                ['macd', 'macd_signal', 'macd_histogram']
+            )
+            if stored is not None:
+                latest_macd = stored['macd']
+                latest_signal = stored['macd_signal']
+                latest_histogram = stored['macd_histogram']
+            else:
+                df = self.get_market_data_df(symbol)
+                if df.empty or len(df) < slow:
+                    return None
+                
+                # Calculate MACD
+                exp1 = df['close'].ewm(span=fast).mean()
+                exp2 = df['close'].ewm(span=slow).mean()
+                macd = exp1 - exp2
+                signal_line = macd.ewm(span=signal).mean()
+                histogram = macd - signal_line
+                
+                latest_macd = macd.iloc[-1]
+                latest_signal = signal_line.iloc[-1]
+                latest_histogram = histogram.iloc[-1]
             
             if not pd.isna(latest_macd):
                 # Save to database
@@ -362,19 +369,28 @@ class TechnicalAnalysisService:
     def calculate_bollinger_bands(self, symbol: Symbol, period: int = 20, std_dev: int = 2) -> Optional[Dict]:
         """Calculate Bollinger Bands for a symbol"""
         try:
-            df = self.get_market_data_df(symbol)
-            if df.empty or len(df) < period:
-                return None
-            
-            # Calculate Bollinger Bands
-            middle = df['close'].rolling(window=period).mean()
-            std = df['close'].rolling(window=period).std()
-            upper = middle + (std * std_dev)
-            lower = middle - (std * std_dev)
-            
-            latest_middle = middle.iloc[-1]
-            latest_upper = upper.iloc[-1]
-            latest_lower = lower.iloc[-1]
+            stored = self.get_stored_indicators(
+                symbol, {'bollinger_period': period, 'bollinger_std': std_dev},
+                ['bollinger_upper', 'bollinger_middle', 'bollinger_lower']
+            )
+            if stored is not None:
+                latest_middle = stored['bollinger_middle']
+                latest_upper = stored['bollinger_upper']
+                latest_lower = stored['bollinger_lower']
+            else:
+                df = self.get_market_data_df(symbol)
+                if df.empty or len(df) < period:
+                    return None
+                
+                # Calculate Bollinger Bands
+                middle = df['close'].rolling(window=period).mean()
+                std = df['close'].rolling(window=period).std()
+                upper = middle + (std * std_dev)
+                lower = middle - (std * std_dev)
+                
+                latest_middle = middle.iloc[-1]
+                latest_upper = upper.iloc[-1]
+                latest_lower = lower.iloc[-1]
             
             if not pd.isna(latest_middle):
                 # Save to database
@@ -425,29 +441,9 @@ class TechnicalAnalysisService:
 class RiskManagementService:
     """Service for risk management calculations"""
     
-    def get_market_data_df(self, symbol: Symbol, limit: int = 100) -> pd.DataFrame:
-        """Get market data as pandas DataFrame"""
-        market_data = MarketData.objects.filter(
-            symbol=symbol
-        ).order_by('-timestamp')[:limit]
-        
-        if not market_data:
-            return pd.DataFrame()
-        
-        data = []
-        for md in market_data:
-            data.append({
-                'timestamp': md.timestamp,
-                'open': float(md.open_price),
-                'high': float(md.high_price),
-                'low': float(md.low_price),
-                'close': float(md.close_price),
-                'volume': float(md.volume)
-            })
-        
-        df = pd.DataFrame(data)
-        df = df.sort_values('timestamp')
-        return df
+    def get_market_data_df(self, symbol: Symbol, limit: int = 100, timeframe: str = '1h') -> pd.DataFrame:
+        """Get the last `limit` candles as a pandas DataFrame (oldest first) from the shared candle store"""
+        return get_candle_store().get_window(symbol, timeframe, limit).to_dataframe()
     
     def calculate_volatility(self, symbol: Symbol, period: int = 20) -> Optional[float]:
         """Calculate price volatility"""
@@ -989,6 +985,18 @@ class SectorAnalysisService:
             logger.error(f"Error calculating sector performance for {sector.display_name}: {e}")
             return None
     
+    def calculate_all_sectors(self, timeframe_days: int = 30, correlation_timeframe: str = '1M') -> Dict:
+        """Batch mode: performance of every active sector and all sector correlations.
+
+        Loads one symbols x days matrix of daily bars (see apps.data.sector_matrix) instead
+        of querying per symbol and per sector pair, and bulk-creates the results.
+        """
+        try:
+            return calculate_sector_analytics(timeframe_days, correlation_timeframe)
+        except Exception as e:
+            logger.error(f"Error calculating batch sector analytics: {e}")
+            return {'performances': [], 'correlations': []}
+    
     def detect_sector_rotation(self, lookback_days: int = 30) -> List[SectorRotation]:
         """Detect sector rotation patterns"""
         try:
@@ -0,0 +1,120 @@
+"""
+Single-flight, stale-while-revalidate cache entries.
+
+``RealPriceService.get_live_prices`` used a plain ``cache.get``/``cache.set``. When the
+entry expired, every concurrent request and every signal-generation call that landed
+in the gap refetched Binance and CoinGecko at once (the CoinGecko loop alone sleeps
+0.5s between batches). ``SingleFlightCache`` changes two things:
+
+- The value is stored with its fetch time and kept for ``max_stale_seconds``. Once it is
+  older than ``fresh_seconds`` callers still get it immediately, and a refresh starts in
+  a background thread.
+- Only one refresh per key runs at a time, across processes. It is guarded by a
+  ``cache.add`` lock that expires after ``lock_seconds`` in case the holder dies. With
+  nothing cached and ``block=False``, callers return ``default`` at once and a
+  background refresh starts. With ``block=True``, the caller that wins the lock fetches
+  and the others wait up to ``wait_seconds`` for its result.
+"""
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightCache:
+    """One cache key whose refreshes are coalesced into a single in-flight call"""
+
+    def __init__(self, key: str, loader: Callable[[], Any], fresh_seconds: float = 60,
+                 max_stale_seconds: float = 600, lock_seconds: float = 60, wait_seconds: float = 10,
+                 poll_seconds: float = 0.1) -> None:
+        self.key = key
+        self.lock_key = f'{key}:refresh_lock'
+        self.loader = loader
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_seconds = poll_seconds
+        self.stats = {'fresh_hits': 0, 'stale_hits': 0, 'refreshes': 0, 'waits': 0, 'misses': 0}
+
+    def get(self, default: Any = None, block: bool = True) -> Any:
+        entry = self._entry()
+        if entry is not None:
+            if time.time() - entry['fetched_at'] < self.fresh_seconds:
+                self.stats['fresh_hits'] += 1
+            else:
+                self.stats['stale_hits'] += 1
+                self.refresh_in_background()
+            return entry['value']
+
+        if not block:
+            self.refresh_in_background()  # no-op while another caller holds the lock
+            self.stats['misses'] += 1
+            return default
+        token = self._acquire()
+        if token is not None:
+            return self._refresh(token, default)
+
+        self.stats['waits'] += 1
+        deadline = time.monotonic() + self.wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_seconds)
+            entry = self._entry()
+            if entry is not None:
+                return entry['value']
+        self.stats['misses'] += 1
+        logger.warning(f"Timed out waiting for the in-flight refresh of {self.key}")
+        return default
+
+    def refresh(self, default: Any = None) -> Any:
+        """Refresh now unless a refresh is already in flight; returns the cached value"""
+        token = self._acquire()
+        if token is None:
+            entry = self._entry()
+            return entry['value'] if entry is not None else default
+        return self._refresh(token, default)
+
+    def refresh_in_background(self) -> bool:
+        """Start a refresh thread if no refresh is in flight; returns whether one was started"""
+        token = self._acquire()
+        if token is None:
+            return False
+        threading.Thread(target=self._refresh, args=(token, None), name=f'refresh:{self.key}', daemon=True).start()
+        return True
+
+    def invalidate(self) -> None:
+        cache.delete(self.key)
+
+    def _entry(self) -> Optional[dict]:
+        """The cached envelope; anything else under the key (e.g. a raw value written
+        before the envelope existed) is treated as a miss"""
+        entry = cache.get(self.key)
+        if isinstance(entry, dict) and 'fetched_at' in entry and 'value' in entry:
+            return entry
+        return None
+
+    def _acquire(self) -> Optional[str]:
+        token = uuid.uuid4().hex
+        return token if cache.add(self.lock_key, token, self.lock_seconds) else None
+
+    def _refresh(self, token: str, default: Any) -> Any:
+        try:
+            value = self.loader()
+        except Exception as e:
+            logger.error(f"Error refreshing {self.key}: {e}")
+            entry = self._entry()
+            return entry['value'] if entry is not None else default
+        else:
+            cache.set(self.key, {'value': value, 'fetched_at': time.time()}, self.max_stale_seconds)
+            return value
+        finally:
+            # Only release a lock we still hold (it may have expired and been re-taken)
+            if cache.get(self.lock_key) == token:
+                cache.delete(self.lock_key)
+            self.stats['refreshes'] += 1
@@ -44,6 +44,30 @@ def update_crypto_prices():
         return False
 
 
+@shared_task
+def refresh_live_prices_task():
+    """Refresh the shared live price cache (skipped while another refresh is in flight)"""
+    try:
+        from .real_price_service import real_price_service
+        prices = real_price_service.refresh_prices()
+        return {'symbols': len(prices)}
+    except Exception as e:
+        logger.error(f"Error refreshing live prices: {e}")
+        return {'symbols': 0, 'error': str(e)}
+
+
+@shared_task
+def calculate_sector_analytics_task(timeframe_days: int = 30, correlation_timeframe: str = '1M'):
+    """Compute every sector's performance and the sector correlation matrix in one batch"""
+    try:
+        from .sector_matrix import calculate_sector_analytics
+        result = calculate_sector_analytics(timeframe_days, correlation_timeframe)
+        return {'performances': len(result['performances']), 'correlations': len(result['correlations'])}
+    except Exception as e:
+        logger.error(f"Error in calculate_sector_analytics_task: {e}")
+        return {'performances': 0, 'correlations': 0, 'error': str(e)}
+
+
 @shared_task
 def sync_crypto_symbols_task():
     """Celery task to sync crypto symbols"""
@@ -146,6 +170,29 @@ def calculate_technical_indicators_task():
         return False
 
 
+@shared_task
+def advance_indicator_state_task(timeframe: str = '1h'):
+    """Celery task to fold newly closed candles into the persisted incremental indicator state"""
+    from .indicator_engine import get_incremental_indicator_service
+
+    try:
+        service = get_incremental_indicator_service()
+        symbols = Symbol.objects.filter(symbol_type='CRYPTO', is_active=True)
+
+        success_count = 0
+        for symbol in symbols:
+            try:
+                if service.advance(symbol, timeframe):
+                    success_count += 1
+            except Exception as e:
+                logger.error(f"Error advancing indicator state for {symbol.symbol} {timeframe}: {e}")
+
+        return success_count
+    except Exception as e:
+        logger.error(f"Error in advance_indicator_state_task: {e}")
+        return 0
+
+
 @shared_task
 def cleanup_old_data_task():
     """Celery task to cleanup old market data and indicators - DISABLED to preserve all historical data from 2020"""
@@ -707,33 +754,45 @@ def load_binance_futures_market_data_task(
     # Step 3: Fetch market data for each
     end_date = timezone.now()
     start_date = end_date - timedelta(days=days)
+    # All symbols x timeframes go to the backfill engine at once, which keeps the
+    # request weight budget busy instead of sleeping between serial chunks
     manager = get_historical_data_manager()
-    timeframes_list = list(timeframes)
-    ok = 0
-    fail = 0
-    for symbol in to_process:
-        symbol_ok = False
-        for tf in timeframes_list:
-            try:
-                if manager.fetch_complete_historical_data(
-                    symbol, timeframe=tf, start=start_date, end=end_date
-                ):
-                    symbol_ok = True
-            except Exception as e:
-                logger.warning(f"[Binance Futures Data] {symbol.symbol} {tf}: {e}")
-        if symbol_ok:
-            ok += 1
-        else:
-            fail += 1
+    jobs = [
+        manager.backfill_job(symbol, timeframe=tf, start=start_date, end=end_date)
+        for symbol in to_process
+        for tf in timeframes
+    ]
+    # A symbol only counts as filled once every one of its timeframes backfilled
+    # without a failed chunk; partial runs are reported separately
+    symbol_ok = {symbol.id: False for symbol in to_process}
+    partial_ids = set()
+    invalid = []
+    try:
+        results = manager.backfill_many(jobs)
+        for symbol in to_process:
+            symbol_results = [r for r in results if r.job.symbol.id == symbol.id]
+            symbol_ok[symbol.id] = bool(symbol_results) and all(r.ok for r in symbol_results)
+        for result in results:
+            if result.partial:
+                partial_ids.add(result.job.symbol.id)
+            if result.invalid_timeframe:
+                invalid.append(f"{result.job.pair}:{result.job.timeframe}")
+    except Exception as e:
+        logger.warning(f"[Binance Futures Data] Backfill error: {e}")
+    ok = sum(symbol_ok.values())
+    fail = len(to_process) - ok
 
     logger.info(
-        f"[Binance Futures Data] Done. Processed {len(to_process)} symbols: ok={ok}, fail={fail}"
+        f"[Binance Futures Data] Done. Processed {len(to_process)} symbols: ok={ok}, "
+        f"fail={fail} (partial={len(partial_ids)}, invalid jobs={len(invalid)})"
     )
     return {
         'status': 'ok',
         'synced': 1,
         'filled': ok,
         'failed': fail,
+        'partial': len(partial_ids),
+        'invalid': invalid,
         'total_processed': len(to_process),
     }
 
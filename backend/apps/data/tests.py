@@ -1,4 +1,5 @@
 from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.utils import timezone
 from decimal import Decimal
 from .models import DataSource, MarketData, TechnicalIndicator, DataFeed, DataSyncLog
@@ -125,3 +126,713 @@ class DataIntegrationTestCase(TestCase):
         
         recent_indicators = TechnicalIndicator.objects.filter(symbol=symbol).order_by('-timestamp')
         self.assertEqual(recent_indicators.count(), 1)
+
+
+class MarketDataIngestionTestCase(TestCase):
+    def setUp(self):
+        from .models import HistoricalDataRange
+        from .market_data_ingestion import MarketDataIngestionService
+        self.HistoricalDataRange = HistoricalDataRange
+        self.symbol = Symbol.objects.create(
+            symbol='SOL',
+            name='Solana',
+            symbol_type='CRYPTO',
+            exchange='Binance'
+        )
+        self.service = MarketDataIngestionService(chunk_size=2)
+        self.start = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+    def _records(self, hours, close='100'):
+        return [
+            {
+                'timestamp': self.start + timedelta(hours=h),
+                'open': Decimal('99'),
+                'high': Decimal('101'),
+                'low': Decimal('98'),
+                'close': Decimal(close),
+                'volume': Decimal('10'),
+            }
+            for h in hours
+        ]
+
+    def test_bulk_upsert_reports_inserted_and_updated(self):
+        """Test bulk upsert counts and overwrites existing candles"""
+        first = self.service.upsert_candles(self.symbol, '1h', self._records(range(3)))
+        self.assertEqual((first.inserted, first.updated), (3, 0))
+
+        second = self.service.upsert_candles(self.symbol, '1h', self._records(range(1, 5), close='105'))
+        self.assertEqual((second.inserted, second.updated), (2, 2))
+
+        closes = list(
+            MarketData.objects.filter(symbol=self.symbol, timeframe='1h')
+            .order_by('timestamp').values_list('close_price', flat=True)
+        )
+        self.assertEqual(closes, [Decimal('100'), Decimal('105'), Decimal('105'), Decimal('105'), Decimal('105')])
+
+    def test_range_is_maintained_incrementally(self):
+        """Test HistoricalDataRange bounds and counts follow each upsert"""
+        self.service.upsert_candles(self.symbol, '1h', self._records(range(2, 4)))
+        self.service.upsert_candles(self.symbol, '1h', self._records(range(0, 3)))
+
+        range_obj = self.HistoricalDataRange.objects.get(symbol=self.symbol, timeframe='1h')
+        self.assertEqual(range_obj.total_records, 4)
+        self.assertEqual(range_obj.earliest_date, self.start)
+        self.assertEqual(range_obj.latest_date, self.start + timedelta(hours=3))
+
+    def test_range_created_concurrently_is_widened(self):
+        """Test a range inserted by another writer between lookup and create is widened, not lost"""
+        from unittest import mock
+        from django.db.models.query import QuerySet
+        self.service.upsert_candles(self.symbol, '1h', self._records(range(3)))
+        self.HistoricalDataRange.objects.all().delete()
+        original_get = QuerySet.get
+        raced = []
+
+        def racing_get(queryset, *args, **kwargs):
+            if queryset.model is self.HistoricalDataRange and not raced:
+                raced.append(True)
+                self.HistoricalDataRange.objects.create(
+                    symbol=self.symbol, timeframe='1h', earliest_date=self.start,
+                    latest_date=self.start + timedelta(hours=2), total_records=3, is_complete=False,
+                )
+                raise self.HistoricalDataRange.DoesNotExist
+            return original_get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'get', racing_get):
+            self.service.record_range(
+                self.symbol, '1h', self.start + timedelta(hours=3), self.start + timedelta(hours=5), 3
+            )
+
+        range_obj = self.HistoricalDataRange.objects.get(symbol=self.symbol, timeframe='1h')
+        self.assertEqual(range_obj.total_records, 6)
+        self.assertEqual((range_obj.earliest_date, range_obj.latest_date), (self.start, self.start + timedelta(hours=5)))
+
+
+class CandleWindowStoreTestCase(TestCase):
+    def setUp(self):
+        from .candle_store import CandleWindowStore
+        self.symbol = Symbol.objects.create(
+            symbol='ADA',
+            name='Cardano',
+            symbol_type='CRYPTO',
+            exchange='Binance'
+        )
+        self.start = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=10)
+        for h in range(5):
+            self._create_candle(h, Decimal(str(1 + h)))
+        self.store = CandleWindowStore(max_entries=2, min_bars=10, refresh_seconds=0)
+
+    def _create_candle(self, hour, close):
+        MarketData.objects.update_or_create(
+            symbol=self.symbol,
+            timestamp=self.start + timedelta(hours=hour),
+            timeframe='1h',
+            defaults={
+                'open_price': close, 'high_price': close, 'low_price': close,
+                'close_price': close, 'volume': Decimal('1'),
+            }
+        )
+
+    def test_window_loads_oldest_first_and_appends_new_bars(self):
+        """Test one full load, then incremental appends including a rewritten last bar"""
+        window = self.store.get_window(self.symbol, '1h', 3)
+        self.assertEqual(window.close.tolist(), [3.0, 4.0, 5.0])
+
+        self._create_candle(4, Decimal('4.5'))
+        self._create_candle(5, Decimal('6'))
+        window = self.store.get_window(self.symbol, '1h', 3)
+        self.assertEqual(window.close.tolist(), [4.0, 4.5, 6.0])
+        self.assertEqual(self.store.stats['full_loads'], 1)
+        self.assertEqual(self.store.stats['incremental_loads'], 1)
+
+        df = self.store.get_window(self.symbol, '1h', 100).to_dataframe()
+        self.assertEqual(list(df.columns), ['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        self.assertEqual(len(df), 6)
+
+    def test_least_recently_used_window_is_evicted(self):
+        """Test the store stays within max_entries"""
+        for timeframe in ('1h', '4h', '1d'):
+            self.store.get_window(self.symbol, timeframe, 5)
+        self.assertEqual(self.store.stats['evictions'], 1)
+        self.assertNotIn((self.symbol.id, '1h'), self.store._entries)
+
+    def test_slow_load_does_not_block_other_windows(self):
+        """Test a window is served while another key's load is still waiting on the database"""
+        import threading
+        from .candle_store import CandleWindow, _Entry
+        started, release = threading.Event(), threading.Event()
+        full_load = self.store._full_load
+
+        def slow_full_load(symbol_id, timeframe, bars, now):
+            if timeframe == '4h':
+                started.set()
+                release.wait(5)
+                return _Entry(window=CandleWindow.empty(), capacity=bars, exhausted=True, checked_at=now)
+            return full_load(symbol_id, timeframe, bars, now)
+
+        self.store._full_load = slow_full_load
+        loader = threading.Thread(target=self.store.get_window, args=(self.symbol, '4h', 5))
+        loader.start()
+        try:
+            self.assertTrue(started.wait(5))
+            self.assertEqual(len(self.store.get_window(self.symbol, '1h', 5)), 5)
+            self.assertTrue(loader.is_alive())
+        finally:
+            release.set()
+            loader.join(5)
+        self.assertIn((self.symbol.id, '4h'), self.store._entries)
+
+
+class IndicatorEngineParityTestCase(TestCase):
+    """The incremental engine must match the pandas implementations bar for bar"""
+
+    def setUp(self):
+        import numpy as np
+        import pandas as pd
+        rng = np.random.default_rng(7)
+        close = 30000 + np.cumsum(rng.normal(0, 120, 600))
+        spread = np.abs(rng.normal(0, 80, 600))
+        self.df = pd.DataFrame({
+            'high': close + spread,
+            'low': close - spread * rng.uniform(0.2, 1.0, 600),
+            'close': close,
+        })
+        # A flat stretch exercises the zero-loss / zero-range branches
+        self.df.loc[300:320, ['high', 'low', 'close']] = 31000.0
+
+    def _pandas_reference(self, smoothing='sma'):
+        import numpy as np
+        import pandas as pd
+        high, low, close = self.df['high'], self.df['low'], self.df['close']
+
+        def smooth(series, n):
+            if smoothing == 'wilder':
+                return series.ewm(alpha=1 / n, adjust=False, min_periods=n).mean()
+            return series.rolling(window=n).mean()
+
+        delta = close.diff()
+        rs = smooth(delta.where(delta > 0, 0), 14) / smooth(-delta.where(delta < 0, 0), 14)
+        macd = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+        macd_signal = macd.ewm(span=9).mean()
+        middle = close.rolling(window=20).mean()
+        std = close.rolling(window=20).std()
+        k_percent = 100 * ((close - low.rolling(window=14).min()) /
+                           (high.rolling(window=14).max() - low.rolling(window=14).min()))
+        tr = np.maximum(high - low, np.maximum(np.abs(high - close.shift()), np.abs(low - close.shift())))
+        up, down = high.diff(), low.diff()
+        dm_plus = pd.Series(np.where((up > down.abs()) & (up > 0), up, 0))
+        dm_minus = pd.Series(np.where((down.abs() > up) & (down < 0), down.abs(), 0))
+        # Directional movement starts with the first true range (bar 1)
+        tr_s, dmp_s, dmm_s = (smooth(s.iloc[1:], 14) for s in (tr, dm_plus, dm_minus))
+        di_plus, di_minus = 100 * dmp_s / tr_s, 100 * dmm_s / tr_s
+        dx = 100 * np.abs(di_plus - di_minus) / (di_plus + di_minus)
+
+        return pd.DataFrame({
+            'sma_20': middle,
+            'sma_50': close.rolling(window=50).mean(),
+            'ema_12': close.ewm(span=12).mean(),
+            'ema_26': close.ewm(span=26).mean(),
+            'rsi': 100 - (100 / (1 + rs)),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd - macd_signal,
+            'bollinger_upper': middle + std * 2,
+            'bollinger_lower': middle - std * 2,
+            'stoch_k': k_percent,
+            'stoch_d': k_percent.rolling(window=3).mean(),
+            'atr': smooth(tr.iloc[1:], 14),
+            'adx': smooth(dx, 14),
+        }).replace([np.inf, -np.inf], np.nan)
+
+    def _run_engine(self, engine, rows):
+        return [dict(engine.update(h, l, c)) for h, l, c in rows]
+
+    def _assert_parity(self, expected, produced):
+        import math
+        for column in expected.columns:
+            for i, reference in enumerate(expected[column].tolist()):
+                value = produced[i][column]
+                if math.isnan(reference):
+                    self.assertIsNone(value, f"{column}[{i}] should still be warming up")
+                else:
+                    self.assertIsNotNone(value, f"{column}[{i}] missing")
+                    self.assertAlmostEqual(value, reference, delta=1e-7 * max(1.0, abs(reference)),
+                                           msg=f"{column}[{i}]")
+
+    def test_rolling_mean_engine_matches_pandas(self):
+        """Test every bar against the pandas formulas used by the analysis services"""
+        from .indicator_engine import IndicatorEngine
+        rows = self.df[['high', 'low', 'close']].itertuples(index=False)
+        produced = self._run_engine(IndicatorEngine(), rows)
+        self._assert_parity(self._pandas_reference(), produced)
+
+    def test_wilder_engine_matches_pandas(self):
+        """Test Wilder smoothing against ewm(alpha=1/n, adjust=False)"""
+        from .indicator_engine import IndicatorEngine
+        rows = self.df[['high', 'low', 'close']].itertuples(index=False)
+        produced = self._run_engine(IndicatorEngine(smoothing='wilder'), rows)
+        self._assert_parity(self._pandas_reference('wilder'), produced)
+
+    def test_last_bar_matches_database_technical_analysis(self):
+        """Test the final values against DatabaseTechnicalAnalysis on the same candles"""
+        from .indicator_engine import IndicatorEngine
+        from apps.signals.database_technical_analysis import DatabaseTechnicalAnalysis
+        import pandas as pd
+
+        window = self.df.iloc[-200:].reset_index(drop=True)
+        engine = IndicatorEngine()
+        values = self._run_engine(engine, window[['high', 'low', 'close']].itertuples(index=False))[-1]
+
+        expected = DatabaseTechnicalAnalysis()._calculate_all_indicators(pd.DataFrame({
+            'timestamp': pd.date_range('2025-01-01', periods=len(window), freq='h', tz='UTC'),
+            'open_price': window['close'],
+            'high_price': window['high'],
+            'low_price': window['low'],
+            'close_price': window['close'],
+            'volume': 1.0,
+        }))
+        for key in ('sma_20', 'sma_50', 'ema_12', 'ema_26', 'rsi', 'macd', 'macd_signal',
+                    'bollinger_upper', 'bollinger_middle', 'bollinger_lower', 'stoch_k', 'stoch_d', 'atr'):
+            self.assertAlmostEqual(values[key], expected[key], delta=1e-7 * max(1.0, abs(expected[key])), msg=key)
+
+    def test_state_round_trip_resumes_identically(self):
+        """Test that a restored engine continues exactly where the saved one stopped"""
+        import json
+        from .indicator_engine import IndicatorEngine
+        rows = list(self.df[['high', 'low', 'close']].itertuples(index=False))
+
+        uninterrupted = self._run_engine(IndicatorEngine(), rows)
+
+        engine = IndicatorEngine()
+        self._run_engine(engine, rows[:310])
+        restored = IndicatorEngine.from_state(json.loads(json.dumps(engine.to_state(), allow_nan=False)))
+        resumed = self._run_engine(restored, rows[310:])
+
+        self.assertEqual(resumed[-1], uninterrupted[-1])
+
+    def _store_candles(self, count):
+        """SOL with ``count`` hourly candles from self.df, the last one closed an hour ago"""
+        symbol = Symbol.objects.create(symbol='SOL', name='Solana', symbol_type='CRYPTO', exchange='Binance')
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=count)
+        for i, row in enumerate(self.df.iloc[:count].itertuples(index=False)):
+            MarketData.objects.create(
+                symbol=symbol, timestamp=start + timedelta(hours=i), timeframe='1h',
+                open_price=Decimal(str(row.close)), high_price=Decimal(str(row.high)),
+                low_price=Decimal(str(row.low)), close_price=Decimal(str(row.close)), volume=Decimal('1'),
+            )
+        return symbol, start
+
+    def _advanced_state(self, count=120):
+        from .candle_store import CandleWindowStore
+        from .indicator_engine import IncrementalIndicatorService
+
+        symbol, start = self._store_candles(count)
+        service = IncrementalIndicatorService(warmup_bars=500)
+        service.candle_store = CandleWindowStore(refresh_seconds=0)
+        values = service.advance(symbol, '1h')
+        return symbol, start, service, values
+
+    def test_stored_values_only_when_current(self):
+        """Test stored values are served until a newer candle closes or other periods are asked for"""
+        symbol, start, service, values = self._advanced_state()
+
+        self.assertEqual(service.stored_values(symbol, '1h', {'rsi_period': 14}), values)
+        self.assertIsNone(service.stored_values(symbol, '1h', {'rsi_period': 7}))
+        self.assertIsNone(service.stored_values(symbol, '1h', smoothing='wilder'))
+        self.assertIsNone(service.stored_values(symbol, '4h'))
+
+        MarketData.objects.create(
+            symbol=symbol, timestamp=start + timedelta(hours=120), timeframe='1h', open_price=Decimal('1'),
+            high_price=Decimal('1'), low_price=Decimal('1'), close_price=Decimal('1'), volume=Decimal('1'),
+        )
+        self.assertEqual(service.stored_values(symbol, '1h'), values)  # still forming
+        self.assertIsNone(service.stored_values(symbol, '1h', now=timezone.now() + timedelta(hours=1)))
+
+    def test_analysis_services_read_stored_state(self):
+        """Test TechnicalAnalysisService and DatabaseTechnicalAnalysis use the state and recompute without it"""
+        from unittest import mock
+        from .models import IndicatorState
+        from .services import TechnicalAnalysisService
+        from apps.signals.database_technical_analysis import DatabaseTechnicalAnalysis
+
+        symbol, _, _, values = self._advanced_state()
+        service = TechnicalAnalysisService()
+        with mock.patch.object(service, 'get_market_data_df') as candles:
+            self.assertEqual(service.calculate_rsi(symbol), values['rsi'])
+            self.assertEqual(service.calculate_macd(symbol)['histogram'], values['macd_histogram'])
+            self.assertEqual(service.calculate_bollinger_bands(symbol)['upper'], values['bollinger_upper'])
+            candles.assert_not_called()
+        # Other periods are recomputed from the candles
+        self.assertNotEqual(service.calculate_rsi(symbol, period=7), values['rsi'])
+
+        analysis = DatabaseTechnicalAnalysis()
+        with mock.patch.object(analysis, '_calculate_rsi') as rsi:
+            indicators = analysis.calculate_indicators_from_database(symbol)
+            rsi.assert_not_called()
+        self.assertEqual((indicators['rsi'], indicators['adx']), (values['rsi'], values['adx']))
+        self.assertIn('cci', indicators)
+
+        IndicatorState.objects.all().delete()
+        recomputed = analysis.calculate_indicators_from_database(symbol)
+        self.assertAlmostEqual(recomputed['rsi'], values['rsi'], places=6)
+
+    def test_service_persists_and_advances_state(self):
+        """Test only newly closed candles are folded into the stored state"""
+        from .candle_store import CandleWindowStore
+        from .indicator_engine import IncrementalIndicatorService
+        from .models import IndicatorState
+
+        symbol, start = self._store_candles(80)
+
+        service = IncrementalIndicatorService(warmup_bars=500)
+        service.candle_store = CandleWindowStore(refresh_seconds=0)
+        now = start + timedelta(hours=75, minutes=30)  # bar 75 is still open
+        service.advance(symbol, '1h', now=now)
+
+        state = IndicatorState.objects.get(symbol=symbol, timeframe='1h')
+        self.assertEqual(state.bars_processed, 75)
+        self.assertEqual(state.last_timestamp, start + timedelta(hours=74))
+
+        values = service.advance(symbol, '1h', now=start + timedelta(hours=81))
+        state.refresh_from_db()
+        self.assertEqual(state.bars_processed, 80)
+
+        expected = self._pandas_reference().iloc[79]
+        self.assertAlmostEqual(values['rsi'], expected['rsi'], places=4)
+        self.assertAlmostEqual(values['macd'], expected['macd'], places=4)
+
+
+class KlineStreamTestCase(TestCase):
+    def setUp(self):
+        import tempfile
+        self.symbol = Symbol.objects.create(
+            symbol='BTC',
+            name='Bitcoin',
+            symbol_type='CRYPTO',
+            exchange='Binance'
+        )
+        self.start_ms = 1_700_000_100_000 - 1_700_000_100_000 % (15 * 60_000)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _message(self, minute, closed=True, pair='BTCUSDT'):
+        t = self.start_ms + minute * 60_000
+        return {
+            'stream': f'{pair.lower()}@kline_1m',
+            'data': {'e': 'kline', 's': pair, 'k': {
+                't': t, 'T': t + 59_999, 'i': '1m', 'x': closed,
+                'o': str(100 + minute), 'h': str(101 + minute), 'l': str(99 + minute),
+                'c': str(100.5 + minute), 'v': '2',
+            }},
+        }
+
+    def _record(self, messages):
+        import json
+        path = f'{self.directory.name}/stream.jsonl'
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(message) + '\n' for message in messages)
+        return path
+
+    def test_replay_writes_minutes_and_complete_rollups(self):
+        """Test a replayed stream writes closed minutes and the 15m bar they complete"""
+        from .kline_stream import KlineStreamIngestionService
+        messages = []
+        for minute in range(15):
+            messages.append(self._message(minute, closed=False))
+            messages.append(self._message(minute))
+            messages.append(self._message(minute, pair='ETHUSDT'))
+        service = KlineStreamIngestionService(pairs=['BTCUSDT'], flush_bars=7)
+        stats = service.replay([self._record(messages)])
+
+        self.assertEqual(MarketData.objects.filter(symbol=self.symbol, timeframe='1m').count(), 15)
+        bar = MarketData.objects.get(symbol=self.symbol, timeframe='15m')
+        self.assertEqual(bar.open_price, Decimal('100'))
+        self.assertEqual(bar.high_price, Decimal('115'))
+        self.assertEqual(bar.low_price, Decimal('99'))
+        self.assertEqual(bar.close_price, Decimal('114.5'))
+        self.assertEqual(bar.volume, Decimal('30'))
+        # The hour and day the stream started inside are incomplete
+        self.assertFalse(MarketData.objects.filter(symbol=self.symbol, timeframe__in=['1h', '4h', '1d']).exists())
+        self.assertGreater(stats['flushes'], 1)
+
+    def test_gap_is_detected_and_backfilled(self):
+        """Test minutes missed between two closed klines are aggregated from the backfill"""
+        from .kline_stream import KlineStreamIngestionService, parse_kline
+        service = KlineStreamIngestionService(pairs=['BTCUSDT'])
+        service.handle_message(self._message(0))
+        late = self._message(14)
+        self.assertEqual(service.missing_minutes(late), ('BTCUSDT', self.start_ms + 60_000, self.start_ms + 13 * 60_000))
+
+        service.add_backfill('BTCUSDT', [parse_kline(self._message(m)['data']['k'])[0] for m in range(1, 14)])
+        service.handle_message(late)
+        self.assertIsNone(service.missing_minutes(self._message(15)))
+        service.flush()
+        self.assertEqual(MarketData.objects.filter(symbol=self.symbol, timeframe='15m').count(), 1)
+
+
+class LiveDataServiceTestCase(TestCase):
+    def test_cross_quoted_tickers_do_not_resolve_signals(self):
+        """Test only the USDT-quoted ticker of a symbol reaches the signal outcome tracker"""
+        import asyncio
+        from unittest import mock
+        from apps.signals.outcome_tracker import OpenSignal
+        from .live_data_service import LiveDataService
+        service = LiveDataService()
+        service.market_broadcaster = mock.Mock()
+        service.save_market_data = mock.AsyncMock()
+        service.outcome_tracker.rebuild([
+            OpenSignal(1, 'ETH', True, 3000.0, 3300.0, 2900.0),
+            OpenSignal(2, 'ETH', False, 3000.0, 2700.0, 3100.0),
+        ])
+        ticker = {'priceChangePercent': '1.5', 'volume': '1000'}
+
+        # ETHBTC at 0.031 would be below the long's stop and the short's target
+        asyncio.run(service.process_binance_ticker('ETH', dict(ticker, symbol='ETHBTC', lastPrice='0.031')))
+        self.assertEqual(service.outcome_tracker.take_hits(), [])
+        self.assertEqual(len(service.outcome_tracker), 2)
+
+        asyncio.run(service.process_binance_ticker('ETH', dict(ticker, symbol='ETHUSDT', lastPrice='2850')))
+        self.assertEqual([hit.signal_id for hit in service.outcome_tracker.take_hits()], [1])
+
+
+class KlineBackfillEngineTestCase(TestCase):
+    """Chunks are fetched concurrently from a local fake kline server and written in order"""
+
+    def setUp(self):
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlsplit
+
+        self.symbol = Symbol.objects.create(
+            symbol='DOT',
+            name='Polkadot',
+            symbol_type='CRYPTO',
+            exchange='Binance'
+        )
+        self.requests = []
+        self.failing = False
+        self.fail_from = None
+        test = self
+
+        class FakeKlines(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                test.requests.append(query)
+                if test.failing or (test.fail_from is not None and int(query['startTime']) >= test.fail_from):
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                if query['symbol'] != 'DOTUSDT':
+                    self.send_response(400)
+                    self.end_headers()
+                    self.wfile.write(b'{"code": -1121, "msg": "Invalid symbol."}')
+                    return
+                step = 3_600_000
+                start, end = int(query['startTime']), int(query['endTime'])
+                rows = [[t, '1', '2', '0.5', str(t // step % 97), '3'] for t in range(start, end + 1, step)]
+                body = json.dumps(rows[:int(query['limit'])]).encode()
+                self.send_response(200)
+                self.send_header('X-MBX-USED-WEIGHT-1M', str(5 * len(test.requests)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeKlines)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/fapi/v1/klines'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_backfill_fetches_chunks_concurrently_and_writes_every_bar(self):
+        """Test a multi-chunk range lands complete, and an invalid pair stops after one request"""
+        from .backfill_engine import BackfillJob, KlineBackfillEngine, RateLimitedClient
+        from .models import HistoricalDataRange
+        engine = KlineBackfillEngine(RateLimitedClient(weight_limit=10_000), klines_url=self.url, max_workers=4)
+        start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        end = start + timedelta(hours=2500)
+        good = BackfillJob(self.symbol, 'DOTUSDT', '1h', start, end)
+        bad = BackfillJob(self.symbol, 'NOPEUSDT', '1h', start, end)
+        results = engine.run([good, bad])
+
+        self.assertEqual(len(good.chunks()), 3)
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[0].inserted, 2501)
+        self.assertTrue(results[1].invalid_pair)
+        self.assertEqual(MarketData.objects.filter(symbol=self.symbol, timeframe='1h').count(), 2501)
+        range_obj = HistoricalDataRange.objects.get(symbol=self.symbol, timeframe='1h')
+        self.assertEqual((range_obj.earliest_date, range_obj.latest_date), (start, end))
+        self.assertTrue(range_obj.is_complete)
+        self.assertLessEqual(sum(1 for r in self.requests if r['symbol'] == 'NOPEUSDT'), 3)
+
+    def test_fetch_fails_when_every_chunk_failed(self):
+        """Test fetch_complete_historical_data reports a backfill whose chunks all failed"""
+        from .backfill_engine import KlineBackfillEngine, RateLimitedClient
+        from .historical_data_manager import HistoricalDataManager
+        manager = HistoricalDataManager()
+        manager.backfill_engine = KlineBackfillEngine(RateLimitedClient(max_retries=0), klines_url=self.url)
+        start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        self.failing = True
+        self.assertFalse(manager.fetch_complete_historical_data(self.symbol, '1h', start, start + timedelta(hours=2500)))
+        self.failing = False
+        self.assertTrue(manager.fetch_complete_historical_data(self.symbol, '1h', start, start + timedelta(hours=2500)))
+        self.assertEqual(manager.backfill_engine.client.stats['requests'], 6)
+
+    def test_partial_backfill_is_not_ok_and_bad_timeframe_is_skipped(self):
+        """Test a range with a failed chunk is partial, and an unknown timeframe only skips its own job"""
+        from .backfill_engine import BackfillJob, KlineBackfillEngine, RateLimitedClient
+        from .models import HistoricalDataRange
+        engine = KlineBackfillEngine(RateLimitedClient(max_retries=0), klines_url=self.url)
+        start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        end = start + timedelta(hours=2500)
+        self.fail_from = int((start + timedelta(hours=2000)).timestamp() * 1000)
+        results = engine.run([
+            BackfillJob(self.symbol, 'DOTUSDT', '7m', start, end),
+            BackfillJob(self.symbol, 'DOTUSDT', '1h', start, end),
+        ])
+
+        self.assertTrue(results[0].invalid_timeframe)
+        self.assertFalse(results[0].ok)
+        self.assertEqual(results[0].chunks, 0)
+        self.assertEqual((results[1].chunks, results[1].failed_chunks), (3, 1))
+        self.assertTrue(results[1].partial)
+        self.assertFalse(results[1].ok)
+        self.assertEqual(results[1].inserted, 2000)
+        self.assertTrue(all(r['interval'] == '1h' for r in self.requests))
+        range_obj = HistoricalDataRange.objects.get(symbol=self.symbol, timeframe='1h')
+        self.assertFalse(range_obj.is_complete)
+
+    def test_weight_bucket_paces_requests(self):
+        """Test the bucket admits its budget at once, then one request per refill interval"""
+        from .backfill_engine import WeightBucket
+        clock = [0.0]
+        bucket = WeightBucket(60, clock=lambda: clock[0], sleep=lambda s: clock.__setitem__(0, clock[0] + s))
+        for _ in range(12):
+            bucket.acquire(5)
+        self.assertEqual(clock[0], 0.0)
+        bucket.acquire(5)
+        self.assertAlmostEqual(clock[0], 5.0)
+        bucket.observe(60)
+        bucket.acquire(5)
+        self.assertAlmostEqual(clock[0], 10.0)
+
+
+class SingleFlightCacheTestCase(TestCase):
+    """Concurrent misses share one refresh and stale values are served without waiting"""
+
+    def setUp(self):
+        import itertools
+        from django.core.cache import cache
+        cache.clear()
+        self.counter = itertools.count(1)
+        self.calls = []
+
+    def _loader(self, delay=0.0):
+        import time
+
+        def load():
+            self.calls.append(1)
+            time.sleep(delay)
+            return {'BTC': next(self.counter)}
+        return load
+
+    def test_concurrent_misses_share_one_fetch(self):
+        """Test blocking callers on a cold key trigger a single loader call"""
+        import threading
+        from .single_flight_cache import SingleFlightCache
+        entry = SingleFlightCache('test_prices', self._loader(delay=0.2), poll_seconds=0.01)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(entry.get(default={}))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(results, [{'BTC': 1}] * 5)
+
+    def test_stale_value_is_served_while_refreshing(self):
+        """Test a stale entry is returned at once and replaced by one background refresh"""
+        import time
+        from .single_flight_cache import SingleFlightCache
+        entry = SingleFlightCache('test_prices', self._loader(), fresh_seconds=0)
+        self.assertEqual(entry.get(default={}, block=False), {})
+        deadline = time.monotonic() + 5
+        while entry.stats['refreshes'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(entry.get(default={}, block=False), {'BTC': 1})
+        while entry.stats['refreshes'] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(entry.get(default={}), {'BTC': 2})
+
+    def test_value_without_envelope_is_a_miss(self):
+        """Test a raw value left under the key by older code is refetched instead of raising"""
+        from django.core.cache import cache
+        from .single_flight_cache import SingleFlightCache
+        cache.set('test_prices', {'BTC': {'price': 1.0}})
+        entry = SingleFlightCache('test_prices', self._loader())
+        self.assertEqual(entry.get(default={}), {'BTC': 1})
+        self.assertEqual(len(self.calls), 1)
+
+
+class SectorMatrixTestCase(TestCase):
+    """Batch sector analytics match per-symbol arithmetic and np.corrcoef"""
+
+    def setUp(self):
+        import numpy as np
+        from .models import Sector
+        self.np = np
+        self.now = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        rng = np.random.default_rng(3)
+        self.sectors = [
+            Sector.objects.create(name='CRYPTO_DEFI', display_name='DeFi'),
+            Sector.objects.create(name='CRYPTO_LAYER1', display_name='Layer 1'),
+        ]
+        self.closes = {}
+        for i, name in enumerate(['UNI', 'AAVE', 'SOL', 'AVAX']):
+            symbol = Symbol.objects.create(
+                symbol=name, name=name, symbol_type='CRYPTO', exchange='Binance',
+                sector=self.sectors[i // 2],
+            )
+            closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, 31)))
+            self.closes[symbol] = closes
+            MarketData.objects.bulk_create([
+                MarketData(
+                    symbol=symbol, timeframe='1d', timestamp=self.now - timedelta(days=30 - d),
+                    open_price=Decimal(str(round(c, 6))), high_price=Decimal(str(round(c, 6))),
+                    low_price=Decimal(str(round(c, 6))), close_price=Decimal(str(round(c, 6))),
+                    volume=Decimal(str(1000 + d)),
+                )
+                for d, c in enumerate(closes)
+            ])
+
+    def test_batch_matches_per_symbol_metrics(self):
+        """Test sector returns, volatility and the correlation of sector return series"""
+        from .models import SectorCorrelation, SectorPerformance
+        from .sector_matrix import calculate_sector_analytics
+        np = self.np
+        result = calculate_sector_analytics(30, '1M', now=self.now)
+        self.assertEqual(len(result['performances']), 2)
+        self.assertEqual(len(result['correlations']), 1)
+        self.assertEqual(SectorPerformance.objects.count(), 2)
+        self.assertEqual(SectorCorrelation.objects.count(), 1)
+
+        sector_returns = []
+        for sector in self.sectors:
+            members = [np.round(c, 6) for s, c in self.closes.items() if s.sector_id == sector.id]
+            returns = [np.diff(c) / c[:-1] for c in members]
+            performance = SectorPerformance.objects.get(sector=sector)
+            self.assertAlmostEqual(performance.monthly_return, np.mean([(c[-1] / c[0] - 1) * 100 for c in members]), places=6)
+            self.assertAlmostEqual(performance.weekly_return, np.mean([(c[-1] / c[-7] - 1) * 100 for c in members]), places=6)
+            self.assertAlmostEqual(performance.volatility, np.mean([np.std(r) * np.sqrt(252) for r in returns]), places=6)
+            sector_returns.append(np.mean(returns, axis=0))
+
+        correlation = SectorCorrelation.objects.get()
+        self.assertAlmostEqual(correlation.correlation_coefficient, np.corrcoef(sector_returns)[0, 1], places=6)
+        self.assertEqual(correlation.sample_size, 30)
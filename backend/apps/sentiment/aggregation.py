@@ -0,0 +1,191 @@
+"""
+Sentiment aggregates for every asset and window in a handful of queries.
+
+``SentimentAggregationService.aggregate_sentiment`` runs an ``exists()`` and an aggregate
+query for social and for news mentions, per asset and timeframe, and
+``aggregate_sentiment_scores`` called it for every active symbol: 4 windows x 4 queries
+per asset. ``aggregate_all`` produces the same figures for all assets at once.
+
+Mentions are rolled up per complete hour into ``SentimentHourlyRollup``. The rollup is
+kept current incrementally: each run recomputes only the hours since the last stored
+one. A window is then the sum of the complete hours it covers, plus two grouped queries
+over raw mentions for its partial edges: the part of its first hour, and the current,
+unfinished hour (shared by all windows). ``use_rollup=False`` instead runs one grouped
+query per window over the raw mentions.
+"""
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from apps.trading.models import Symbol
+from apps.sentiment.models import CryptoMention, SentimentAggregate, SentimentHourlyRollup
+
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = {
+    '1h': timedelta(hours=1),
+    '4h': timedelta(hours=4),
+    '1d': timedelta(days=1),
+    '1w': timedelta(weeks=1),
+}
+HOUR = timedelta(hours=1)
+
+# Same weights and confidence scale as SentimentAggregationService.aggregate_sentiment
+SOCIAL_WEIGHT = 0.6
+NEWS_WEIGHT = 0.4
+CONFIDENCE_MENTIONS = 10.0
+
+TOTAL_FIELDS = ('mention_count', 'sentiment_sum', 'bullish_count', 'bearish_count', 'neutral_count')
+MENTION_TOTALS = {
+    'mention_count': Count('id'),
+    'sentiment_sum': Sum('sentiment_score'),
+    'bullish_count': Count('id', filter=Q(sentiment_label='bullish')),
+    'bearish_count': Count('id', filter=Q(sentiment_label='bearish')),
+    'neutral_count': Count('id', filter=Q(sentiment_label='neutral')),
+}
+
+Totals = Dict[Tuple[int, str], List[float]]  # (asset_id, mention_type) -> TOTAL_FIELDS
+
+
+def _floor_hour(moment: datetime) -> datetime:
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(moment: datetime) -> datetime:
+    floor = _floor_hour(moment)
+    return floor if floor == moment else floor + HOUR
+
+
+def _add(totals: Totals, key: Tuple[int, str], values: Iterable[float]) -> None:
+    current = totals.setdefault(key, [0, 0.0, 0, 0, 0])
+    for i, value in enumerate(values):
+        current[i] += value or 0
+
+
+def raw_totals(start: datetime, end: Optional[datetime] = None) -> Totals:
+    """Mention totals per (asset, type) created in [start, end), one grouped query"""
+    mentions = CryptoMention.objects.filter(created_at__gte=start)
+    if end is not None:
+        mentions = mentions.filter(created_at__lt=end)
+    totals: Totals = {}
+    for row in mentions.values('asset_id', 'mention_type').annotate(**MENTION_TOTALS):
+        _add(totals, (row['asset_id'], row['mention_type']), (row[field] for field in TOTAL_FIELDS))
+    return totals
+
+
+def update_hourly_rollup(now: Optional[datetime] = None, retention: timedelta = max(WINDOWS.values())) -> int:
+    """Roll up the complete hours since the last stored one; returns the buckets written"""
+    now = now or timezone.now()
+    current = _floor_hour(now)
+    oldest = current - retention
+    latest = SentimentHourlyRollup.objects.filter(hour__gte=oldest).aggregate(latest=Max('hour'))['latest']
+    # The newest stored hour is recomputed in case mentions committed after it was rolled up
+    start = max(latest, oldest) if latest is not None else oldest
+
+    rows = (
+        CryptoMention.objects.filter(created_at__gte=start, created_at__lt=current)
+        .annotate(hour=TruncHour('created_at', tzinfo=dt_timezone.utc))
+        .values('asset_id', 'mention_type', 'hour')
+        .annotate(**MENTION_TOTALS)
+    )
+    buckets = [
+        SentimentHourlyRollup(
+            asset_id=row['asset_id'],
+            mention_type=row['mention_type'],
+            hour=row['hour'],
+            **{field: row[field] or 0 for field in TOTAL_FIELDS},
+        )
+        for row in rows
+    ]
+    conflict_options = {'update_conflicts': True, 'update_fields': list(TOTAL_FIELDS) + ['updated_at']}
+    # MySQL's ON DUPLICATE KEY UPDATE cannot name a conflict target
+    if connection.features.supports_update_conflicts_with_target:
+        conflict_options['unique_fields'] = ['asset', 'mention_type', 'hour']
+    with transaction.atomic():
+        SentimentHourlyRollup.objects.bulk_create(buckets, batch_size=1000, **conflict_options)
+        SentimentHourlyRollup.objects.filter(hour__lt=oldest).delete()
+    return len(buckets)
+
+
+def window_totals(now: Optional[datetime] = None, timeframes: Iterable[str] = WINDOWS,
+                  use_rollup: bool = True) -> Dict[str, Totals]:
+    """timeframe -> mention totals per (asset, type) over the window ending at ``now``"""
+    now = now or timezone.now()
+    spans = {timeframe: WINDOWS[timeframe] for timeframe in timeframes}
+    if not use_rollup:
+        return {timeframe: raw_totals(now - span) for timeframe, span in spans.items()}
+
+    update_hourly_rollup(now)
+    current = _floor_hour(now)
+    tail = raw_totals(current)
+    result: Dict[str, Totals] = {}
+    first_full: Dict[str, datetime] = {}
+    for timeframe, span in spans.items():
+        start = now - span
+        first_full[timeframe] = min(_ceil_hour(start), current)
+        totals: Totals = {}
+        for key, values in tail.items():
+            _add(totals, key, values)
+        if start < first_full[timeframe]:
+            for key, values in raw_totals(start, first_full[timeframe]).items():
+                _add(totals, key, values)
+        result[timeframe] = totals
+
+    earliest = min(first_full.values(), default=current)
+    buckets = SentimentHourlyRollup.objects.filter(hour__gte=earliest, hour__lt=current).values_list(
+        'asset_id', 'mention_type', 'hour', *TOTAL_FIELDS
+    )
+    for asset_id, mention_type, hour, *values in buckets:
+        for timeframe, first in first_full.items():
+            if hour >= first:
+                _add(result[timeframe], (asset_id, mention_type), values)
+    return result
+
+
+def combine(social: Optional[List[float]], news: Optional[List[float]]) -> Dict:
+    """Aggregate fields (as produced by ``aggregate_sentiment``) from social and news totals"""
+    social = social or [0, 0.0, 0, 0, 0]
+    news = news or [0, 0.0, 0, 0, 0]
+    social_sentiment = social[1] / social[0] if social[0] else 0.0
+    news_sentiment = news[1] / news[0] if news[0] else 0.0
+    bullish = social[2] + news[2]
+    bearish = social[3] + news[3]
+    neutral = social[4] + news[4]
+    total_mentions = bullish + bearish + neutral
+    return {
+        'social_sentiment_score': social_sentiment,
+        'news_sentiment_score': news_sentiment,
+        'combined_sentiment_score': social_sentiment * SOCIAL_WEIGHT + news_sentiment * NEWS_WEIGHT,
+        'bullish_mentions': bullish,
+        'bearish_mentions': bearish,
+        'neutral_mentions': neutral,
+        'total_mentions': total_mentions,
+        'confidence_score': min(1.0, total_mentions / CONFIDENCE_MENTIONS),
+    }
+
+
+def aggregate_all(assets: Optional[Iterable[Symbol]] = None, now: Optional[datetime] = None,
+                  timeframes: Iterable[str] = WINDOWS, use_rollup: bool = True,
+                  save: bool = True) -> List[SentimentAggregate]:
+    """``SentimentAggregate`` rows for every asset and timeframe, bulk-created if ``save``"""
+    assets = list(assets if assets is not None else Symbol.objects.filter(is_active=True))
+    totals = window_totals(now, timeframes, use_rollup)
+    aggregates = [
+        SentimentAggregate(
+            asset=asset,
+            timeframe=timeframe,
+            **combine(by_key.get((asset.id, 'social')), by_key.get((asset.id, 'news'))),
+        )
+        for timeframe, by_key in totals.items()
+        for asset in assets
+    ]
+    if save:
+        SentimentAggregate.objects.bulk_create(aggregates, batch_size=1000)
+    logger.info(f"Aggregated sentiment for {len(assets)} assets x {len(totals)} timeframes")
+    return aggregates
@@ -0,0 +1,238 @@
+"""
+Batched news ingestion with precompiled symbol matching.
+
+``collect_news_data`` used to handle each article on its own:
+- an ``exists()`` query on its URL
+- a ``NewsSource.objects.get_or_create``
+- a fresh query for every active crypto ``Symbol``
+- a ``Symbol.objects.get`` per mention
+- a substring scan per ticker, re-scoring the whole text once per ticker found
+
+``NewsIngestionPipeline.ingest`` takes the whole batch instead. It de-duplicates URLs
+with one ``filter(url__in=...)`` and resolves sources from a name -> ``NewsSource`` map.
+It scores each text once, finds mentions with one compiled regex over every ticker and
+name (``SymbolMatcher``), and writes the ``NewsArticle`` and ``CryptoMention`` rows with
+``bulk_create``. On backends that do not return primary keys from bulk inserts
+(MySQL), the article ids are read back by URL before the mentions are written.
+"""
+import logging
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.trading.models import Symbol
+from apps.sentiment.models import CryptoMention, NewsArticle, NewsSource
+
+
+logger = logging.getLogger(__name__)
+
+# Used when no active crypto Symbol rows exist yet
+FALLBACK_CRYPTO_SYMBOLS = ['BTC', 'ETH', 'ADA', 'DOT', 'LINK', 'UNI', 'AAVE', 'SOL', 'MATIC', 'AVAX']
+
+# Rule-based labels (bullish/bearish/neutral) -> NewsArticle/CryptoMention labels
+SENTIMENT_LABELS = {
+    'BULLISH': 'POSITIVE',
+    'BEARISH': 'NEGATIVE',
+    'NEUTRAL': 'NEUTRAL',
+}
+
+
+class SymbolMatcher:
+    """Finds tickers and asset names in text with one precompiled regex.
+
+    Matching is case-insensitive and bounded by non-alphanumeric characters, so ``ETH``
+    matches ``$ETH`` and ``eth,`` but not ``method``. ``aliases`` maps extra names (such
+    as ``Bitcoin``) to their ticker.
+    """
+
+    def __init__(self, tickers: Iterable[str], aliases: Optional[Dict[str, str]] = None) -> None:
+        self._ticker_for: Dict[str, str] = {}
+        for ticker in tickers:
+            if ticker:
+                self._ticker_for.setdefault(ticker.lower(), ticker)
+        for alias, ticker in (aliases or {}).items():
+            if alias and ticker.lower() in self._ticker_for:
+                self._ticker_for.setdefault(alias.lower(), self._ticker_for[ticker.lower()])
+        # Longest first, so "bitcoin cash" wins over "bitcoin"
+        terms = sorted(self._ticker_for, key=len, reverse=True)
+        self._pattern = re.compile(
+            r'(?<![a-z0-9])(?:' + '|'.join(re.escape(term) for term in terms) + r')(?![a-z0-9])',
+            re.IGNORECASE,
+        ) if terms else None
+
+    def __len__(self) -> int:
+        return len(self._ticker_for)
+
+    def find(self, text: str) -> List[str]:
+        """Tickers mentioned in ``text``, each once, in order of first mention"""
+        if self._pattern is None or not text:
+            return []
+        found: Dict[str, None] = {}
+        for match in self._pattern.finditer(text):
+            found.setdefault(self._ticker_for[match.group(0).lower()], None)
+        return list(found)
+
+
+def parse_published_at(value: Optional[str]) -> datetime:
+    """Timezone-aware publish time from the news APIs' formats; now if unparseable"""
+    if not value:
+        return timezone.now()
+    try:
+        published_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        published_at = None
+        for fmt in ['%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y-%m-%dT%H:%M:%S']:
+            try:
+                published_at = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        if published_at is None:
+            logger.warning(f"Unparseable article date {value!r}, using current time")
+            return timezone.now()
+    if published_at.tzinfo is None:
+        published_at = timezone.make_aware(published_at)
+    return published_at
+
+
+def impact_score(confidence_score: float, mention_count: int, published_at: datetime,
+                 now: Optional[datetime] = None) -> float:
+    """Article impact: confidence, plus up to 0.3 for mentions and 0.2 for recency"""
+    now = now or timezone.now()
+    score = confidence_score or 0.0
+    if mention_count > 0:
+        score += min(mention_count * 0.1, 0.3)
+    hours_ago = (now - published_at).total_seconds() / 3600
+    if hours_ago < 24:
+        score += 0.2 * (1 - hours_ago / 24)
+    return min(max(score, 0.0), 1.0)
+
+
+class NewsIngestionPipeline:
+    """Stores a batch of fetched news articles and their crypto mentions"""
+
+    def __init__(self, sentiment_service=None, batch_size: int = 500) -> None:
+        if sentiment_service is None:
+            from apps.sentiment.services import SentimentAnalysisService
+            sentiment_service = SentimentAnalysisService()
+        self.sentiment_service = sentiment_service
+        self.batch_size = batch_size
+        self._symbols: Optional[Dict[str, Symbol]] = None
+        self._matcher: Optional[SymbolMatcher] = None
+        self._sources: Dict[str, NewsSource] = {}
+
+    @property
+    def symbols(self) -> Dict[str, Symbol]:
+        if self._symbols is None:
+            self._load_symbols()
+        return self._symbols
+
+    @property
+    def matcher(self) -> SymbolMatcher:
+        if self._matcher is None:
+            self._load_symbols()
+        return self._matcher
+
+    def _load_symbols(self) -> None:
+        """One query for the matchable symbols; names become aliases of their tickers"""
+        symbols = list(Symbol.objects.filter(is_active=True, is_crypto_symbol=True))
+        if not symbols:
+            symbols = list(Symbol.objects.filter(symbol__in=FALLBACK_CRYPTO_SYMBOLS))
+        self._symbols = {symbol.symbol: symbol for symbol in symbols}
+        aliases = {symbol.name: symbol.symbol for symbol in symbols if symbol.name and len(symbol.name) > 2}
+        self._matcher = SymbolMatcher(self._symbols, aliases)
+
+    def sources_for(self, sources: Dict[str, str]) -> Dict[str, NewsSource]:
+        """name -> NewsSource for ``{name: url}``, creating the missing ones in bulk"""
+        missing = [name for name in sources if name not in self._sources]
+        if missing:
+            self._sources.update(
+                (source.name, source) for source in NewsSource.objects.filter(name__in=missing)
+            )
+            new = [NewsSource(name=name, url=sources[name]) for name in missing if name not in self._sources]
+            if new:
+                NewsSource.objects.bulk_create(new, ignore_conflicts=True)
+                self._sources.update(
+                    (source.name, source)
+                    for source in NewsSource.objects.filter(name__in=[source.name for source in new])
+                )
+        return {name: self._sources[name] for name in sources if name in self._sources}
+
+    def new_articles(self, articles: Iterable[Dict]) -> List[Dict]:
+        """Articles with a URL and title that are not stored yet (one query for the batch)"""
+        candidates: Dict[str, Dict] = {}
+        for article in articles:
+            url, title = article.get('url'), article.get('title')
+            if not url or not title:
+                logger.warning(f"Skipping article with missing required fields: {article}")
+                continue
+            candidates.setdefault(url, article)
+        if not candidates:
+            return []
+        stored = set(NewsArticle.objects.filter(url__in=list(candidates)).values_list('url', flat=True))
+        return [article for url, article in candidates.items() if url not in stored]
+
+    def ingest(self, articles: Iterable[Dict]) -> Dict[str, int]:
+        """Store the new articles of a fetched batch; returns counts"""
+        articles = list(articles)
+        new = self.new_articles(articles)
+        stats = {'fetched': len(articles), 'skipped': len(articles) - len(new), 'articles': 0, 'mentions': 0}
+        if not new:
+            return stats
+
+        sources = self.sources_for({
+            (article.get('source') or {}).get('name') or 'Unknown': (article.get('source') or {}).get('url') or ''
+            for article in new
+        })
+        now = timezone.now()
+        rows: List[Tuple[NewsArticle, List[str]]] = []
+        for article in new:
+            content = f"{article['title']} {article.get('description') or ''}"
+            sentiment = self.sentiment_service.analyze_text_sentiment(content)
+            tickers = self.matcher.find(content)
+            published_at = parse_published_at(article.get('publishedAt'))
+            confidence = sentiment.get('confidence_score', 0.0)
+            rows.append((NewsArticle(
+                source=sources[(article.get('source') or {}).get('name') or 'Unknown'],
+                title=article['title'][:500],
+                content=(article.get('description') or '')[:5000],
+                url=article['url'],
+                published_at=published_at,
+                sentiment_score=sentiment.get('sentiment_score', 0.0),
+                sentiment_label=SENTIMENT_LABELS.get(sentiment.get('sentiment_label', 'neutral').upper(), 'NEUTRAL'),
+                confidence_score=confidence,
+                impact_score=impact_score(confidence, len(tickers), published_at, now),
+            ), tickers))
+
+        # One transaction, so a failed mention insert cannot leave articles that the
+        # next run would skip as duplicates
+        with transaction.atomic():
+            created = NewsArticle.objects.bulk_create([article for article, _ in rows], batch_size=self.batch_size)
+            if any(article.pk is None for article in created):
+                # Backends without RETURNING (MySQL) leave pk unset; read the ids back by URL
+                ids = dict(
+                    NewsArticle.objects.filter(url__in=[article.url for article in created])
+                    .order_by('id').values_list('url', 'id')
+                )
+                for article in created:
+                    article.pk = ids[article.url]
+            mentions = [
+                CryptoMention(
+                    asset=self.symbols[ticker],
+                    news_article=article,
+                    mention_type='news',
+                    sentiment_score=article.sentiment_score,
+                    sentiment_label=article.sentiment_label,
+                    confidence_score=article.confidence_score,
+                    impact_weight=1.0,
+                )
+                for article, (_, tickers) in zip(created, rows)
+                for ticker in tickers
+            ]
+            CryptoMention.objects.bulk_create(mentions, batch_size=self.batch_size)
+        stats['articles'] = len(created)
+        stats['mentions'] = len(mentions)
+        return stats
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sentiment', '0001_initial'),
+        ('trading', '0006_symbol_circulating_supply_symbol_total_supply'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mention_type', models.CharField(max_length=20)),
+                ('hour', models.DateTimeField()),
+                ('mention_count', models.IntegerField(default=0)),
+                ('sentiment_sum', models.FloatField(default=0.0)),
+                ('bullish_count', models.IntegerField(default=0)),
+                ('bearish_count', models.IntegerField(default=0)),
+                ('neutral_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('asset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trading.symbol')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='sentiment_s_hour_b3a7f2_idx')],
+                'unique_together': {('asset', 'mention_type', 'hour')},
+            },
+        ),
+    ]
@@ -142,6 +142,28 @@ class SentimentAggregate(models.Model):
         return f"{self.asset.symbol} {self.timeframe}: {self.combined_sentiment_score:.3f}"
 
 
+class SentimentHourlyRollup(models.Model):
+    """Per-hour mention totals per asset and mention type (apps.sentiment.aggregation)"""
+    asset = models.ForeignKey(Symbol, on_delete=models.CASCADE)
+    mention_type = models.CharField(max_length=20)  # social, news
+    hour = models.DateTimeField()  # start of the hour; only complete hours are stored
+    mention_count = models.IntegerField(default=0)
+    sentiment_sum = models.FloatField(default=0.0)
+    bullish_count = models.IntegerField(default=0)
+    bearish_count = models.IntegerField(default=0)
+    neutral_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['asset', 'mention_type', 'hour']
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.asset.symbol} {self.mention_type} @ {self.hour}: {self.mention_count} mentions"
+
+
 class Influencer(models.Model):
     """Tracks crypto influencers and their impact"""
     platform = models.CharField(max_length=50)
@@ -1,6 +1,7 @@
 import requests
 import json
 import logging
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 from django.conf import settings
@@ -11,6 +12,7 @@ from apps.sentiment.models import (
     CryptoMention, SentimentAggregate, Influencer, SentimentModel
 )
 from apps.trading.models import Symbol
+from apps.sentiment.ingestion import SymbolMatcher
 
 logger = logging.getLogger(__name__)
 
@@ -675,19 +677,26 @@ class SentimentAnalysisService:
     
     def analyze_crypto_mentions(self, text: str, crypto_symbols: List[str]) -> List[Dict]:
         """Analyze sentiment for specific crypto mentions in text"""
-        mentions = []
-        
-        for symbol in crypto_symbols:
-            if symbol.lower() in text.lower():
-                sentiment_result = self.analyze_text_sentiment(text)
-                mentions.append({
-                    'symbol': symbol,
-                    'sentiment_score': sentiment_result['sentiment_score'],
-                    'sentiment_label': sentiment_result['sentiment_label'],
-                    'confidence_score': sentiment_result['confidence_score']
-                })
+        tickers = _symbol_matcher(tuple(crypto_symbols)).find(text)
+        if not tickers:
+            return []
         
-        return mentions
+        # Rule-based sentiment is per text, so every mention shares one score
+        sentiment_result = self.analyze_text_sentiment(text)
+        return [
+            {
+                'symbol': symbol,
+                'sentiment_score': sentiment_result['sentiment_score'],
+                'sentiment_label': sentiment_result['sentiment_label'],
+                'confidence_score': sentiment_result['confidence_score']
+            }
+            for symbol in tickers
+        ]
+
+
+@lru_cache(maxsize=32)
+def _symbol_matcher(crypto_symbols: Tuple[str, ...]) -> SymbolMatcher:
+    return SymbolMatcher(crypto_symbols)
 
 
 class SentimentAggregationService:
@@ -790,6 +799,12 @@ class SentimentAggregationService:
             'confidence_score': confidence_score
         }
     
+    def aggregate_all_assets(self, assets: Optional[List[Symbol]] = None,
+                             timeframes: Tuple[str, ...] = ('1h', '4h', '1d', '1w')) -> List[SentimentAggregate]:
+        """Aggregate and save sentiment for every asset and timeframe in one batch"""
+        from apps.sentiment.aggregation import aggregate_all
+        return aggregate_all(assets=assets, timeframes=timeframes)
+    
     def save_aggregate(self, aggregate_data: Dict) -> SentimentAggregate:
         """Save sentiment aggregate to database"""
         return SentimentAggregate.objects.create(**aggregate_data)
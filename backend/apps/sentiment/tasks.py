@@ -12,6 +12,7 @@ from apps.sentiment.services import (
     TwitterService, RedditService, NewsAPIService,
     SentimentAnalysisService, SentimentAggregationService
 )
+from apps.sentiment.ingestion import NewsIngestionPipeline
 from apps.trading.models import Symbol
 
 logger = logging.getLogger(__name__)
@@ -202,7 +203,7 @@ def collect_news_data():
     logger.info("Collecting news data...")
     
     news_service = NewsAPIService()
-    sentiment_service = SentimentAnalysisService()
+    stats = {'articles': 0, 'mentions': 0}
     
     try:
         # Get crypto news from the last 24 hours
@@ -211,142 +212,17 @@ def collect_news_data():
         
         logger.info(f"Fetched {len(articles)} articles from news API")
         
-        new_articles_count = 0
-        for article_data in articles:
-            # Check if article already exists
-            if NewsArticle.objects.filter(url=article_data.get('url', '')).exists():
-                continue
-            
-            # Skip if required fields are missing
-            if not article_data.get('url') or not article_data.get('title'):
-                logger.warning(f"Skipping article with missing required fields: {article_data}")
-                continue
-            
-            # Analyze sentiment
-            content = f"{article_data['title']} {article_data.get('description', '')}"
-            sentiment_result = sentiment_service.analyze_text_sentiment(content)
-            
-            # Parse published date - handle different formats
-            published_at = timezone.now()  # Default to now
-            try:
-                published_at_str = article_data.get('publishedAt', '')
-                if published_at_str:
-                    # Handle ISO format with Z or +00:00
-                    if published_at_str.endswith('Z'):
-                        published_at_str = published_at_str.replace('Z', '+00:00')
-                    # Try parsing with fromisoformat first
-                    try:
-                        published_at = datetime.fromisoformat(published_at_str.replace('Z', '+00:00'))
-                        # Convert to timezone-aware if needed
-                        if published_at.tzinfo is None:
-                            published_at = timezone.make_aware(published_at)
-                    except (ValueError, AttributeError):
-                        # Fallback: try parsing with strptime for common formats
-                        try:
-                            published_at = datetime.strptime(published_at_str, '%Y-%m-%dT%H:%M:%S%z')
-                            if published_at.tzinfo is None:
-                                published_at = timezone.make_aware(published_at)
-                        except ValueError:
-                            # Try other common formats
-                            for fmt in ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y-%m-%dT%H:%M:%S']:
-                                try:
-                                    published_at = datetime.strptime(published_at_str, fmt)
-                                    if published_at.tzinfo is None:
-                                        published_at = timezone.make_aware(published_at)
-                                    break
-                                except ValueError:
-                                    continue
-            except Exception as e:
-                logger.warning(f"Error parsing date for article {article_data.get('title', 'Unknown')}: {e}, using current time")
-                published_at = timezone.now()
-            
-            # Convert sentiment label to uppercase format (POSITIVE/NEGATIVE/NEUTRAL)
-            sentiment_label_raw = sentiment_result.get('sentiment_label', 'neutral').upper()
-            sentiment_label_map = {
-                'BULLISH': 'POSITIVE',
-                'BEARISH': 'NEGATIVE',
-                'NEUTRAL': 'NEUTRAL'
-            }
-            sentiment_label = sentiment_label_map.get(sentiment_label_raw, 'NEUTRAL')
-            
-            # Create news article
-            article = NewsArticle.objects.create(
-                source=NewsSource.objects.get_or_create(
-                    name=article_data.get('source', {}).get('name', 'Unknown'),
-                    defaults={'url': article_data.get('source', {}).get('url', '')}
-                )[0],
-                title=article_data['title'][:500],  # Truncate if too long
-                content=article_data.get('description', '')[:5000] if article_data.get('description') else '',  # Limit content length
-                url=article_data['url'],
-                published_at=published_at,
-                sentiment_score=sentiment_result.get('sentiment_score', 0.0),
-                sentiment_label=sentiment_label,
-                confidence_score=sentiment_result.get('confidence_score', 0.0),
-                impact_score=0.0  # Will be calculated below
-            )
-            
-            new_articles_count += 1
-            
-            # Create crypto mentions - use active crypto symbols from database
-            active_crypto_assets = Symbol.objects.filter(
-                is_active=True,
-                is_crypto_symbol=True
-            )
-            crypto_symbols = [asset.symbol for asset in active_crypto_assets]
-            
-            # If no active symbols, fall back to common ones
-            if not crypto_symbols:
-                crypto_symbols = ['BTC', 'ETH', 'ADA', 'DOT', 'LINK', 'UNI', 'AAVE', 'SOL', 'MATIC', 'AVAX']
-            
-            mentions = sentiment_service.analyze_crypto_mentions(content, crypto_symbols)
-            
-            # Also check for currencies from CryptoNewsAPI response
-            if 'currencies' in article_data and article_data['currencies']:
-                for currency in article_data['currencies']:
-                    if currency not in crypto_symbols:
-                        crypto_symbols.append(currency)
-            
-            for mention in mentions:
-                try:
-                    asset = Symbol.objects.get(symbol=mention['symbol'])
-                    # Convert sentiment label for crypto mentions
-                    mention_sentiment_raw = mention.get('sentiment_label', 'neutral').upper()
-                    mention_sentiment_map = {
-                        'BULLISH': 'POSITIVE',
-                        'BEARISH': 'NEGATIVE',
-                        'NEUTRAL': 'NEUTRAL'
-                    }
-                    mention_sentiment_label = mention_sentiment_map.get(mention_sentiment_raw, 'NEUTRAL')
-                    
-                    CryptoMention.objects.create(
-                        asset=asset,
-                        news_article=article,
-                        mention_type='news',
-                        sentiment_score=mention.get('sentiment_score', 0.0),
-                        sentiment_label=mention_sentiment_label,
-                        confidence_score=mention.get('confidence_score', 0.0),
-                        impact_weight=1.0
-                    )
-                except Symbol.DoesNotExist:
-                    continue
-            
-            # Update impact score after mentions are created
-            # Calculate impact score
-            mention_count = article.cryptomention_set.count()
-            impact_score = article.confidence_score or 0.0
-            if mention_count > 0:
-                impact_score += min(mention_count * 0.1, 0.3)
-            hours_ago = (timezone.now() - article.published_at).total_seconds() / 3600
-            if hours_ago < 24:
-                impact_score += 0.2 * (1 - hours_ago / 24)
-            impact_score = min(max(impact_score, 0.0), 1.0)
-            article.impact_score = impact_score
-            article.save(update_fields=['impact_score'])
+        # De-duplication, sentiment, symbol matching and writes are batched
+        stats = NewsIngestionPipeline().ingest(articles)
                     
     except Exception as e:
         logger.error(f"Error collecting news data: {e}", exc_info=True)
     
-    logger.info(f"News data collection completed. Added {new_articles_count} new articles.")
+    logger.info(
+        f"News data collection completed. Added {stats['articles']} new articles "
+        f"with {stats['mentions']} crypto mentions."
+    )
+    return stats
 
 
 @shared_task
@@ -384,23 +260,16 @@ def aggregate_sentiment_scores():
     logger.info("Aggregating sentiment scores...")
     
     aggregation_service = SentimentAggregationService()
-    crypto_assets = Symbol.objects.filter(is_active=True)
     
-    timeframes = ['1h', '4h', '1d', '1w']
-    
-    for asset in crypto_assets:
-        for timeframe in timeframes:
-            try:
-                # Calculate aggregate sentiment
-                aggregate_data = aggregation_service.aggregate_sentiment(asset, timeframe)
-                
-                # Save aggregate
-                aggregation_service.save_aggregate(aggregate_data)
-                
-            except Exception as e:
-                logger.error(f"Error aggregating sentiment for {asset.symbol} {timeframe}: {e}")
+    try:
+        # All assets and timeframes at once, from the hourly mention rollup
+        aggregates = aggregation_service.aggregate_all_assets()
+    except Exception as e:
+        logger.error(f"Error aggregating sentiment: {e}")
+        return 0
     
-    logger.info("Sentiment aggregation completed")
+    logger.info(f"Sentiment aggregation completed: {len(aggregates)} aggregates")
+    return len(aggregates)
 
 
 @shared_task
@@ -0,0 +1,161 @@
+from django.test import TestCase
+from unittest import mock
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.sentiment import aggregation
+from apps.sentiment.ingestion import NewsIngestionPipeline, SymbolMatcher
+from apps.sentiment.models import CryptoMention, NewsArticle, NewsSource, SentimentAggregate, SentimentHourlyRollup
+from apps.sentiment.services import SentimentAggregationService, SentimentAnalysisService
+from apps.trading.models import Symbol
+
+
+class SymbolMatcherTestCase(TestCase):
+    """Ticker/name matching is word-bounded and case-insensitive"""
+
+    def test_find_tickers_and_names(self):
+        """Test aliases, boundaries and first-mention ordering"""
+        matcher = SymbolMatcher(['BTC', 'ETH', 'SOL'], {'Bitcoin': 'BTC', 'Ethereum': 'ETH'})
+        self.assertEqual(matcher.find("Ethereum rallies while $btc and BITCOIN hold"), ['ETH', 'BTC'])
+        self.assertEqual(matcher.find("A new method for solving consensus"), [])
+        self.assertEqual(matcher.find(""), [])
+
+    def test_analyze_crypto_mentions_scores_once(self):
+        """Test mentions share one sentiment result and skip substring false positives"""
+        service = SentimentAnalysisService()
+        calls = []
+        analyze = service.analyze_text_sentiment
+        service.analyze_text_sentiment = lambda text: calls.append(text) or analyze(text)
+        mentions = service.analyze_crypto_mentions("BTC and ETH look bullish, unlike other methods", ['BTC', 'ETH', 'THE'])
+        self.assertEqual([mention['symbol'] for mention in mentions], ['BTC', 'ETH'])
+        self.assertEqual(len(calls), 1)
+
+
+class NewsIngestionPipelineTestCase(TestCase):
+    """Batched news ingestion"""
+
+    def setUp(self):
+        for ticker, name in [('BTC', 'Bitcoin'), ('ETH', 'Ethereum'), ('SOL', 'Solana')]:
+            Symbol.objects.create(
+                symbol=ticker, name=name, symbol_type='CRYPTO', exchange='Binance', is_crypto_symbol=True,
+            )
+        self.published = (timezone.now() - timedelta(hours=2)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def article(self, n, title, source='CoinDesk'):
+        return {
+            'url': f'https://news.example.com/{n}',
+            'title': title,
+            'description': 'Analysts expect a rally',
+            'publishedAt': self.published,
+            'source': {'name': source, 'url': 'https://news.example.com'},
+        }
+
+    def test_ingest_batch(self):
+        """Test de-duplication, shared sources and bulk-created mentions"""
+        NewsSource.objects.create(name='CoinDesk', url='https://coindesk.com')
+        pipeline = NewsIngestionPipeline()
+        first = [
+            self.article(1, 'Bitcoin and ETH surge'),
+            self.article(2, 'Solana outage', source='The Block'),
+            self.article(2, 'Solana outage (duplicate url)'),
+            {'url': '', 'title': 'No url'},
+        ]
+        stats = pipeline.ingest(first)
+        self.assertEqual(stats['articles'], 2)
+        self.assertEqual(stats['mentions'], 3)
+        self.assertEqual(NewsSource.objects.count(), 2)
+
+        article = NewsArticle.objects.get(url='https://news.example.com/1')
+        self.assertEqual(
+            sorted(article.cryptomention_set.values_list('asset__symbol', flat=True)), ['BTC', 'ETH']
+        )
+        self.assertEqual(article.sentiment_label, 'POSITIVE')
+        self.assertGreater(article.impact_score, 0.2)
+        self.assertEqual(
+            set(CryptoMention.objects.values_list('sentiment_score', flat=True)),
+            set(NewsArticle.objects.values_list('sentiment_score', flat=True)),
+        )
+
+        with self.assertNumQueries(1):
+            stats = NewsIngestionPipeline().ingest([self.article(1, 'Bitcoin and ETH surge')])
+        self.assertEqual(stats['articles'], 0)
+        self.assertEqual(NewsArticle.objects.count(), 2)
+
+    def test_ingest_without_returned_ids(self):
+        """Test mentions are linked when bulk inserts return no primary keys (MySQL)"""
+        from django.db import connection
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            stats = NewsIngestionPipeline().ingest([
+                self.article(1, 'Bitcoin and ETH surge'),
+                self.article(2, 'Solana outage'),
+            ])
+        self.assertEqual((stats['articles'], stats['mentions']), (2, 3))
+        self.assertEqual(
+            sorted(CryptoMention.objects.values_list('news_article__url', 'asset__symbol')),
+            [('https://news.example.com/1', 'BTC'), ('https://news.example.com/1', 'ETH'),
+             ('https://news.example.com/2', 'SOL')],
+        )
+
+
+class SentimentAggregationTestCase(TestCase):
+    """Bulk aggregation over the hourly rollup matches per-asset aggregation"""
+
+    def setUp(self):
+        import random
+        self.rng = random.Random(5)
+        self.now = timezone.now().replace(minute=37, second=12, microsecond=0)
+        self.assets = [
+            Symbol.objects.create(symbol=ticker, name=ticker, symbol_type='CRYPTO', exchange='Binance')
+            for ticker in ('BTC', 'ETH', 'DOGE')
+        ]
+        self.add_mentions(self.now - timedelta(days=8), self.now, 300)
+
+    def add_mentions(self, start, end, n):
+        span = (end - start).total_seconds()
+        for _ in range(n):
+            mention = CryptoMention.objects.create(
+                asset=self.rng.choice(self.assets[:2]),
+                mention_type=self.rng.choice(['social', 'news']),
+                sentiment_score=self.rng.uniform(-1, 1),
+                sentiment_label=self.rng.choice(['bullish', 'bearish', 'neutral', 'POSITIVE']),
+            )
+            CryptoMention.objects.filter(pk=mention.pk).update(
+                created_at=start + timedelta(seconds=self.rng.uniform(0, span))
+            )
+
+    def assertMatchesPerAsset(self, aggregates, now):
+        service = SentimentAggregationService()
+        with mock.patch('apps.sentiment.services.timezone.now', return_value=now):
+            for aggregate in aggregates:
+                expected = service.aggregate_sentiment(aggregate.asset, aggregate.timeframe)
+                for field in ('social_sentiment_score', 'news_sentiment_score', 'combined_sentiment_score',
+                              'confidence_score'):
+                    self.assertAlmostEqual(getattr(aggregate, field), expected[field], places=9)
+                for field in ('bullish_mentions', 'bearish_mentions', 'neutral_mentions', 'total_mentions'):
+                    self.assertEqual(getattr(aggregate, field), expected[field])
+
+    def test_rollup_matches_per_asset(self):
+        """Test rollup and raw windows against aggregate_sentiment, including an empty asset"""
+        aggregates = aggregation.aggregate_all(now=self.now, save=False)
+        self.assertEqual(len(aggregates), 12)
+        self.assertMatchesPerAsset(aggregates, self.now)
+        raw = aggregation.aggregate_all(now=self.now, use_rollup=False, save=False)
+        self.assertMatchesPerAsset(raw, self.now)
+        self.assertTrue(SentimentHourlyRollup.objects.exists())
+        doge = [a for a in aggregates if a.asset == self.assets[2]]
+        self.assertTrue(all(a.total_mentions == 0 and a.combined_sentiment_score == 0.0 for a in doge))
+
+    def test_rollup_is_incremental(self):
+        """Test a later run only rolls up new hours and still matches"""
+        aggregation.update_hourly_rollup(self.now)
+        later = self.now + timedelta(hours=3, minutes=5)
+        self.add_mentions(self.now, later, 60)
+        # Recomputes the last stored hour and the three since: 4 hours x 2 assets x 2 types at most
+        self.assertLessEqual(aggregation.update_hourly_rollup(later), 4 * 2 * 2)
+        self.assertMatchesPerAsset(aggregation.aggregate_all(now=later, save=False), later)
+
+    def test_task_saves_in_bulk(self):
+        """Test the service saves one aggregate per asset and timeframe"""
+        SentimentAggregationService().aggregate_all_assets()
+        self.assertEqual(SentimentAggregate.objects.count(), 12)
@@ -7,7 +7,7 @@ from django.utils import timezone
 
 from apps.signals.models import (
     SignalType, SignalFactor, TradingSignal, SignalFactorContribution,
-    MarketRegime, SignalPerformance, SignalAlert, HourlyBestSignal
+    MarketRegime, SignalPerformance, SignalAlert, HourlyBestSignal, BacktestJob
 )
 from apps.signals.admin_filters import (
     SignalDateRangeFilter, SignalPerformanceFilter, SignalStrengthFilter,
@@ -503,6 +503,17 @@ class HourlyBestSignalAdmin(admin.ModelAdmin):
     date_hierarchy = 'signal_date'
 
 
+@admin.register(BacktestJob)
+class BacktestJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'symbol', 'start_date', 'end_date', 'status', 'progress', 'created_at', 'completed_at']
+    list_filter = ['kind', 'status']
+    search_fields = ['symbol__symbol', 'content_key']
+    ordering = ['-created_at']
+    raw_id_fields = ['symbol', 'requested_by']
+    readonly_fields = ['content_key', 'data_version', 'task_id', 'created_at', 'started_at', 'completed_at']
+    date_hierarchy = 'created_at'
+
+
 # Custom admin site configuration
 admin.site.site_header = "AI Trading Signal Engine"
 admin.site.site_title = "CryptAI Admin"
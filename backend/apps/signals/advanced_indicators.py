@@ -12,7 +12,9 @@ from django.utils import timezone
 from django.db.models import Q
 
 from apps.data.models import TechnicalIndicator, MarketData
+from apps.data.candle_store import get_candle_store
 from apps.trading.models import Symbol
+from apps.signals import pattern_kernels as kernels
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +22,14 @@ logger = logging.getLogger(__name__)
 class AdvancedIndicatorsService:
     """Service for calculating advanced technical indicators including LuxAlgo indicators"""
     
-    def __init__(self):
+    def __init__(self, timeframe: str = '1h'):
         self.name = "AdvancedIndicatorsService"
+        self.timeframe = timeframe
         
+    def _get_candles_df(self, symbol: Symbol, bars: int) -> pd.DataFrame:
+        """Last `bars` candles (oldest first) from the shared candle store"""
+        return get_candle_store().get_window(symbol, self.timeframe, bars).to_dataframe()
+    
     def calculate_fair_value_gap(self, symbol: Symbol, lookback: int = 50) -> Optional[Dict]:
         """
         Calculate Fair Value Gap (FVG) indicator
@@ -30,50 +37,39 @@ class AdvancedIndicatorsService:
         """
         try:
             # Get market data
-            market_data = MarketData.objects.filter(
-                symbol=symbol
-            ).order_by('-timestamp')[:lookback]
+            df = self._get_candles_df(symbol, lookback)
             
-            if len(market_data) < 3:
+            if len(df) < 3:
                 return None
-                
-            # Convert to pandas DataFrame
-            df = pd.DataFrame([{
-                'timestamp': data.timestamp,
-                'open': float(data.open_price),
-                'high': float(data.high_price),
-                'low': float(data.low_price),
-                'close': float(data.close_price),
-                'volume': float(data.volume)
-            } for data in market_data])
-            
-            df = df.sort_values('timestamp').reset_index(drop=True)
             
-            fvg_data = []
+            high = df['high'].to_numpy()
+            low = df['low'].to_numpy()
+            close = df['close'].to_numpy()
+            timestamps = df['timestamp'].tolist()
             
-            for i in range(1, len(df) - 1):
-                prev_candle = df.iloc[i-1]
-                current_candle = df.iloc[i]
-                next_candle = df.iloc[i+1]
-                
-                # Bullish FVG: Previous candle high < Next candle low
-                if prev_candle['high'] < next_candle['low']:
+            # Gap between candle i-1 and candle i+1, reported on candle i
+            bullish = np.zeros(len(df), dtype=bool)
+            bearish = np.zeros(len(df), dtype=bool)
+            bullish[1:-1] = high[:-2] < low[2:]  # Previous candle high < Next candle low
+            bearish[1:-1] = ~bullish[1:-1] & (low[:-2] > high[2:])  # Previous candle low > Next candle high
+            
+            fvg_data = []
+            for i in np.flatnonzero(bullish | bearish):
+                if bullish[i]:
                     fvg_data.append({
                         'type': 'BULLISH',
-                        'start': prev_candle['high'],
-                        'end': next_candle['low'],
-                        'strength': (next_candle['low'] - prev_candle['high']) / prev_candle['close'],
-                        'timestamp': current_candle['timestamp']
+                        'start': float(high[i-1]),
+                        'end': float(low[i+1]),
+                        'strength': float((low[i+1] - high[i-1]) / close[i-1]),
+                        'timestamp': timestamps[i]
                     })
-                
-                # Bearish FVG: Previous candle low > Next candle high
-                elif prev_candle['low'] > next_candle['high']:
+                else:
                     fvg_data.append({
                         'type': 'BEARISH',
-                        'start': next_candle['high'],
-                        'end': prev_candle['low'],
-                        'strength': (prev_candle['low'] - next_candle['high']) / prev_candle['close'],
-                        'timestamp': current_candle['timestamp']
+                        'start': float(high[i+1]),
+                        'end': float(low[i-1]),
+                        'strength': float((low[i-1] - high[i+1]) / close[i-1]),
+                        'timestamp': timestamps[i]
                     })
             
             return {
@@ -92,49 +88,34 @@ class AdvancedIndicatorsService:
         Identifies areas where liquidity is likely to be found
         """
         try:
-            market_data = MarketData.objects.filter(
-                symbol=symbol
-            ).order_by('-timestamp')[:lookback]
+            df = self._get_candles_df(symbol, lookback)
             
-            if len(market_data) < 20:
+            if len(df) < 20:
                 return None
-                
-            df = pd.DataFrame([{
-                'timestamp': data.timestamp,
-                'open': float(data.open_price),
-                'high': float(data.high_price),
-                'low': float(data.low_price),
-                'close': float(data.close_price),
-                'volume': float(data.volume)
-            } for data in market_data])
-            
-            df = df.sort_values('timestamp').reset_index(drop=True)
-            
-            # Calculate swing highs and lows
-            swing_highs = []
-            swing_lows = []
-            
-            for i in range(5, len(df) - 5):
-                current_high = df.iloc[i]['high']
-                current_low = df.iloc[i]['low']
-                
-                # Check for swing high
-                if all(current_high > df.iloc[i-j]['high'] for j in range(1, 6)) and \
-                   all(current_high > df.iloc[i+j]['high'] for j in range(1, 6)):
-                    swing_highs.append({
-                        'price': current_high,
-                        'timestamp': df.iloc[i]['timestamp'],
-                        'strength': self._calculate_swing_strength(df, i, 'high')
-                    })
-                
-                # Check for swing low
-                if all(current_low < df.iloc[i-j]['low'] for j in range(1, 6)) and \
-                   all(current_low < df.iloc[i+j]['low'] for j in range(1, 6)):
-                    swing_lows.append({
-                        'price': current_low,
-                        'timestamp': df.iloc[i]['timestamp'],
-                        'strength': self._calculate_swing_strength(df, i, 'low')
-                    })
+            
+            high = df['high'].to_numpy()
+            low = df['low'].to_numpy()
+            timestamps = df['timestamp'].tolist()
+            
+            # A swing must be strictly beyond the 5 candles on each side
+            swing_high_idx = np.flatnonzero(kernels.strict_peaks(high, 5))
+            swing_low_idx = np.flatnonzero(kernels.strict_troughs(low, 5))
+            
+            # Strength relative to the average of the surrounding candles
+            high_avg = kernels.neighbour_mean(high, 5)
+            low_avg = kernels.neighbour_mean(low, 5)
+            
+            swing_highs = [{
+                'price': float(high[i]),
+                'timestamp': timestamps[i],
+                'strength': float((high[i] - high_avg[i]) / high_avg[i])
+            } for i in swing_high_idx]
+            
+            swing_lows = [{
+                'price': float(low[i]),
+                'timestamp': timestamps[i],
+                'strength': float((low_avg[i] - low[i]) / low_avg[i])
+            } for i in swing_low_idx]
             
             return {
                 'swing_highs': swing_highs,
@@ -153,19 +134,10 @@ class AdvancedIndicatorsService:
         Creates dynamic support and resistance levels
         """
         try:
-            market_data = MarketData.objects.filter(
-                symbol=symbol
-            ).order_by('-timestamp')[:period * 2]
+            df = self._get_candles_df(symbol, period * 2)
             
-            if len(market_data) < period:
+            if len(df) < period:
                 return None
-                
-            df = pd.DataFrame([{
-                'timestamp': data.timestamp,
-                'close': float(data.close_price)
-            } for data in market_data])
-            
-            df = df.sort_values('timestamp').reset_index(drop=True)
             
             # Calculate Nadaraya-Watson regression
             x = np.arange(len(df))
@@ -205,18 +177,15 @@ class AdvancedIndicatorsService:
         Calculate Standard Pivot Points
         """
         try:
-            market_data = MarketData.objects.filter(
-                symbol=symbol
-            ).order_by('-timestamp')[:period + 1]
+            window = get_candle_store().get_window(symbol, self.timeframe, period + 1)
             
-            if len(market_data) < period + 1:
+            if len(window) < period + 1:
                 return None
                 
-            # Get previous day's OHLC
-            prev_data = market_data[1]  # Previous day
-            high = float(prev_data.high_price)
-            low = float(prev_data.low_price)
-            close = float(prev_data.close_price)
+            # Get previous candle's OHLC (window is oldest first)
+            high = float(window.high[-2])
+            low = float(window.low[-2])
+            close = float(window.close[-2])
             
             # Calculate pivot point
             pivot = (high + low + close) / 3
@@ -234,7 +203,7 @@ class AdvancedIndicatorsService:
                 'pivot': pivot,
                 'r1': r1, 'r2': r2, 'r3': r3,
                 's1': s1, 's2': s2, 's3': s3,
-                'timestamp': market_data[0].timestamp
+                'timestamp': window.datetimes()[-1]
             }
             
         except Exception as e:
@@ -247,58 +216,41 @@ class AdvancedIndicatorsService:
         Identifies divergences between price and RSI
         """
         try:
-            market_data = MarketData.objects.filter(
-                symbol=symbol
-            ).order_by('-timestamp')[:lookback]
+            df = self._get_candles_df(symbol, lookback)
             
-            if len(market_data) < period + 10:
+            if len(df) < period + 10:
                 return None
-                
-            df = pd.DataFrame([{
-                'timestamp': data.timestamp,
-                'close': float(data.close_price)
-            } for data in market_data])
             
-            df = df.sort_values('timestamp').reset_index(drop=True)
+            close = df['close'].to_numpy()
+            timestamps = df['timestamp'].tolist()
+            rsi = kernels.sma_rsi(close, period)
             
-            # Calculate RSI
-            rsi_values = self._calculate_rsi_values(df['close'].values, period)
-            df['rsi'] = rsi_values
+            # Candidate bars need RSI on both sides of a 5-candle neighbourhood
+            candidates = np.zeros(len(df), dtype=bool)
+            candidates[period + 5:len(df) - 5] = True
             
-            # Find divergences
-            divergences = []
+            # Previous price peak/trough on a tighter 3-candle neighbourhood
+            prev_trough = kernels.previous_true_index(kernels.strict_troughs(close, 3))
+            prev_peak = kernels.previous_true_index(kernels.strict_peaks(close, 3))
+            trough_ref = np.maximum(prev_trough, 0)
+            peak_ref = np.maximum(prev_peak, 0)
             
-            for i in range(period + 5, len(df) - 5):
-                # Look for price and RSI peaks/troughs
-                price_peak = self._is_peak(df['close'].values, i, 5)
-                rsi_peak = self._is_peak(df['rsi'].values, i, 5)
-                
-                price_trough = self._is_trough(df['close'].values, i, 5)
-                rsi_trough = self._is_trough(df['rsi'].values, i, 5)
-                
+            with np.errstate(invalid='ignore'):
                 # Bullish divergence: Price makes lower low, RSI makes higher low
-                if price_trough and rsi_trough:
-                    prev_trough_idx = self._find_previous_trough(df['close'].values, i)
-                    if prev_trough_idx is not None:
-                        if (df.iloc[i]['close'] < df.iloc[prev_trough_idx]['close'] and 
-                            df.iloc[i]['rsi'] > df.iloc[prev_trough_idx]['rsi']):
-                            divergences.append({
-                                'type': 'BULLISH_DIVERGENCE',
-                                'timestamp': df.iloc[i]['timestamp'],
-                                'strength': abs(df.iloc[i]['rsi'] - df.iloc[prev_trough_idx]['rsi'])
-                            })
-                
+                bullish = (candidates & kernels.strict_troughs(close, 5) & kernels.strict_troughs(rsi, 5)
+                           & (prev_trough >= 0) & (close < close[trough_ref]) & (rsi > rsi[trough_ref]))
                 # Bearish divergence: Price makes higher high, RSI makes lower high
-                if price_peak and rsi_peak:
-                    prev_peak_idx = self._find_previous_peak(df['close'].values, i)
-                    if prev_peak_idx is not None:
-                        if (df.iloc[i]['close'] > df.iloc[prev_peak_idx]['close'] and 
-                            df.iloc[i]['rsi'] < df.iloc[prev_peak_idx]['rsi']):
-                            divergences.append({
-                                'type': 'BEARISH_DIVERGENCE',
-                                'timestamp': df.iloc[i]['timestamp'],
-                                'strength': abs(df.iloc[i]['rsi'] - df.iloc[prev_peak_idx]['rsi'])
-                            })
+                bearish = (candidates & kernels.strict_peaks(close, 5) & kernels.strict_peaks(rsi, 5)
+                           & (prev_peak >= 0) & (close > close[peak_ref]) & (rsi < rsi[peak_ref]))
+            
+            divergences = []
+            for i in np.flatnonzero(bullish | bearish):
+                reference = trough_ref[i] if bullish[i] else peak_ref[i]
+                divergences.append({
+                    'type': 'BULLISH_DIVERGENCE' if bullish[i] else 'BEARISH_DIVERGENCE',
+                    'timestamp': timestamps[i],
+                    'strength': float(abs(rsi[i] - rsi[reference]))
+                })
             
             return {
                 'divergences': divergences,
@@ -315,43 +267,15 @@ class AdvancedIndicatorsService:
         Calculate Stochastic RSI indicator
         """
         try:
-            market_data = MarketData.objects.filter(
-                symbol=symbol
-            ).order_by('-timestamp')[:rsi_period + stoch_period + 10]
+            df = self._get_candles_df(symbol, rsi_period + stoch_period + 10)
             
-            if len(market_data) < rsi_period + stoch_period:
+            if len(df) < rsi_period + stoch_period:
                 return None
-                
-            df = pd.DataFrame([{
-                'timestamp': data.timestamp,
-                'close': float(data.close_price)
-            } for data in market_data])
-            
-            df = df.sort_values('timestamp').reset_index(drop=True)
-            
-            # Calculate RSI
-            rsi_values = self._calculate_rsi_values(df['close'].values, rsi_period)
-            df['rsi'] = rsi_values
-            
-            # Calculate Stochastic RSI
-            stoch_rsi_values = []
-            for i in range(rsi_period + stoch_period - 1, len(df)):
-                rsi_window = df['rsi'].iloc[i-stoch_period+1:i+1]
-                rsi_min = rsi_window.min()
-                rsi_max = rsi_window.max()
-                
-                if rsi_max - rsi_min == 0:
-                    stoch_rsi = 50
-                else:
-                    stoch_rsi = ((df.iloc[i]['rsi'] - rsi_min) / (rsi_max - rsi_min)) * 100
-                
-                stoch_rsi_values.append(stoch_rsi)
             
-            # Pad with None values for alignment
-            stoch_rsi_values = [None] * (rsi_period + stoch_period - 1) + stoch_rsi_values
-            df['stoch_rsi'] = stoch_rsi_values
+            rsi = kernels.sma_rsi(df['close'].to_numpy(), rsi_period)
+            stoch_rsi_values = kernels.stochastic(rsi, stoch_period)
             
-            latest_stoch_rsi = stoch_rsi_values[-1] if stoch_rsi_values else None
+            latest_stoch_rsi = float(stoch_rsi_values[-1])
             
             return {
                 'stoch_rsi': latest_stoch_rsi,
@@ -363,105 +287,3 @@ class AdvancedIndicatorsService:
         except Exception as e:
             logger.error(f"Error calculating Stochastic RSI for {symbol.symbol}: {e}")
             return None
-    
-    def _calculate_swing_strength(self, df: pd.DataFrame, idx: int, swing_type: str) -> float:
-        """Calculate the strength of a swing point"""
-        try:
-            if swing_type == 'high':
-                current_value = df.iloc[idx]['high']
-                # Compare with surrounding values
-                surrounding_values = []
-                for i in range(max(0, idx-5), min(len(df), idx+6)):
-                    if i != idx:
-                        surrounding_values.append(df.iloc[i]['high'])
-                
-                if surrounding_values:
-                    avg_surrounding = np.mean(surrounding_values)
-                    return (current_value - avg_surrounding) / avg_surrounding
-            else:  # low
-                current_value = df.iloc[idx]['low']
-                surrounding_values = []
-                for i in range(max(0, idx-5), min(len(df), idx+6)):
-                    if i != idx:
-                        surrounding_values.append(df.iloc[i]['low'])
-                
-                if surrounding_values:
-                    avg_surrounding = np.mean(surrounding_values)
-                    return (avg_surrounding - current_value) / avg_surrounding
-            
-            return 0.0
-        except:
-            return 0.0
-    
-    def _calculate_rsi_values(self, prices: np.ndarray, period: int) -> List[float]:
-        """Calculate RSI values"""
-        try:
-            deltas = np.diff(prices)
-            gains = np.where(deltas > 0, deltas, 0)
-            losses = np.where(deltas < 0, -deltas, 0)
-            
-            avg_gains = []
-            avg_losses = []
-            
-            for i in range(len(prices)):
-                if i < period:
-                    avg_gains.append(None)
-                    avg_losses.append(None)
-                else:
-                    avg_gain = np.mean(gains[i-period:i])
-                    avg_loss = np.mean(losses[i-period:i])
-                    avg_gains.append(avg_gain)
-                    avg_losses.append(avg_loss)
-            
-            rsi_values = []
-            for i in range(len(prices)):
-                if avg_gains[i] is None or avg_losses[i] is None:
-                    rsi_values.append(None)
-                else:
-                    if avg_losses[i] == 0:
-                        rsi = 100
-                    else:
-                        rs = avg_gains[i] / avg_losses[i]
-                        rsi = 100 - (100 / (1 + rs))
-                    rsi_values.append(rsi)
-            
-            return rsi_values
-        except:
-            return [None] * len(prices)
-    
-    def _is_peak(self, values: np.ndarray, idx: int, window: int) -> bool:
-        """Check if value at index is a peak"""
-        if idx < window or idx >= len(values) - window:
-            return False
-        
-        current = values[idx]
-        for i in range(idx - window, idx + window + 1):
-            if i != idx and values[i] >= current:
-                return False
-        return True
-    
-    def _is_trough(self, values: np.ndarray, idx: int, window: int) -> bool:
-        """Check if value at index is a trough"""
-        if idx < window or idx >= len(values) - window:
-            return False
-        
-        current = values[idx]
-        for i in range(idx - window, idx + window + 1):
-            if i != idx and values[i] <= current:
-                return False
-        return True
-    
-    def _find_previous_peak(self, values: np.ndarray, current_idx: int) -> Optional[int]:
-        """Find the previous peak before current index"""
-        for i in range(current_idx - 1, 0, -1):
-            if self._is_peak(values, i, 3):
-                return i
-        return None
-    
-    def _find_previous_trough(self, values: np.ndarray, current_idx: int) -> Optional[int]:
-        """Find the previous trough before current index"""
-        for i in range(current_idx - 1, 0, -1):
-            if self._is_trough(values, i, 3):
-                return i
-        return None
-
@@ -0,0 +1,340 @@
+"""
+Background backtest jobs with content-addressed results.
+
+Long backtests no longer have to run inside the web request: ``submit`` records a
+BacktestJob and queues ``run_backtest_job_task`` on a Celery worker, which pushes
+progress to the ``backtest_job_<id>`` channels group (and keeps it on the row for
+polling). Every finished payload is stored under a key hashed from
+(kind, symbol, date range, strategy parameters, data version), so an identical request
+is answered from the stored result, or attached to the run already in flight, instead
+of running the backtest again.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from apps.data.models import MarketData
+from apps.signals.models import BacktestJob, TradingSignal
+from apps.trading.models import Symbol
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_JOBS = getattr(settings, 'BACKTEST_JOBS', {})
+
+# Request fields that change each kind's result; anything else is left out of the key
+PARAMETER_KEYS = {
+    'generate_signals': ('desired_signal_count', 'leverage', 'leverage_multiplier'),
+    'backtest': ('leverage', 'leverage_multiplier'),
+    'fixed': (),
+    'upgraded': (),
+}
+
+# The execution simulators read up to 7 days of bars past the end of the range
+SIMULATION_LOOKAHEAD = timedelta(days=7)
+
+ProgressCallback = Callable[[int, str], None]
+
+
+def progress_group(job_id: int) -> str:
+    """Channels group that receives ``backtest_progress`` events for a job"""
+    return f'backtest_job_{job_id}'
+
+
+def wants_async(data) -> bool:
+    """Whether a backtest request asked to run as a background job (``"async": true``)"""
+    raw = data.get('async', BACKTEST_JOBS.get('ASYNC_BY_DEFAULT', False))
+    if isinstance(raw, str):
+        return raw.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(raw)
+
+
+class BacktestJobService:
+    """Create, run and look up backtest jobs"""
+
+    def __init__(self):
+        self.stale_after = timedelta(seconds=BACKTEST_JOBS.get('STALE_AFTER_SECONDS', 3600))
+
+    def job_parameters(self, kind: str, data) -> Dict:
+        """The subset of request fields that affect ``kind``'s result, blanks dropped"""
+        if kind not in PARAMETER_KEYS:
+            raise ValueError(f"Unknown backtest job kind: {kind}")
+        return {
+            key: data.get(key) for key in PARAMETER_KEYS[kind]
+            if data.get(key) not in (None, '', 'null')
+        }
+
+    def data_version(self, symbol: Symbol, start_date: datetime, end_date: datetime) -> str:
+        """Fingerprint of the candles and signals a backtest over this range reads.
+
+        New or re-imported candles (row count, latest id/timestamp) and any created or
+        updated signal change the fingerprint, and with it the content key.
+        """
+        candles = MarketData.objects.filter(
+            symbol=symbol,
+            timestamp__gte=start_date,
+            timestamp__lte=end_date + SIMULATION_LOOKAHEAD
+        ).aggregate(count=Count('id'), last_id=Max('id'), last_timestamp=Max('timestamp'))
+        signals = TradingSignal.objects.filter(
+            symbol=symbol,
+            created_at__gte=start_date,
+            created_at__lte=end_date
+        ).aggregate(count=Count('id'), last_id=Max('id'), last_updated=Max('updated_at'))
+        return self._digest({'candles': candles, 'signals': signals})
+
+    def content_key(self, kind: str, symbol: Symbol, start_date: datetime, end_date: datetime,
+                    parameters: Dict, data_version: str) -> str:
+        return self._digest({
+            'kind': kind,
+            'symbol': symbol.symbol,
+            'start_date': start_date,
+            'end_date': end_date,
+            'parameters': parameters,
+            'data_version': data_version,
+        })
+
+    def cached_result(self, kind: str, symbol: Symbol, start_date: datetime, end_date: datetime,
+                      data) -> Optional[Dict]:
+        """Stored payload of a completed identical backtest, or None"""
+        key = self._key_for(kind, symbol, start_date, end_date, self.job_parameters(kind, data))
+        job = self._completed_job(key)
+        if job:
+            logger.info(f"Serving {kind} backtest for {symbol.symbol} from stored job {job.id}")
+            return job.result
+        return None
+
+    def run_cached(self, kind: str, symbol: Symbol, start_date: datetime, end_date: datetime, data,
+                   runner: Callable[[], Dict], user=None) -> Dict:
+        """Run ``runner`` in-process unless an identical backtest is stored; store successful payloads"""
+        cached = self.cached_result(kind, symbol, start_date, end_date, data)
+        if cached is not None:
+            return cached
+
+        started_at = timezone.now()
+        payload = runner()
+        if payload.get('success', True):
+            parameters = self.job_parameters(kind, data)
+            data_version = self.data_version(symbol, start_date, end_date)
+            BacktestJob.objects.create(
+                kind=kind,
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                parameters=parameters,
+                data_version=data_version,
+                content_key=self.content_key(kind, symbol, start_date, end_date, parameters, data_version),
+                status='COMPLETED',
+                progress=100,
+                message='Completed',
+                result=self._json_ready(payload),
+                requested_by=user,
+                started_at=started_at,
+                completed_at=timezone.now(),
+            )
+        return payload
+
+    def submit(self, kind: str, symbol: Symbol, start_date: datetime, end_date: datetime, data,
+               user=None) -> Tuple[BacktestJob, bool]:
+        """
+        Queue a backtest, reusing a completed or in-flight identical job
+
+        Returns:
+            (job, reused)
+        """
+        parameters = self.job_parameters(kind, data)
+        data_version = self.data_version(symbol, start_date, end_date)
+        key = self.content_key(kind, symbol, start_date, end_date, parameters, data_version)
+
+        completed = self._completed_job(key)
+        if completed and completed.requested_by_id != getattr(user, 'id', None):
+            # Jobs are only visible to their requester, so serve the stored result from a copy
+            completed = self._copy_for(completed, user)
+        existing = completed or self._in_flight_job(key, user)
+        if existing:
+            logger.info(f"Reusing backtest job {existing.id} ({existing.status}) for {kind} {symbol.symbol}")
+            return existing, True
+
+        job = BacktestJob.objects.create(
+            kind=kind,
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date,
+            parameters=parameters,
+            data_version=data_version,
+            content_key=key,
+            message='Queued',
+            requested_by=user,
+        )
+        transaction.on_commit(lambda: self._enqueue(job))
+        logger.info(f"Queued backtest job {job.id}: {kind} {symbol.symbol} {start_date.date()} - {end_date.date()}")
+        return job, False
+
+    def run(self, job_id: int) -> BacktestJob:
+        """Execute a queued job (called by the Celery task)"""
+        job = BacktestJob.objects.select_related('symbol').get(pk=job_id)
+        if job.is_finished:
+            return job
+
+        job.status = 'RUNNING'
+        job.started_at = timezone.now()
+        job.progress = 0
+        job.message = 'Starting'
+        job.save(update_fields=['status', 'started_at', 'progress', 'message'])
+        self._broadcast(job)
+
+        def report(percent: int, message: str):
+            self.report_progress(job, percent, message)
+
+        try:
+            payload = self._execute(job, report)
+            job.result = self._json_ready(payload)
+            if payload.get('success', True):
+                job.status = 'COMPLETED'
+                job.message = 'Completed'
+                # A run can persist the signals it generated; re-key against the data as it is now
+                job.data_version = self.data_version(job.symbol, job.start_date, job.end_date)
+                job.content_key = self.content_key(
+                    job.kind, job.symbol, job.start_date, job.end_date, job.parameters, job.data_version
+                )
+            else:
+                job.status = 'FAILED'
+                job.error = str(payload.get('error', ''))
+                job.message = 'Failed'
+        except Exception as e:
+            logger.error(f"Backtest job {job.id} failed: {e}", exc_info=True)
+            job.status = 'FAILED'
+            job.error = str(e)
+            job.message = 'Failed'
+
+        job.progress = 100
+        job.completed_at = timezone.now()
+        job.save()
+        self._broadcast(job)
+        return job
+
+    def report_progress(self, job: BacktestJob, percent: int, message: str):
+        job.progress = max(0, min(int(percent), 100))
+        job.message = message[:255]
+        BacktestJob.objects.filter(pk=job.pk).update(progress=job.progress, message=job.message)
+        self._broadcast(job)
+
+    def serialize(self, job: BacktestJob, include_result: bool = True) -> Dict:
+        data = {
+            'id': job.id,
+            'kind': job.kind,
+            'symbol': job.symbol.symbol,
+            'start_date': job.start_date.isoformat(),
+            'end_date': job.end_date.isoformat(),
+            'parameters': job.parameters,
+            'status': job.status,
+            'progress': job.progress,
+            'message': job.message,
+            'error': job.error,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+        }
+        if include_result:
+            data['result'] = job.result
+        return data
+
+    def _execute(self, job: BacktestJob, progress: ProgressCallback) -> Dict:
+        if job.kind in ('generate_signals', 'backtest'):
+            from apps.signals.backtesting_api import BacktestAPIView
+            return BacktestAPIView().run_action(
+                job.kind, job.parameters, job.symbol, job.start_date, job.end_date, progress_callback=progress
+            )
+        if job.kind == 'fixed':
+            from apps.signals.fixed_backtesting_api import FixedBacktestAPIView
+            progress(10, 'Verifying signal executions')
+            return FixedBacktestAPIView().build_response(job.symbol, job.start_date, job.end_date)
+        if job.kind == 'upgraded':
+            from apps.signals.upgraded_backtesting_api import UpgradedBacktestAPIView
+            progress(10, 'Simulating signal executions')
+            return UpgradedBacktestAPIView().build_response(job.symbol, job.start_date, job.end_date)
+        raise ValueError(f"Unknown backtest job kind: {job.kind}")
+
+    def _enqueue(self, job: BacktestJob):
+        from apps.signals.tasks import run_backtest_job_task
+        try:
+            async_result = run_backtest_job_task.delay(job.id)
+            BacktestJob.objects.filter(pk=job.pk).update(task_id=async_result.id or '')
+        except Exception as e:
+            logger.error(f"Could not queue backtest job {job.id}: {e}")
+            BacktestJob.objects.filter(pk=job.pk).update(
+                status='FAILED', error=f'Could not queue job: {e}', message='Failed', completed_at=timezone.now()
+            )
+
+    def _key_for(self, kind: str, symbol: Symbol, start_date: datetime, end_date: datetime, parameters: Dict) -> str:
+        data_version = self.data_version(symbol, start_date, end_date)
+        return self.content_key(kind, symbol, start_date, end_date, parameters, data_version)
+
+    def jobs_for(self, user):
+        """Jobs ``user`` may see: their own, or the anonymous ones when ``user`` is None"""
+        if user is None:
+            return BacktestJob.objects.filter(requested_by__isnull=True)
+        return BacktestJob.objects.filter(requested_by=user)
+
+    def _completed_job(self, key: str) -> Optional[BacktestJob]:
+        return BacktestJob.objects.filter(content_key=key, status='COMPLETED').order_by('-completed_at').first()
+
+    def _copy_for(self, job: BacktestJob, user) -> BacktestJob:
+        """A completed copy of ``job`` owned by ``user``"""
+        now = timezone.now()
+        return BacktestJob.objects.create(
+            kind=job.kind,
+            symbol=job.symbol,
+            start_date=job.start_date,
+            end_date=job.end_date,
+            parameters=job.parameters,
+            data_version=job.data_version,
+            content_key=job.content_key,
+            status='COMPLETED',
+            progress=100,
+            message='Completed',
+            result=job.result,
+            requested_by=user,
+            started_at=now,
+            completed_at=now,
+        )
+
+    def _in_flight_job(self, key: str, user=None) -> Optional[BacktestJob]:
+        # Jobs older than STALE_AFTER_SECONDS are assumed lost with their worker
+        return self.jobs_for(user).filter(
+            content_key=key,
+            status__in=['PENDING', 'RUNNING'],
+            created_at__gte=timezone.now() - self.stale_after
+        ).order_by('-created_at').first()
+
+    def _broadcast(self, job: BacktestJob):
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            return
+        try:
+            async_to_sync(channel_layer.group_send)(
+                progress_group(job.id),
+                {'type': 'backtest_progress', **self.serialize(job, include_result=False)}
+            )
+        except Exception as e:
+            logger.warning(f"Could not broadcast progress for backtest job {job.id}: {e}")
+
+    @staticmethod
+    def _json_ready(payload: Dict) -> Dict:
+        # Same encoder JsonResponse uses, so stored results render exactly like live ones
+        return json.loads(json.dumps(payload, cls=DjangoJSONEncoder))
+
+    @staticmethod
+    def _digest(value) -> str:
+        encoded = json.dumps(value, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+backtest_job_service = BacktestJobService()
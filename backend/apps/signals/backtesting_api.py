@@ -6,11 +6,9 @@ Handles coin name input, date period selection, and signal generation based on s
 import json
 import logging
 import csv
-import io
-import zipfile
-import base64
 from datetime import datetime, timedelta
 from django.http import JsonResponse, HttpResponse
+from django.urls import reverse
 from django.views import View
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -20,14 +18,44 @@ from django.db.models import Q
 from django.utils import timezone
 
 from apps.trading.models import Symbol
-from apps.signals.models import TradingSignal, SignalType
+from apps.signals.models import TradingSignal, SignalType, BacktestJob
 from apps.analytics.models import BacktestResult
 from apps.data.models import MarketData
-from django.db.models import Min, Max, Avg
+from apps.signals import outcome_engine
+from apps.signals.backtest_jobs import backtest_job_service, wants_async
+from apps.signals.outcome_engine import PriceBars, SignalOutcomeEngine
+from apps.core.streaming_exports import csv_chunks, keyset_values, streaming_csv_response, streaming_zip_response
+from django.db.models import Min, Max, Avg, Count
 
 logger = logging.getLogger(__name__)
 
 
+def request_user(request):
+    """Authenticated user of a request, or None"""
+    user = getattr(request, 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+
+def backtest_job_response(request, kind, symbol, start_date, end_date, data):
+    """Queue (or reuse) a background backtest job and describe it.
+    
+    200 with the stored ``result`` when an identical backtest already completed,
+    otherwise 202 with the job to poll or follow over WebSocket.
+    """
+    job, reused = backtest_job_service.submit(kind, symbol, start_date, end_date, data, user=request_user(request))
+    completed = job.status == 'COMPLETED'
+    response_data = {
+        'success': True,
+        'cached': reused and completed,
+        'job': backtest_job_service.serialize(job, include_result=False),
+        'status_url': reverse('signals:backtest_job_api', args=[job.id]),
+        'progress_socket': f'/ws/backtest-jobs/{job.id}/',
+    }
+    if completed:
+        response_data['result'] = job.result
+    return JsonResponse(response_data, status=200 if completed else 202)
+
+
 class BacktestAPIView(View):
     """Main backtesting API endpoint"""
     
@@ -84,17 +112,36 @@ class BacktestAPIView(View):
             # Get or create symbol
             symbol = self._get_or_create_symbol(symbol_str)
             
-            if action == 'generate_signals':
-                return self._generate_historical_signals(request, symbol, start_date, end_date)
-            elif action == 'backtest':
-                return self._run_backtest(request, symbol, start_date, end_date)
-            else:
+            if action not in ('generate_signals', 'backtest'):
                 return JsonResponse({'success': False, 'error': 'Invalid action'})
+            
+            # Long ranges can run as a background job ("async": true); either way an
+            # identical earlier run is served from its stored result
+            if wants_async(data):
+                return backtest_job_response(request, action, symbol, start_date, end_date, data)
+            
+            return JsonResponse(backtest_job_service.run_cached(
+                action, symbol, start_date, end_date, data,
+                lambda: self.run_action(action, data, symbol, start_date, end_date),
+                user=request_user(request)
+            ))
                 
         except Exception as e:
             logger.error(f"Backtesting API error: {e}")
             return JsonResponse({'success': False, 'error': str(e)})
     
+    def run_action(self, action, data, symbol, start_date, end_date, progress_callback=None):
+        """Run a backtesting action and return its response payload (also used by background backtest jobs)"""
+        self.progress_callback = progress_callback
+        if action == 'generate_signals':
+            return self._generate_historical_signals(data, symbol, start_date, end_date)
+        return self._run_backtest(data, symbol, start_date, end_date)
+    
+    def _report_progress(self, percent, message):
+        callback = getattr(self, 'progress_callback', None)
+        if callback:
+            callback(percent, message)
+    
     def _get_or_create_symbol(self, symbol_str: str) -> Symbol:
         """Get or create symbol object"""
         try:
@@ -183,8 +230,8 @@ class BacktestAPIView(View):
             'volume_threshold': 1.2,
         }
 
-    def _generate_historical_signals(self, request, symbol, start_date, end_date):
-        """Generate historical signals for the given period using YOUR actual strategy"""
+    def _generate_historical_signals(self, data, symbol, start_date, end_date):
+        """Generate historical signals for the given period using YOUR actual strategy; returns the response payload"""
         try:
             # Make dates timezone-aware if they aren't already
             from django.utils import timezone
@@ -194,10 +241,6 @@ class BacktestAPIView(View):
                 end_date = timezone.make_aware(end_date)
             
             # Get user-specified signal count (safe parsing; blank => 0)
-            if request.content_type == 'application/json':
-                data = json.loads(request.body)
-            else:
-                data = request.POST
             raw_count = data.get('desired_signal_count')
             try:
                 desired_signal_count = int(raw_count) if raw_count not in (None, '', 'null') else 0
@@ -320,7 +363,7 @@ class BacktestAPIView(View):
                     'total_signals': len(executed_signals)
                 })
                 
-                return JsonResponse(response_data)
+                return response_data
             
             # No existing signals found, generate new ones
             logger.info(f"No existing signals found for {symbol.symbol}, generating new ones")
@@ -332,6 +375,7 @@ class BacktestAPIView(View):
             strategy_service = StrategyBacktestingService(leverage=leverage)
             
             # Generate signals based on YOUR actual strategy
+            self._report_progress(10, 'Generating historical signals')
             signals = strategy_service.generate_historical_signals(symbol, start_date, end_date)
             
             # Convert signals to the required format (safe float to avoid NoneType)
@@ -435,24 +479,17 @@ class BacktestAPIView(View):
                 response_data['signal_analysis'] = signal_analysis
                 logger.info(f"Added signal analysis to response for {symbol.symbol}")
             
-            return JsonResponse(response_data)
+            return response_data
             
         except Exception as e:
             logger.error(f"Error generating historical signals with YOUR strategy: {e}")
-            return JsonResponse({'success': False, 'error': str(e)})
+            return {'success': False, 'error': str(e)}
     
-    def _run_backtest(self, request, symbol, start_date, end_date):
-        """Run a full backtest"""
+    def _run_backtest(self, data, symbol, start_date, end_date):
+        """Run a full backtest; returns the response payload"""
         try:
             # Parse optional leverage (10 => mandatory 50% TP / 25% SL of capital)
-            if getattr(request, 'content_type', '') == 'application/json':
-                try:
-                    data_bt = json.loads(request.body)
-                except Exception:
-                    data_bt = {}
-            else:
-                data_bt = getattr(request, 'POST', {})
-            raw_lev = data_bt.get('leverage') or data_bt.get('leverage_multiplier')
+            raw_lev = data.get('leverage') or data.get('leverage_multiplier')
             try:
                 leverage_bt = int(raw_lev) if raw_lev not in (None, '', 'null') else None
             except (TypeError, ValueError):
@@ -480,11 +517,12 @@ class BacktestAPIView(View):
                     strategy_service = StrategyBacktestingService(leverage=leverage_bt)
                     
                     # Generate signals based on YOUR actual strategy
+                    self._report_progress(10, 'Generating historical signals')
                     generated_signals = strategy_service.generate_historical_signals(symbol, start_date, end_date)
                     
                     if not generated_signals:
                         logger.warning(f"No signals could be generated for {symbol.symbol} in date range")
-                        return JsonResponse({
+                        return {
                             'success': True,
                             'action': 'backtest',
                             'result': {
@@ -499,7 +537,7 @@ class BacktestAPIView(View):
                                 'win_rate': 0.0,
                                 'individual_signals': []
                             }
-                        })
+                        }
                     
                     # Convert generated signals to TradingSignal format for backtesting (safe float)
                     def _safe_float_bt(v, default=0.0):
@@ -545,10 +583,10 @@ class BacktestAPIView(View):
                     signals_to_backtest = formatted_signals
                 except Exception as e:
                     logger.error(f"Error generating signals for backtest: {e}")
-                    return JsonResponse({
+                    return {
                         'success': False,
                         'error': f'Failed to generate signals for backtesting: {str(e)}'
-                    })
+                    }
             else:
                 # Convert database signals to format needed for backtesting
                 signals_to_backtest = []
@@ -578,54 +616,27 @@ class BacktestAPIView(View):
             
             if historical_df.empty:
                 logger.error(f"No historical data found for {symbol.symbol}")
-                return JsonResponse({
+                return {
                     'success': False,
                     'error': f'No historical data available for {symbol.symbol}'
-                })
-            
-            # Convert DataFrame to dict format expected by _simulate_single_signal_execution
-            # (timestamp -> {open, high, low, close, volume}) so simulation can check if price hit target/stop
-            from django.utils import timezone as tz
-            historical_data = {}
-            for ts, row in historical_df.iterrows():
-                # Ensure timestamp is timezone-aware for comparison with signal_time
-                if hasattr(ts, 'to_pydatetime'):
-                    ts = ts.to_pydatetime()
-                if ts.tzinfo is None:
-                    ts = tz.make_aware(ts)
-                # Safe float conversion for historical data
-                def safe_float_hist(value, default=0.0):
-                    if value is None:
-                        return default
-                    try:
-                        return float(value)
-                    except (TypeError, ValueError):
-                        return default
-                
-                historical_data[ts] = {
-                    'open': safe_float_hist(row.get('open'), 0),
-                    'high': safe_float_hist(row.get('high'), 0),
-                    'low': safe_float_hist(row.get('low'), 0),
-                    'close': safe_float_hist(row.get('close'), 0),
-                    'volume': safe_float_hist(row.get('volume'), 0)
                 }
-            logger.info(f"Converted {len(historical_data)} price bars for execution simulation")
-            
-            # Simulate signal execution for all signals
-            executed_signals = []
-            for signal_data in signals_to_backtest:
-                # signal_data is already in dictionary format
-                # Ensure it has all required fields
-                # Safe float conversion helper
-                def safe_float_exec(value, default=0.0):
-                    if value is None or value == '':
-                        return default
-                    try:
-                        return float(value)
-                    except (TypeError, ValueError):
-                        return default
-                
-                signal_dict = {
+            
+            # Sorted price arrays for the outcome engine; every signal is resolved against them in one batch
+            price_bars = PriceBars.from_dataframe(historical_df)
+            logger.info(f"Loaded {len(price_bars)} price bars for execution simulation")
+            
+            # Safe float conversion helper
+            def safe_float_exec(value, default=0.0):
+                if value is None or value == '':
+                    return default
+                try:
+                    return float(value)
+                except (TypeError, ValueError):
+                    return default
+            
+            # signal_data is already in dictionary format; ensure it has all required fields
+            executed_signals = [
+                {
                     'id': signal_data.get('id'),
                     'created_at': signal_data.get('created_at'),
                     'entry_price': str(signal_data.get('entry_price', 0)) if signal_data.get('entry_price') is not None else '0',
@@ -635,16 +646,20 @@ class BacktestAPIView(View):
                     'confidence_score': safe_float_exec(signal_data.get('confidence_score'), 0),
                     'risk_reward_ratio': safe_float_exec(signal_data.get('risk_reward_ratio'), 0)
                 }
-                
-                # Simulate execution
-                execution_result = self._simulate_single_signal_execution(signal_dict, historical_data, symbol)
-                
-                # Merge execution result into signal_dict for analysis
-                # Include all signals (both executed and not executed) for proper analysis
+                for signal_data in signals_to_backtest
+            ]
+            
+            self._report_progress(60, f'Simulating execution for {len(executed_signals)} signals')
+            
+            # Simulate execution and merge the results into each signal for analysis
+            # Include all signals (both executed and not executed) for proper analysis
+            for signal_dict, execution_result in zip(
+                executed_signals, self._simulate_signals_batch(executed_signals, price_bars)
+            ):
                 signal_dict.update(execution_result)
-                executed_signals.append(signal_dict)
             
             # Analyze executed signals
+            self._report_progress(85, 'Analyzing results')
             analysis_result = self._analyze_executed_signals(executed_signals, symbol, start_date, end_date)
             
             # Safe access to total_signals (could be in total_summary or top level)
@@ -653,15 +668,15 @@ class BacktestAPIView(View):
             
             logger.info(f"Backtest completed: {total_signals} signals, {executed_count} executed")
             
-            return JsonResponse({
+            return {
                 'success': True,
                 'action': 'backtest',
                 'result': analysis_result
-            })
+            }
             
         except Exception as e:
             logger.error(f"Error running backtest: {e}")
-            return JsonResponse({'success': False, 'error': str(e)})
+            return {'success': False, 'error': str(e)}
     
     def _get_historical_data(self, symbol, start_date, end_date):
         """Get historical market data for backtesting"""
@@ -844,32 +859,31 @@ class BacktestAPIView(View):
             return signals
         
         logger.info(f"Simulating execution for {len(signals)} signals for {symbol.symbol}")
+        self._report_progress(60, f'Simulating execution for {len(signals)} signals')
         
         # Get historical price data for execution simulation
-        historical_data = self._get_historical_price_data(symbol, start_date, end_date)
+        price_bars = PriceBars.from_mapping(self._get_historical_price_data(symbol, start_date, end_date))
         
+        # Create a copy of each signal to modify; ensure SELL/BUY prices are logical
+        normalized = []
         executed_signals = []
         for signal in signals:
             try:
-                # Create a copy of the signal to modify; ensure SELL/BUY prices are logical
                 executed_signal = signal.copy()
                 self._normalize_signal_prices(executed_signal)
-
-                # Simulate execution using normalized prices
-                execution_result = self._simulate_single_signal_execution(
-                    executed_signal, historical_data, symbol
-                )
-                
-                # Update signal with execution results
-                executed_signal.update(execution_result)
+                normalized.append(executed_signal)
                 executed_signals.append(executed_signal)
-                
             except Exception as e:
                 logger.error(f"Error simulating execution for signal {signal.get('id', 'unknown')}: {e}")
                 # Keep original signal if execution simulation fails
                 executed_signals.append(signal)
         
+        # Simulate execution using normalized prices, all signals in one batch
+        for executed_signal, execution_result in zip(normalized, self._simulate_signals_batch(normalized, price_bars)):
+            executed_signal.update(execution_result)
+        
         logger.info(f"Simulated execution for {len(executed_signals)} signals")
+        self._report_progress(85, 'Analyzing results')
         return executed_signals
     
     def _get_historical_price_data(self, symbol, start_date, end_date):
@@ -961,178 +975,106 @@ class BacktestAPIView(View):
     
     def _simulate_single_signal_execution(self, signal, historical_data, symbol):
         """Simulate execution of a single signal"""
-        try:
-            from datetime import datetime, timedelta
-            from decimal import Decimal
-            
-            # Parse signal timestamp
-            signal_time = datetime.fromisoformat(signal['created_at'].replace('Z', '+00:00'))
-            if signal_time.tzinfo is None:
-                from django.utils import timezone
-                signal_time = timezone.make_aware(signal_time)
-            
-            # FIXED: Handle empty or invalid price values
+        bars = historical_data if isinstance(historical_data, PriceBars) else PriceBars.from_mapping(historical_data)
+        return self._simulate_signals_batch([signal], bars)[0]
+    
+    def _simulate_signals_batch(self, signals, bars):
+        """Simulate execution of signals against one set of price bars.
+        
+        Every signal with usable prices is resolved in a single outcome-engine call
+        (7-day window from the signal time, target checked before stop on each bar,
+        otherwise the window's last close). Returns one result dict per signal, in order.
+        """
+        results = [None] * len(signals)
+        pending, times, longs, targets, stops, entries = [], [], [], [], [], []
+        
+        for i, signal in enumerate(signals):
             try:
-                entry_price = float(signal['entry_price']) if signal['entry_price'] and signal['entry_price'] != '' else 0.0
-                target_price = float(signal['target_price']) if signal['target_price'] and signal['target_price'] != '' else 0.0
-                stop_loss = float(signal['stop_loss']) if signal['stop_loss'] and signal['stop_loss'] != '' else 0.0
-            except (ValueError, TypeError):
-                # If prices are invalid, skip this signal
-                return {
-                    'is_executed': False,
-                    'executed_at': None,
-                    'execution_price': None,
-                    'is_profitable': None,
-                    'profit_loss': 0.0,
-                    'execution_status': 'INVALID_PRICES'
-                }
-            
-            # Skip signals with zero prices
-            if entry_price == 0.0 or target_price == 0.0 or stop_loss == 0.0:
-                return {
-                    'is_executed': False,
-                    'executed_at': None,
-                    'execution_price': None,
-                    'is_profitable': None,
-                    'profit_loss': 0.0,
-                    'execution_status': 'ZERO_PRICES'
-                }
-            
-            signal_type = signal['signal_type'].upper()
-            
-            # Look for execution in the next 7 days after signal
-            execution_window = timedelta(days=7)
-            end_time = signal_time + execution_window
-            
-            # Find price data points within the execution window
-            relevant_price_data = []
-            for timestamp, price_data in historical_data.items():
-                if timestamp >= signal_time and timestamp <= end_time:
-                    relevant_price_data.append((timestamp, price_data))
-            
-            # Sort by timestamp to process chronologically
-            relevant_price_data.sort(key=lambda x: x[0])
-            
-            if not relevant_price_data:
-                # No price data found, mark as not executed
-                return {
-                    'is_executed': False,
-                    'executed_at': None,
-                    'execution_price': None,
-                    'is_profitable': None,
-                    'profit_loss': 0.0,
-                    'execution_status': 'NO_DATA'
-                }
-            
-            # Process price data chronologically to find execution
-            execution_price = None
-            execution_time = None
-            execution_status = 'NOT_EXECUTED'
-            
-            for timestamp, price_data in relevant_price_data:
-                high_price = price_data['high']
-                low_price = price_data['low']
+                # Parse signal timestamp
+                signal_time = datetime.fromisoformat(signal['created_at'].replace('Z', '+00:00'))
+                if signal_time.tzinfo is None:
+                    signal_time = timezone.make_aware(signal_time)
                 
-                if signal_type in ['BUY', 'STRONG_BUY']:
-                    # For buy signals, check if price hit target (above entry) or stop loss (below entry)
-                    if high_price >= target_price:
-                        execution_price = target_price
-                        execution_time = timestamp
-                        execution_status = 'TARGET_HIT'
-                        break
-                    elif low_price <= stop_loss:
-                        execution_price = stop_loss
-                        execution_time = timestamp
-                        execution_status = 'STOP_LOSS_HIT'
-                        break
-                else:  # SELL or STRONG_SELL
-                    # For sell signals, check if price hit target (below entry) or stop loss (above entry)
-                    if low_price <= target_price:
-                        execution_price = target_price
-                        execution_time = timestamp
-                        execution_status = 'TARGET_HIT'
-                        break
-                    elif high_price >= stop_loss:
-                        execution_price = stop_loss
-                        execution_time = timestamp
-                        execution_status = 'STOP_LOSS_HIT'
-                        break
-            
-            # If no target or stop loss was hit, execute at the last available price
-            if execution_price is None and relevant_price_data:
-                last_timestamp, last_price_data = relevant_price_data[-1]
-                execution_price = last_price_data['close']
-                execution_time = last_timestamp
-                execution_status = 'CLOSE_PRICE'
-            
-            # Calculate profit/loss based on whether target or stop loss was hit
-            if execution_price is not None:
-                if execution_status == 'TARGET_HIT':
-                    # Target was hit = PROFIT
-                    if signal_type in ['BUY', 'STRONG_BUY']:
-                        profit_loss = (target_price - entry_price) / entry_price * 100
-                    else:  # SELL or STRONG_SELL
-                        profit_loss = (entry_price - target_price) / entry_price * 100
-                    is_profitable = True
-                elif execution_status == 'STOP_LOSS_HIT':
-                    # Stop loss was hit = LOSS
-                    if signal_type in ['BUY', 'STRONG_BUY']:
-                        profit_loss = (stop_loss - entry_price) / entry_price * 100
-                    else:  # SELL or STRONG_SELL
-                        profit_loss = (entry_price - stop_loss) / entry_price * 100
-                    is_profitable = False
-                else:
-                    # Close price execution - calculate based on actual execution
-                    if signal_type in ['BUY', 'STRONG_BUY']:
-                        profit_loss = (execution_price - entry_price) / entry_price * 100
-                        is_profitable = execution_price > entry_price
-                    else:  # SELL or STRONG_SELL
-                        profit_loss = (entry_price - execution_price) / entry_price * 100
-                        is_profitable = execution_price < entry_price
+                # Handle empty or invalid price values
+                try:
+                    entry_price = float(signal['entry_price']) if signal['entry_price'] and signal['entry_price'] != '' else 0.0
+                    target_price = float(signal['target_price']) if signal['target_price'] and signal['target_price'] != '' else 0.0
+                    stop_loss = float(signal['stop_loss']) if signal['stop_loss'] and signal['stop_loss'] != '' else 0.0
+                except (ValueError, TypeError):
+                    results[i] = self._unexecuted_result('INVALID_PRICES')
+                    continue
+                
+                # Skip signals with zero prices
+                if entry_price == 0.0 or target_price == 0.0 or stop_loss == 0.0:
+                    results[i] = self._unexecuted_result('ZERO_PRICES')
+                    continue
+                
+                longs.append(signal['signal_type'].upper() in ['BUY', 'STRONG_BUY'])
+            except Exception as e:
+                logger.error(f"Error simulating single signal execution: {e}")
+                results[i] = self._unexecuted_result('ERROR')
+                continue
+            
+            pending.append(i)
+            times.append(signal_time)
+            targets.append(target_price)
+            stops.append(stop_loss)
+            entries.append(entry_price)
+        
+        if not pending:
+            return results
+        
+        outcomes = SignalOutcomeEngine(bars).resolve(times, longs, targets, stops, timedelta(days=7))
+        
+        for k, i in enumerate(pending):
+            status = outcomes.status[k]
+            if status == outcome_engine.NO_DATA:
+                results[i] = self._unexecuted_result('NO_DATA')
+                continue
+            
+            entry_price = entries[k]
+            execution_price = float(outcomes.exit_price[k])
+            execution_time = bars.timestamp_at(outcomes.bar[k]).to_pydatetime()
+            direction = 1 if longs[k] else -1
+            profit_loss = direction * (execution_price - entry_price) / entry_price * 100
+            
+            if status == outcome_engine.TARGET_HIT:
+                execution_status, is_profitable = 'TARGET_HIT', True
+            elif status == outcome_engine.STOP_HIT:
+                execution_status, is_profitable = 'STOP_LOSS_HIT', False
             else:
-                # No execution possible
-                return {
-                    'is_executed': False,
-                    'executed_at': None,
-                    'execution_price': None,
-                    'is_profitable': None,
-                    'profit_loss': 0.0,
-                    'execution_status': 'NO_DATA'
-                }
+                # No target or stop loss hit: executed at the last available price
+                execution_status = 'CLOSE_PRICE'
+                is_profitable = direction * (execution_price - entry_price) > 0
             
-            # Determine if signal was opened (executed) and closed (hit target or stop loss)
-            is_opened = execution_status in ['TARGET_HIT', 'STOP_LOSS_HIT', 'CLOSE_PRICE']
+            # Opened = executed; closed = hit target or stop loss
             is_closed = execution_status in ['TARGET_HIT', 'STOP_LOSS_HIT']
             
-            # Signal open date (when signal was executed/opened)
-            open_date = execution_time.isoformat() if (execution_time and is_opened) else None
-            
-            # Signal closing date (when signal hit target or stop loss)
-            closing_date = execution_time.isoformat() if (execution_time and is_closed) else None
-            
-            return {
+            results[i] = {
                 'is_executed': True,
-                'executed_at': execution_time.isoformat() if execution_time else None,
-                'open_date': open_date,  # When signal was opened/executed
-                'closing_date': closing_date,  # Only set when signal hit target or stop loss
+                'executed_at': execution_time.isoformat(),
+                'open_date': execution_time.isoformat(),  # When signal was opened/executed
+                'closing_date': execution_time.isoformat() if is_closed else None,  # Only set when signal hit target or stop loss
                 'execution_price': round(execution_price, 6),
                 'is_profitable': is_profitable,
                 'profit_loss': round(profit_loss, 2),
                 'execution_status': execution_status,
-                'is_opened': is_opened,
+                'is_opened': True,
                 'is_closed': is_closed
             }
-            
-        except Exception as e:
-            logger.error(f"Error simulating single signal execution: {e}")
-            return {
-                'is_executed': False,
-                'executed_at': None,
-                'execution_price': None,
-                'is_profitable': None,
-                'profit_loss': 0.0,
-                'execution_status': 'ERROR'
-            }
+        
+        return results
+    
+    @staticmethod
+    def _unexecuted_result(execution_status):
+        return {
+            'is_executed': False,
+            'executed_at': None,
+            'execution_price': None,
+            'is_profitable': None,
+            'profit_loss': 0.0,
+            'execution_status': execution_status
+        }
     
     def _analyze_executed_signals(self, executed_signals, symbol, start_date, end_date):
         """Analyze executed signals for performance metrics"""
@@ -1391,6 +1333,21 @@ class BacktestAPIView(View):
         }
 
 
+class BacktestJobAPIView(View):
+    """Status (and, once completed, result) of a background backtest job of the requesting user"""
+    
+    def get(self, request, job_id):
+        try:
+            # Someone else's job is reported as missing rather than forbidden
+            job = backtest_job_service.jobs_for(request_user(request)).select_related('symbol').get(pk=job_id)
+        except BacktestJob.DoesNotExist:
+            return JsonResponse({'success': False, 'error': 'Backtest job not found'}, status=404)
+        return JsonResponse({
+            'success': True,
+            'job': backtest_job_service.serialize(job, include_result=job.status == 'COMPLETED')
+        })
+
+
 class BacktestSearchAPIView(View):
     """API for managing backtest searches"""
     
@@ -1467,12 +1424,22 @@ class BacktestSearchAPIView(View):
 class TradingViewExportAPIView(View):
     """API for exporting signals to TradingView format"""
     
+    HEADERS = [
+        'Timestamp', 'Symbol', 'Signal Type', 'Strength', 'Confidence',
+        'Entry Price', 'Target Price', 'Stop Loss', 'Risk/Reward',
+        'Timeframe', 'Quality Score'
+    ]
+    FIELDS = [
+        'created_at', 'signal_type__name', 'strength', 'confidence_score', 'entry_price',
+        'target_price', 'stop_loss', 'risk_reward_ratio', 'timeframe', 'quality_score'
+    ]
+    
     @method_decorator(csrf_exempt)
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
     
     def post(self, request):
-        """Export signals to CSV for TradingView"""
+        """Export signals to CSV for TradingView, streamed as a file download"""
         try:
             data = json.loads(request.body)
             
@@ -1489,60 +1456,51 @@ class TradingViewExportAPIView(View):
             signals = TradingSignal.objects.filter(
                 symbol=symbol_obj,
                 created_at__date__range=[start_date.split('T')[0], end_date.split('T')[0]]
-            ).order_by('created_at')
-            
-            # Generate CSV content
-            csv_content = self._generate_csv_content(signals)
+            )
             
             filename = f"{symbol}_signals_{start_date.split('T')[0]}_to_{end_date.split('T')[0]}.csv"
-            
-            return JsonResponse({
-                'success': True,
-                'csv_content': csv_content,
-                'filename': filename
-            })
+            rows = (self._csv_row(symbol, row) for row in keyset_values(signals, self.FIELDS))
+            return streaming_csv_response(filename, self.HEADERS, rows, quoting=csv.QUOTE_ALL)
             
         except Exception as e:
             logger.error(f"Error exporting to TradingView: {e}")
             return JsonResponse({'success': False, 'error': str(e)})
     
-    def _generate_csv_content(self, signals):
-        """Generate CSV content for signals"""
-        headers = [
-            'Timestamp', 'Symbol', 'Signal Type', 'Strength', 'Confidence',
-            'Entry Price', 'Target Price', 'Stop Loss', 'Risk/Reward',
-            'Timeframe', 'Quality Score'
+    @staticmethod
+    def _csv_row(symbol, row):
+        """CSV row for one signal's values() dict"""
+        return [
+            row['created_at'].strftime('%Y-%m-%d %H:%M:%S'),
+            symbol,
+            row['signal_type__name'] or 'N/A',
+            row['strength'],
+            f"{row['confidence_score']:.2f}",
+            str(row['entry_price']) if row['entry_price'] else 'N/A',
+            str(row['target_price']) if row['target_price'] else 'N/A',
+            str(row['stop_loss']) if row['stop_loss'] else 'N/A',
+            str(row['risk_reward_ratio']) if row['risk_reward_ratio'] else 'N/A',
+            row['timeframe'] or 'N/A',
+            str(row['quality_score']) if row['quality_score'] else 'N/A'
         ]
-        
-        rows = [headers]
-        
-        for signal in signals:
-            row = [
-                signal.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                signal.symbol.symbol,
-                signal.signal_type.name if signal.signal_type else 'N/A',
-                signal.strength,
-                f"{signal.confidence_score:.2f}",
-                str(signal.entry_price) if signal.entry_price else 'N/A',
-                str(signal.target_price) if signal.target_price else 'N/A',
-                str(signal.stop_loss) if signal.stop_loss else 'N/A',
-                str(signal.risk_reward_ratio) if signal.risk_reward_ratio else 'N/A',
-                signal.timeframe or 'N/A',
-                str(signal.quality_score) if signal.quality_score else 'N/A'
-            ]
-            rows.append(row)
-        
-        # Convert to CSV format
-        csv_lines = []
-        for row in rows:
-            csv_lines.append(','.join(f'"{str(cell)}"' for cell in row))
-        
-        return '\n'.join(csv_lines)
 
 
 class BacktestingHistoryExportAPIView(View):
     """API for exporting all backtesting history as CSV files"""
     
+    HEADERS = [
+        'Date', 'Time', 'Symbol', 'Signal Type', 'Strength', 'Confidence Score',
+        'Entry Price', 'Target Price', 'Stop Loss', 'Risk/Reward Ratio',
+        'Timeframe', 'Entry Point Type', 'Quality Score', 'Is Executed',
+        'Execution Price', 'Is Profitable', 'Profit/Loss', 'Performance %',
+        'Notes', 'Created At', 'Updated At'
+    ]
+    FIELDS = [
+        'created_at', 'updated_at', 'signal_type__name', 'strength', 'confidence_score',
+        'entry_price', 'target_price', 'stop_loss', 'risk_reward_ratio', 'timeframe',
+        'entry_point_type', 'quality_score', 'is_executed', 'execution_price',
+        'is_profitable', 'profit_loss', 'notes'
+    ]
+    
     @method_decorator(csrf_exempt)
     @method_decorator(login_required)
     def dispatch(self, *args, **kwargs):
@@ -1564,63 +1522,49 @@ class BacktestingHistoryExportAPIView(View):
             return JsonResponse({'success': False, 'error': str(e)})
     
     def _export_all_backtesting_history(self):
-        """Export all backtesting signals for each cryptocurrency as separate CSV files"""
+        """Stream a ZIP with one CSV of backtesting signals per cryptocurrency"""
         try:
-            # Get all backtesting signals grouped by symbol
-            backtesting_signals = TradingSignal.objects.filter(
-                metadata__is_backtesting=True
-            ).select_related('symbol', 'signal_type').order_by('symbol__symbol', 'created_at')
+            backtesting_signals = TradingSignal.objects.filter(metadata__is_backtesting=True)
+            totals = backtesting_signals.aggregate(
+                total_signals=Count('id'),
+                symbols_count=Count('symbol', distinct=True)
+            )
             
-            if not backtesting_signals.exists():
+            if not totals['total_signals']:
                 return JsonResponse({
                     'success': False, 
                     'error': 'No backtesting history found'
                 })
             
-            # Group signals by symbol
-            signals_by_symbol = {}
-            for signal in backtesting_signals:
-                symbol = signal.symbol.symbol
-                if symbol not in signals_by_symbol:
-                    signals_by_symbol[symbol] = []
-                signals_by_symbol[symbol].append(signal)
-            
-            # Create ZIP file in memory
-            zip_buffer = io.BytesIO()
-            
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                # Create CSV file for each symbol
-                for symbol, signals in signals_by_symbol.items():
-                    csv_content = self._generate_csv_for_symbol(symbol, signals)
-                    filename = f"{symbol}_backtesting_history.csv"
-                    zip_file.writestr(filename, csv_content)
-            
-            # Prepare ZIP file for download
-            zip_buffer.seek(0)
-            zip_data = base64.b64encode(zip_buffer.getvalue()).decode('utf-8')
+            symbols = list(
+                backtesting_signals.order_by('symbol__symbol')
+                .values_list('symbol_id', 'symbol__symbol').distinct()
+            )
+            # Each CSV is generated from paged values() rows while the archive is sent
+            entries = (
+                (
+                    f"{symbol}_backtesting_history.csv",
+                    csv_chunks(self.HEADERS, (
+                        self._history_row(symbol, row)
+                        for row in keyset_values(backtesting_signals.filter(symbol_id=symbol_id), self.FIELDS)
+                    ))
+                )
+                for symbol_id, symbol in symbols
+            )
             
             timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-            zip_filename = f"backtesting_history_all_cryptos_{timestamp}.zip"
-            
-            return JsonResponse({
-                'success': True,
-                'files': {
-                    'zip_data': zip_data,
-                    'filename': zip_filename,
-                    'symbols_count': len(signals_by_symbol),
-                    'total_signals': backtesting_signals.count()
-                }
-            })
+            response = streaming_zip_response(f"backtesting_history_all_cryptos_{timestamp}.zip", entries)
+            response['X-Export-Symbols-Count'] = str(totals['symbols_count'])
+            response['X-Export-Total-Signals'] = str(totals['total_signals'])
+            return response
             
         except Exception as e:
             logger.error(f"Error exporting backtesting history: {e}")
             return JsonResponse({'success': False, 'error': str(e)})
     
-    def _generate_csv_for_symbol(self, symbol, signals):
-        """Generate CSV content for a specific symbol"""
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
+    @staticmethod
+    def _history_row(symbol, row):
+        """CSV row for one backtesting signal's values() dict"""
         # Safe float conversion helper
         def safe_float_export(value, default=0.0):
             if value is None:
@@ -1630,55 +1574,41 @@ class BacktestingHistoryExportAPIView(View):
             except (TypeError, ValueError):
                 return default
         
-        # CSV Headers
-        headers = [
-            'Date', 'Time', 'Symbol', 'Signal Type', 'Strength', 'Confidence Score',
-            'Entry Price', 'Target Price', 'Stop Loss', 'Risk/Reward Ratio',
-            'Timeframe', 'Entry Point Type', 'Quality Score', 'Is Executed',
-            'Execution Price', 'Is Profitable', 'Profit/Loss', 'Performance %',
-            'Notes', 'Created At', 'Updated At'
-        ]
-        writer.writerow(headers)
-        
-        # Add signal data
-        for signal in signals:
-            # Calculate performance percentage with safe float conversion
-            performance_pct = 0
-            if signal.is_executed and signal.execution_price and signal.entry_price:
-                exec_price = safe_float_export(signal.execution_price, 0)
-                entry_price = safe_float_export(signal.entry_price, 0)
-                if entry_price > 0:
-                    if signal.signal_type.name in ['BUY', 'STRONG_BUY']:
-                        performance_pct = ((exec_price - entry_price) / entry_price) * 100
-                    else:
-                        performance_pct = ((entry_price - exec_price) / entry_price) * 100
-            
-            row = [
-                signal.created_at.strftime('%Y-%m-%d'),
-                signal.created_at.strftime('%H:%M:%S'),
-                symbol,
-                signal.signal_type.name if signal.signal_type else 'N/A',
-                signal.strength or 'N/A',
-                f"{signal.confidence_score:.2f}" if signal.confidence_score else 'N/A',
-                str(signal.entry_price) if signal.entry_price else 'N/A',
-                str(signal.target_price) if signal.target_price else 'N/A',
-                str(signal.stop_loss) if signal.stop_loss else 'N/A',
-                f"{signal.risk_reward_ratio:.2f}" if signal.risk_reward_ratio else 'N/A',
-                signal.timeframe or 'N/A',
-                signal.entry_point_type or 'N/A',
-                f"{signal.quality_score:.2f}" if signal.quality_score else 'N/A',
-                'Yes' if signal.is_executed else 'No',
-                str(signal.execution_price) if signal.execution_price else 'N/A',
-                'Yes' if signal.is_profitable else 'No' if signal.is_profitable is not None else 'N/A',
-                str(signal.profit_loss) if signal.profit_loss else 'N/A',
-                f"{performance_pct:.2f}%" if performance_pct else 'N/A',
-                signal.notes or 'N/A',
-                signal.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                signal.updated_at.strftime('%Y-%m-%d %H:%M:%S') if signal.updated_at else 'N/A'
-            ]
-            writer.writerow(row)
+        # Calculate performance percentage with safe float conversion
+        performance_pct = 0
+        if row['is_executed'] and row['execution_price'] and row['entry_price']:
+            exec_price = safe_float_export(row['execution_price'], 0)
+            entry_price = safe_float_export(row['entry_price'], 0)
+            if entry_price > 0:
+                if row['signal_type__name'] in ['BUY', 'STRONG_BUY']:
+                    performance_pct = ((exec_price - entry_price) / entry_price) * 100
+                else:
+                    performance_pct = ((entry_price - exec_price) / entry_price) * 100
         
-        return output.getvalue()
+        created_at = row['created_at']
+        return [
+            created_at.strftime('%Y-%m-%d'),
+            created_at.strftime('%H:%M:%S'),
+            symbol,
+            row['signal_type__name'] or 'N/A',
+            row['strength'] or 'N/A',
+            f"{row['confidence_score']:.2f}" if row['confidence_score'] else 'N/A',
+            str(row['entry_price']) if row['entry_price'] else 'N/A',
+            str(row['target_price']) if row['target_price'] else 'N/A',
+            str(row['stop_loss']) if row['stop_loss'] else 'N/A',
+            f"{row['risk_reward_ratio']:.2f}" if row['risk_reward_ratio'] else 'N/A',
+            row['timeframe'] or 'N/A',
+            row['entry_point_type'] or 'N/A',
+            f"{row['quality_score']:.2f}" if row['quality_score'] else 'N/A',
+            'Yes' if row['is_executed'] else 'No',
+            str(row['execution_price']) if row['execution_price'] else 'N/A',
+            'Yes' if row['is_profitable'] else 'No' if row['is_profitable'] is not None else 'N/A',
+            str(row['profit_loss']) if row['profit_loss'] else 'N/A',
+            f"{performance_pct:.2f}%" if performance_pct else 'N/A',
+            row['notes'] or 'N/A',
+            created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            row['updated_at'].strftime('%Y-%m-%d %H:%M:%S') if row['updated_at'] else 'N/A'
+        ]
 
 
 class AvailableSymbolsAPIView(View):
@@ -16,6 +16,9 @@ from django.db import transaction
 from apps.signals.models import TradeLog, BacktestResult, TradingSignal, Symbol
 from apps.data.models import MarketData
 from apps.signals.strategy_engine import StrategyEngine
+from apps.analytics.backtest_engine import (
+    BacktestRun, ColumnarBacktestEngine, EXIT_REASONS, sma_crossover_signals,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -196,61 +199,17 @@ class Phase2BacktestingService:
     def _simulate_simple_strategy(self, data: pd.DataFrame):
         """Simulate a simple moving average crossover strategy"""
         try:
-            # Calculate moving averages
-            data['sma_20'] = data['close'].rolling(window=20).mean()
-            data['sma_50'] = data['close'].rolling(window=50).mean()
-            
-            # Process each data point
-            for i, (timestamp, row) in enumerate(data.iterrows()):
-                if i < 50:  # Need enough data for indicators
-                    continue
-                
-                current_price = row['close']
-                sma_20 = row['sma_20']
-                sma_50 = row['sma_50']
-                
-                # Update equity curve
-                self._update_equity_curve(current_price, timestamp)
-                
-                # Generate signals
-                signals = []
-                
-                # Buy signal: SMA crossover bullish
-                if (sma_20 > sma_50 and 
-                    data.iloc[i-1]['sma_20'] <= data.iloc[i-1]['sma_50'] and
-                    current_price > sma_20):
-                    signals.append({
-                        'type': 'BUY',
-                        'price': current_price,
-                        'confidence': 0.8,
-                        'stop_loss': current_price * 0.95,  # 5% stop loss
-                        'take_profit': current_price * 1.15,  # 15% take profit
-                        'reason': 'SMA crossover bullish'
-                    })
-                
-                # Sell signal: SMA crossover bearish
-                elif (sma_20 < sma_50 and 
-                      data.iloc[i-1]['sma_20'] >= data.iloc[i-1]['sma_50'] and
-                      current_price < sma_20):
-                    signals.append({
-                        'type': 'SELL',
-                        'price': current_price,
-                        'confidence': 0.8,
-                        'stop_loss': current_price * 1.05,  # 5% stop loss
-                        'take_profit': current_price * 0.85,  # 15% take profit
-                        'reason': 'SMA crossover bearish'
-                    })
-                
-                # Execute signals
-                for signal in signals:
-                    self._execute_signal(signal, current_price, timestamp)
-                
-                # Update positions
-                self._update_positions(current_price, timestamp)
-            
-            # Close remaining positions
-            if len(data) > 0:
-                self._close_all_positions(data.iloc[-1]['close'], data.index[-1])
+            close = data['close'].to_numpy(dtype=np.float64)
+            engine = ColumnarBacktestEngine(
+                initial_capital=float(self.initial_capital),
+                commission_rate=float(self.commission_rate),
+                slippage=float(self.slippage_rate),
+                position_fraction=0.1,
+                stop_loss=0.05,  # 5% stop loss
+                take_profit=0.15,  # 15% take profit
+            )
+            run = engine.run(close, sma_crossover_signals(close, fast=20, slow=50), data.index.to_numpy())
+            self._record_run(run, warmup=50)  # Need enough data for indicators
                 
         except Exception as e:
             logger.error(f"Error simulating simple strategy: {e}")
@@ -261,168 +220,35 @@ class Phase2BacktestingService:
         # to work with historical data rather than real-time data
         return []
     
-    def _execute_signal(self, signal: Dict, current_price: float, timestamp: datetime):
-        """Execute a trading signal"""
-        try:
-            signal_type = signal['type']
-            symbol_key = self.symbol.symbol
-            
-            if signal_type == 'BUY' and self.current_capital > 0:
-                # Calculate position size (10% of capital per trade)
-                position_size = self.current_capital * Decimal('0.1')
-                shares = position_size / Decimal(str(current_price))
-                
-                # Apply slippage and commission
-                execution_price = current_price * (1 + float(self.slippage_rate))
-                commission = position_size * self.commission_rate
-                total_cost = position_size + commission
-                
-                if total_cost <= self.current_capital:
-                    # Create trade log entry
-                    trade = TradeLog(
-                        symbol=self.symbol,
-                        trade_type='BUY',
-                        entry_price=Decimal(str(execution_price)),
-                        quantity=shares,
-                        stop_loss=Decimal(str(signal.get('stop_loss', 0))),
-                        take_profit=Decimal(str(signal.get('take_profit', 0))),
-                        entry_time=timestamp,
-                        commission=commission,
-                        slippage=position_size * self.slippage_rate,
-                        backtest_id=self.backtest_id,
-                        strategy_name=self.strategy_name,
-                        is_open=True
-                    )
-                    
-                    self.trades.append(trade)
-                    
-                    # Update capital and positions
-                    self.current_capital -= total_cost
-                    self.positions[symbol_key] = {
-                        'shares': shares,
-                        'entry_price': execution_price,
-                        'entry_timestamp': timestamp,
-                        'trade': trade
-                    }
-                    
-                    logger.debug(f"Executed BUY: {shares:.4f} shares at {execution_price:.2f}")
-            
-            elif signal_type == 'SELL' and symbol_key in self.positions:
-                position = self.positions[symbol_key]
-                shares = position['shares']
-                
-                # Apply slippage and commission
-                execution_price = current_price * (1 - float(self.slippage_rate))
-                trade_value = shares * Decimal(str(execution_price))
-                commission = trade_value * self.commission_rate
-                net_proceeds = trade_value - commission
-                
-                # Update the trade log
-                trade = position['trade']
-                trade.exit_price = Decimal(str(execution_price))
-                trade.exit_time = timestamp
-                trade.exit_reason = 'SIGNAL_EXIT'
-                trade.is_open = False
-                trade.calculate_pnl()
-                
-                # Update capital and remove position
-                self.current_capital += net_proceeds
-                del self.positions[symbol_key]
-                
-                logger.debug(f"Executed SELL: {shares:.4f} shares at {execution_price:.2f}")
-                
-        except Exception as e:
-            logger.error(f"Error executing signal: {e}")
-    
-    def _update_equity_curve(self, current_price: float, timestamp: datetime):
-        """Update equity curve with current portfolio value"""
-        try:
-            # Calculate current portfolio value
-            portfolio_value = self.current_capital
-            
-            # Add value of open positions
-            for symbol_key, position in self.positions.items():
-                shares = position['shares']
-                position_value = shares * Decimal(str(current_price))
-                portfolio_value += position_value
-            
-            self.equity_curve.append({
-                'timestamp': timestamp,
-                'equity': float(portfolio_value),
-                'capital': float(self.current_capital)
-            })
-            
-        except Exception as e:
-            logger.error(f"Error updating equity curve: {e}")
-    
-    def _update_positions(self, current_price: float, timestamp: datetime):
-        """Update positions and check for stop loss/take profit"""
-        try:
-            for symbol_key, position in list(self.positions.items()):
-                trade = position['trade']
-                shares = position['shares']
-                entry_price = position['entry_price']
-                
-                # Check stop loss
-                if trade.stop_loss and trade.stop_loss > 0:
-                    if trade.trade_type == 'BUY' and current_price <= float(trade.stop_loss):
-                        self._close_position(symbol_key, trade.stop_loss, timestamp, 'STOP_LOSS')
-                        continue
-                    elif trade.trade_type == 'SELL' and current_price >= float(trade.stop_loss):
-                        self._close_position(symbol_key, trade.stop_loss, timestamp, 'STOP_LOSS')
-                        continue
-                
-                # Check take profit
-                if trade.take_profit and trade.take_profit > 0:
-                    if trade.trade_type == 'BUY' and current_price >= float(trade.take_profit):
-                        self._close_position(symbol_key, trade.take_profit, timestamp, 'TAKE_PROFIT')
-                        continue
-                    elif trade.trade_type == 'SELL' and current_price <= float(trade.take_profit):
-                        self._close_position(symbol_key, trade.take_profit, timestamp, 'TAKE_PROFIT')
-                        continue
-                        
-        except Exception as e:
-            logger.error(f"Error updating positions: {e}")
-    
-    def _close_position(self, symbol_key: str, exit_price: Decimal, timestamp: datetime, reason: str):
-        """Close a position"""
-        try:
-            if symbol_key not in self.positions:
-                return
-            
-            position = self.positions[symbol_key]
-            trade = position['trade']
-            shares = position['shares']
-            
-            # Update trade log
-            trade.exit_price = exit_price
-            trade.exit_time = timestamp
-            trade.exit_reason = reason
-            trade.is_open = False
+    def _record_run(self, run: BacktestRun, warmup: int = 0):
+        """Turn a simulated run into TradeLog entries, the equity curve and daily returns"""
+        trades = run.trades
+        for i in range(len(trades)):
+            entry_price = float(trades.entry_price[i])
+            signal_price = float(run.close[trades.entry_bar[i]])
+            trade = TradeLog(
+                symbol=self.symbol,
+                trade_type='BUY',
+                entry_price=Decimal(str(entry_price)),
+                quantity=Decimal(str(float(trades.shares[i]))),
+                stop_loss=Decimal(str(signal_price * 0.95)),
+                take_profit=Decimal(str(signal_price * 1.15)),
+                entry_time=run.timestamp_at(int(trades.entry_bar[i])),
+                commission=Decimal(str(float(trades.entry_commission[i]))),
+                slippage=Decimal(str(float(trades.position_size[i]))) * self.slippage_rate,
+                backtest_id=self.backtest_id,
+                strategy_name=self.strategy_name,
+                exit_price=Decimal(str(float(trades.exit_price[i]))),
+                exit_time=run.timestamp_at(int(trades.exit_bar[i])),
+                exit_reason=EXIT_REASONS[int(trades.exit_reason[i])],
+                is_open=False
+            )
             trade.calculate_pnl()
-            
-            # Calculate proceeds
-            trade_value = shares * exit_price
-            commission = trade_value * self.commission_rate
-            net_proceeds = trade_value - commission
-            
-            # Update capital and remove position
-            self.current_capital += net_proceeds
-            del self.positions[symbol_key]
-            
-            logger.debug(f"Closed position: {shares:.4f} shares at {exit_price:.2f} ({reason})")
-            
-        except Exception as e:
-            logger.error(f"Error closing position: {e}")
-    
-    def _close_all_positions(self, current_price: float, timestamp: datetime):
-        """Close all remaining positions at the end of backtest"""
-        try:
-            for symbol_key in list(self.positions.keys()):
-                self._close_position(symbol_key, Decimal(str(current_price)), timestamp, 'TIME_EXIT')
-                
-        except Exception as e:
-            logger.error(f"Error closing all positions: {e}")
+            self.trades.append(trade)
+        
+        self.equity_curve = run.equity_records()[warmup:]
+        self.daily_returns = run.returns[warmup:].tolist()
+        self.current_capital = Decimal(str(run.final_capital))
     
     def _calculate_comprehensive_metrics(self) -> Dict:
         """Calculate comprehensive performance metrics"""
@@ -16,6 +16,8 @@ from django.core.cache import cache
 
 from apps.trading.models import Symbol
 from apps.data.models import MarketData, TechnicalIndicator
+from apps.data.candle_store import get_candle_store
+from apps.data.indicator_engine import get_incremental_indicator_service
 from apps.signals.models import TradingSignal, SignalType
 from apps.signals.strategies import (
     MovingAverageCrossoverStrategy,
@@ -522,24 +524,20 @@ class DatabaseTechnicalAnalysis:
     def calculate_indicators_from_database(self, symbol: Symbol, hours_back: int = 168) -> Optional[Dict]:
         """Calculate indicators using database data (default: 1 week)"""
         try:
-            # Get market data
-            market_data = MarketData.objects.filter(
-                symbol=symbol,
-                timeframe='1h',
-                timestamp__gte=timezone.now() - timedelta(hours=hours_back)
-            ).order_by('timestamp')
+            # Get market data from the shared candle store
+            window = get_candle_store().get_window(symbol, '1h', hours_back).since(
+                timezone.now() - timedelta(hours=hours_back)
+            )
             
-            if market_data.count() < 20:
-                logger.warning(f"Insufficient data for {symbol.symbol}: {market_data.count()} points")
+            if len(window) < 20:
+                logger.warning(f"Insufficient data for {symbol.symbol}: {len(window)} points")
                 return None
             
             # Convert to DataFrame
-            df = self._market_data_to_dataframe(market_data)
-            if df is None:
-                return None
+            df = window.to_dataframe().set_index('timestamp')
             
-            # Calculate indicators
-            indicators = self._calculate_all_indicators(df)
+            # Calculate indicators, taking the ones the incremental engine keeps from its state
+            indicators = self._calculate_all_indicators(df, self._stored_indicators(symbol))
             return indicators
             
         except Exception as e:
@@ -570,31 +568,53 @@ class DatabaseTechnicalAnalysis:
             logger.error(f"Error converting market data to DataFrame: {e}")
             return None
     
-    def _calculate_all_indicators(self, df: pd.DataFrame) -> Dict:
-        """Calculate all technical indicators"""
+    def _stored_indicators(self, symbol: Symbol) -> Optional[Dict]:
+        """Moving averages, RSI, MACD and Bollinger Bands from IndicatorState, or None when it is missing or stale"""
+        try:
+            values = get_incremental_indicator_service().stored_values(symbol, '1h', {
+                'sma_short': 20, 'sma_long': 50, 'ema_short': 12, 'ema_long': 26, 'macd_signal': 9,
+                'rsi_period': 14, 'bollinger_period': 20, 'bollinger_std': 2,
+            })
+        except Exception as e:
+            logger.warning(f"Indicator state unavailable for {symbol.symbol}, recomputing: {e}")
+            return None
+        if values is None:
+            return None
+        stored = {key: values.get(key) for key in (
+            'sma_20', 'sma_50', 'ema_12', 'ema_26', 'rsi', 'macd', 'macd_signal', 'macd_histogram'
+        )}
+        stored.update(bb_upper=values.get('bollinger_upper'), bb_middle=values.get('bollinger_middle'),
+                      bb_lower=values.get('bollinger_lower'))
+        return None if any(value is None for value in stored.values()) else stored
+    
+    def _calculate_all_indicators(self, df: pd.DataFrame, stored: Optional[Dict] = None) -> Dict:
+        """Calculate all technical indicators; ``stored`` replaces the moving average, RSI, MACD and Bollinger computations"""
         indicators = {}
         
         try:
-            # Moving averages
-            indicators['sma_20'] = df['close'].rolling(20).mean().iloc[-1] if len(df) >= 20 else None
-            indicators['sma_50'] = df['close'].rolling(50).mean().iloc[-1] if len(df) >= 50 else None
-            indicators['ema_12'] = df['close'].ewm(span=12).mean().iloc[-1]
-            indicators['ema_26'] = df['close'].ewm(span=26).mean().iloc[-1]
-            
-            # RSI
-            indicators['rsi'] = self._calculate_rsi(df['close'], 14)
-            
-            # MACD
-            macd_line, signal_line, histogram = self._calculate_macd(df['close'])
-            indicators['macd'] = macd_line.iloc[-1] if not macd_line.empty else None
-            indicators['macd_signal'] = signal_line.iloc[-1] if not signal_line.empty else None
-            indicators['macd_histogram'] = histogram.iloc[-1] if not histogram.empty else None
-            
-            # Bollinger Bands
-            bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(df['close'])
-            indicators['bb_upper'] = bb_upper.iloc[-1] if not bb_upper.empty else None
-            indicators['bb_middle'] = bb_middle.iloc[-1] if not bb_middle.empty else None
-            indicators['bb_lower'] = bb_lower.iloc[-1] if not bb_lower.empty else None
+            if stored:
+                indicators.update(stored)
+            else:
+                # Moving averages
+                indicators['sma_20'] = df['close'].rolling(20).mean().iloc[-1] if len(df) >= 20 else None
+                indicators['sma_50'] = df['close'].rolling(50).mean().iloc[-1] if len(df) >= 50 else None
+                indicators['ema_12'] = df['close'].ewm(span=12).mean().iloc[-1]
+                indicators['ema_26'] = df['close'].ewm(span=26).mean().iloc[-1]
+                
+                # RSI
+                indicators['rsi'] = self._calculate_rsi(df['close'], 14)
+                
+                # MACD
+                macd_line, signal_line, histogram = self._calculate_macd(df['close'])
+                indicators['macd'] = macd_line.iloc[-1] if not macd_line.empty else None
+                indicators['macd_signal'] = signal_line.iloc[-1] if not signal_line.empty else None
+                indicators['macd_histogram'] = histogram.iloc[-1] if not histogram.empty else None
+                
+                # Bollinger Bands
+                bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(df['close'])
+                indicators['bb_upper'] = bb_upper.iloc[-1] if not bb_upper.empty else None
+                indicators['bb_middle'] = bb_middle.iloc[-1] if not bb_middle.empty else None
+                indicators['bb_lower'] = bb_lower.iloc[-1] if not bb_lower.empty else None
             
             # Volume indicators
             indicators['volume_sma'] = df['volume'].rolling(20).mean().iloc[-1] if len(df) >= 20 else None
@@ -15,6 +15,7 @@ from apps.signals.models import (
     TradingSignal, SignalType, SignalAlert, SignalPerformance,
     MarketRegime
 )
+from apps.signals import signal_cache
 from apps.signals.database_signal_service import database_signal_service
 from apps.signals.database_technical_analysis import database_technical_analysis
 from apps.signals.database_data_utils import (
@@ -239,27 +240,15 @@ def generate_ml_signals_task():
         
         logger.info(f"Generating ML signals for {active_symbols.count()} symbols using {ML_MODEL_NAME}")
         
-        # Generate signals for all symbols
-        all_signals = []
-        processed_count = 0
-        
-        for symbol in active_symbols:
-            try:
-                signals = ml_service.generate_signals_for_symbol(
-                    symbol=symbol,
-                    prediction_horizon_hours=24,
-                    min_confidence=ML_MIN_CONFIDENCE
-                )
-                if signals:
-                    all_signals.extend(signals)
-                processed_count += 1
-                
-                if processed_count % 50 == 0:
-                    logger.info(f"Processed {processed_count}/{active_symbols.count()} symbols")
-                    
-            except Exception as e:
-                logger.error(f"Error generating ML signals for {symbol.symbol}: {e}")
-                continue
+        # Generate signals for all symbols (features per symbol, one batched model call)
+        active_symbols = list(active_symbols)
+        results = ml_service.generate_signals_for_all_symbols(
+            symbols=active_symbols,
+            prediction_horizon_hours=24,
+            min_confidence=ML_MIN_CONFIDENCE
+        )
+        all_signals = [signal for signals in results.values() for signal in signals]
+        processed_count = len(active_symbols)
         
         # Select best signals by confidence score
         all_signals.sort(key=lambda s: s.confidence_score, reverse=True)
@@ -636,8 +625,8 @@ def cleanup_database_signal_cache():
         database_technical_analysis.clear_indicators_cache()
         
         # Clear any other signal-related cache
+        signal_cache.invalidate_signals()
         cache_keys_to_clear = [
-            'signal_statistics',
             'database_health_status',
             'symbols_with_recent_data'
         ]
@@ -15,10 +15,17 @@ from django.db.models import Q, Count, Avg, Max, Min
 
 from apps.trading.models import Symbol
 from apps.data.models import MarketData, TechnicalIndicator
-from apps.signals.database_data_utils import get_recent_market_data
+from apps.data.candle_store import get_candle_store
+from apps.data.indicator_engine import get_incremental_indicator_service
 
 logger = logging.getLogger(__name__)
 
+# Indicators the incremental engine keeps in IndicatorState, under the keys used here
+STATE_INDICATORS = (
+    'sma_20', 'sma_50', 'ema_12', 'ema_26', 'rsi', 'macd', 'macd_signal', 'macd_histogram',
+    'bollinger_upper', 'bollinger_middle', 'bollinger_lower', 'stoch_k', 'stoch_d', 'atr', 'adx',
+)
+
 
 class DatabaseTechnicalAnalysis:
     """Calculate technical indicators from database data"""
@@ -45,8 +52,16 @@ class DatabaseTechnicalAnalysis:
         try:
             logger.info(f"Calculating indicators for {symbol.symbol} ({hours_back} hours)")
             
-            # Get market data from database
-            market_data = get_recent_market_data(symbol, hours_back)
+            # Get market data from the shared candle store
+            window = get_candle_store().get_window(symbol, '1h', hours_back).since(
+                timezone.now() - timedelta(hours=hours_back)
+            )
+            market_data = window.to_dataframe().rename(columns={
+                'open': 'open_price',
+                'high': 'high_price',
+                'low': 'low_price',
+                'close': 'close_price',
+            })
             
             if market_data.empty:
                 logger.warning(f"No market data available for {symbol.symbol}")
@@ -56,8 +71,8 @@ class DatabaseTechnicalAnalysis:
                 logger.warning(f"Insufficient data for {symbol.symbol}: {len(market_data)} records")
                 return None
             
-            # Calculate all indicators
-            indicators = self._calculate_all_indicators(market_data)
+            # Calculate all indicators, taking the ones the incremental engine keeps from its state
+            indicators = self._calculate_all_indicators(market_data, self._stored_indicators(symbol))
             
             # Store indicators in database
             self._store_indicators(symbol, indicators, market_data.iloc[-1]['timestamp'])
@@ -69,8 +84,25 @@ class DatabaseTechnicalAnalysis:
             logger.error(f"Error calculating indicators for {symbol.symbol}: {e}")
             return None
     
-    def _calculate_all_indicators(self, df: pd.DataFrame) -> Dict[str, float]:
-        """Calculate all technical indicators"""
+    def _stored_indicators(self, symbol: Symbol) -> Optional[Dict[str, float]]:
+        """STATE_INDICATORS from IndicatorState, or None when it is missing, built with other periods or stale"""
+        periods = {
+            name: self.default_periods[name]
+            for name in ('sma_short', 'sma_long', 'ema_short', 'ema_long', 'rsi_period', 'macd_signal',
+                         'bollinger_period', 'bollinger_std', 'stoch_k', 'stoch_d', 'atr_period')
+        }
+        periods['adx_period'] = 14  # _calculate_adx
+        try:
+            values = get_incremental_indicator_service().stored_values(symbol, '1h', periods)
+        except Exception as e:
+            logger.warning(f"Indicator state unavailable for {symbol.symbol}, recomputing: {e}")
+            return None
+        if values is None or any(values.get(key) is None for key in STATE_INDICATORS):
+            return None
+        return {key: float(values[key]) for key in STATE_INDICATORS}
+    
+    def _calculate_all_indicators(self, df: pd.DataFrame, stored: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Calculate all technical indicators; ``stored`` replaces the STATE_INDICATORS computations"""
         try:
             indicators = {}
             
@@ -84,20 +116,21 @@ class DatabaseTechnicalAnalysis:
             open_prices = df['open_price']
             volumes = df['volume']
             
-            # Moving Averages
-            indicators.update(self._calculate_moving_averages(close_prices))
-            
-            # RSI
-            indicators['rsi'] = self._calculate_rsi(close_prices)
-            
-            # MACD
-            indicators.update(self._calculate_macd(close_prices))
-            
-            # Bollinger Bands
-            indicators.update(self._calculate_bollinger_bands(close_prices))
-            
-            # Stochastic Oscillator
-            indicators.update(self._calculate_stochastic(high_prices, low_prices, close_prices))
+            if not stored:
+                # Moving Averages
+                indicators.update(self._calculate_moving_averages(close_prices))
+                
+                # RSI
+                indicators['rsi'] = self._calculate_rsi(close_prices)
+                
+                # MACD
+                indicators.update(self._calculate_macd(close_prices))
+                
+                # Bollinger Bands
+                indicators.update(self._calculate_bollinger_bands(close_prices))
+                
+                # Stochastic Oscillator
+                indicators.update(self._calculate_stochastic(high_prices, low_prices, close_prices))
             
             # Williams %R
             indicators['williams_r'] = self._calculate_williams_r(high_prices, low_prices, close_prices)
@@ -106,7 +139,8 @@ class DatabaseTechnicalAnalysis:
             indicators['cci'] = self._calculate_cci(high_prices, low_prices, close_prices)
             
             # Average True Range (ATR)
-            indicators['atr'] = self._calculate_atr(high_prices, low_prices, close_prices)
+            if not stored:
+                indicators['atr'] = self._calculate_atr(high_prices, low_prices, close_prices)
             
             # Volume indicators
             indicators.update(self._calculate_volume_indicators(close_prices, volumes))
@@ -117,6 +151,10 @@ class DatabaseTechnicalAnalysis:
             # Momentum indicators
             indicators.update(self._calculate_momentum_indicators(close_prices))
             
+            if stored:
+                # ADX too, replacing the one the trend indicators computed from the window
+                indicators.update(stored)
+            
             return indicators
             
         except Exception as e:
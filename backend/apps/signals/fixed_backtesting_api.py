@@ -15,6 +15,8 @@ from django.db.models import Q
 
 from apps.trading.models import Symbol
 from apps.signals.models import TradingSignal
+from apps.signals.backtest_jobs import backtest_job_service, wants_async
+from apps.signals.backtesting_api import backtest_job_response, request_user
 from apps.data.models import MarketData
 
 logger = logging.getLogger(__name__)
@@ -64,31 +66,16 @@ class FixedBacktestAPIView(View):
                     'error': f'Symbol {symbol_name} not found or not active'
                 }, status=404)
             
-            # Run FIXED backtest
-            logger.info(f"Running FIXED backtest for {symbol_name} from {start_date.date()} to {end_date.date()}")
-            
-            backtest_results = self._run_fixed_backtest(symbol, start_date, end_date)
-            
-            # Prepare response
-            response_data = {
-                'success': True,
-                'backtest_results': backtest_results,
-                'metadata': {
-                    'symbol': symbol_name,
-                    'start_date': start_date.isoformat(),
-                    'end_date': end_date.isoformat(),
-                    'backtest_timestamp': timezone.now().isoformat(),
-                    'fixes_applied': {
-                        'sell_signal_execution': 'FIXED - SELL signals now execute at correct prices',
-                        'target_hit_logic': 'FIXED - Target price execution logic corrected',
-                        'profit_loss_calculation': 'FIXED - P&L calculation for SELL signals corrected'
-                    }
-                }
-            }
+            # Long ranges can run as a background job ("async": true); either way an
+            # identical earlier run is served from its stored result
+            if wants_async(data):
+                return backtest_job_response(request, 'fixed', symbol, start_date, end_date, data)
             
-            logger.info(f"FIXED backtest completed for {symbol_name}: {backtest_results['total_signals']} signals processed")
-            
-            return JsonResponse(response_data)
+            return JsonResponse(backtest_job_service.run_cached(
+                'fixed', symbol, start_date, end_date, data,
+                lambda: self.build_response(symbol, start_date, end_date),
+                user=request_user(request)
+            ))
             
         except json.JSONDecodeError:
             return JsonResponse({
@@ -102,6 +89,34 @@ class FixedBacktestAPIView(View):
                 'error': f'Backtest failed: {str(e)}'
             }, status=500)
 
+    def build_response(self, symbol: Symbol, start_date: datetime, end_date: datetime) -> dict:
+        """Run the FIXED backtest with correct signal execution logic and build the response payload"""
+        # Run FIXED backtest
+        logger.info(f"Running FIXED backtest for {symbol.symbol} from {start_date.date()} to {end_date.date()}")
+        
+        backtest_results = self._run_fixed_backtest(symbol, start_date, end_date)
+        
+        # Prepare response
+        response_data = {
+            'success': True,
+            'backtest_results': backtest_results,
+            'metadata': {
+                'symbol': symbol.symbol,
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+                'backtest_timestamp': timezone.now().isoformat(),
+                'fixes_applied': {
+                    'sell_signal_execution': 'FIXED - SELL signals now execute at correct prices',
+                    'target_hit_logic': 'FIXED - Target price execution logic corrected',
+                    'profit_loss_calculation': 'FIXED - P&L calculation for SELL signals corrected'
+                }
+            }
+        }
+        
+        logger.info(f"FIXED backtest completed for {symbol.symbol}: {backtest_results['total_signals']} signals processed")
+        
+        return response_data
+
     def _run_fixed_backtest(self, symbol: Symbol, start_date: datetime, end_date: datetime) -> dict:
         """Run FIXED backtest with correct signal execution logic"""
         try:
@@ -11,6 +11,8 @@ from typing import Dict, List, Optional
 from apps.trading.models import Symbol
 from apps.data.models import MarketData
 from apps.signals.models import TradingSignal
+from apps.signals import outcome_engine
+from apps.signals.outcome_engine import PriceBars, SignalOutcomeEngine, is_long_signal
 
 logger = logging.getLogger(__name__)
 
@@ -32,117 +34,127 @@ class FixedBacktestingService:
             Dict with execution details
         """
         try:
-            # Ensure signal timestamp is UTC
-            signal_date = signal.created_at
-            if signal_date.tzinfo is None:
-                signal_date = signal_date.replace(tzinfo=dt_timezone.utc)
-            
             # Get the exact day's data (UTC day boundary)
-            day_start = signal_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
+            day_start = self._signal_day_start(signal)
+            price_bars = self._load_daily_bars(signal.symbol, day_start, day_start + timedelta(days=1))
+            return self.verify_signals_execution([signal], price_bars)[0]
+                    
+        except Exception as e:
+            logger.error(f"Error verifying signal execution: {e}")
+            return self._error_result(e)
+
+    def verify_signals_execution(self, signals: List[TradingSignal], price_bars: PriceBars) -> List[Dict]:
+        """
+        Verify a batch of signals against daily candles in one outcome-engine call
+        
+        Each signal is checked against its UTC day's candle: target first, then stop loss,
+        otherwise it closes at the end of the day.
+        
+        Args:
+            signals: TradingSignals to verify
+            price_bars: Daily ('1d') candles covering the signals' days
             
-            # Fetch market data for the signal day
-            market_data = MarketData.objects.filter(
-                symbol=signal.symbol,
-                timestamp__gte=day_start,
-                timestamp__lt=day_end,
-                timeframe='1d'  # Use daily candles for verification
-            ).first()
+        Returns:
+            List of execution dicts, one per signal
+        """
+        results = [None] * len(signals)
+        pending, day_starts, longs, entries, targets, stops = [], [], [], [], [], []
+        for i, signal in enumerate(signals):
+            try:
+                day_start = self._signal_day_start(signal)
+                entry_price = float(signal.entry_price)
+                stop_loss = float(signal.stop_loss)
+                target_price = float(signal.target_price)
+                is_long = is_long_signal(signal.signal_type)
+                logger.debug(f"Verifying signal {signal.id}: Entry=${entry_price:.2f}, SL=${stop_loss:.2f}, Target=${target_price:.2f}")
+            except Exception as e:
+                logger.error(f"Error verifying signal execution: {e}")
+                results[i] = self._error_result(e)
+                continue
             
-            if not market_data:
-                logger.error(f"No market data found for {signal.symbol.symbol} on {signal_date.date()}")
-                return {
+            pending.append(i)
+            day_starts.append(day_start)
+            longs.append(is_long)
+            entries.append(entry_price)
+            targets.append(target_price)
+            stops.append(stop_loss)
+        
+        if not pending:
+            return results
+        
+        # Window is the signal's UTC day: [day_start, day_start + 1 day)
+        outcomes = SignalOutcomeEngine(price_bars).resolve(
+            day_starts, longs, targets, stops, timedelta(days=1), include_window_end=False
+        )
+        
+        for k, i in enumerate(pending):
+            status = outcomes.status[k]
+            if status == outcome_engine.NO_DATA:
+                signal = signals[i]
+                logger.error(f"No market data found for {signal.symbol.symbol} on {day_starts[k].date()}")
+                results[i] = {
                     'executed': False,
                     'reason': 'No market data',
                     'execution_price': None,
                     'execution_time': None,
                     'status': 'NOT_EXECUTED'
                 }
+                continue
             
-            # Verify stop loss and take profit using the day's OHLC
-            entry_price = float(signal.entry_price)
-            stop_loss = float(signal.stop_loss)
-            target_price = float(signal.target_price)
-            
-            day_high = float(market_data.high_price)
-            day_low = float(market_data.low_price)
-            day_close = float(market_data.close_price)
+            if status == outcome_engine.TARGET_HIT:
+                reason, execution_status = 'Target hit', 'TARGET_HIT'
+            elif status == outcome_engine.STOP_HIT:
+                reason, execution_status = 'Stop loss hit', 'STOP_LOSS_HIT'
+            else:
+                # No execution, close at end of day
+                reason, execution_status = 'End of day close', 'END_OF_DAY'
             
-            logger.info(f"Verifying signal {signal.id}: Entry=${entry_price:.2f}, SL=${stop_loss:.2f}, Target=${target_price:.2f}")
-            logger.info(f"Day OHLC: O=${market_data.open_price} H=${day_high:.2f} L=${day_low:.2f} C=${day_close:.2f}")
-            
-            # Check execution based on signal type
-            if signal.signal_type in ['BUY', 'STRONG_BUY']:
-                # For buy signals: check if target hit first, then stop loss
-                if day_high >= target_price:
-                    return {
-                        'executed': True,
-                        'reason': 'Target hit',
-                        'execution_price': target_price,
-                        'execution_time': market_data.timestamp,
-                        'status': 'TARGET_HIT',
-                        'pnl': (target_price - entry_price) / entry_price * 100
-                    }
-                elif day_low <= stop_loss:
-                    return {
-                        'executed': True,
-                        'reason': 'Stop loss hit',
-                        'execution_price': stop_loss,
-                        'execution_time': market_data.timestamp,
-                        'status': 'STOP_LOSS_HIT',
-                        'pnl': (stop_loss - entry_price) / entry_price * 100
-                    }
-                else:
-                    # No execution, close at end of day
-                    return {
-                        'executed': True,
-                        'reason': 'End of day close',
-                        'execution_price': day_close,
-                        'execution_time': market_data.timestamp,
-                        'status': 'END_OF_DAY',
-                        'pnl': (day_close - entry_price) / entry_price * 100
-                    }
-                    
+            execution_price = float(outcomes.exit_price[k])
+            entry_price = entries[k]
+            if longs[k]:
+                pnl = (execution_price - entry_price) / entry_price * 100
             else:  # SELL or STRONG_SELL
-                # For sell signals: check if target hit first, then stop loss
-                if day_low <= target_price:
-                    return {
-                        'executed': True,
-                        'reason': 'Target hit',
-                        'execution_price': target_price,
-                        'execution_time': market_data.timestamp,
-                        'status': 'TARGET_HIT',
-                        'pnl': (entry_price - target_price) / entry_price * 100
-                    }
-                elif day_high >= stop_loss:
-                    return {
-                        'executed': True,
-                        'reason': 'Stop loss hit',
-                        'execution_price': stop_loss,
-                        'execution_time': market_data.timestamp,
-                        'status': 'STOP_LOSS_HIT',
-                        'pnl': (entry_price - stop_loss) / entry_price * 100
-                    }
-                else:
-                    # No execution, close at end of day
-                    return {
-                        'executed': True,
-                        'reason': 'End of day close',
-                        'execution_price': day_close,
-                        'execution_time': market_data.timestamp,
-                        'status': 'END_OF_DAY',
-                        'pnl': (entry_price - day_close) / entry_price * 100
-                    }
-                    
-        except Exception as e:
-            logger.error(f"Error verifying signal execution: {e}")
-            return {
-                'executed': False,
-                'reason': f'Error: {str(e)}',
-                'execution_price': None,
-                'execution_time': None,
-                'status': 'ERROR'
+                pnl = (entry_price - execution_price) / entry_price * 100
+            
+            results[i] = {
+                'executed': True,
+                'reason': reason,
+                'execution_price': execution_price,
+                'execution_time': price_bars.timestamp_at(outcomes.bar[k]).to_pydatetime(),
+                'status': execution_status,
+                'pnl': pnl
             }
+        
+        return results
+
+    @staticmethod
+    def _signal_day_start(signal: TradingSignal) -> datetime:
+        # Ensure signal timestamp is UTC
+        signal_date = signal.created_at
+        if signal_date.tzinfo is None:
+            signal_date = signal_date.replace(tzinfo=dt_timezone.utc)
+        return signal_date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def _load_daily_bars(symbol: Symbol, start: datetime, end: datetime) -> PriceBars:
+        """Daily candles with start <= timestamp < end"""
+        rows = MarketData.objects.filter(
+            symbol=symbol,
+            timestamp__gte=start,
+            timestamp__lt=end,
+            timeframe='1d'  # Use daily candles for verification
+        ).order_by('timestamp').values_list('timestamp', 'high_price', 'low_price', 'close_price')
+        return PriceBars.from_rows(list(rows))
+
+    @staticmethod
+    def _error_result(error: Exception) -> Dict:
+        return {
+            'executed': False,
+            'reason': f'Error: {str(error)}',
+            'execution_price': None,
+            'execution_time': None,
+            'status': 'ERROR'
+        }
 
     def verify_all_signals(self, symbol: Symbol, start_date: datetime, end_date: datetime) -> List[Dict]:
         """
@@ -170,9 +182,17 @@ class FixedBacktestingService:
                 created_at__lte=end_date
             ).order_by('created_at')
             
+            signal_list = list(signals.select_related('symbol', 'signal_type'))
+            if not signal_list:
+                return []
+            
+            # One query for every day the signals fall on, then one engine pass over them
+            day_starts = [self._signal_day_start(signal) for signal in signal_list]
+            price_bars = self._load_daily_bars(symbol, min(day_starts), max(day_starts) + timedelta(days=1))
+            verifications = self.verify_signals_execution(signal_list, price_bars)
+            
             results = []
-            for signal in signals:
-                verification = self.verify_signal_execution(signal)
+            for signal, verification in zip(signal_list, verifications):
                 verification['signal_id'] = signal.id
                 verification['signal_date'] = signal.created_at
                 verification['signal_type'] = signal.signal_type
@@ -13,6 +13,7 @@ import json
 import logging
 
 from apps.trading.models import Symbol
+from apps.signals import signal_cache
 from apps.signals.improved_signal_generation_service import generate_improved_signals_for_symbol, improved_signal_service
 
 logger = logging.getLogger(__name__)
@@ -142,11 +143,10 @@ class ImprovedSignalGenerationView(View):
                 # Clear symbol-specific caches
                 cache.delete(f"current_price_{symbol_name}")
                 cache.delete(f"sync_prices_{symbol_name}")
-                cache.delete(f"signals_api_{symbol_name}_None_true_50")
+                signal_cache.invalidate_signals([symbol_name])
             else:
                 # Clear general signal caches
-                cache.delete("signal_statistics")
-                cache.delete("signals_api_None_None_true_50")
+                signal_cache.invalidate_signals()
                 
         except Exception as e:
             logger.warning(f"Error clearing caches: {e}")
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-16 20:05
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('signals', '0020_hourly_best_signal'),
+        ('trading', '0006_symbol_circulating_supply_symbol_total_supply'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BacktestJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('generate_signals', 'Generate Historical Signals'), ('backtest', 'Backtest'), ('fixed', 'Fixed Backtest'), ('upgraded', 'Upgraded Backtest')], max_length=20)),
+                ('start_date', models.DateTimeField()),
+                ('end_date', models.DateTimeField()),
+                ('parameters', models.JSONField(blank=True, default=dict, help_text='Strategy parameters the job was run with')),
+                ('data_version', models.CharField(help_text='Fingerprint of the market data and signals read', max_length=64)),
+                ('content_key', models.CharField(db_index=True, help_text='SHA-256 of the request and data version', max_length=64)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], db_index=True, default='PENDING', max_length=10)),
+                ('progress', models.PositiveSmallIntegerField(default=0, validators=[django.core.validators.MaxValueValidator(100)])),
+                ('message', models.CharField(blank=True, max_length=255)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('task_id', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('symbol', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='backtest_jobs', to='trading.symbol')),
+            ],
+            options={
+                'verbose_name': 'Backtest Job',
+                'verbose_name_plural': 'Backtest Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['content_key', 'status'], name='signals_bac_content_29526f_idx')],
+            },
+        ),
+    ]
@@ -12,24 +12,32 @@ import talib
 from django.utils import timezone
 from django.db.models import Q
 
-from apps.signals.models import MLFeature, MLModel, MLPrediction
-from apps.data.models import MarketData, TechnicalIndicator
 from apps.trading.models import Symbol
-from apps.sentiment.models import SentimentAggregate
-from apps.analytics.models import SentimentData as AnalyticsSentimentData
+from apps.signals import ml_dataset_store as datasets
 
 logger = logging.getLogger(__name__)
 
 
+def _ml_feature_class():
+    """``MLFeature``, where the Phase 3 ML tables are installed (dropped in signals migration 0014)"""
+    try:
+        from apps.signals.models import MLFeature
+        return MLFeature
+    except ImportError:
+        return None
+
+
 class MLDataCollectionService:
     """Service for collecting and preparing ML training data"""
     
     def __init__(self):
         self.logger = logger
         self.feature_cache = {}
+        self.snapshot_store = datasets.get_snapshot_store()
     
     def collect_training_data(self, symbols: List[Symbol], start_date: datetime, 
-                           end_date: datetime, prediction_horizon_hours: int = 24) -> pd.DataFrame:
+                           end_date: datetime, prediction_horizon_hours: int = 24,
+                           use_snapshot: Optional[bool] = None) -> pd.DataFrame:
         """
         Collect comprehensive training data for ML models
         
@@ -38,6 +46,8 @@ class MLDataCollectionService:
             start_date: Start date for data collection
             end_date: End date for data collection
             prediction_horizon_hours: Hours ahead to predict
+            use_snapshot: Read the combined bars from an on-disk snapshot (see
+                ``apps.signals.ml_dataset_store``); defaults to on when pyarrow is available
             
         Returns:
             DataFrame with features and labels
@@ -45,25 +55,40 @@ class MLDataCollectionService:
         try:
             self.logger.info(f"Collecting ML training data for {len(symbols)} symbols")
             
+            if use_snapshot is None:
+                use_snapshot = self.snapshot_store.available
+            snapshot_bars = None
+            if use_snapshot:
+                try:
+                    snapshot_bars = self.snapshot_store.load(symbols, start_date, end_date)
+                except Exception as e:
+                    self.logger.warning(f"Dataset snapshot unavailable, querying the database: {e}")
+            
             all_data = []
             
             for symbol in symbols:
                 self.logger.info(f"Processing {symbol.symbol}")
                 
-                # Get market data
-                market_data = self._get_market_data(symbol, start_date, end_date)
-                if market_data.empty:
-                    self.logger.warning(f"No market data for {symbol.symbol}")
-                    continue
-                
-                # Get technical indicators
-                technical_data = self._get_technical_indicators(symbol, start_date, end_date)
-                
-                # Get sentiment data
-                sentiment_data = self._get_sentiment_data(symbol, start_date, end_date)
-                
-                # Combine all data
-                symbol_data = self._combine_data_sources(market_data, technical_data, sentiment_data)
+                if snapshot_bars is not None:
+                    symbol_data = snapshot_bars.get(symbol.id, pd.DataFrame())
+                    if symbol_data.empty:
+                        self.logger.warning(f"No market data for {symbol.symbol}")
+                        continue
+                else:
+                    # Get market data
+                    market_data = self._get_market_data(symbol, start_date, end_date)
+                    if market_data.empty:
+                        self.logger.warning(f"No market data for {symbol.symbol}")
+                        continue
+                    
+                    # Get technical indicators
+                    technical_data = self._get_technical_indicators(symbol, start_date, end_date)
+                    
+                    # Get sentiment data
+                    sentiment_data = self._get_sentiment_data(symbol, start_date, end_date)
+                    
+                    # Combine all data
+                    symbol_data = self._combine_data_sources(market_data, technical_data, sentiment_data)
                 
                 # Add symbol identifier
                 symbol_data['symbol'] = symbol.symbol
@@ -97,29 +122,7 @@ class MLDataCollectionService:
     def _get_market_data(self, symbol: Symbol, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Get market data for a symbol"""
         try:
-            market_data = MarketData.objects.filter(
-                symbol=symbol,
-                timestamp__gte=start_date,
-                timestamp__lte=end_date
-            ).order_by('timestamp')
-            
-            if not market_data.exists():
-                return pd.DataFrame()
-            
-            data = []
-            for record in market_data:
-                data.append({
-                    'timestamp': record.timestamp,
-                    'open': float(record.open_price),
-                    'high': float(record.high_price),
-                    'low': float(record.low_price),
-                    'close': float(record.close_price),
-                    'volume': float(record.volume)
-                })
-            
-            df = pd.DataFrame(data)
-            df.set_index('timestamp', inplace=True)
-            return df
+            return datasets.market_frame(datasets.read_market_data([symbol.id], start_date, end_date))
             
         except Exception as e:
             self.logger.error(f"Error getting market data for {symbol.symbol}: {e}")
@@ -128,30 +131,8 @@ class MLDataCollectionService:
     def _get_technical_indicators(self, symbol: Symbol, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Get technical indicators for a symbol"""
         try:
-            indicators = TechnicalIndicator.objects.filter(
-                symbol=symbol,
-                timestamp__gte=start_date,
-                timestamp__lte=end_date
-            ).order_by('timestamp')
-            
-            if not indicators.exists():
-                return pd.DataFrame()
-            
-            data = []
-            for indicator in indicators:
-                data.append({
-                    'timestamp': indicator.timestamp,
-                    'indicator_name': indicator.name,
-                    'indicator_value': float(indicator.value)
-                })
-            
-            df = pd.DataFrame(data)
-            if df.empty:
-                return pd.DataFrame()
-            
             # Pivot to get indicators as columns
-            df_pivot = df.pivot(index='timestamp', columns='indicator_name', values='indicator_value')
-            return df_pivot
+            return datasets.indicator_frame(datasets.read_technical_indicators([symbol.id], start_date, end_date))
             
         except Exception as e:
             self.logger.error(f"Error getting technical indicators for {symbol.symbol}: {e}")
@@ -160,57 +141,8 @@ class MLDataCollectionService:
     def _get_sentiment_data(self, symbol: Symbol, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """Get sentiment data for a symbol"""
         try:
-            # Try both sentiment models
-            sentiment_data = []
-            
-            # From sentiment app
-            try:
-                sentiments = SentimentAggregate.objects.filter(
-                    symbol=symbol,
-                    timestamp__gte=start_date,
-                    timestamp__lte=end_date
-                ).order_by('timestamp')
-                
-                for sentiment in sentiments:
-                    sentiment_data.append({
-                        'timestamp': sentiment.timestamp,
-                        'compound_score': sentiment.compound_score,
-                        'positive_score': sentiment.positive_score,
-                        'negative_score': sentiment.negative_score,
-                        'neutral_score': sentiment.neutral_score
-                    })
-            except Exception:
-                pass
-            
-            # From analytics app
-            try:
-                analytics_sentiments = AnalyticsSentimentData.objects.filter(
-                    symbol=symbol.symbol,
-                    timestamp__gte=start_date,
-                    timestamp__lte=end_date
-                ).order_by('timestamp')
-                
-                for sentiment in analytics_sentiments:
-                    sentiment_data.append({
-                        'timestamp': sentiment.timestamp,
-                        'compound_score': sentiment.compound_score,
-                        'positive_score': sentiment.positive_score,
-                        'negative_score': sentiment.negative_score,
-                        'neutral_score': sentiment.neutral_score
-                    })
-            except Exception:
-                pass
-            
-            if not sentiment_data:
-                return pd.DataFrame()
-            
-            df = pd.DataFrame(sentiment_data)
-            df.set_index('timestamp', inplace=True)
-            
             # Resample to daily and forward fill
-            df = df.resample('D').mean().fillna(method='ffill')
-            
-            return df
+            return datasets.sentiment_frame(datasets.read_sentiment([symbol], start_date, end_date))
             
         except Exception as e:
             self.logger.error(f"Error getting sentiment data for {symbol.symbol}: {e}")
@@ -220,21 +152,7 @@ class MLDataCollectionService:
                             sentiment_data: pd.DataFrame) -> pd.DataFrame:
         """Combine all data sources"""
         try:
-            # Start with market data
-            combined = market_data.copy()
-            
-            # Add technical indicators
-            if not technical_data.empty:
-                combined = combined.join(technical_data, how='left')
-            
-            # Add sentiment data
-            if not sentiment_data.empty:
-                combined = combined.join(sentiment_data, how='left')
-            
-            # Forward fill missing values
-            combined = combined.fillna(method='ffill')
-            
-            return combined
+            return datasets.combine_sources(market_data, technical_data, sentiment_data)
             
         except Exception as e:
             self.logger.error(f"Error combining data sources: {e}")
@@ -487,6 +405,9 @@ class MLDataCollectionService:
     
     def get_feature_list(self) -> List[str]:
         """Get list of all available features"""
+        MLFeature = _ml_feature_class()
+        if MLFeature is None:
+            return []
         try:
             features = MLFeature.objects.filter(is_active=True)
             return [feature.name for feature in features]
@@ -496,6 +417,10 @@ class MLDataCollectionService:
     
     def create_feature_definitions(self):
         """Create feature definitions in the database"""
+        MLFeature = _ml_feature_class()
+        if MLFeature is None:
+            self.logger.warning("MLFeature table is not installed; no feature definitions created")
+            return
         try:
             feature_definitions = [
                 {
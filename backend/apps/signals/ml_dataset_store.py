@@ -0,0 +1,575 @@
+"""
+Columnar training-set builder with on-disk snapshots.
+
+``MLDataCollectionService`` used to iterate full ORM querysets row by row (one model
+instance and one dict per candle, indicator and sentiment row) and repeat that for every
+training or backtest run. This module reads the same sources with ``values_list`` in
+chunks (``iterator(chunk_size=...)``, which streams from a server-side cursor where the
+database backend has one) and converts each chunk to float columns straight away.
+
+``DatasetSnapshotStore`` persists the combined bars (market data joined with technical
+indicators and sentiment, as ``combine_sources`` builds them) per symbol set and source
+set. A snapshot directory holds a ``manifest.json`` and one or more Feather/Parquet
+parts. A later run that needs a range the snapshot covers memory-maps the parts instead
+of querying the database, and a run that reaches past the snapshot end appends a part with
+only the candles at or after each symbol's last stored bar. Parts are compacted once there
+are more than ``MAX_PARTS``.
+
+The manifest records a data version of the range it covers: the row count, highest id and
+value sums of every source read for it (none of them has an ``updated_at``). Backfilled
+rows change the count or the highest id, and candles corrected in place by
+``update_or_create`` or an upsert change the sums. The version is split per symbol at its
+latest candle: ``load`` recomputes it with two aggregate queries per source, rebuilds the
+snapshot when anything before the split changed and appends from the split when only the
+rows after it did.
+
+Those aggregates scan the whole range, so a snapshot that was verified less than
+``VERIFY_SECONDS`` ago is served after a single ``Max('id')`` primary-key lookup per
+source table; any new row anywhere in a source forces the full check. In-place
+corrections and deletes leave the highest id alone and are picked up once the verification
+expires.
+
+Writes go to a temporary file first and are swapped in with ``os.replace``, so readers
+never see a half-written part or manifest. Checking, building, appending and reading a
+snapshot happen under an exclusive ``flock`` on ``<root>/<key>.lock``, so processes
+sharing the directory never rebuild it at the same time or delete parts another one is
+reading. Where ``fcntl`` is missing (Windows), only the in-process lock applies.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from apps.trading.models import Symbol
+from apps.data.models import MarketData, TechnicalIndicator
+from apps.sentiment.models import SentimentAggregate
+from apps.analytics.models import SentimentData as AnalyticsSentimentData
+
+try:
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    feather = pq = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ML_DATASETS = getattr(settings, 'ML_DATASETS', {})
+CHUNK_SIZE = ML_DATASETS.get('CHUNK_SIZE', 5000)
+
+# Bump when the stored layout or the way bars are combined changes; old snapshots are then ignored
+SNAPSHOT_VERSION = 1
+
+MARKET_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+SENTIMENT_COLUMNS = ['compound_score', 'positive_score', 'negative_score', 'neutral_score']
+KEY_COLUMNS = ['symbol_id', 'timestamp']
+
+
+def _stream_frame(queryset, fields: Sequence[str], columns: Sequence[str],
+                  float_columns: Sequence[str] = (), chunk_size: Optional[int] = None) -> pd.DataFrame:
+    """``values_list`` rows read ``chunk_size`` at a time, with Decimal columns cast to float per chunk"""
+    chunk_size = chunk_size or CHUNK_SIZE
+    frames, rows = [], []
+
+    def flush():
+        frame = pd.DataFrame.from_records(rows, columns=list(columns))
+        for column in float_columns:
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype(np.float64)
+        frames.append(frame)
+        rows.clear()
+
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            flush()
+    if rows or not frames:
+        flush()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def read_market_data(symbol_ids: Iterable[int], start_date: datetime, end_date: datetime,
+                     chunk_size: Optional[int] = None) -> pd.DataFrame:
+    """Long frame of ``symbol_id, timestamp, open, high, low, close, volume``, ordered by symbol and time"""
+    queryset = MarketData.objects.filter(
+        symbol_id__in=list(symbol_ids),
+        timestamp__gte=start_date,
+        timestamp__lte=end_date
+    ).order_by('symbol_id', 'timestamp')
+    fields = ('symbol_id', 'timestamp', 'open_price', 'high_price', 'low_price', 'close_price', 'volume')
+    frame = _stream_frame(queryset, fields, KEY_COLUMNS + MARKET_COLUMNS, MARKET_COLUMNS, chunk_size)
+    frame['volume'] = frame['volume'].fillna(0.0)
+    return frame
+
+
+def read_technical_indicators(symbol_ids: Iterable[int], start_date: datetime, end_date: datetime,
+                              chunk_size: Optional[int] = None) -> pd.DataFrame:
+    """Long frame of ``symbol_id, timestamp, indicator_name, indicator_value``; names are ``<TYPE>_<period>``"""
+    queryset = TechnicalIndicator.objects.filter(
+        symbol_id__in=list(symbol_ids),
+        timestamp__gte=start_date,
+        timestamp__lte=end_date
+    ).order_by('symbol_id', 'timestamp')
+    frame = _stream_frame(
+        queryset, ('symbol_id', 'timestamp', 'indicator_type', 'period', 'value'),
+        KEY_COLUMNS + ['indicator_type', 'period', 'indicator_value'], ['indicator_value'], chunk_size
+    )
+    frame['indicator_name'] = frame['indicator_type'].astype(str) + '_' + frame['period'].astype(str)
+    return frame[KEY_COLUMNS + ['indicator_name', 'indicator_value']]
+
+
+def read_sentiment(symbols: Sequence[Symbol], start_date: datetime, end_date: datetime,
+                   chunk_size: Optional[int] = None) -> pd.DataFrame:
+    """Long frame of ``symbol_id, timestamp`` and the sentiment score columns from both sentiment apps"""
+    symbol_ids = [symbol.id for symbol in symbols]
+    frames = []
+
+    # From sentiment app: only a combined score is stored
+    aggregates = SentimentAggregate.objects.filter(
+        asset_id__in=symbol_ids,
+        created_at__gte=start_date,
+        created_at__lte=end_date
+    ).order_by('created_at')
+    frames.append(_stream_frame(
+        aggregates, ('asset_id', 'created_at', 'combined_sentiment_score'),
+        KEY_COLUMNS + ['compound_score'], ['compound_score'], chunk_size
+    ))
+
+    # From analytics app, keyed by symbol code
+    ids_by_code = {symbol.symbol: symbol.id for symbol in symbols}
+    analytics = AnalyticsSentimentData.objects.filter(
+        symbol__in=list(ids_by_code),
+        timestamp__gte=start_date,
+        timestamp__lte=end_date
+    ).order_by('timestamp')
+    frame = _stream_frame(
+        analytics, ['symbol', 'timestamp'] + SENTIMENT_COLUMNS, KEY_COLUMNS + SENTIMENT_COLUMNS,
+        SENTIMENT_COLUMNS, chunk_size
+    )
+    frame['symbol_id'] = frame['symbol_id'].map(ids_by_code)
+    frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True).reindex(columns=KEY_COLUMNS + SENTIMENT_COLUMNS)
+
+
+def _fingerprint(queryset, fields: Sequence[str]) -> List[str]:
+    """Row count, highest id and the sum of each of ``fields``, as strings so they survive JSON"""
+    row = queryset.aggregate(rows=Count('id'), last_id=Max('id'),
+                             **{f'{field}_sum': Sum(field) for field in fields})
+    return [str(row['rows']), str(row['last_id'])] + [str(row[f'{field}_sum']) for field in fields]
+
+
+def _day_start(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def market_frame(market: pd.DataFrame) -> pd.DataFrame:
+    """One symbol's candles indexed by timestamp"""
+    if market.empty:
+        return pd.DataFrame()
+    return market.drop(columns='symbol_id').set_index('timestamp')
+
+
+def indicator_frame(indicators: pd.DataFrame) -> pd.DataFrame:
+    """One symbol's indicators pivoted to one column per indicator"""
+    if indicators.empty:
+        return pd.DataFrame()
+    return indicators.pivot_table(index='timestamp', columns='indicator_name',
+                                  values='indicator_value', aggfunc='last')
+
+
+def sentiment_frame(sentiment: pd.DataFrame) -> pd.DataFrame:
+    """One symbol's sentiment resampled to daily means and forward filled"""
+    if sentiment.empty:
+        return pd.DataFrame()
+    df = sentiment.drop(columns='symbol_id').set_index('timestamp').sort_index()
+    df.index = pd.DatetimeIndex(df.index)
+    return df.resample('D').mean().ffill()
+
+
+def combine_sources(market_data: pd.DataFrame, technical_data: pd.DataFrame,
+                    sentiment_data: pd.DataFrame) -> pd.DataFrame:
+    """Left-join indicators and sentiment onto the candles and forward fill the gaps"""
+    combined = market_data.copy()
+    if not technical_data.empty:
+        combined = combined.join(technical_data, how='left')
+    if not sentiment_data.empty:
+        combined = combined.join(sentiment_data, how='left')
+    return combined.ffill()
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """What a snapshot holds: which symbols and which sources (the date range lives in the manifest)"""
+    symbols: Tuple[str, ...]
+    indicators: bool = True
+    sentiment: bool = True
+
+    @property
+    def key(self) -> str:
+        payload = json.dumps({
+            'version': SNAPSHOT_VERSION,
+            'symbols': list(self.symbols),
+            'indicators': self.indicators,
+            'sentiment': self.sentiment,
+        }, sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()[:20]
+
+
+class DatasetSnapshotStore:
+    """Versioned, column-pruned snapshots of the combined bars, read back memory-mapped"""
+
+    def __init__(self, root: Optional[str] = None, file_format: Optional[str] = None,
+                 chunk_size: Optional[int] = None, max_parts: Optional[int] = None,
+                 verify_seconds: Optional[float] = None) -> None:
+        self.root = Path(root or ML_DATASETS.get('ROOT') or Path(settings.BASE_DIR) / 'ml_datasets')
+        self.file_format = (file_format or ML_DATASETS.get('FORMAT', 'feather')).lower()
+        if self.file_format not in ('feather', 'parquet'):
+            raise ValueError(f"Unsupported snapshot format: {self.file_format}")
+        self.chunk_size = int(chunk_size or CHUNK_SIZE)
+        self.max_parts = int(max_parts or ML_DATASETS.get('MAX_PARTS', 16))
+        self.verify_seconds = float(
+            verify_seconds if verify_seconds is not None else ML_DATASETS.get('VERIFY_SECONDS', 300)
+        )
+        # spec key -> (monotonic time, source high-water marks) of the last full version check
+        self._verified: Dict[str, Tuple[float, Dict[str, Optional[int]]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'reads': 0, 'builds': 0, 'appends': 0, 'compactions': 0}
+
+    @property
+    def available(self) -> bool:
+        """Snapshots need pyarrow; without it callers query the database directly"""
+        return feather is not None and ML_DATASETS.get('ENABLED', True)
+
+    def load(self, symbols: Sequence[Symbol], start_date: datetime, end_date: datetime,
+             indicators: bool = True, sentiment: bool = True,
+             columns: Optional[Sequence[str]] = None) -> Dict[int, pd.DataFrame]:
+        """
+        Combined bars per symbol id for [start_date, end_date], indexed by timestamp
+
+        The snapshot is built on first use, rebuilt when the range starts before it or its
+        data version no longer matches the database, and topped up with only the newer
+        candles when the range ends after it. The data version is only recomputed when a
+        source gained rows or the last check is ``verify_seconds`` old. ``columns`` limits
+        the columns read from disk (the index is always included).
+        """
+        symbols = sorted({symbol.id: symbol for symbol in symbols}.values(), key=lambda s: s.symbol)
+        spec = DatasetSpec(tuple(symbol.symbol for symbol in symbols), indicators, sentiment)
+        directory = self.root / spec.key
+        start_date, end_date = self._aware(start_date), self._aware(end_date)
+
+        with self._lock, self._exclusive(directory):
+            # Taken before the check, so rows written during it show up on the next load
+            checked_at, marks = time.monotonic(), self._high_water_marks(spec)
+            manifest = self._read_manifest(directory)
+            if manifest is None or 'data_version' not in manifest or start_date < self._parse(manifest['start']):
+                manifest = self._build(directory, spec, symbols, start_date, end_date)
+                self._verified[spec.key] = (checked_at, marks)
+            elif end_date > self._parse(manifest['end']) or not self._recently_verified(spec, marks):
+                manifest = self._refresh(directory, spec, symbols, manifest, end_date)
+                self._verified[spec.key] = (checked_at, marks)
+            return self._read(directory, manifest, start_date, end_date, columns)
+
+    def _high_water_marks(self, spec: DatasetSpec) -> Dict[str, Optional[int]]:
+        """Highest id of each source table; a primary-key lookup, unlike the range fingerprints"""
+        sources = [('market', MarketData)]
+        if spec.indicators:
+            sources.append(('indicators', TechnicalIndicator))
+        if spec.sentiment:
+            sources += [('sentiment', SentimentAggregate), ('analytics_sentiment', AnalyticsSentimentData)]
+        return {name: model.objects.aggregate(last_id=Max('id'))['last_id'] for name, model in sources}
+
+    def _recently_verified(self, spec: DatasetSpec, marks: Dict[str, Optional[int]]) -> bool:
+        verified = self._verified.get(spec.key)
+        return (verified is not None and verified[1] == marks
+                and time.monotonic() - verified[0] < self.verify_seconds)
+
+    def _refresh(self, directory: Path, spec: DatasetSpec, symbols: Sequence[Symbol],
+                 manifest: Dict, end_date: datetime) -> Dict:
+        """Rebuild when rows before the split changed, append when rows after it did or the range grows"""
+        stored_start, stored_end = self._parse(manifest['start']), self._parse(manifest['end'])
+        stored = manifest['data_version']
+        split = {key: self._parse(value) for key, value in stored['split'].items()}
+
+        # The next version is taken before the stored one is checked, so a write landing
+        # between the two queries shows up as a mismatch instead of going missing
+        pending = self._versioned(spec, symbols, stored_start, end_date) if end_date > stored_end else None
+        current = self.data_version(spec, symbols, stored_start, stored_end, split)
+        if pending is None and current['tail'] != stored['tail']:
+            pending = self._versioned(spec, symbols, stored_start, stored_end)
+            current = self.data_version(spec, symbols, stored_start, stored_end, split)
+
+        if current['head'] != stored['head']:
+            logger.info(f"Dataset snapshot {spec.key} no longer matches the database, rebuilding")
+            return self._build(directory, spec, symbols, stored_start, max(end_date, stored_end))
+        if pending is not None:
+            return self._append(directory, spec, symbols, manifest, max(end_date, stored_end), pending)
+        return manifest
+
+    def _versioned(self, spec: DatasetSpec, symbols: Sequence[Symbol],
+                   start_date: datetime, end_date: datetime) -> Dict:
+        """Data version of the range, split at each symbol's latest candle in the database"""
+        latest = dict(
+            MarketData.objects.filter(
+                symbol_id__in=[symbol.id for symbol in symbols],
+                timestamp__gte=start_date,
+                timestamp__lte=end_date
+            ).values('symbol_id').annotate(latest=Max('timestamp')).values_list('symbol_id', 'latest')
+        )
+        split = {str(symbol.id): latest.get(symbol.id, start_date) for symbol in symbols}
+        return self.data_version(spec, symbols, start_date, end_date, split)
+
+    def data_version(self, spec: DatasetSpec, symbols: Sequence[Symbol], start_date: datetime,
+                     end_date: datetime, split: Dict[str, datetime]) -> Dict:
+        """
+        Fingerprints of every source ``_combined_bars`` reads for [start_date, end_date]
+
+        ``head`` covers each symbol's rows before its ``split`` time, which an append never
+        re-reads, so a change there needs a rebuild. ``tail`` covers the rows from the
+        split on, which an append fetches again.
+        """
+        ids = {str(symbol.id): symbol.id for symbol in symbols}
+        codes = {str(symbol.id): symbol.symbol for symbol in symbols}
+        sources = [('market', MarketData, 'symbol_id', ids, 'timestamp', False,
+                    ('open_price', 'high_price', 'low_price', 'close_price', 'volume'))]
+        if spec.indicators:
+            sources.append(('indicators', TechnicalIndicator, 'symbol_id', ids, 'timestamp', False, ('value',)))
+        if spec.sentiment:
+            # Sentiment is read from the start of the day (see _combined_bars)
+            sources.append(('sentiment', SentimentAggregate, 'asset_id', ids, 'created_at', True,
+                            ('combined_sentiment_score',)))
+            sources.append(('analytics_sentiment', AnalyticsSentimentData, 'symbol', codes, 'timestamp', True,
+                            SENTIMENT_COLUMNS))
+
+        version = {'split': {key: value.isoformat() for key, value in split.items()}, 'head': {}, 'tail': {}}
+        for name, model, key_field, keys, time_field, daily, fields in sources:
+            first = _day_start(start_date) if daily else start_date
+            head, tail = Q(pk__in=[]), Q(pk__in=[])
+            for key, value in keys.items():
+                boundary = _day_start(split[key]) if daily else split[key]
+                head |= Q(**{key_field: value, f'{time_field}__gte': first, f'{time_field}__lt': boundary})
+                tail |= Q(**{key_field: value, f'{time_field}__gte': boundary, f'{time_field}__lte': end_date})
+            version['head'][name] = _fingerprint(model.objects.filter(head), fields)
+            version['tail'][name] = _fingerprint(model.objects.filter(tail), fields)
+        return version
+
+    def _build(self, directory: Path, spec: DatasetSpec, symbols: Sequence[Symbol],
+               start_date: datetime, end_date: datetime) -> Dict:
+        # Versioned before reading: rows written meanwhile make the next load refresh, never go missing
+        version = self._versioned(spec, symbols, start_date, end_date)
+        bars = self._combined_bars(spec, symbols, {symbol.id: start_date for symbol in symbols}, end_date)
+        directory.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'version': SNAPSHOT_VERSION,
+            'key': spec.key,
+            'symbols': list(spec.symbols),
+            'indicators': spec.indicators,
+            'sentiment': spec.sentiment,
+            'format': self.file_format,
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            'parts': [],
+            'last_timestamps': {},
+            'data_version': version,
+        }
+        old_parts = self._part_files(directory)
+        self._add_part(directory, manifest, bars)
+        self._write_manifest(directory, manifest)
+        self._remove(old_parts, keep=manifest)
+        self.stats['builds'] += 1
+        logger.info(f"Built dataset snapshot {spec.key}: {len(bars)} rows for {len(symbols)} symbols")
+        return manifest
+
+    def _append(self, directory: Path, spec: DatasetSpec, symbols: Sequence[Symbol],
+                manifest: Dict, end_date: datetime, version: Dict) -> Dict:
+        # Re-read from each symbol's split: the last stored bar may have been in progress,
+        # and everything from it on is outside the version's head
+        since = {symbol.id: self._parse(manifest['data_version']['split'][str(symbol.id)]) for symbol in symbols}
+        bars = self._combined_bars(spec, symbols, since, end_date)
+        manifest['end'] = end_date.isoformat()
+        manifest['data_version'] = version
+        if not bars.empty:
+            self._add_part(directory, manifest, bars)
+        if len(manifest['parts']) > self.max_parts:
+            self._compact(directory, manifest)
+        self._write_manifest(directory, manifest)
+        self.stats['appends'] += 1
+        logger.debug(f"Appended {len(bars)} rows to dataset snapshot {spec.key}")
+        return manifest
+
+    def _compact(self, directory: Path, manifest: Dict) -> None:
+        old_parts = [directory / part['file'] for part in manifest['parts']]
+        bars = self._read_parts(directory, manifest['parts'], None)
+        manifest['parts'] = []
+        self._add_part(directory, manifest, bars)
+        # Point the manifest at the compacted part before the old parts go away
+        self._write_manifest(directory, manifest)
+        self._remove(old_parts, keep=manifest)
+        self.stats['compactions'] += 1
+
+    def _combined_bars(self, spec: DatasetSpec, symbols: Sequence[Symbol],
+                       since: Dict[int, datetime], end_date: datetime) -> pd.DataFrame:
+        """Long frame of combined bars at or after each symbol's ``since``, one query per source"""
+        earliest = min(since.values())
+        ids = [symbol.id for symbol in symbols]
+        market = read_market_data(ids, earliest, end_date, self.chunk_size)
+        technical = read_technical_indicators(ids, earliest, end_date, self.chunk_size) if spec.indicators else None
+        # Sentiment is resampled daily: load whole days so the buckets keep their full mean
+        sentiment = read_sentiment(symbols, _day_start(earliest), end_date, self.chunk_size) if spec.sentiment else None
+
+        frames = []
+        for symbol_id, candles in market.groupby('symbol_id', sort=False):
+            candles = candles[candles['timestamp'] >= since[symbol_id]]
+            if candles.empty:
+                continue
+            combined = combine_sources(
+                market_frame(candles),
+                indicator_frame(technical[technical['symbol_id'] == symbol_id]) if technical is not None else pd.DataFrame(),
+                sentiment_frame(sentiment[sentiment['symbol_id'] == symbol_id]) if sentiment is not None else pd.DataFrame(),
+            )
+            combined.insert(0, 'symbol_id', symbol_id)
+            frames.append(combined.reset_index())
+        if not frames:
+            return pd.DataFrame(columns=KEY_COLUMNS + MARKET_COLUMNS)
+        bars = pd.concat(frames, ignore_index=True)
+        bars['timestamp'] = pd.to_datetime(bars['timestamp'], utc=True)
+        return bars
+
+    def _add_part(self, directory: Path, manifest: Dict, bars: pd.DataFrame) -> None:
+        name = f"part-{len(manifest['parts']):05d}-{uuid.uuid4().hex[:8]}.{self.file_format}"
+        temporary = directory / f".{name}.tmp"
+        if self.file_format == 'parquet':
+            bars.to_parquet(temporary, index=False)
+        else:
+            # Uncompressed Arrow IPC so readers can memory-map the columns without decoding
+            feather.write_feather(bars, temporary, compression='uncompressed')
+        os.replace(temporary, directory / name)
+
+        for symbol_id, last in bars.groupby('symbol_id')['timestamp'].max().items():
+            manifest['last_timestamps'][str(int(symbol_id))] = last.isoformat()
+        manifest['parts'].append({'file': name, 'rows': len(bars), 'columns': list(bars.columns)})
+
+    def _read(self, directory: Path, manifest: Dict, start_date: datetime, end_date: datetime,
+              columns: Optional[Sequence[str]]) -> Dict[int, pd.DataFrame]:
+        bars = self._read_parts(directory, manifest['parts'], columns)
+        self.stats['reads'] += 1
+        if bars.empty:
+            return {}
+        bars = bars[(bars['timestamp'] >= start_date) & (bars['timestamp'] <= end_date)]
+        return {
+            int(symbol_id): frame.drop(columns='symbol_id').set_index('timestamp')
+            for symbol_id, frame in bars.groupby('symbol_id', sort=False)
+        }
+
+    def _read_parts(self, directory: Path, parts: List[Dict], columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        frames = []
+        for part in parts:
+            wanted = None
+            if columns is not None:
+                wanted = KEY_COLUMNS + [c for c in columns if c in part['columns'] and c not in KEY_COLUMNS]
+            path = directory / part['file']
+            if part['file'].endswith('.parquet'):
+                table = pq.read_table(path, columns=wanted, memory_map=True)
+            else:
+                table = feather.read_table(path, columns=wanted, memory_map=True)
+            frames.append(table.to_pandas())
+        if not frames:
+            return pd.DataFrame(columns=KEY_COLUMNS)
+
+        bars = pd.concat(frames, ignore_index=True)
+        # Later parts re-read each symbol's last bar; keep the newest copy
+        bars = bars.drop_duplicates(subset=KEY_COLUMNS, keep='last').sort_values(KEY_COLUMNS, kind='stable')
+        # Indicators/sentiment forward fill across part boundaries, as within one combined frame
+        value_columns = [c for c in bars.columns if c not in KEY_COLUMNS]
+        bars[value_columns] = bars.groupby('symbol_id', sort=False)[value_columns].ffill()
+        return bars.reset_index(drop=True)
+
+    def _read_manifest(self, directory: Path) -> Optional[Dict]:
+        try:
+            with open(directory / 'manifest.json') as handle:
+                manifest = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable dataset manifest in {directory}: {e}")
+            return None
+        if manifest.get('version') != SNAPSHOT_VERSION or manifest.get('format') != self.file_format:
+            return None
+        if not all((directory / part['file']).exists() for part in manifest['parts']):
+            return None
+        return manifest
+
+    def _write_manifest(self, directory: Path, manifest: Dict) -> None:
+        manifest['updated_at'] = timezone.now().isoformat()
+        temporary = directory / f".manifest.{uuid.uuid4().hex[:8]}.tmp"
+        with open(temporary, 'w') as handle:
+            json.dump(manifest, handle, indent=2)
+        os.replace(temporary, directory / 'manifest.json')
+
+    @contextmanager
+    def _exclusive(self, directory: Path):
+        """Cross-process lock on one snapshot, held on ``<root>/<key>.lock``"""
+        if fcntl is None:
+            yield
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / f"{directory.name}.lock", 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _part_files(self, directory: Path) -> List[Path]:
+        return [path for path in directory.glob('part-*') if path.is_file()]
+
+    @staticmethod
+    def _remove(paths: Iterable[Path], keep: Dict) -> None:
+        current = {part['file'] for part in keep['parts']}
+        for path in paths:
+            if path.name not in current:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _aware(value) -> datetime:
+        if not isinstance(value, datetime):
+            value = datetime.combine(value, datetime.min.time())
+        return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+    @staticmethod
+    def _parse(value: str) -> datetime:
+        return datetime.fromisoformat(value)
+
+
+_snapshot_store: Optional[DatasetSnapshotStore] = None
+_snapshot_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> DatasetSnapshotStore:
+    """Process-wide shared store."""
+    global _snapshot_store
+    if _snapshot_store is None:
+        with _snapshot_store_lock:
+            if _snapshot_store is None:
+                _snapshot_store = DatasetSnapshotStore()
+    return _snapshot_store
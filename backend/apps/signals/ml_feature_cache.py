@@ -0,0 +1,207 @@
+"""
+Online feature cache for live ML inference.
+
+``MLInferenceService`` used to call ``MLDataCollectionService.collect_training_data``
+for every prediction: 30 days of market data, indicators and sentiment loaded row by row
+and the full lagged/rolling feature frame rebuilt, only to keep its last row. This module
+keeps, per symbol, the combined raw bars (market data joined with technical indicators
+and sentiment, as ``_combine_data_sources`` builds them) and tops them up with only the
+bars at or after the last one held. Features are then generated over the newest
+``WARMUP_BARS`` bars only and the last rows kept until another bar arrives.
+
+The warm-up window bounds every rolling feature (the longest is ``sma_50``); the
+exponential ones (EMA, MACD, RSI, ATR) lose less than 1e-8 of their weight beyond 250
+bars, so the rows match a full rebuild to float precision.
+
+The cache is per process: each web/Celery worker keeps its own copy.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.utils import timezone
+
+from apps.trading.models import Symbol
+from apps.signals.ml_data_service import MLDataCollectionService
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    raw: pd.DataFrame  # combined bars, oldest first, at most warmup_bars + max_steps long
+    features: pd.DataFrame  # feature rows of the newest max_steps bars
+    checked_at: float  # monotonic time of the last DB round-trip
+
+
+class OnlineFeatureCache:
+    """LRU map of symbol_id -> latest feature rows, refreshed incrementally.
+
+    ``latest_features`` serves from memory while an entry is younger than
+    ``refresh_seconds``; after that it loads the bars at or after the last held
+    timestamp (the in-progress bar may have been rewritten) and regenerates features
+    only if anything new arrived.
+    """
+
+    def __init__(self, data_service: Optional[MLDataCollectionService] = None,
+                 lookback_days: Optional[int] = None, warmup_bars: Optional[int] = None,
+                 max_steps: Optional[int] = None, refresh_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None) -> None:
+        configured = getattr(settings, 'ML_FEATURE_CACHE', {}) or {}
+        self.data_service = data_service or MLDataCollectionService()
+        self.lookback_days = int(lookback_days or configured.get('LOOKBACK_DAYS', 30))
+        self.warmup_bars = int(warmup_bars or configured.get('WARMUP_BARS', 250))
+        self.max_steps = int(max_steps or configured.get('MAX_STEPS', 64))
+        self.refresh_seconds = float(
+            refresh_seconds if refresh_seconds is not None else configured.get('REFRESH_SECONDS', 60)
+        )
+        self.max_entries = int(max_entries or configured.get('MAX_ENTRIES', 512))
+        self._entries: 'OrderedDict[int, _Entry]' = OrderedDict()
+        self._key_locks: Dict[int, threading.Lock] = {}
+        self._generation = 0  # bumped by invalidate()
+        self._lock = threading.RLock()
+        self.stats = {'hits': 0, 'full_loads': 0, 'incremental_loads': 0, 'rebuilds': 0, 'evictions': 0}
+
+    def latest_features(self, symbol: Symbol, steps: int = 1) -> pd.DataFrame:
+        """Feature rows of the newest ``steps`` bars (empty if the symbol has no recent data)."""
+        steps = min(max(int(steps), 1), self.max_steps)
+        # Loads run under the symbol's own lock only, so one slow symbol does not
+        # stall the others; the cache-wide lock just guards the map
+        with self._key_lock(symbol.id):
+            with self._lock:
+                entry = self._entries.get(symbol.id)
+                generation = self._generation
+            now = time.monotonic()
+
+            if entry is None:
+                entry = self._full_load(symbol, now)
+                if entry is None:
+                    return pd.DataFrame()
+            elif now - entry.checked_at >= self.refresh_seconds:
+                entry = self._incremental_load(symbol, entry, now)
+            else:
+                self._count('hits')
+
+            with self._lock:
+                # Don't put back rows loaded before an invalidate() that ran meanwhile
+                if generation == self._generation:
+                    self._entries[symbol.id] = entry
+                    self._entries.move_to_end(symbol.id)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+                    self.stats['evictions'] += 1
+
+            return entry.features.tail(steps)
+
+    def feature_matrix(self, symbols: Iterable[Symbol], feature_names: List[str],
+                       steps: int = 1) -> Tuple[List[Symbol], np.ndarray]:
+        """
+        Stack the newest feature rows of ``symbols`` into one array.
+
+        Returns the symbols that had ``steps`` rows and an array of shape
+        ``(len(symbols), feature_count)``, or ``(len(symbols), steps, feature_count)``
+        when ``steps > 1``. Features a symbol lacks and NaN/inf values are set to 0,
+        as ``MLInferenceService._prepare_prediction_features`` does.
+        """
+        included, blocks = [], []
+        missing = set()
+        for symbol in symbols:
+            try:
+                rows = self.latest_features(symbol, steps)
+            except Exception as e:
+                logger.error(f"Error building features for {symbol.symbol}: {e}")
+                continue
+            if len(rows) < steps:
+                logger.warning(f"Not enough recent data to predict for {symbol.symbol}")
+                continue
+            missing.update(name for name in feature_names if name not in rows.columns)
+            blocks.append(rows.reindex(columns=feature_names).to_numpy(dtype=np.float64))
+            included.append(symbol)
+
+        if missing:
+            logger.warning(f"Missing features filled with 0: {sorted(missing)}")
+        if not blocks:
+            shape = (0, steps, len(feature_names)) if steps > 1 else (0, len(feature_names))
+            return included, np.empty(shape, dtype=np.float64)
+
+        matrix = np.nan_to_num(np.stack(blocks), nan=0.0, posinf=0.0, neginf=0.0)
+        return included, matrix if steps > 1 else matrix[:, -1, :]
+
+    def invalidate(self, symbol: Optional[Symbol] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if symbol is None:
+                self._entries.clear()
+                self._key_locks.clear()
+            else:
+                self._entries.pop(symbol.id, None)
+                self._key_locks.pop(symbol.id, None)
+
+    def _key_lock(self, symbol_id: int) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(symbol_id, threading.Lock())
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _load_bars(self, symbol: Symbol, since: datetime, end: datetime) -> pd.DataFrame:
+        """Combined market/indicator/sentiment bars in [since, end], as collect_training_data joins them"""
+        service = self.data_service
+        market_data = service._get_market_data(symbol, since, end)
+        if market_data.empty:
+            return market_data
+        technical_data = service._get_technical_indicators(symbol, since, end)
+        # Sentiment is resampled daily: load whole days so the buckets keep their full mean
+        day_start = since.replace(hour=0, minute=0, second=0, microsecond=0)
+        sentiment_data = service._get_sentiment_data(symbol, day_start, end)
+        return service._combine_data_sources(market_data, technical_data, sentiment_data)
+
+    def _features(self, raw: pd.DataFrame) -> pd.DataFrame:
+        window = raw.tail(self.warmup_bars + self.max_steps - 1)
+        self._count('rebuilds')
+        return self.data_service._generate_features(window).tail(self.max_steps)
+
+    def _full_load(self, symbol: Symbol, now: float) -> Optional[_Entry]:
+        end = timezone.now()
+        raw = self._load_bars(symbol, end - timedelta(days=self.lookback_days), end)
+        self._count('full_loads')
+        if raw.empty:
+            return None
+        raw = raw.tail(self.warmup_bars + self.max_steps)
+        return _Entry(raw=raw, features=self._features(raw), checked_at=now)
+
+    def _incremental_load(self, symbol: Symbol, entry: _Entry, now: float) -> _Entry:
+        last = entry.raw.index[-1]
+        newer = self._load_bars(symbol, pd.Timestamp(last).to_pydatetime(), timezone.now())
+        self._count('incremental_loads')
+        if newer.empty:
+            return _Entry(raw=entry.raw, features=entry.features, checked_at=now)
+        raw = pd.concat([entry.raw, newer])
+        # An overlapping first bar replaces the one held
+        raw = raw[~raw.index.duplicated(keep='last')].sort_index().ffill()
+        raw = raw.tail(self.warmup_bars + self.max_steps)
+        return _Entry(raw=raw, features=self._features(raw), checked_at=now)
+
+
+_feature_cache: Optional[OnlineFeatureCache] = None
+_feature_cache_lock = threading.Lock()
+
+
+def get_feature_cache() -> OnlineFeatureCache:
+    """Process-wide shared cache."""
+    global _feature_cache
+    if _feature_cache is None:
+        with _feature_cache_lock:
+            if _feature_cache is None:
+                _feature_cache = OnlineFeatureCache()
+    return _feature_cache
@@ -8,19 +8,34 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
-import joblib
-import tensorflow as tf
 from sklearn.preprocessing import StandardScaler
 from django.utils import timezone
 from django.db import transaction
 
-from apps.signals.models import MLModel, MLPrediction, MLFeature
 from apps.signals.ml_data_service import MLDataCollectionService
+from apps.signals.ml_feature_cache import get_feature_cache
+from apps.signals.model_registry import SEQUENCE_MODEL_TYPES, get_model_registry
 from apps.trading.models import Symbol
 from apps.data.models import MarketData
 
 logger = logging.getLogger(__name__)
 
+# MLModel.target_variable -> MLPrediction.prediction_type
+PREDICTION_TYPES = {
+    'signal_direction': 'SIGNAL_DIRECTION',
+    'target_return': 'PRICE_CHANGE',
+    'target_volatility': 'VOLATILITY',
+}
+
+
+def _ml_tables():
+    """``(MLModel, MLPrediction)``; the Phase 3 ML tables were dropped in signals migration 0014"""
+    try:
+        from apps.signals.models import MLModel, MLPrediction
+    except ImportError:
+        raise ValueError("Phase 3 ML tables (MLModel, MLPrediction) are not installed") from None
+    return MLModel, MLPrediction
+
 
 class MLInferenceService:
     """Service for making live predictions with trained ML models"""
@@ -28,8 +43,8 @@ class MLInferenceService:
     def __init__(self):
         self.logger = logger
         self.data_service = MLDataCollectionService()
-        self.model_cache = {}
-        self.scaler_cache = {}
+        self.feature_cache = get_feature_cache()
+        self.model_registry = get_model_registry()
     
     def predict_signal_direction(self, symbol: Symbol, model_name: Optional[str] = None,
                                 prediction_horizon_hours: int = 24) -> Dict[str, Any]:
@@ -45,6 +60,7 @@ class MLInferenceService:
             Dictionary with prediction results
         """
         try:
+            MLModel, MLPrediction = _ml_tables()
             # Get the best active model
             if model_name:
                 model = MLModel.objects.get(name=model_name, is_active=True)
@@ -115,6 +131,7 @@ class MLInferenceService:
         Uses data up to as_of_date only. Returns None if no model or no data.
         """
         try:
+            MLModel, MLPrediction = _ml_tables()
             if as_of_date.tzinfo is None:
                 as_of_date = timezone.make_aware(as_of_date)
             if model_name:
@@ -159,10 +176,117 @@ class MLInferenceService:
             self.logger.debug(f"ML prediction as of date for {symbol.symbol} skipped: {e}")
             return None
 
+    def predict_signal_directions(self, symbols: List[Symbol], model_name: Optional[str] = None,
+                                  prediction_horizon_hours: int = 24) -> Dict[str, Dict[str, Any]]:
+        """
+        Batch version of ``predict_signal_direction``: one scaler and model call for all symbols
+
+        Returns:
+            Dictionary mapping symbol names to prediction results; symbols without
+            recent data are left out
+        """
+        MLModel, _ = _ml_tables()
+        if model_name:
+            model = MLModel.objects.get(name=model_name, is_active=True)
+        else:
+            model = self._get_best_active_model('signal_direction')
+
+        if not model:
+            raise ValueError("No active ML model found for signal direction prediction")
+
+        return self.predict_batch(symbols, [model], prediction_horizon_hours)[model.name]
+
+    def predict_batch(self, symbols: List[Symbol], models: Optional[List[Any]] = None,
+                      prediction_horizon_hours: int = 24,
+                      store_predictions: bool = True) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Predict every symbol with every model from the online feature cache
+
+        Each symbol's latest feature rows are built once (incrementally, see
+        ``apps.signals.ml_feature_cache``) and stacked into one matrix per model, so the
+        scaler and model run once per model instead of once per symbol. The resulting
+        ``MLPrediction`` rows are written with a single ``bulk_create``.
+
+        Args:
+            symbols: Symbols to predict for
+            models: Models to apply (if None, all deployed active models)
+            prediction_horizon_hours: Hours ahead to predict
+            store_predictions: Whether to store MLPrediction rows
+
+        Returns:
+            Dictionary mapping model names to {symbol name: prediction result}
+        """
+        MLModel, MLPrediction = _ml_tables()
+        if models is None:
+            models = list(MLModel.objects.filter(is_active=True, status='DEPLOYED'))
+
+        timestamp = timezone.now()
+        results = {}
+        pending = []
+        for model in models:
+            results[model.name] = {}
+            try:
+                prediction_type = PREDICTION_TYPES.get(model.target_variable, 'SIGNAL_DIRECTION')
+                feature_names = list(model.features_used or [])
+                if not feature_names:
+                    raise ValueError(f"No features defined for model {model.name}")
+
+                ml_model, scaler = self._load_model_and_scaler(model)
+                steps = self._sequence_length(ml_model, model)
+                included, X = self.feature_cache.feature_matrix(symbols, feature_names, steps)
+                if not included:
+                    continue
+
+                predictions = self._make_predictions(ml_model, scaler, X, model)
+            except Exception as e:
+                self.logger.error(f"Error running batch prediction with {model.name}: {e}")
+                continue
+
+            # The newest step is what the prediction is for
+            latest = X[:, -1, :] if X.ndim == 3 else X
+            for symbol, row, prediction_result in zip(included, latest, predictions):
+                prediction = MLPrediction(
+                    model=model,
+                    symbol=symbol,
+                    prediction_type=prediction_type,
+                    prediction_value=prediction_result['prediction'],
+                    confidence_score=prediction_result['confidence'],
+                    prediction_probabilities=prediction_result.get('probabilities', {}),
+                    input_features=dict(zip(feature_names, row.tolist())),
+                    prediction_timestamp=timestamp,
+                    prediction_horizon_hours=prediction_horizon_hours
+                )
+                pending.append(prediction)
+                results[model.name][symbol.symbol] = {
+                    'prediction': prediction_result['prediction'],
+                    'confidence': prediction_result['confidence'],
+                    'probabilities': prediction_result.get('probabilities', {}),
+                    '_prediction': prediction,
+                }
+
+        if store_predictions and pending:
+            with transaction.atomic():
+                MLPrediction.objects.bulk_create(pending, batch_size=500)
+
+        for model in models:
+            for symbol_name, result in results[model.name].items():
+                prediction = result.pop('_prediction')
+                result.update({
+                    # Only set on backends that return primary keys from bulk inserts
+                    'prediction_id': prediction.pk if store_predictions else None,
+                    'symbol': symbol_name,
+                    'model_name': model.name,
+                    'prediction_horizon_hours': prediction_horizon_hours,
+                    'timestamp': timestamp.isoformat()
+                })
+
+        return results
+
     def predict_price_change(self, symbol: Symbol, model_name: Optional[str] = None,
                            prediction_horizon_hours: int = 24) -> Dict[str, Any]:
         """Predict price change for a symbol"""
         try:
+            MLModel, MLPrediction = _ml_tables()
             # Get the best active model for price prediction
             if model_name:
                 model = MLModel.objects.get(name=model_name, is_active=True)
@@ -222,6 +346,7 @@ class MLInferenceService:
                           prediction_horizon_hours: int = 24) -> Dict[str, Any]:
         """Predict volatility for a symbol"""
         try:
+            MLModel, MLPrediction = _ml_tables()
             # Get the best active model for volatility prediction
             if model_name:
                 model = MLModel.objects.get(name=model_name, is_active=True)
@@ -283,6 +408,7 @@ class MLInferenceService:
             Dictionary with ensemble prediction results
         """
         try:
+            MLModel, _ = _ml_tables()
             # Get all active models
             active_models = MLModel.objects.filter(
                 is_active=True,
@@ -341,9 +467,10 @@ class MLInferenceService:
             self.logger.error(f"Error getting ensemble prediction for {symbol.symbol}: {e}")
             raise e
     
-    def _get_best_active_model(self, target_variable: str) -> Optional[MLModel]:
+    def _get_best_active_model(self, target_variable: str) -> Optional[Any]:
         """Get the best active model for a specific target variable"""
         try:
+            MLModel, _ = _ml_tables()
             models = MLModel.objects.filter(
                 target_variable=target_variable,
                 is_active=True,
@@ -356,7 +483,7 @@ class MLInferenceService:
             self.logger.error(f"Error getting best active model: {e}")
             return None
     
-    def _prepare_prediction_features(self, data: pd.DataFrame, model: MLModel) -> Tuple[np.ndarray, List[str]]:
+    def _prepare_prediction_features(self, data: pd.DataFrame, model: Any) -> Tuple[np.ndarray, List[str]]:
         """Prepare features for prediction"""
         try:
             # Use the same features as training
@@ -384,83 +511,92 @@ class MLInferenceService:
             self.logger.error(f"Error preparing prediction features: {e}")
             raise e
     
-    def _load_model_and_scaler(self, model: MLModel) -> Tuple[Any, Any]:
-        """Load model and scaler from cache or disk"""
+    def _load_model_and_scaler(self, model: Any) -> Tuple[Any, Any]:
+        """Load model and scaler from the shared registry (loaded once per process)"""
         try:
-            model_key = f"{model.name}_{model.version}"
-            
-            # Check cache first
-            if model_key in self.model_cache:
-                return self.model_cache[model_key], self.scaler_cache[model_key]
-            
-            # Load model
-            if model.model_type in ['LSTM', 'GRU']:
-                # Keras model
-                ml_model = tf.keras.models.load_model(model.model_file_path.replace('.pkl', '.h5'))
-            else:
-                # Sklearn/XGBoost/LightGBM model
-                ml_model = joblib.load(model.model_file_path)
-            
-            # Load scaler
-            scaler = joblib.load(model.scaler_file_path)
-            
-            # Cache for future use
-            self.model_cache[model_key] = ml_model
-            self.scaler_cache[model_key] = scaler
-            
-            return ml_model, scaler
+            artifact = self.model_registry.get(model)
+            return artifact.model, artifact.scaler
             
         except Exception as e:
             self.logger.error(f"Error loading model and scaler: {e}")
             raise e
     
-    def _make_prediction(self, ml_model: Any, scaler: StandardScaler, X: np.ndarray, model: MLModel) -> Dict[str, Any]:
+    def _sequence_length(self, ml_model: Any, model: Any) -> int:
+        """Timesteps a recurrent model expects per sample (1 for tabular models)"""
+        if model.model_type not in SEQUENCE_MODEL_TYPES:
+            return 1
+        input_shape = getattr(ml_model, 'input_shape', None)
+        if isinstance(input_shape, tuple) and len(input_shape) == 3 and input_shape[1]:
+            return int(input_shape[1])
+        return 1
+
+    def _make_prediction(self, ml_model: Any, scaler: StandardScaler, X: np.ndarray, model: Any) -> Dict[str, Any]:
         """Make prediction using loaded model"""
+        return self._make_predictions(ml_model, scaler, X, model)[0]
+
+    def _make_predictions(self, ml_model: Any, scaler: StandardScaler, X: np.ndarray,
+                          model: Any) -> List[Dict[str, Any]]:
+        """
+        Predict every row of ``X`` with one scaler and one model call
+
+        ``X`` is (samples, features), or (samples, timesteps, features) for LSTM/GRU
+        models; a 2-D batch is fed to those as one-step sequences.
+        """
         try:
             # Scale features
-            X_scaled = scaler.transform(X)
-            
-            # Make prediction
+            if X.ndim == 3:
+                samples, steps, features = X.shape
+                X_scaled = scaler.transform(X.reshape(-1, features)).reshape(samples, steps, features)
+            else:
+                X_scaled = scaler.transform(X)
+
+            if model.model_type in SEQUENCE_MODEL_TYPES:
+                if X_scaled.ndim == 2:
+                    X_scaled = X_scaled[:, np.newaxis, :]
+                outputs = np.asarray(ml_model.predict(X_scaled, batch_size=len(X_scaled), verbose=0))
+                outputs = outputs.reshape(len(X_scaled), -1)
+                if outputs.shape[1] > 1:
+                    # Softmax head: one probability per class
+                    return [self._classification_result(int(np.argmax(row)), row) for row in outputs]
+                return [self._regression_result(value) for value in outputs[:, 0]]
+
             if hasattr(ml_model, 'predict_proba'):
                 # Classification model with probabilities
-                probabilities = ml_model.predict_proba(X_scaled)[0]
-                prediction = ml_model.predict(X_scaled)[0]
-                confidence = np.max(probabilities)
-                
-                # Convert probabilities to dictionary
-                if len(probabilities) == 2:
-                    prob_dict = {'class_0': probabilities[0], 'class_1': probabilities[1]}
-                else:
-                    prob_dict = {f'class_{i}': prob for i, prob in enumerate(probabilities)}
-                
-                return {
-                    'prediction': prediction,
-                    'confidence': confidence,
-                    'probabilities': prob_dict
-                }
-            else:
-                # Regression model
-                prediction = ml_model.predict(X_scaled)[0]
-                
-                # Estimate confidence based on model type
-                if hasattr(ml_model, 'predict'):
-                    # For regression, confidence is based on prediction magnitude
-                    confidence = min(1.0, abs(prediction) / 0.1)  # Normalize to 0-1
-                else:
-                    confidence = 0.5  # Default confidence
-                
-                return {
-                    'prediction': prediction,
-                    'confidence': confidence
-                }
-                
+                probabilities = ml_model.predict_proba(X_scaled)
+                predictions = ml_model.predict(X_scaled)
+                return [self._classification_result(prediction, row)
+                        for prediction, row in zip(predictions, probabilities)]
+
+            # Regression model
+            return [self._regression_result(value) for value in np.ravel(ml_model.predict(X_scaled))]
+
         except Exception as e:
             self.logger.error(f"Error making prediction: {e}")
             raise e
-    
+
+    @staticmethod
+    def _classification_result(prediction: Any, probabilities: np.ndarray) -> Dict[str, Any]:
+        # Convert probabilities to dictionary
+        prob_dict = {f'class_{i}': float(prob) for i, prob in enumerate(probabilities)}
+        return {
+            'prediction': float(prediction),
+            'confidence': float(np.max(probabilities)),
+            'probabilities': prob_dict
+        }
+
+    @staticmethod
+    def _regression_result(prediction: float) -> Dict[str, Any]:
+        # For regression, confidence is based on prediction magnitude
+        prediction = float(prediction)
+        return {
+            'prediction': prediction,
+            'confidence': min(1.0, abs(prediction) / 0.1)  # Normalize to 0-1
+        }
+
     def update_prediction_accuracy(self, prediction_id: int, actual_value: float):
         """Update prediction with actual value and calculate accuracy"""
         try:
+            _, MLPrediction = _ml_tables()
             prediction = MLPrediction.objects.get(id=prediction_id)
             
             # Update actual value
@@ -487,6 +623,7 @@ class MLInferenceService:
     def get_model_performance_summary(self, model_name: Optional[str] = None) -> Dict[str, Any]:
         """Get performance summary for models"""
         try:
+            MLModel, MLPrediction = _ml_tables()
             if model_name:
                 models = MLModel.objects.filter(name=model_name)
             else:
@@ -499,6 +636,9 @@ class MLInferenceService:
                 'model_performance': []
             }
             
+            # Load cost of the artifacts this process holds
+            loaded = {(a['name'], a['version']): a for a in self.model_registry.report()}
+            
             for model in models:
                 # Get recent predictions
                 recent_predictions = MLPrediction.objects.filter(
@@ -527,7 +667,8 @@ class MLInferenceService:
                     'performance_score': model.performance_score,
                     'recent_accuracy': accuracy,
                     'avg_confidence': avg_confidence,
-                    'total_predictions': recent_predictions.count()
+                    'total_predictions': recent_predictions.count(),
+                    'artifact': loaded.get((model.name, str(model.version)))
                 })
             
             return summary
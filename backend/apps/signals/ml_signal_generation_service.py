@@ -8,7 +8,6 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-import joblib
 import os
 from pathlib import Path
 from decimal import Decimal
@@ -17,6 +16,7 @@ from django.utils import timezone
 from apps.trading.models import Symbol
 from apps.signals.models import TradingSignal, SignalType
 from apps.signals.ml_feature_engineering_service import MLFeatureEngineeringService
+from apps.signals.model_registry import SIGNAL_MODEL_DIR, get_model_registry
 from apps.data.models import MarketData
 
 logger = logging.getLogger(__name__)
@@ -33,7 +33,7 @@ class MLSignalGenerationService:
             model_name: Name of the model to use ('signal_xgboost' or 'signal_lightgbm')
         """
         self.model_name = model_name
-        self.model_path = Path(__file__).parent.parent.parent / 'ml_models' / 'signals'
+        self.model_path = SIGNAL_MODEL_DIR
         self.model = None
         self.scaler = None
         self.feature_service = MLFeatureEngineeringService()
@@ -42,18 +42,11 @@ class MLSignalGenerationService:
         self._load_model()
     
     def _load_model(self):
-        """Load trained model and scaler from disk"""
+        """Load trained model and scaler from the shared registry (loaded once per process)"""
         try:
-            model_file = self.model_path / f"{self.model_name}_model.pkl"
-            scaler_file = self.model_path / f"{self.model_name}_scaler.pkl"
-            
-            if not model_file.exists():
-                raise FileNotFoundError(f"Model file not found: {model_file}")
-            if not scaler_file.exists():
-                raise FileNotFoundError(f"Scaler file not found: {scaler_file}")
-            
-            self.model = joblib.load(model_file)
-            self.scaler = joblib.load(scaler_file)
+            artifact = get_model_registry().get_signal_model(self.model_name)
+            self.model = artifact.model
+            self.scaler = artifact.scaler
             
             logger.info(f"Loaded {self.model_name} model and scaler successfully")
             
@@ -89,30 +82,60 @@ class MLSignalGenerationService:
                 logger.warning(f"No features available for {symbol.symbol}")
                 return []
             
-            # Scale features
-            features_scaled = self.scaler.transform(features_df)
-            
-            # Get prediction
-            prediction = self.model.predict(features_scaled)[0]
+            prediction, confidence_scores = self._predict_rows(features_df)[0]
+            return self._create_signals(
+                symbol, prediction, confidence_scores, prediction_horizon_hours, min_confidence
+            )
             
-            # Get prediction probabilities (confidence scores)
-            try:
-                probabilities = self.model.predict_proba(features_scaled)[0]
+        except Exception as e:
+            logger.error(f"Error generating signals for {symbol.symbol}: {e}", exc_info=True)
+            return []
+    
+    def _predict_rows(self, features_df: pd.DataFrame) -> List[Tuple[int, Dict[int, float]]]:
+        """Scale and predict every row at once; returns (prediction, class confidences) per row"""
+        # Scale features
+        features_scaled = self.scaler.transform(features_df)
+        
+        # Get predictions
+        predictions = self.model.predict(features_scaled)
+        
+        # Get prediction probabilities (confidence scores)
+        try:
+            all_probabilities = self.model.predict_proba(features_scaled)
+        except Exception as e:
+            logger.warning(f"Could not get prediction probabilities: {e}")
+            all_probabilities = None
+        
+        results = []
+        for i, prediction in enumerate(predictions):
+            if all_probabilities is not None:
+                probabilities = all_probabilities[i]
                 # Map class indices to probabilities
                 confidence_scores = {
                     0: probabilities[0] if len(probabilities) > 0 else 0.0,  # HOLD
                     1: probabilities[1] if len(probabilities) > 1 else 0.0,  # BUY
                     2: probabilities[2] if len(probabilities) > 2 else 0.0,  # SELL
                 }
-            except Exception as e:
-                logger.warning(f"Could not get prediction probabilities: {e}")
+            else:
                 # Fallback: use prediction as confidence
                 confidence_scores = {
                     0: 1.0 if prediction == 0 else 0.0,
                     1: 1.0 if prediction == 1 else 0.0,
                     2: 1.0 if prediction == 2 else 0.0,
                 }
-            
+            results.append((prediction, confidence_scores))
+        return results
+    
+    def _create_signals(
+        self,
+        symbol: Symbol,
+        prediction: int,
+        confidence_scores: Dict[int, float],
+        prediction_horizon_hours: int,
+        min_confidence: float
+    ) -> List[TradingSignal]:
+        """Turn one model prediction into a stored TradingSignal (if confident enough)"""
+        try:
             signals = []
             
             # Map prediction to signal type
@@ -236,20 +259,49 @@ class MLSignalGenerationService:
         if symbols is None:
             symbols = list(Symbol.objects.filter(is_active=True, is_crypto_symbol=True))
         
-        results = {}
+        # Build each symbol's feature row, then scale and predict them all in one call
+        included, rows = [], []
         for symbol in symbols:
             try:
-                signals = self.generate_signals_for_symbol(
+                features_df = self.feature_service.prepare_features_for_symbol(
                     symbol=symbol,
-                    prediction_horizon_hours=prediction_horizon_hours,
-                    min_confidence=min_confidence
+                    prediction_horizon_hours=prediction_horizon_hours
                 )
-                if signals:
-                    results[symbol.symbol] = signals
+                if features_df.empty:
+                    logger.warning(f"No features available for {symbol.symbol}")
+                    continue
+                included.append(symbol)
+                rows.append(features_df)
             except Exception as e:
-                logger.error(f"Error generating signals for {symbol.symbol}: {e}")
+                logger.error(f"Error preparing features for {symbol.symbol}: {e}")
                 continue
         
+        results = {}
+        if not rows:
+            logger.info("Generated signals for 0 symbols")
+            return results
+        
+        # A row with a different feature set would fail the scaler alone; keep the rest
+        expected = list(getattr(self.scaler, 'feature_names_in_', rows[0].columns))
+        batch = [(symbol, row) for symbol, row in zip(included, rows) if list(row.columns) == expected]
+        for symbol, row in zip(included, rows):
+            if list(row.columns) != expected:
+                logger.error(f"Error generating signals for {symbol.symbol}: feature set does not match the scaler")
+        if not batch:
+            return results
+        
+        try:
+            predictions = self._predict_rows(pd.concat([row for _, row in batch], ignore_index=True))
+        except Exception as e:
+            logger.error(f"Error running batch prediction: {e}", exc_info=True)
+            return results
+        
+        for (symbol, _), (prediction, confidence_scores) in zip(batch, predictions):
+            signals = self._create_signals(
+                symbol, prediction, confidence_scores, prediction_horizon_hours, min_confidence
+            )
+            if signals:
+                results[symbol.symbol] = signals
+        
         logger.info(f"Generated signals for {len(results)} symbols")
         return results
-
@@ -57,56 +57,45 @@ class MLSignalTrainingService:
             for symbol in symbols:
                 # Get historical signals - use all signals, not just executed ones
                 # (since we may not have many executed signals)
-                historical_signals = TradingSignal.objects.filter(
+                signal_types = list(TradingSignal.objects.filter(
                     symbol=symbol,
                     created_at__gte=start_date,
                     created_at__lte=end_date
-                ).order_by('created_at').select_related('signal_type')
+                ).order_by('created_at').values_list('signal_type__name', flat=True))
                 
-                if not historical_signals.exists():
+                if not signal_types:
                     logger.debug(f"No signals found for {symbol.symbol}")
                     continue
                 
-                signal_count = 0
-                # For each signal, get features at the time it was created
-                for signal in historical_signals:
-                    try:
-                        # Get features at signal creation time
-                        # Note: We use current time for feature extraction since we can't go back in time
-                        # In production, you might want to store features with signals
-                        features_df = self.feature_service.prepare_features_for_symbol(
-                            symbol=symbol,
-                            prediction_horizon_hours=prediction_horizon_hours
-                        )
-                        
-                        if features_df.empty:
-                            continue
-                        
-                        # Get label from signal type
-                        signal_type_name = signal.signal_type.name if hasattr(signal, 'signal_type') and signal.signal_type else 'HOLD'
-                        
-                        # Map to 0, 1, 2 for multi-class classification (HOLD=0, BUY=1, SELL=2)
-                        if signal_type_name in ['BUY', 'STRONG_BUY']:
-                            label = 1
-                        elif signal_type_name in ['SELL', 'STRONG_SELL']:
-                            label = 2
-                        else:
-                            label = 0  # HOLD
-                        
-                        # Only use if signal was profitable (optional filter)
-                        # Uncomment if you want to filter by profitability
-                        # if signal.is_profitable is not None and not signal.is_profitable:
-                        #     continue
-                        
-                        all_features.append(features_df.iloc[0].to_dict())
-                        all_labels.append(label)
-                        signal_count += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing signal {signal.id}: {e}", exc_info=True)
-                        continue
+                # Features are extracted at the current time (we can't go back in time), so
+                # every signal of a symbol shares one feature row: build it once per symbol.
+                # In production, you might want to store features with signals
+                try:
+                    features_df = self.feature_service.prepare_features_for_symbol(
+                        symbol=symbol,
+                        prediction_horizon_hours=prediction_horizon_hours
+                    )
+                except Exception as e:
+                    logger.error(f"Error preparing features for {symbol.symbol}: {e}", exc_info=True)
+                    continue
+                
+                if features_df.empty:
+                    continue
+                features = features_df.iloc[0].to_dict()
+                
+                for signal_type_name in signal_types:
+                    # Map to 0, 1, 2 for multi-class classification (HOLD=0, BUY=1, SELL=2)
+                    if signal_type_name in ['BUY', 'STRONG_BUY']:
+                        label = 1
+                    elif signal_type_name in ['SELL', 'STRONG_SELL']:
+                        label = 2
+                    else:
+                        label = 0  # HOLD
+                    
+                    all_features.append(features)
+                    all_labels.append(label)
                 
-                logger.info(f"Processed {signal_count} signals for {symbol.symbol}")
+                logger.info(f"Processed {len(signal_types)} signals for {symbol.symbol}")
             
             if not all_features:
                 logger.warning("No training data prepared")
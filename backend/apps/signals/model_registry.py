@@ -0,0 +1,280 @@
+"""
+Process-wide registry of loaded ML model artifacts.
+
+``MLInferenceService`` and ``MLSignalGenerationService`` used to ``joblib.load`` their
+model and scaler into per-instance dicts, so every service instance in every worker held
+its own copy and paid the load again after each restart. The registry loads each
+artifact once per process, keyed by ``MLModel`` name and version, or by file name and
+modification time for the file-based signal models.
+
+Joblib artifacts are loaded with ``mmap_mode`` (``'r'`` by default): NumPy arrays in
+uncompressed joblib files (tree ensembles, scaler statistics) stay backed by the file, so
+every process reading the same file shares the page cache. Artifacts preloaded in the
+Celery ``worker_init`` hook are also shared copy-on-write with the pool children that are
+forked afterwards. Keras models (LSTM/GRU) cannot be memory-mapped and load normally.
+
+Versions that are no longer active (the ``MLModel`` row was deactivated, or a new file
+replaced the old one) are evicted on the next lookup after ``EVICT_SECONDS``.
+"""
+import logging
+import mmap
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+ML_MODEL_REGISTRY = getattr(settings, 'ML_MODEL_REGISTRY', {})
+MMAP_MODE = ML_MODEL_REGISTRY.get('MMAP_MODE', 'r')
+EVICT_SECONDS = ML_MODEL_REGISTRY.get('EVICT_SECONDS', 300)
+
+# Where MLSignalGenerationService keeps <name>_model.pkl / <name>_scaler.pkl
+SIGNAL_MODEL_DIR = Path(settings.BASE_DIR) / 'ml_models' / 'signals'
+
+SEQUENCE_MODEL_TYPES = ('LSTM', 'GRU')
+
+
+def _ml_model_class():
+    """``MLModel``, where the Phase 3 ML tables are installed (the file-based signal models need none)"""
+    try:
+        from apps.signals.models import MLModel
+        return MLModel
+    except ImportError:
+        return None
+
+
+@dataclass
+class ModelArtifact:
+    """A loaded model and scaler with what it cost to load them"""
+    name: str
+    version: str
+    model_type: str
+    model: Any
+    scaler: Any
+    load_seconds: float
+    file_bytes: int
+    mapped_bytes: int  # NumPy data left backed by the artifact files
+    heap_bytes: int  # NumPy data copied into this process
+    rss_bytes: Optional[int]  # resident-set growth while loading (None without psutil)
+    loaded_at: str
+    hits: int = field(default=0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'version': self.version,
+            'model_type': self.model_type,
+            'load_seconds': round(self.load_seconds, 4),
+            'file_bytes': self.file_bytes,
+            'mapped_bytes': self.mapped_bytes,
+            'heap_bytes': self.heap_bytes,
+            'rss_bytes': self.rss_bytes,
+            'loaded_at': self.loaded_at,
+            'hits': self.hits,
+        }
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+def array_footprint(obj: Any, max_depth: int = 6) -> Tuple[int, int]:
+    """(mapped, heap) bytes of the NumPy arrays reachable from ``obj``"""
+    mapped = heap = 0
+    seen = set()
+    stack = [(obj, 0)]
+    while stack:
+        current, depth = stack.pop()
+        if id(current) in seen or depth > max_depth:
+            continue
+        seen.add(id(current))
+        if isinstance(current, np.ndarray):
+            base = current
+            while isinstance(base, np.ndarray) and base.base is not None and not isinstance(base, np.memmap):
+                base = base.base
+            if isinstance(base, (np.memmap, mmap.mmap)):
+                mapped += current.nbytes
+            else:
+                heap += current.nbytes
+            if current.dtype != object:
+                continue
+            children = current.ravel().tolist()
+        elif isinstance(current, dict):
+            children = list(current.values())
+        elif isinstance(current, (list, tuple, set)):
+            children = list(current)
+        elif hasattr(current, '__dict__'):
+            children = list(vars(current).values())
+        else:
+            continue
+        stack.extend((child, depth + 1) for child in children)
+    return mapped, heap
+
+
+class ModelRegistry:
+    """Lazily loaded, shared model artifacts keyed by (name, version)"""
+
+    def __init__(self, mmap_mode: Optional[str] = MMAP_MODE, evict_seconds: float = EVICT_SECONDS) -> None:
+        self.mmap_mode = mmap_mode
+        self.evict_seconds = evict_seconds
+        self._artifacts: Dict[Tuple[str, str], ModelArtifact] = {}
+        self._lock = threading.RLock()
+        self._evicted_at = time.monotonic()
+
+    def get(self, model) -> ModelArtifact:
+        """Model and scaler of an ``MLModel`` row, loaded on first use"""
+        self._maybe_evict()
+        key = (model.name, str(model.version))
+        with self._lock:
+            artifact = self._artifacts.get(key)
+            if artifact is None:
+                if model.model_type in SEQUENCE_MODEL_TYPES:
+                    model_path = model.model_file_path.replace('.pkl', '.h5')
+                else:
+                    model_path = model.model_file_path
+                artifact = self._load(key, model.model_type, model_path, model.scaler_file_path)
+                self._artifacts[key] = artifact
+            artifact.hits += 1
+            return artifact
+
+    def get_files(self, name: str, model_file: Path, scaler_file: Path) -> ModelArtifact:
+        """
+        Model and scaler saved as files without an ``MLModel`` row
+
+        The files' modification time is the version, so retraining in place loads the new
+        model and drops the old one.
+        """
+        version = f"file:{os.stat(model_file).st_mtime_ns}:{os.stat(scaler_file).st_mtime_ns}"
+        key = (name, version)
+        with self._lock:
+            artifact = self._artifacts.get(key)
+            if artifact is None:
+                artifact = self._load(key, 'FILE', str(model_file), str(scaler_file))
+                for stale in [k for k in self._artifacts if k[0] == name and k[1].startswith('file:')]:
+                    del self._artifacts[stale]
+                self._artifacts[key] = artifact
+            artifact.hits += 1
+            return artifact
+
+    def get_signal_model(self, name: str) -> ModelArtifact:
+        """``<name>_model.pkl`` / ``<name>_scaler.pkl`` from the signal model directory"""
+        model_file = SIGNAL_MODEL_DIR / f"{name}_model.pkl"
+        scaler_file = SIGNAL_MODEL_DIR / f"{name}_scaler.pkl"
+        if not model_file.exists():
+            raise FileNotFoundError(f"Model file not found: {model_file}")
+        if not scaler_file.exists():
+            raise FileNotFoundError(f"Scaler file not found: {scaler_file}")
+        return self.get_files(name, model_file, scaler_file)
+
+    def preload(self) -> List[Dict[str, Any]]:
+        """Load every deployed active model and the configured signal models; returns the report"""
+        MLModel = _ml_model_class()
+        for model in MLModel.objects.filter(is_active=True, status='DEPLOYED') if MLModel else []:
+            try:
+                self.get(model)
+            except Exception as e:
+                logger.error(f"Error preloading model {model.name} v{model.version}: {e}")
+        for name in ML_MODEL_REGISTRY.get('PRELOAD_SIGNAL_MODELS', []):
+            try:
+                self.get_signal_model(name)
+            except Exception as e:
+                logger.error(f"Error preloading signal model {name}: {e}")
+        return self.report()
+
+    def evict_inactive(self) -> List[Tuple[str, str]]:
+        """Drop ``MLModel`` versions that are no longer active; returns the evicted keys"""
+        MLModel = _ml_model_class()
+        if MLModel is None:
+            return []
+        active = {
+            (name, str(version))
+            for name, version in MLModel.objects.filter(is_active=True).values_list('name', 'version')
+        }
+        with self._lock:
+            evicted = [key for key in self._artifacts if not key[1].startswith('file:') and key not in active]
+            for key in evicted:
+                del self._artifacts[key]
+            self._evicted_at = time.monotonic()
+        for name, version in evicted:
+            logger.info(f"Evicted inactive model {name} v{version}")
+        return evicted
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-model load time and memory footprint of this process's artifacts"""
+        with self._lock:
+            return [artifact.to_dict() for artifact in self._artifacts.values()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._artifacts.clear()
+
+    def _maybe_evict(self) -> None:
+        if time.monotonic() - self._evicted_at < self.evict_seconds:
+            return
+        try:
+            self.evict_inactive()
+        except Exception as e:
+            logger.warning(f"Error evicting inactive models: {e}")
+
+    def _load(self, key: Tuple[str, str], model_type: str, model_path: str, scaler_path: str) -> ModelArtifact:
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        if model_type in SEQUENCE_MODEL_TYPES:
+            import tensorflow as tf
+            ml_model = tf.keras.models.load_model(model_path)
+        else:
+            # Sklearn/XGBoost/LightGBM model
+            ml_model = joblib.load(model_path, mmap_mode=self.mmap_mode)
+        scaler = joblib.load(scaler_path, mmap_mode=self.mmap_mode)
+        load_seconds = time.perf_counter() - started
+        rss_after = _rss_bytes()
+
+        if model_type in SEQUENCE_MODEL_TYPES:
+            mapped, heap = array_footprint((ml_model.get_weights(), scaler))
+        else:
+            mapped, heap = array_footprint((ml_model, scaler))
+        artifact = ModelArtifact(
+            name=key[0],
+            version=key[1],
+            model_type=model_type,
+            model=ml_model,
+            scaler=scaler,
+            load_seconds=load_seconds,
+            file_bytes=sum(os.path.getsize(path) for path in (model_path, scaler_path) if os.path.exists(path)),
+            mapped_bytes=mapped,
+            heap_bytes=heap,
+            rss_bytes=rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            loaded_at=timezone.now().isoformat(),
+        )
+        logger.info(
+            f"Loaded model {key[0]} ({key[1]}) in {load_seconds:.3f}s: "
+            f"{mapped / 1e6:.1f} MB mapped, {heap / 1e6:.1f} MB on the heap"
+        )
+        return artifact
+
+
+_model_registry: Optional[ModelRegistry] = None
+_model_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide shared registry."""
+    global _model_registry
+    if _model_registry is None:
+        with _model_registry_lock:
+            if _model_registry is None:
+                _model_registry = ModelRegistry()
+    return _model_registry
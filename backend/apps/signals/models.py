@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils import timezone
+from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from apps.trading.models import Symbol
 from apps.data.models import TechnicalIndicator
@@ -667,3 +668,60 @@ class HourlyBestSignal(models.Model):
 
     def __str__(self):
         return f"{self.signal_date} {self.signal_hour:02d}:00 {self.symbol.symbol} (#{self.rank})"
+
+
+class BacktestJob(models.Model):
+    """
+    A backtest run in the background by a Celery worker.
+    ``content_key`` hashes the request (kind, symbol, date range, strategy parameters)
+    together with a version of the data it reads, so a completed job's ``result`` is
+    served again for an identical request instead of re-running the backtest.
+    """
+    KIND_CHOICES = [
+        ('generate_signals', 'Generate Historical Signals'),
+        ('backtest', 'Backtest'),
+        ('fixed', 'Fixed Backtest'),
+        ('upgraded', 'Upgraded Backtest'),
+    ]
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    symbol = models.ForeignKey(Symbol, on_delete=models.CASCADE, related_name='backtest_jobs')
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    parameters = models.JSONField(default=dict, blank=True, help_text="Strategy parameters the job was run with")
+    data_version = models.CharField(max_length=64, help_text="Fingerprint of the market data and signals read")
+    content_key = models.CharField(max_length=64, db_index=True, help_text="SHA-256 of the request and data version")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING', db_index=True)
+    progress = models.PositiveSmallIntegerField(default=0, validators=[MaxValueValidator(100)])
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    task_id = models.CharField(max_length=255, blank=True)
+
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Backtest Job'
+        verbose_name_plural = 'Backtest Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['content_key', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.symbol.symbol} {self.start_date.date()} - {self.end_date.date()} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('COMPLETED', 'FAILED')
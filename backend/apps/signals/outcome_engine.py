@@ -0,0 +1,198 @@
+"""
+Vectorised signal-outcome resolution for backtests.
+
+Prices are held once as sorted NumPy arrays (int64 nanosecond timestamps plus
+high/low/close). Each signal's execution window is then two ``searchsorted`` calls,
+and the first bar that touches its target or stop is an ``argmax`` over a boolean
+(signals x bars) matrix, so a whole batch of signals resolves together instead of
+every signal scanning every bar. As in the per-signal loops this replaces, the
+target wins when a single bar touches both levels.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+
+# Outcome status codes
+NO_DATA = 0       # no bars inside the window
+TARGET_HIT = 1
+STOP_HIT = 2
+WINDOW_CLOSE = 3  # neither level touched; exit at the close of the last bar in the window
+
+# Upper bound on the size of the gathered (signals x bars) matrices per chunk
+DEFAULT_MAX_CELLS = 2_000_000
+
+
+def to_nanoseconds(times: Iterable) -> np.ndarray:
+    """int64 UTC nanoseconds for datetimes/Timestamps/ISO strings; naive values are taken as UTC."""
+    index = pd.DatetimeIndex(pd.to_datetime(list(times), utc=True))
+    return index.as_unit('ns').asi8
+
+
+@dataclass(frozen=True)
+class PriceBars:
+    """Oldest-first high/low/close arrays keyed by int64 nanosecond UTC timestamps."""
+    timestamps: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def empty(cls) -> 'PriceBars':
+        floats = np.empty(0, dtype=np.float64)
+        return cls(np.empty(0, dtype=np.int64), floats, floats, floats)
+
+    @classmethod
+    def _sorted(cls, timestamps: np.ndarray, high, low, close) -> 'PriceBars':
+        order = np.argsort(timestamps, kind='stable')
+        columns = (np.asarray(col, dtype=np.float64)[order] for col in (high, low, close))
+        return cls(timestamps[order], *columns)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'PriceBars':
+        """From an OHLC frame indexed by timestamp (or with a ``timestamp`` column).
+
+        Missing prices become 0, like the ``safe_float`` conversions used when the frames are built.
+        """
+        if df is None or df.empty:
+            return cls.empty()
+        times = df['timestamp'] if 'timestamp' in df.columns else df.index
+        columns = [pd.to_numeric(df[name], errors='coerce').fillna(0).to_numpy() for name in ('high', 'low', 'close')]
+        return cls._sorted(to_nanoseconds(times), *columns)
+
+    @classmethod
+    def from_mapping(cls, price_data: Mapping) -> 'PriceBars':
+        """From a ``{timestamp: {'high': .., 'low': .., 'close': ..}}`` dict."""
+        if not price_data:
+            return cls.empty()
+        rows = list(price_data.values())
+        columns = [[row.get(name) or 0 for row in rows] for name in ('high', 'low', 'close')]
+        return cls._sorted(to_nanoseconds(price_data.keys()), *columns)
+
+    @classmethod
+    def from_rows(cls, rows) -> 'PriceBars':
+        """From ``values_list('timestamp', 'high_price', 'low_price', 'close_price')`` rows."""
+        if not rows:
+            return cls.empty()
+        timestamps, high, low, close = zip(*rows)
+        return cls._sorted(to_nanoseconds(timestamps), *([x or 0 for x in col] for col in (high, low, close)))
+
+    @classmethod
+    def from_candle_window(cls, window) -> 'PriceBars':
+        """From an ``apps.data.candle_store.CandleWindow`` (already sorted, no copy)."""
+        return cls(window.timestamps, window.high, window.low, window.close)
+
+    def timestamp_at(self, index: int) -> pd.Timestamp:
+        return pd.Timestamp(int(self.timestamps[index]), tz='UTC')
+
+
+@dataclass(frozen=True)
+class Outcomes:
+    """Per-signal results aligned with the inputs to ``SignalOutcomeEngine.resolve``.
+
+    ``bar`` is the index into the price arrays of the exit bar (-1 for NO_DATA) and
+    ``exit_price`` is the target, the stop or the window's last close (NaN for NO_DATA).
+    """
+    status: np.ndarray
+    bar: np.ndarray
+    exit_price: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+
+class SignalOutcomeEngine:
+    """Resolve which of target/stop each signal touches first inside its execution window"""
+
+    def __init__(self, bars: PriceBars, max_cells: int = DEFAULT_MAX_CELLS):
+        self.bars = bars
+        self.max_cells = max(int(max_cells), 1)
+
+    def resolve(self, signal_times, is_long, targets, stops, window: timedelta,
+                include_window_end: bool = True) -> Outcomes:
+        """
+        Resolve a batch of signals.
+
+        Args:
+            signal_times: Signal timestamps (datetimes, or int64 UTC nanoseconds)
+            is_long: True for BUY-side signals (target above entry), False for SELL-side
+            targets: Target prices; NaN never triggers
+            stops: Stop prices; NaN never triggers
+            window: Execution window measured from each signal time
+            include_window_end: Whether a bar stamped exactly at signal time + window counts
+
+        Returns:
+            Outcomes aligned with the inputs
+        """
+        times = np.asarray(signal_times)
+        if times.dtype != np.int64:
+            times = to_nanoseconds(times)
+        is_long = np.asarray(is_long, dtype=bool)
+        targets = np.asarray(targets, dtype=np.float64)
+        stops = np.asarray(stops, dtype=np.float64)
+
+        count = len(times)
+        status = np.full(count, NO_DATA, dtype=np.int8)
+        bar = np.full(count, -1, dtype=np.int64)
+        exit_price = np.full(count, np.nan)
+        if count == 0 or len(self.bars) == 0:
+            return Outcomes(status, bar, exit_price)
+
+        timestamps = self.bars.timestamps
+        window_ns = pd.Timedelta(window).value
+        starts = np.searchsorted(timestamps, times, side='left')
+        ends = np.searchsorted(timestamps, times + window_ns, side='right' if include_window_end else 'left')
+        lengths = np.maximum(ends - starts, 0)
+
+        # Default for any signal with data: close of the last bar in its window
+        has_data = lengths > 0
+        status[has_data] = WINDOW_CLOSE
+        bar[has_data] = ends[has_data] - 1
+        exit_price[has_data] = self.bars.close[bar[has_data]]
+
+        width = int(lengths.max())
+        if width == 0:
+            return Outcomes(status, bar, exit_price)
+
+        offsets = np.arange(width)
+        last_bar = len(timestamps) - 1
+        chunk = max(self.max_cells // width, 1)
+        for lo in range(0, count, chunk):
+            rows = slice(lo, lo + chunk)
+            in_window = offsets < lengths[rows, None]
+            index = np.minimum(starts[rows, None] + offsets, last_bar)
+            high = self.bars.high[index]
+            low = self.bars.low[index]
+            long_side = is_long[rows, None]
+            target = targets[rows, None]
+            stop = stops[rows, None]
+
+            target_touch = in_window & np.where(long_side, high >= target, low <= target)
+            stop_touch = in_window & np.where(long_side, low <= stop, high >= stop)
+            touched = target_touch | stop_touch
+
+            hit_rows = np.flatnonzero(touched.any(axis=1))
+            if not len(hit_rows):
+                continue
+            first = touched[hit_rows].argmax(axis=1)
+            target_first = target_touch[hit_rows, first]
+            signal_rows = hit_rows + lo
+
+            status[signal_rows] = np.where(target_first, TARGET_HIT, STOP_HIT)
+            bar[signal_rows] = starts[signal_rows] + first
+            exit_price[signal_rows] = np.where(target_first, targets[signal_rows], stops[signal_rows])
+
+        return Outcomes(status, bar, exit_price)
+
+
+def is_long_signal(signal_type) -> bool:
+    """True for BUY/STRONG_BUY; accepts a SignalType instance or its name."""
+    name = getattr(signal_type, 'name', signal_type)
+    return str(name or '').upper() in ('BUY', 'STRONG_BUY')
+
@@ -0,0 +1,317 @@
+"""
+Live signal outcome tracking driven by price ticks.
+
+Otherwise a signal's target or stop is only found after the fact, by
+``FixedBacktestingService.verify_signal_execution`` against daily candles, or never,
+when ``cleanup_expired_signals`` expires it first. ``SignalOutcomeTracker`` keeps every
+open ``TradingSignal`` in memory, in two sorted level lists per symbol:
+
+- ``rising`` levels are hit when the price reaches them from below: long targets and
+  short stops.
+- ``falling`` levels are hit when the price reaches them from above: long stops and
+  short targets.
+
+A tick at ``price`` crosses the ``rising`` levels ``<= price`` and the ``falling``
+levels ``>= price``. Both are found with one ``bisect`` each and cut off the end of the
+list, so a tick costs O(log n) plus the hits. A hit signal's other level is left in
+place and skipped when it is crossed later. As in the outcome engine, the target wins
+when one tick crosses both levels.
+
+Hits are buffered and persisted in one ``bulk_update`` per flush (``is_executed``,
+``executed_at``, ``execution_price``, ``is_profitable``, ``profit_loss``), then pushed
+as ``signal_update`` messages through ``TradingSignalsBroadcaster``. Like
+``verify_signal_execution``, the execution price is the level itself and
+``profit_loss`` is the percentage return. The index is rebuilt from the database every
+``RELOAD_SECONDS``, which picks up new signals and drops expired or invalidated ones.
+
+``on_price`` and ``rebuild`` are pure in-memory and safe on an event loop.
+``load_open_signals`` and ``persist`` use the ORM, so async callers run them with
+``asyncio.to_thread`` (``run`` does this).
+"""
+import asyncio
+import logging
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.signals.models import TradingSignal
+from apps.signals.outcome_engine import is_long_signal
+
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_OUTCOME_TRACKER = getattr(settings, 'SIGNAL_OUTCOME_TRACKER', {})
+FLUSH_SECONDS = SIGNAL_OUTCOME_TRACKER.get('FLUSH_SECONDS', 1)
+RELOAD_SECONDS = SIGNAL_OUTCOME_TRACKER.get('RELOAD_SECONDS', 30)
+
+TARGET_HIT = 'TARGET_HIT'
+STOP_LOSS_HIT = 'STOP_LOSS_HIT'
+
+
+@dataclass(frozen=True)
+class OpenSignal:
+    signal_id: int
+    symbol: str
+    is_long: bool
+    entry_price: float
+    target_price: float
+    stop_loss: float
+
+
+@dataclass(frozen=True)
+class SignalHit:
+    signal_id: int
+    symbol: str
+    status: str  # TARGET_HIT or STOP_LOSS_HIT
+    execution_price: float
+    pnl: float  # percent return from the entry price
+    timestamp: datetime
+
+    @property
+    def is_profitable(self) -> bool:
+        return self.pnl > 0
+
+
+@dataclass
+class _SymbolLevels:
+    """Ascending level prices with the (signal_id, status) each one belongs to"""
+    rising: List[float] = field(default_factory=list)
+    rising_refs: List[tuple] = field(default_factory=list)
+    falling: List[float] = field(default_factory=list)
+    falling_refs: List[tuple] = field(default_factory=list)
+
+    def crossed(self, price: float) -> List[tuple]:
+        """Remove and return the refs of every level ``price`` has reached"""
+        k = bisect_right(self.rising, price)
+        j = bisect_left(self.falling, price)
+        refs = self.rising_refs[:k] + self.falling_refs[j:]
+        if k:
+            del self.rising[:k], self.rising_refs[:k]
+        if j < len(self.falling):
+            del self.falling[j:], self.falling_refs[j:]
+        return refs
+
+
+def _sorted_levels(levels: List[tuple]):
+    levels.sort(key=lambda level: level[0])
+    return [level[0] for level in levels], [level[1] for level in levels]
+
+
+class SignalOutcomeTracker:
+    """Per-symbol sorted target/stop index over the open signals, fed by price ticks"""
+
+    def __init__(self, broadcaster=None, flush_seconds: float = FLUSH_SECONDS,
+                 reload_seconds: float = RELOAD_SECONDS) -> None:
+        if broadcaster is None:
+            from apps.core.services import TradingSignalsBroadcaster
+            broadcaster = TradingSignalsBroadcaster()
+        self.broadcaster = broadcaster
+        self.flush_seconds = flush_seconds
+        self.reload_seconds = reload_seconds
+        self._open: Dict[int, OpenSignal] = {}
+        self._levels: Dict[str, _SymbolLevels] = {}
+        self._hits: List[SignalHit] = []
+        # Hit here but possibly still open in the database; kept out of rebuilds
+        self._closed: Set[int] = set()
+        self._stopping: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {'ticks': 0, 'hits': 0, 'persisted': 0, 'reloads': 0}
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    @staticmethod
+    def load_open_signals() -> List[OpenSignal]:
+        """Valid, unexecuted, unexpired signals with entry, target and stop (one query)"""
+        rows = TradingSignal.objects.filter(
+            is_valid=True,
+            is_executed=False,
+            entry_price__isnull=False,
+            target_price__isnull=False,
+            stop_loss__isnull=False,
+        ).filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
+        ).values_list('id', 'symbol__symbol', 'signal_type__name', 'entry_price', 'target_price', 'stop_loss')
+        return [
+            OpenSignal(signal_id, symbol.upper(), is_long_signal(signal_type),
+                       float(entry), float(target), float(stop))
+            for signal_id, symbol, signal_type, entry, target, stop in rows
+        ]
+
+    def rebuild(self, signals: Iterable[OpenSignal]) -> None:
+        """Replace the index with ``signals``, leaving out ones already hit here"""
+        signals = list(signals)
+        loaded = {signal.signal_id for signal in signals}
+        # A closed id missing from the load has been persisted; stop tracking it
+        self._closed &= loaded
+        self._closed.update(hit.signal_id for hit in self._hits)
+
+        grouped: Dict[str, tuple] = {}
+        self._open = {}
+        for signal in signals:
+            if signal.signal_id in self._closed:
+                continue
+            self._open[signal.signal_id] = signal
+            rising, falling = grouped.setdefault(signal.symbol, ([], []))
+            target = (signal.target_price, (signal.signal_id, TARGET_HIT))
+            stop = (signal.stop_loss, (signal.signal_id, STOP_LOSS_HIT))
+            if signal.is_long:
+                rising.append(target)
+                falling.append(stop)
+            else:
+                falling.append(target)
+                rising.append(stop)
+
+        self._levels = {}
+        for symbol, (rising, falling) in grouped.items():
+            levels = _SymbolLevels()
+            levels.rising, levels.rising_refs = _sorted_levels(rising)
+            levels.falling, levels.falling_refs = _sorted_levels(falling)
+            self._levels[symbol] = levels
+        self.stats['reloads'] += 1
+
+    def reload(self) -> int:
+        """Rebuild from the database; returns the number of open signals"""
+        self.rebuild(self.load_open_signals())
+        return len(self._open)
+
+    def on_price(self, symbol: str, price: float, timestamp: Optional[datetime] = None) -> List[SignalHit]:
+        """Record the signals of ``symbol`` whose target or stop ``price`` reached"""
+        self.stats['ticks'] += 1
+        levels = self._levels.get(symbol.upper())
+        if levels is None:
+            return []
+        refs = levels.crossed(float(price))
+        if not refs:
+            return []
+
+        if timestamp is None:
+            timestamp = timezone.now()
+        hits = []
+        # Targets first, so a tick through both levels of a signal counts as a target hit
+        for signal_id, status in sorted(refs, key=lambda ref: ref[1] != TARGET_HIT):
+            signal = self._open.pop(signal_id, None)
+            if signal is None:  # its other level was crossed earlier
+                continue
+            execution_price = signal.target_price if status == TARGET_HIT else signal.stop_loss
+            move = (execution_price - signal.entry_price) / signal.entry_price * 100
+            hits.append(SignalHit(
+                signal_id=signal_id,
+                symbol=signal.symbol,
+                status=status,
+                execution_price=execution_price,
+                pnl=move if signal.is_long else -move,
+                timestamp=timestamp,
+            ))
+            self._closed.add(signal_id)
+        self._hits.extend(hits)
+        self.stats['hits'] += len(hits)
+        return hits
+
+    def take_hits(self) -> List[SignalHit]:
+        hits, self._hits = self._hits, []
+        return hits
+
+    def persist(self, hits: List[SignalHit]) -> int:
+        """Write ``hits`` with one bulk update and broadcast them; returns signals updated"""
+        if not hits:
+            return 0
+        by_id = {}
+        for hit in hits:
+            by_id.setdefault(hit.signal_id, hit)
+        # Signals executed elsewhere in the meantime keep their recorded outcome
+        still_open = set(
+            TradingSignal.objects.filter(id__in=list(by_id), is_executed=False).values_list('id', flat=True)
+        )
+        hits = [hit for signal_id, hit in by_id.items() if signal_id in still_open]
+        if not hits:
+            return 0
+
+        now = timezone.now()
+        TradingSignal.objects.bulk_update(
+            [
+                TradingSignal(
+                    id=hit.signal_id,
+                    is_executed=True,
+                    executed_at=hit.timestamp,
+                    execution_price=Decimal(str(hit.execution_price)),
+                    is_profitable=hit.is_profitable,
+                    profit_loss=Decimal(str(round(hit.pnl, 6))),
+                    updated_at=now,
+                )
+                for hit in hits
+            ],
+            ['is_executed', 'executed_at', 'execution_price', 'is_profitable', 'profit_loss', 'updated_at'],
+            batch_size=500,
+        )
+        self.stats['persisted'] += len(hits)
+        logger.info(f"Recorded {len(hits)} live signal outcomes")
+
+        for hit in hits:
+            self.broadcaster.broadcast_signal_outcome(
+                signal_id=hit.signal_id,
+                symbol=hit.symbol,
+                status=hit.status,
+                execution_price=hit.execution_price,
+                pnl=hit.pnl,
+                timestamp=hit.timestamp,
+            )
+        return len(hits)
+
+    def flush(self) -> int:
+        return self.persist(self.take_hits())
+
+    async def run(self) -> None:
+        """Persist hits every ``flush_seconds`` and reload every ``reload_seconds`` until ``stop``"""
+        self._stopping = asyncio.Event()
+        reloaded_at = None
+        try:
+            while not self._stopping.is_set():
+                if reloaded_at is None or time.monotonic() - reloaded_at >= self.reload_seconds:
+                    try:
+                        self.rebuild(await asyncio.to_thread(self.load_open_signals))
+                    except Exception as e:
+                        logger.error(f"Error loading open signals: {e}")
+                    reloaded_at = time.monotonic()
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                await self._persist_pending()
+        finally:
+            self._stopping = None
+
+    async def _persist_pending(self) -> None:
+        hits = self.take_hits()
+        if not hits:
+            return
+        try:
+            await asyncio.to_thread(self.persist, hits)
+        except Exception as e:
+            logger.error(f"Error persisting {len(hits)} signal outcomes: {e}")
+            self._hits[:0] = hits  # retry on the next flush
+
+    def start(self) -> asyncio.Task:
+        """Start ``run`` as a task on the running loop (once)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the loop after persisting what is pending"""
+        if self._task is None:
+            return
+        if self._stopping is not None:
+            self._stopping.set()
+        else:
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self._persist_pending()
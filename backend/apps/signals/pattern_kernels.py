@@ -0,0 +1,271 @@
+"""
+NumPy kernels for the advanced-indicator and SMC pattern detectors.
+
+Each kernel takes plain float64 arrays and returns an array aligned with its input, so
+the detectors can evaluate a condition for every bar at once and only build result
+dicts/patterns for the bars that match. Window extremes use
+``np.lib.stride_tricks.sliding_window_view`` (a view, no copy) and rolling means go
+through pandas so the numbers are bit-identical to the per-bar ``rolling().mean()``
+calls they replace.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _pad(values: np.ndarray, before: int, after: int, fill: float) -> np.ndarray:
+    return np.concatenate((np.full(before, fill), values, np.full(after, fill)))
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """max(values[i-window+1 .. i]); NaN until the window is full (``rolling(window).max()``)."""
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        out[window - 1:] = sliding_window_view(values, window).max(axis=1)
+    return out
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """min(values[i-window+1 .. i]); NaN until the window is full (``rolling(window).min()``)."""
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        out[window - 1:] = sliding_window_view(values, window).min(axis=1)
+    return out
+
+
+def shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """``Series.shift(periods)`` for positive periods: values[i - periods], NaN before."""
+    out = np.full(len(values), np.nan)
+    if periods < len(values):
+        out[periods:] = values[:len(values) - periods]
+    return out
+
+
+def trailing_max(values: np.ndarray, window: int) -> np.ndarray:
+    """max(values[i-window .. i-1]) — the ``window`` bars before i."""
+    return shift(rolling_max(values, window))
+
+
+def trailing_min(values: np.ndarray, window: int) -> np.ndarray:
+    """min(values[i-window .. i-1]) — the ``window`` bars before i."""
+    return shift(rolling_min(values, window))
+
+
+def leading_max(values: np.ndarray, window: int) -> np.ndarray:
+    """max(values[i+1 .. i+window]), truncated at the end of the array (-inf if empty)."""
+    padded = _pad(values, 0, window, -np.inf)
+    return sliding_window_view(padded[1:], window).max(axis=1)
+
+
+def leading_min(values: np.ndarray, window: int) -> np.ndarray:
+    """min(values[i+1 .. i+window]), truncated at the end of the array (+inf if empty)."""
+    padded = _pad(values, 0, window, np.inf)
+    return sliding_window_view(padded[1:], window).min(axis=1)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """``rolling(window).mean()`` as an array."""
+    return pd.Series(values, dtype=np.float64).rolling(window=window).mean().to_numpy()
+
+
+def strict_peaks(values: np.ndarray, left: int, right: int = None) -> np.ndarray:
+    """True where values[i] is strictly greater than the ``left`` bars before and ``right`` after.
+
+    Bars without a full neighbourhood are never peaks.
+    """
+    right = left if right is None else right
+    n = len(values)
+    mask = np.zeros(n, dtype=bool)
+    if n < left + right + 1:
+        return mask
+    before = trailing_max(values, left)
+    after = leading_max(values, right)
+    core = slice(left, n - right)
+    with np.errstate(invalid='ignore'):
+        mask[core] = (values[core] > before[core]) & (values[core] > after[core])
+    return mask
+
+
+def strict_troughs(values: np.ndarray, left: int, right: int = None) -> np.ndarray:
+    """True where values[i] is strictly lower than the ``left`` bars before and ``right`` after."""
+    right = left if right is None else right
+    n = len(values)
+    mask = np.zeros(n, dtype=bool)
+    if n < left + right + 1:
+        return mask
+    before = trailing_min(values, left)
+    after = leading_min(values, right)
+    core = slice(left, n - right)
+    with np.errstate(invalid='ignore'):
+        mask[core] = (values[core] < before[core]) & (values[core] < after[core])
+    return mask
+
+
+def neighbour_mean(values: np.ndarray, radius: int) -> np.ndarray:
+    """Mean of values[i-radius .. i+radius] excluding values[i]; NaN near the edges."""
+    out = np.full(len(values), np.nan)
+    width = 2 * radius + 1
+    if width <= len(values):
+        windows = sliding_window_view(values, width)
+        neighbours = np.delete(windows, radius, axis=1)
+        out[radius:len(values) - radius] = neighbours.mean(axis=1)
+    return out
+
+
+def previous_true_index(mask: np.ndarray) -> np.ndarray:
+    """For every i, the largest j < i with mask[j] True, or -1."""
+    if not len(mask):
+        return np.empty(0, dtype=np.int64)
+    latest = np.maximum.accumulate(np.where(mask, np.arange(len(mask)), -1))
+    return np.concatenate(([-1], latest[:-1]))
+
+
+def sma_rsi(prices: np.ndarray, period: int) -> np.ndarray:
+    """RSI from simple averages of the ``period`` changes ending at each bar; NaN for the first ``period`` bars.
+
+    A window without losses gives 100.
+    """
+    out = np.full(len(prices), np.nan)
+    if len(prices) <= period:
+        return out
+    deltas = np.diff(prices)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    avg_gain = sliding_window_view(gains, period).mean(axis=1)
+    avg_loss = sliding_window_view(losses, period).mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    out[period:] = np.where(avg_loss == 0, 100.0, rsi)
+    return out
+
+
+def stochastic(values: np.ndarray, window: int, flat: float = 50.0) -> np.ndarray:
+    """100 * (v - min) / (max - min) over the trailing ``window`` values; ``flat`` when max == min."""
+    lowest = rolling_min(values, window)
+    highest = rolling_max(values, window)
+    span = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = (values - lowest) / span * 100
+    return np.where(span == 0, flat, result)
+
+
+# Smart Money Concepts detectors. Each returns boolean masks over the bars plus the
+# per-bar levels the caller needs to describe a match.
+
+def structure_breaks(high: np.ndarray, low: np.ndarray, volume: np.ndarray, lookback: int,
+                     min_break: float, volume_multiplier: float) -> dict:
+    """Break of structure: bar i clears the extreme of the ``lookback`` bars before it on above-average volume."""
+    bars = np.arange(len(high))
+    avg_volume = rolling_mean(volume, 10)
+    previous_high = trailing_max(high, lookback)
+    previous_low = trailing_min(low, lookback)
+    with np.errstate(invalid='ignore'):
+        confirmed = (bars >= lookback) & (volume >= avg_volume * volume_multiplier)
+        bullish = confirmed & (high > previous_high * (1 + min_break))
+        bearish = confirmed & (low < previous_low * (1 - min_break))
+    return {
+        'bullish': bullish,
+        'bearish': bearish,
+        'previous_high': previous_high,
+        'previous_low': previous_low,
+        'avg_volume': avg_volume,
+    }
+
+
+def trend_reversals(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                    lookback: int, min_strength: float, volume_multiplier: float = 1.2) -> dict:
+    """Change of character: SMA(10)/SMA(20) flipped within 5 bars and price moved off the 10-bar extreme."""
+    bars = np.arange(len(close))
+    sma_short = rolling_mean(close, 10)
+    sma_long = rolling_mean(close, 20)
+    was_short, was_long = shift(sma_short, 5), shift(sma_long, 5)
+    recent_low = trailing_min(low, 10)
+    recent_high = trailing_max(high, 10)
+    avg_volume = rolling_mean(volume, 10)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bullish_strength = (close - recent_low) / recent_low
+        bearish_strength = (recent_high - close) / recent_high
+        confirmed = (bars >= max(lookback, 20)) & (volume >= avg_volume * volume_multiplier)
+        bullish = confirmed & (was_short < was_long) & (sma_short > sma_long) & (bullish_strength >= min_strength)
+        bearish = confirmed & (was_short > was_long) & (sma_short < sma_long) & (bearish_strength >= min_strength)
+    return {
+        'bullish': bullish,
+        'bearish': bearish,
+        'recent_low': recent_low,
+        'recent_high': recent_high,
+        'bullish_strength': bullish_strength,
+        'bearish_strength': bearish_strength,
+        'avg_volume': avg_volume,
+    }
+
+
+def order_blocks(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                 volume_threshold: float, min_body: float = 0.02, max_range: float = 0.01,
+                 consolidation_bars: int = 9) -> dict:
+    """Bullish order block: a >2% body on heavy volume followed by a tight (<1%) consolidation."""
+    n = len(close)
+    bars = np.arange(n)
+    avg_volume = rolling_mean(volume, 10)
+    range_high = leading_max(high, consolidation_bars)
+    range_low = leading_min(low, consolidation_bars)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        body = (close - open_) / open_
+        range_size = (range_high - range_low) / range_low
+        blocks = ((bars >= 10) & (bars < n - 5) & (body > min_body)
+                  & (volume >= avg_volume * volume_threshold) & (range_size < max_range))
+    return {
+        'blocks': blocks,
+        'range_high': range_high,
+        'range_low': range_low,
+        'range_size': range_size,
+        'consolidation_end': np.minimum(bars + consolidation_bars + 1, n),
+        'avg_volume': avg_volume,
+    }
+
+
+def price_gaps(high: np.ndarray, low: np.ndarray, volume: np.ndarray, min_gap: float,
+               volume_multiplier: float = 1.2) -> dict:
+    """Gap between bar i and the bar before it, on above-average volume."""
+    bars = np.arange(len(high))
+    previous_high, previous_low = shift(high), shift(low)
+    avg_volume = rolling_mean(volume, 10)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bullish_gap = (low - previous_high) / previous_high
+        bearish_gap = (previous_low - high) / previous_low
+        confirmed = (bars >= 2) & (volume >= avg_volume * volume_multiplier)
+        bullish = confirmed & (bullish_gap > min_gap)
+        bearish = confirmed & (bearish_gap > min_gap)
+    return {
+        'bullish': bullish,
+        'bearish': bearish,
+        'bullish_gap': bullish_gap,
+        'bearish_gap': bearish_gap,
+        'previous_high': previous_high,
+        'previous_low': previous_low,
+        'avg_volume': avg_volume,
+    }
+
+
+def liquidity_sweeps(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                     lookback: int, threshold: float, volume_spike: float) -> dict:
+    """Wick through the ``lookback``-bar low/high on a volume spike, closing back inside."""
+    bars = np.arange(len(close))
+    support = trailing_min(low, lookback)
+    resistance = trailing_max(high, lookback)
+    avg_volume = rolling_mean(volume, 10)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = volume / avg_volume
+        bullish_sweep = (support - low) / support
+        bearish_sweep = (high - resistance) / resistance
+        confirmed = (bars >= lookback) & (volume_ratio >= volume_spike)
+        bullish = confirmed & (bullish_sweep > threshold) & (close > support)
+        bearish = confirmed & (bearish_sweep > threshold) & (close < resistance)
+    return {
+        'bullish': bullish,
+        'bearish': bearish,
+        'support': support,
+        'resistance': resistance,
+        'bullish_sweep': bullish_sweep,
+        'bearish_sweep': bearish_sweep,
+        'volume_ratio': volume_ratio,
+    }
@@ -0,0 +1,105 @@
+"""
+Generation-stamped cache keys for the signals API.
+
+Each logical dataset has a generation counter in the cache: every signal list, the
+list for each symbol, and the statistics payload. Read keys embed the current
+generations of the datasets they depend on, so a write only has to bump the matching
+counters. Every variant of the old key (any symbol/type/valid/limit spelling) then
+misses at once and the stale entries age out on their own TTL.
+
+Counters start at the current time in milliseconds rather than 1, so a counter lost to
+eviction or a cache flush never restarts at a generation an old entry was stored under.
+"""
+import logging
+import time
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_API_CACHE = getattr(settings, 'SIGNAL_API_CACHE', {})
+LIST_TTL = SIGNAL_API_CACHE.get('LIST_TTL', 120)
+EMPTY_LIST_TTL = SIGNAL_API_CACHE.get('EMPTY_LIST_TTL', 10)
+STATISTICS_TTL = SIGNAL_API_CACHE.get('STATISTICS_TTL', 300)
+
+# Datasets with their own generation counter
+SIGNALS = 'signals'  # every signal list; bumped by writes that can touch any symbol
+ALL_SYMBOLS = 'signals:*'  # unfiltered lists; bumped by per-symbol writes too
+STATISTICS = 'signal_statistics'
+
+
+def symbol_namespace(symbol: str) -> str:
+    """Dataset of the lists filtered to one symbol (the API matches symbols case-insensitively)"""
+    return f'signals:{symbol.upper()}'
+
+
+def _counter_key(namespace: str) -> str:
+    return f'cache_generation:{namespace}'
+
+
+def _fresh_generation() -> int:
+    return int(time.time() * 1000)
+
+
+def generations(namespaces: Iterable[str]) -> List[int]:
+    """Current generation of each namespace, creating missing counters (one round trip when all exist)"""
+    namespaces = list(namespaces)
+    keys = [_counter_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # add() loses to a concurrent writer; re-read so both sides agree
+            cache.add(key, _fresh_generation(), None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump(*namespaces: str):
+    """Start a new generation for each namespace, invalidating every key stamped with the old one"""
+    for namespace in namespaces:
+        key = _counter_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_generation(), None)
+
+
+def versioned_key(base: str, namespaces: Iterable[str]) -> str:
+    return f"{base}:g{'.'.join(str(generation) for generation in generations(namespaces))}"
+
+
+def signals_api_key(symbol: Optional[str], signal_type: Optional[str], is_valid: bool, limit: int) -> str:
+    """Cache key of a SignalAPIView list response"""
+    if symbol:
+        symbol = symbol.upper()
+        namespaces = (SIGNALS, symbol_namespace(symbol))
+    else:
+        namespaces = (SIGNALS, ALL_SYMBOLS)
+    return versioned_key(f'signals_api_{symbol}_{signal_type}_{bool(is_valid)}_{int(limit)}', namespaces)
+
+
+def statistics_key() -> str:
+    """Cache key of the signal statistics payload"""
+    return versioned_key('signal_statistics', (STATISTICS,))
+
+
+def invalidate_signals(symbols: Optional[Iterable[str]] = None) -> int:
+    """
+    Invalidate cached signal lists and statistics after a write.
+
+    With ``symbols`` only those symbols' lists (and the unfiltered ones) are invalidated;
+    without, every list is. Returns the number of generations bumped.
+    """
+    if symbols is None:
+        namespaces = [SIGNALS, STATISTICS]
+    else:
+        namespaces = sorted({symbol_namespace(symbol) for symbol in symbols}) + [ALL_SYMBOLS, STATISTICS]
+    try:
+        bump(*namespaces)
+    except Exception as e:
+        # Never fail a write because the cache is unreachable; entries expire on their TTL
+        logger.warning(f"Failed to invalidate signal caches: {e}")
+        return 0
+    return len(namespaces)
@@ -0,0 +1,123 @@
+"""
+Set-based signal lifecycle maintenance.
+
+``cleanup_expired_signals`` (every 15 minutes) counted the expired signals, updated
+them, and then iterated the same queryset to create one ``SignalAlert`` each, fetching
+``signal.symbol`` and ``signal.signal_type`` lazily per alert. Because the queryset was
+re-evaluated after the update, it matched nothing and no alert was created. The
+post-generation duplicate cleanup ran a count, a ``first()`` and an ``update`` for
+every (symbol, type) group.
+
+``SignalLifecycleEngine`` does each pass in a fixed number of statements:
+
+- ``expire_signals`` reads the expiring ids with their symbol and type names in one
+  query, flips them with one ``update`` and writes their alerts with one
+  ``bulk_create``.
+- ``resolve_duplicates`` ranks the valid, unexecuted signals with
+  ``ROW_NUMBER() OVER (PARTITION BY symbol, signal_type ORDER BY created_at DESC, id
+  DESC)`` and invalidates every row ranked after the first, with one ``update``.
+
+Each pass returns and logs how many rows it selected, updated and created.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from apps.signals import signal_cache
+from apps.signals.models import SignalAlert, TradingSignal
+
+
+logger = logging.getLogger(__name__)
+
+# Rows without expires_at expire this long after creation (SignalGenerationService's default)
+LEGACY_EXPIRY = timedelta(hours=48)
+# Ids per UPDATE ... WHERE id IN (...) statement
+UPDATE_CHUNK = 1000
+
+
+def _update_in_chunks(ids: List[int], **values) -> int:
+    updated = 0
+    for i in range(0, len(ids), UPDATE_CHUNK):
+        updated += TradingSignal.objects.filter(id__in=ids[i:i + UPDATE_CHUNK], is_valid=True).update(**values)
+    return updated
+
+
+class SignalLifecycleEngine:
+    """Expiry and duplicate resolution for TradingSignal rows, one set-based pass each"""
+
+    def expire_signals(self, now: Optional[datetime] = None) -> Dict:
+        """Invalidate expired signals and create a SIGNAL_EXPIRED alert for each"""
+        started = time.perf_counter()
+        if now is None:
+            now = timezone.now()
+        # Expired if expires_at is in the past, or, for legacy/sample rows without
+        # expires_at, created_at is older than the default expiry window
+        expiring = list(
+            TradingSignal.objects.filter(is_valid=True).filter(
+                Q(expires_at__lt=now) |
+                Q(expires_at__isnull=True, created_at__lt=now - LEGACY_EXPIRY)
+            ).values_list('id', 'symbol__symbol', 'signal_type__name')
+        )
+
+        updated = created = 0
+        if expiring:
+            with transaction.atomic():
+                updated = _update_in_chunks([row[0] for row in expiring], is_valid=False)
+                alerts = SignalAlert.objects.bulk_create(
+                    [
+                        SignalAlert(
+                            alert_type='SIGNAL_EXPIRED',
+                            priority='MEDIUM',
+                            title=f"Signal Expired for {symbol}",
+                            message=f"{signal_type} signal has expired",
+                            signal_id=signal_id,
+                        )
+                        for signal_id, symbol, signal_type in expiring
+                    ],
+                    batch_size=500,
+                )
+                created = len(alerts)
+            signal_cache.invalidate_signals(sorted({row[1] for row in expiring}))
+
+        return self._metrics('expire', started, selected=len(expiring), updated=updated, created=created)
+
+    def resolve_duplicates(self) -> Dict:
+        """Keep only the latest valid, unexecuted signal per (symbol, signal_type)"""
+        started = time.perf_counter()
+        ranked = TradingSignal.objects.filter(is_valid=True, is_executed=False).annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F('symbol_id'), F('signal_type_id')],
+                order_by=[F('created_at').desc(), F('id').desc()],
+            )
+        )
+        superseded = list(ranked.filter(position__gt=1).values_list('id', flat=True))
+
+        updated = 0
+        if superseded:
+            with transaction.atomic():
+                updated = _update_in_chunks(superseded, is_valid=False)
+
+        return self._metrics('duplicates', started, selected=len(superseded), updated=updated, created=0)
+
+    @staticmethod
+    def _metrics(name: str, started: float, selected: int, updated: int, created: int) -> Dict:
+        metrics = {
+            'pass': name,
+            'selected': selected,
+            'updated': updated,
+            'created': created,
+            'rows_touched': updated + created,
+            'seconds': round(time.perf_counter() - started, 4),
+        }
+        logger.info(
+            f"Signal lifecycle {name}: selected={selected} updated={updated} "
+            f"created={created} in {metrics['seconds']}s"
+        )
+        return metrics
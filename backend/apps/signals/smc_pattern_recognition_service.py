@@ -16,6 +16,7 @@ from django.db import transaction
 from apps.trading.models import Symbol
 from apps.data.models import MarketData
 from apps.signals.models import ChartImage, ChartPattern, EntryPoint
+from apps.signals import pattern_kernels as kernels
 
 logger = logging.getLogger(__name__)
 
@@ -222,79 +223,47 @@ class SMCPatternRecognitionService:
             if len(df) < self.bos_config['lookback_periods']:
                 return patterns
             
-            # Calculate structure levels
-            highs = df['high'].rolling(window=self.bos_config['lookback_periods']).max()
-            lows = df['low'].rolling(window=self.bos_config['lookback_periods']).min()
-            
-            # Detect bullish BOS (break above previous high)
-            for i in range(self.bos_config['lookback_periods'], len(df)):
-                current_high = df.iloc[i]['high']
-                previous_high = highs.iloc[i-1]
+            high = df['high'].to_numpy(dtype=float)
+            low = df['low'].to_numpy(dtype=float)
+            volume = df['volume'].to_numpy(dtype=float)
+            breaks = kernels.structure_breaks(
+                high, low, volume,
+                lookback=self.bos_config['lookback_periods'],
+                min_break=self.bos_config['min_structure_break'],
+                volume_multiplier=self.bos_config['volume_multiplier'],
+            )
+            
+            # Bullish BOS (break above previous high)
+            for i in np.flatnonzero(breaks['bullish']):
+                previous_high = float(breaks['previous_high'][i])
+                current_high = float(high[i])
+                break_strength = (current_high - previous_high) / previous_high
+                volume_ratio = volume[i] / breaks['avg_volume'][i]
+                confidence_score = float(min(0.95, (break_strength * 10 + volume_ratio * 0.1)))
                 
-                if current_high > previous_high * (1 + self.bos_config['min_structure_break']):
-                    # Check volume confirmation
-                    avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                    current_volume = df.iloc[i]['volume']
-                    
-                    if current_volume >= avg_volume * self.bos_config['volume_multiplier']:
-                        # Calculate confidence score
-                        break_strength = (current_high - previous_high) / previous_high
-                        volume_ratio = current_volume / avg_volume
-                        confidence_score = min(0.95, (break_strength * 10 + volume_ratio * 0.1))
-                        
-                        # Calculate coordinates
-                        x_pos = i / len(df)
-                        y_pos = (current_high - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                        
-                        pattern = ChartPattern(
-                            chart_image=chart_image,
-                            pattern_type='BOS',
-                            confidence_score=confidence_score,
-                            x_start=x_pos - 0.05,
-                            y_start=y_pos,
-                            x_end=x_pos + 0.05,
-                            y_end=y_pos,
-                            strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
-                            pattern_price_low=Decimal(str(previous_high)),
-                            pattern_price_high=Decimal(str(current_high)),
-                            is_validated=False
-                        )
-                        patterns.append(pattern)
-            
-            # Detect bearish BOS (break below previous low)
-            for i in range(self.bos_config['lookback_periods'], len(df)):
-                current_low = df.iloc[i]['low']
-                previous_low = lows.iloc[i-1]
+                x_pos = i / len(df)
+                y_pos = self._chart_y(chart_image, current_high)
+                patterns.append(self._build_pattern(
+                    chart_image, 'BOS', confidence_score,
+                    x_pos - 0.05, y_pos, x_pos + 0.05, y_pos,
+                    price_low=previous_high, price_high=current_high
+                ))
+            
+            # Bearish BOS (break below previous low)
+            for i in np.flatnonzero(breaks['bearish']):
+                previous_low = float(breaks['previous_low'][i])
+                current_low = float(low[i])
+                break_strength = (previous_low - current_low) / previous_low
+                volume_ratio = volume[i] / breaks['avg_volume'][i]
+                confidence_score = float(min(0.95, (break_strength * 10 + volume_ratio * 0.1)))
                 
-                if current_low < previous_low * (1 - self.bos_config['min_structure_break']):
-                    # Check volume confirmation
-                    avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                    current_volume = df.iloc[i]['volume']
-                    
-                    if current_volume >= avg_volume * self.bos_config['volume_multiplier']:
-                        # Calculate confidence score
-                        break_strength = (previous_low - current_low) / previous_low
-                        volume_ratio = current_volume / avg_volume
-                        confidence_score = min(0.95, (break_strength * 10 + volume_ratio * 0.1))
-                        
-                        # Calculate coordinates
-                        x_pos = i / len(df)
-                        y_pos = (current_low - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                        
-                        pattern = ChartPattern(
-                            chart_image=chart_image,
-                            pattern_type='BOS',
-                            confidence_score=confidence_score,
-                            x_start=x_pos - 0.05,
-                            y_start=y_pos,
-                            x_end=x_pos + 0.05,
-                            y_end=y_pos,
-                            strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
-                            pattern_price_low=Decimal(str(current_low)),
-                            pattern_price_high=Decimal(str(previous_low)),
-                            is_validated=False
-                        )
-                        patterns.append(pattern)
+                x_pos = i / len(df)
+                y_pos = self._chart_y(chart_image, current_low)
+                patterns.append(self._build_pattern(
+                    chart_image, 'BOS', confidence_score,
+                    x_pos - 0.05, y_pos, x_pos + 0.05, y_pos,
+                    price_low=current_low, price_high=previous_low
+                ))
             
             return patterns
             
@@ -311,89 +280,34 @@ class SMCPatternRecognitionService:
             if len(df) < self.choch_config['lookback_periods']:
                 return patterns
             
-            # Calculate trend direction
-            sma_short = df['close'].rolling(window=10).mean()
-            sma_long = df['close'].rolling(window=20).mean()
-            
-            # Detect bullish CHoCH (downtrend to uptrend)
-            for i in range(self.choch_config['lookback_periods'], len(df)):
-                # Check if we're transitioning from downtrend to uptrend
-                if (i >= 20 and 
-                    sma_short.iloc[i-5] < sma_long.iloc[i-5] and  # Was in downtrend
-                    sma_short.iloc[i] > sma_long.iloc[i]):        # Now in uptrend
-                    
-                    # Check for significant reversal
-                    recent_low = df['low'].iloc[i-10:i].min()
-                    current_price = df.iloc[i]['close']
-                    reversal_strength = (current_price - recent_low) / recent_low
+            close = df['close'].to_numpy(dtype=float)
+            volume = df['volume'].to_numpy(dtype=float)
+            reversals = kernels.trend_reversals(
+                df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float), close, volume,
+                lookback=self.choch_config['lookback_periods'],
+                min_strength=self.choch_config['min_reversal_strength'],
+            )
+            
+            # Bullish CHoCH (downtrend to uptrend) then bearish CHoCH (uptrend to downtrend)
+            for direction in ('bullish', 'bearish'):
+                for i in np.flatnonzero(reversals[direction]):
+                    current_price = float(close[i])
+                    reversal_strength = reversals[f'{direction}_strength'][i]
+                    volume_ratio = volume[i] / reversals['avg_volume'][i]
+                    confidence_score = float(min(0.95, reversal_strength * 20 + volume_ratio * 0.1))
                     
-                    if reversal_strength >= self.choch_config['min_reversal_strength']:
-                        # Check volume confirmation
-                        avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                        current_volume = df.iloc[i]['volume']
-                        
-                        if current_volume >= avg_volume * 1.2:
-                            # Calculate confidence score
-                            confidence_score = min(0.95, reversal_strength * 20 + (current_volume / avg_volume) * 0.1)
-                            
-                            # Calculate coordinates
-                            x_pos = i / len(df)
-                            y_pos = (current_price - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                            
-                            pattern = ChartPattern(
-                                chart_image=chart_image,
-                                pattern_type='CHOCH',
-                                confidence_score=confidence_score,
-                                x_start=x_pos - 0.1,
-                                y_start=y_pos,
-                                x_end=x_pos + 0.1,
-                                y_end=y_pos,
-                                strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
-                                pattern_price_low=Decimal(str(recent_low)),
-                                pattern_price_high=Decimal(str(current_price)),
-                                is_validated=False
-                            )
-                            patterns.append(pattern)
-            
-            # Detect bearish CHoCH (uptrend to downtrend)
-            for i in range(self.choch_config['lookback_periods'], len(df)):
-                # Check if we're transitioning from uptrend to downtrend
-                if (i >= 20 and 
-                    sma_short.iloc[i-5] > sma_long.iloc[i-5] and  # Was in uptrend
-                    sma_short.iloc[i] < sma_long.iloc[i]):        # Now in downtrend
-                    
-                    # Check for significant reversal
-                    recent_high = df['high'].iloc[i-10:i].max()
-                    current_price = df.iloc[i]['close']
-                    reversal_strength = (recent_high - current_price) / recent_high
+                    if direction == 'bullish':
+                        price_low, price_high = float(reversals['recent_low'][i]), current_price
+                    else:
+                        price_low, price_high = current_price, float(reversals['recent_high'][i])
                     
-                    if reversal_strength >= self.choch_config['min_reversal_strength']:
-                        # Check volume confirmation
-                        avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                        current_volume = df.iloc[i]['volume']
-                        
-                        if current_volume >= avg_volume * 1.2:
-                            # Calculate confidence score
-                            confidence_score = min(0.95, reversal_strength * 20 + (current_volume / avg_volume) * 0.1)
-                            
-                            # Calculate coordinates
-                            x_pos = i / len(df)
-                            y_pos = (current_price - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                            
-                            pattern = ChartPattern(
-                                chart_image=chart_image,
-                                pattern_type='CHOCH',
-                                confidence_score=confidence_score,
-                                x_start=x_pos - 0.1,
-                                y_start=y_pos,
-                                x_end=x_pos + 0.1,
-                                y_end=y_pos,
-                                strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
-                                pattern_price_low=Decimal(str(current_price)),
-                                pattern_price_high=Decimal(str(recent_high)),
-                                is_validated=False
-                            )
-                            patterns.append(pattern)
+                    x_pos = i / len(df)
+                    y_pos = self._chart_y(chart_image, current_price)
+                    patterns.append(self._build_pattern(
+                        chart_image, 'CHOCH', confidence_score,
+                        x_pos - 0.1, y_pos, x_pos + 0.1, y_pos,
+                        price_low=price_low, price_high=price_high
+                    ))
             
             return patterns
             
@@ -410,57 +324,27 @@ class SMCPatternRecognitionService:
             if len(df) < 20:
                 return patterns
             
-            # Detect bullish order blocks (after strong move up)
-            for i in range(10, len(df) - 5):
-                # Look for strong bullish candle followed by consolidation
-                current_candle = df.iloc[i]
-                prev_candle = df.iloc[i-1]
+            volume = df['volume'].to_numpy(dtype=float)
+            # Strong bullish candle (>2%) on heavy volume, then <1% consolidation over the next 9 candles
+            blocks = kernels.order_blocks(
+                df['open'].to_numpy(dtype=float), df['high'].to_numpy(dtype=float),
+                df['low'].to_numpy(dtype=float), df['close'].to_numpy(dtype=float), volume,
+                volume_threshold=self.order_block_config['volume_threshold'],
+            )
+            
+            for i in np.flatnonzero(blocks['blocks']):
+                range_high = float(blocks['range_high'][i])
+                range_low = float(blocks['range_low'][i])
+                volume_ratio = volume[i] / blocks['avg_volume'][i]
+                consolidation_score = 1 - blocks['range_size'][i] * 100
+                confidence_score = float(min(0.95, (volume_ratio * 0.3 + consolidation_score * 0.7)))
                 
-                # Check for strong bullish candle
-                candle_size = (current_candle['close'] - current_candle['open']) / current_candle['open']
-                if candle_size > 0.02:  # 2% minimum candle size
-                    
-                    # Check for volume confirmation
-                    avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                    if current_candle['volume'] >= avg_volume * self.order_block_config['volume_threshold']:
-                        
-                        # Look for consolidation after the move
-                        consolidation_start = i + 1
-                        consolidation_end = min(i + 10, len(df))
-                        
-                        # Check if price consolidates in the range
-                        consolidation_range = df.iloc[consolidation_start:consolidation_end]
-                        if len(consolidation_range) >= 3:
-                            range_high = consolidation_range['high'].max()
-                            range_low = consolidation_range['low'].min()
-                            range_size = (range_high - range_low) / range_low
-                            
-                            if range_size < 0.01:  # Less than 1% range
-                                # Calculate confidence score
-                                volume_ratio = current_candle['volume'] / avg_volume
-                                consolidation_score = 1 - range_size * 100
-                                confidence_score = min(0.95, (volume_ratio * 0.3 + consolidation_score * 0.7))
-                                
-                                # Calculate coordinates
-                                x_start = consolidation_start / len(df)
-                                x_end = consolidation_end / len(df)
-                                y_start = (range_low - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                                y_end = (range_high - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                                
-                                pattern = ChartPattern(
-                                    chart_image=chart_image,
-                                    pattern_type='ORDER_BLOCK',
-                                    confidence_score=confidence_score,
-                                    x_start=x_start,
-                                    y_start=y_start,
-                                    x_end=x_end,
-                                    y_end=y_end,
-                                    strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
-                                    pattern_price_low=Decimal(str(range_low)),
-                                    pattern_price_high=Decimal(str(range_high)),
-                                    is_validated=False
-                                )
-                                patterns.append(pattern)
+                patterns.append(self._build_pattern(
+                    chart_image, 'ORDER_BLOCK', confidence_score,
+                    (i + 1) / len(df), self._chart_y(chart_image, range_low),
+                    blocks['consolidation_end'][i] / len(df), self._chart_y(chart_image, range_high),
+                    price_low=range_low, price_high=range_high
+                ))
             
             return patterns
             
@@ -477,81 +361,30 @@ class SMCPatternRecognitionService:
             if len(df) < 10:
                 return patterns
             
-            # Detect bullish FVG (gap up)
-            for i in range(2, len(df)):
-                prev_candle = df.iloc[i-1]
-                current_candle = df.iloc[i]
-                
-                # Check for gap up
-                gap_size = (current_candle['low'] - prev_candle['high']) / prev_candle['high']
-                
-                if gap_size > self.fvg_config['min_gap_size']:
-                    # Check volume confirmation
-                    avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                    if current_candle['volume'] >= avg_volume * 1.2:
-                        
-                        # Calculate confidence score
-                        volume_ratio = current_candle['volume'] / avg_volume
-                        gap_score = min(1.0, gap_size * 200)  # Scale gap size
-                        confidence_score = min(0.95, (gap_score * 0.6 + volume_ratio * 0.4))
-                        
-                        # Calculate coordinates
-                        x_pos = i / len(df)
-                        y_start = (prev_candle['high'] - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                        y_end = (current_candle['low'] - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                        
-                        pattern = ChartPattern(
-                            chart_image=chart_image,
-                            pattern_type='FAIR_VALUE_GAP',
-                            confidence_score=confidence_score,
-                            x_start=x_pos - 0.05,
-                            y_start=y_start,
-                            x_end=x_pos + 0.05,
-                            y_end=y_end,
-                            strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
-                            pattern_price_low=Decimal(str(prev_candle['high'])),
-                            pattern_price_high=Decimal(str(current_candle['low'])),
-                            is_validated=False
-                        )
-                        patterns.append(pattern)
-            
-            # Detect bearish FVG (gap down)
-            for i in range(2, len(df)):
-                prev_candle = df.iloc[i-1]
-                current_candle = df.iloc[i]
-                
-                # Check for gap down
-                gap_size = (prev_candle['low'] - current_candle['high']) / prev_candle['low']
-                
-                if gap_size > self.fvg_config['min_gap_size']:
-                    # Check volume confirmation
-                    avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                    if current_candle['volume'] >= avg_volume * 1.2:
-                        
-                        # Calculate confidence score
-                        volume_ratio = current_candle['volume'] / avg_volume
-                        gap_score = min(1.0, gap_size * 200)  # Scale gap size
-                        confidence_score = min(0.95, (gap_score * 0.6 + volume_ratio * 0.4))
-                        
-                        # Calculate coordinates
-                        x_pos = i / len(df)
-                        y_start = (current_candle['high'] - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                        y_end = (prev_candle['low'] - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                        
-                        pattern = ChartPattern(
-                            chart_image=chart_image,
-                            pattern_type='FAIR_VALUE_GAP',
-                            confidence_score=confidence_score,
-                            x_start=x_pos - 0.05,
-                            y_start=y_start,
-                            x_end=x_pos + 0.05,
-                            y_end=y_end,
-                            strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
-                            pattern_price_low=Decimal(str(current_candle['high'])),
-                            pattern_price_high=Decimal(str(prev_candle['low'])),
-                            is_validated=False
-                        )
-                        patterns.append(pattern)
+            high = df['high'].to_numpy(dtype=float)
+            low = df['low'].to_numpy(dtype=float)
+            volume = df['volume'].to_numpy(dtype=float)
+            gaps = kernels.price_gaps(high, low, volume, min_gap=self.fvg_config['min_gap_size'])
+            
+            # Bullish FVG (gap up) then bearish FVG (gap down)
+            for direction in ('bullish', 'bearish'):
+                for i in np.flatnonzero(gaps[direction]):
+                    volume_ratio = volume[i] / gaps['avg_volume'][i]
+                    gap_score = min(1.0, gaps[f'{direction}_gap'][i] * 200)  # Scale gap size
+                    confidence_score = float(min(0.95, (gap_score * 0.6 + volume_ratio * 0.4)))
+                    
+                    if direction == 'bullish':
+                        price_low, price_high = float(high[i-1]), float(low[i])
+                    else:
+                        price_low, price_high = float(high[i]), float(low[i-1])
+                    
+                    x_pos = i / len(df)
+                    patterns.append(self._build_pattern(
+                        chart_image, 'FAIR_VALUE_GAP', confidence_score,
+                        x_pos - 0.05, self._chart_y(chart_image, price_low),
+                        x_pos + 0.05, self._chart_y(chart_image, price_high),
+                        price_low=price_low, price_high=price_high
+                    ))
             
             return patterns
             
@@ -568,91 +401,38 @@ class SMCPatternRecognitionService:
             if len(df) < self.liquidity_sweep_config['lookback_periods']:
                 return patterns
             
-            # Detect bullish liquidity sweep (sweep below support then reversal)
-            for i in range(self.liquidity_sweep_config['lookback_periods'], len(df)):
-                # Find recent support level
-                lookback_data = df.iloc[i-self.liquidity_sweep_config['lookback_periods']:i]
-                support_level = lookback_data['low'].min()
-                
-                current_candle = df.iloc[i]
-                
-                # Check for sweep below support
-                sweep_size = (support_level - current_candle['low']) / support_level
-                
-                if sweep_size > self.liquidity_sweep_config['sweep_threshold']:
-                    # Check for volume spike
-                    avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                    volume_ratio = current_candle['volume'] / avg_volume
+            high = df['high'].to_numpy(dtype=float)
+            low = df['low'].to_numpy(dtype=float)
+            close = df['close'].to_numpy(dtype=float)
+            sweeps = kernels.liquidity_sweeps(
+                high, low, close, df['volume'].to_numpy(dtype=float),
+                lookback=self.liquidity_sweep_config['lookback_periods'],
+                threshold=self.liquidity_sweep_config['sweep_threshold'],
+                volume_spike=self.liquidity_sweep_config['volume_spike'],
+            )
+            
+            # Bullish sweep below support, then bearish sweep above resistance; both must close back inside
+            for direction in ('bullish', 'bearish'):
+                for i in np.flatnonzero(sweeps[direction]):
+                    sweep_score = min(1.0, sweeps[f'{direction}_sweep'][i] * 200)
+                    if direction == 'bullish':
+                        level = float(sweeps['support'][i])
+                        rejection_score = (close[i] - level) / level
+                        wick, price_low, price_high = float(low[i]), float(low[i]), level
+                    else:
+                        level = float(sweeps['resistance'][i])
+                        rejection_score = (level - close[i]) / level
+                        wick, price_low, price_high = float(high[i]), level, float(high[i])
+                    confidence_score = float(min(0.95, (sweep_score * 0.4 + rejection_score * 100 * 0.4
+                                                        + sweeps['volume_ratio'][i] * 0.2)))
                     
-                    if volume_ratio >= self.liquidity_sweep_config['volume_spike']:
-                        # Check for rejection (close above support)
-                        if current_candle['close'] > support_level:
-                            # Calculate confidence score
-                            sweep_score = min(1.0, sweep_size * 200)
-                            rejection_score = (current_candle['close'] - support_level) / support_level
-                            confidence_score = min(0.95, (sweep_score * 0.4 + rejection_score * 100 * 0.4 + volume_ratio * 0.2))
-                            
-                            # Calculate coordinates
-                            x_pos = i / len(df)
-                            y_pos = (current_candle['low'] - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                            
-                            pattern = ChartPattern(
-                                chart_image=chart_image,
-                                pattern_type='LIQUIDITY_SWEEP',
-                                confidence_score=confidence_score,
-                                x_start=x_pos - 0.05,
-                                y_start=y_pos,
-                                x_end=x_pos + 0.05,
-                                y_end=y_pos,
-                                strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
-                                pattern_price_low=Decimal(str(current_candle['low'])),
-                                pattern_price_high=Decimal(str(support_level)),
-                                is_validated=False
-                            )
-                            patterns.append(pattern)
-            
-            # Detect bearish liquidity sweep (sweep above resistance then reversal)
-            for i in range(self.liquidity_sweep_config['lookback_periods'], len(df)):
-                # Find recent resistance level
-                lookback_data = df.iloc[i-self.liquidity_sweep_config['lookback_periods']:i]
-                resistance_level = lookback_data['high'].max()
-                
-                current_candle = df.iloc[i]
-                
-                # Check for sweep above resistance
-                sweep_size = (current_candle['high'] - resistance_level) / resistance_level
-                
-                if sweep_size > self.liquidity_sweep_config['sweep_threshold']:
-                    # Check for volume spike
-                    avg_volume = df['volume'].rolling(window=10).mean().iloc[i]
-                    volume_ratio = current_candle['volume'] / avg_volume
-                    
-                    if volume_ratio >= self.liquidity_sweep_config['volume_spike']:
-                        # Check for rejection (close below resistance)
-                        if current_candle['close'] < resistance_level:
-                            # Calculate confidence score
-                            sweep_score = min(1.0, sweep_size * 200)
-                            rejection_score = (resistance_level - current_candle['close']) / resistance_level
-                            confidence_score = min(0.95, (sweep_score * 0.4 + rejection_score * 100 * 0.4 + volume_ratio * 0.2))
-                            
-                            # Calculate coordinates
-                            x_pos = i / len(df)
-                            y_pos = (current_candle['high'] - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
-                            
-                            pattern = ChartPattern(
-                                chart_image=chart_image,
-                                pattern_type='LIQUIDITY_SWEEP',
-                                confidence_score=confidence_score,
-                                x_start=x_pos - 0.05,
-                                y_start=y_pos,
-                                x_end=x_pos + 0.05,
-                                y_end=y_pos,
-                                strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
-                                pattern_price_low=Decimal(str(resistance_level)),
-                                pattern_price_high=Decimal(str(current_candle['high'])),
-                                is_validated=False
-                            )
-                            patterns.append(pattern)
+                    x_pos = i / len(df)
+                    y_pos = self._chart_y(chart_image, wick)
+                    patterns.append(self._build_pattern(
+                        chart_image, 'LIQUIDITY_SWEEP', confidence_score,
+                        x_pos - 0.05, y_pos, x_pos + 0.05, y_pos,
+                        price_low=price_low, price_high=price_high
+                    ))
             
             return patterns
             
@@ -660,6 +440,28 @@ class SMCPatternRecognitionService:
             logger.error(f"Error detecting Liquidity Sweeps: {e}")
             return []
     
+    def _chart_y(self, chart_image: ChartImage, price: float) -> float:
+        """Vertical chart coordinate (0-1) of a price"""
+        return (price - chart_image.price_range_low) / (chart_image.price_range_high - chart_image.price_range_low)
+    
+    def _build_pattern(self, chart_image: ChartImage, pattern_type: str, confidence_score: float,
+                       x_start: float, y_start: float, x_end: float, y_end: float,
+                       price_low: float, price_high: float) -> ChartPattern:
+        """Unsaved ChartPattern for a detected pattern"""
+        return ChartPattern(
+            chart_image=chart_image,
+            pattern_type=pattern_type,
+            confidence_score=confidence_score,
+            x_start=x_start,
+            y_start=y_start,
+            x_end=x_end,
+            y_end=y_end,
+            strength='STRONG' if confidence_score > 0.8 else 'MODERATE',
+            pattern_price_low=Decimal(str(price_low)),
+            pattern_price_high=Decimal(str(price_high)),
+            is_validated=False
+        )
+    
     def save_patterns_to_database(self, patterns: Dict[str, List[ChartPattern]]) -> int:
         """
         Save detected patterns to database
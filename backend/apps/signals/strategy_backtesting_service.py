@@ -69,6 +69,9 @@ class StrategyBacktestingService:
         # Volume confirmation threshold
         self.volume_threshold = 1.2  # 20% above average volume
         
+        # Evaluate precomputed per-bar decisions instead of re-slicing the data for every day
+        self.single_pass = True
+        
         # Strategy sensitivity (for testing - can be adjusted)
         self.min_confirmations = 2  # Minimum confirmations needed (reduced from 4)
         self.enable_debug_logging = True  # Enable detailed logging
@@ -160,26 +163,10 @@ class StrategyBacktestingService:
                 logger.info(f"Loaded {len(historical_data)} data points for analysis")
                 
                 # Generate signals day by day
-                signals = []
-                current_date = start_date
-                
-                while current_date <= end_date:
-                    try:
-                        # Get data up to current date (no look-ahead bias)
-                        data_up_to_date = historical_data[historical_data.index <= current_date]
-                        
-                        if len(data_up_to_date) < 50:  # Need minimum data for analysis
-                            current_date += timedelta(days=1)
-                            continue
-                        
-                        # Analyze current day for signals
-                        daily_signals = self._analyze_daily_signals(symbol, data_up_to_date, current_date)
-                        signals.extend(daily_signals)
-                        
-                    except Exception as e:
-                        logger.error(f"Error analyzing signals for {current_date}: {e}")
-                    
-                    current_date += timedelta(days=1)
+                if self.single_pass:
+                    signals = self._generate_walk_forward_signals(symbol, historical_data, start_date, end_date)
+                else:
+                    signals = self._generate_sliced_signals(symbol, historical_data, start_date, end_date)
                 
                 logger.info(f"Generated {len(signals)} natural signals for {symbol.symbol}")
                 
@@ -225,6 +212,148 @@ class StrategyBacktestingService:
             return []
     
     
+    def _generate_sliced_signals(self, symbol: Symbol, historical_data: pd.DataFrame,
+                                 start_date: datetime, end_date: datetime) -> List[Dict]:
+        """Reference day-by-day loop: re-runs every analysis on a copy of the data up to each day"""
+        signals = []
+        current_date = start_date
+        
+        while current_date <= end_date:
+            try:
+                # Get data up to current date (no look-ahead bias)
+                data_up_to_date = historical_data[historical_data.index <= current_date]
+                
+                if len(data_up_to_date) < 50:  # Need minimum data for analysis
+                    current_date += timedelta(days=1)
+                    continue
+                
+                # Analyze current day for signals
+                daily_signals = self._analyze_daily_signals(symbol, data_up_to_date, current_date)
+                signals.extend(daily_signals)
+                
+            except Exception as e:
+                logger.error(f"Error analyzing signals for {current_date}: {e}")
+            
+            current_date += timedelta(days=1)
+        
+        return signals
+    
+    def _generate_walk_forward_signals(self, symbol: Symbol, historical_data: pd.DataFrame,
+                                       start_date: datetime, end_date: datetime) -> List[Dict]:
+        """
+        Same signals as ``_generate_sliced_signals`` in one pass over the data.
+        
+        Every rule reads only the last three bars of the data up to a day, and the indicator
+        columns are causal, so the trend/entry decision of each bar is computed once for the
+        whole frame. Each day then looks up the last bar at or before it by position.
+        Sentiment and ML are only fetched on days whose decision produces a signal.
+        """
+        decisions = self._precompute_entry_decisions(historical_data)
+        if decisions is None:
+            return []
+        
+        signals = []
+        current_date = start_date
+        while current_date <= end_date:
+            try:
+                # Number of bars at or before current_date (no look-ahead bias)
+                bars = historical_data.index.searchsorted(current_date, side='right')
+                if bars >= 50:  # Need minimum data for analysis
+                    position = bars - 1
+                    if decisions['emit'].iat[position]:
+                        signals.extend(self._signals_for_bar(symbol, historical_data, decisions, position, current_date))
+            except Exception as e:
+                logger.error(f"Error analyzing signals for {current_date}: {e}")
+            
+            current_date += timedelta(days=1)
+        
+        return signals
+    
+    def _precompute_entry_decisions(self, data: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Per-bar trend bias and entry confirmation, matching ``_analyze_daily_trend`` and
+        ``_analyze_entry_confirmation`` evaluated on the data ending at that bar.
+        Returns None when indicator columns are missing (the per-day analysis yields no signals then).
+        """
+        try:
+            sma_fast, sma_slow = data['sma_20'], data['sma_50']
+            bullish = (sma_fast > sma_slow) & (sma_fast.shift() > sma_slow.shift())
+            bearish = (sma_fast < sma_slow) & (sma_fast.shift() < sma_slow.shift())
+            
+            macd, macd_signal = data['macd'], data['macd_signal']
+            macd_prev, macd_signal_prev = macd.shift(), macd_signal.shift()
+            rsi = data['rsi']
+            volume_confirmed = data['volume_ratio'] >= self.volume_threshold
+            candlestick = self._candlestick_patterns(data)
+            
+            buy_count = (
+                rsi.between(*self.rsi_buy_range).astype(int)
+                + ((macd > macd_signal) & (macd_prev <= macd_signal_prev)).astype(int)
+                + volume_confirmed.astype(int)
+                + (candlestick == 'BULLISH').astype(int)
+            ).where(bullish, 0)
+            sell_count = (
+                rsi.between(*self.rsi_sell_range).astype(int)
+                + ((macd < macd_signal) & (macd_prev >= macd_signal_prev)).astype(int)
+                + volume_confirmed.astype(int)
+                + (candlestick == 'BEARISH').astype(int)
+            ).where(bearish, 0)
+        except Exception as e:
+            logger.error(f"Error precomputing entry decisions: {e}")
+            return None
+        
+        is_buy = buy_count >= self.min_confirmations
+        is_sell = ~is_buy & (sell_count >= self.min_confirmations)
+        return pd.DataFrame({
+            'bullish': bullish,
+            'bearish': bearish,
+            'is_buy': is_buy,
+            'is_sell': is_sell,
+            'confirmations': buy_count.where(is_buy, sell_count),
+            'emit': (is_buy & bullish) | (is_sell & bearish),
+        }, index=data.index)
+    
+    def _candlestick_patterns(self, data: pd.DataFrame) -> pd.Series:
+        """``_analyze_candlestick_pattern`` for every bar (first matching pattern wins)"""
+        open_, high, low, close = data['open'], data['high'], data['low'], data['close']
+        prev_open, prev_close = open_.shift(), close.shift()
+        body_low, body_high = np.minimum(open_, close), np.maximum(open_, close)
+        conditions = [
+            (prev_close < prev_open) & (close > open_) & (open_ < prev_close) & (close > prev_open),  # Bullish engulfing
+            (prev_close > prev_open) & (close < open_) & (open_ > prev_close) & (close < prev_open),  # Bearish engulfing
+            (close > open_) & ((low - body_low) > 2 * (body_high - low)),  # Hammer
+            (close < open_) & ((high - body_high) > 2 * (body_high - low)),  # Shooting star
+        ]
+        patterns = np.select(conditions, ['BULLISH', 'BEARISH', 'BULLISH', 'BEARISH'], default='NEUTRAL')
+        patterns[:2] = 'NEUTRAL'  # Fewer than 3 candles
+        return pd.Series(patterns, index=data.index)
+    
+    def _signals_for_bar(self, symbol: Symbol, data: pd.DataFrame, decisions: pd.DataFrame,
+                         position: int, current_date: datetime) -> List[Dict]:
+        """Create the signal decided for bar ``position`` on ``current_date``"""
+        current_data = data.iloc[position]
+        decision = decisions.iloc[position]
+        confirmations = int(decision['confirmations'])
+        confirmation = {
+            'direction': 'BUY' if decision['is_buy'] else 'SELL',
+            'confidence': min(0.9, 0.5 + (confirmations * 0.1)),
+            'confirmations': confirmations
+        }
+        sentiment_info = self._get_sentiment_for_date(symbol, current_date)
+        ml_pred = self._get_ml_prediction_for_date(symbol, current_date)
+        
+        if decision['is_buy']:
+            signal = self._create_buy_signal(symbol, current_data, current_date, confirmation, sentiment_info, ml_pred)
+        else:
+            signal = self._create_sell_signal(symbol, current_data, current_date, confirmation, sentiment_info, ml_pred)
+        if not signal:
+            if self.enable_debug_logging:
+                logger.debug(f"{confirmation['direction']} signal rejected for {symbol.symbol} on {current_date.date()}: Risk/reward too low")
+            return []
+        if self.enable_debug_logging:
+            logger.info(f"Generated {confirmation['direction']} signal for {symbol.symbol} on {current_date.date()}")
+        return [signal]
+    
     def _validate_historical_data(self, df: pd.DataFrame) -> bool:
         """Validate that historical data has realistic prices"""
         if df.empty:
@@ -920,8 +1049,8 @@ class StrategyBacktestingService:
                     current_date += timedelta(days=1)
                     continue
                 
-                # Get data up to current date
-                data_up_to_date = historical_data[historical_data.index <= current_date]
+                # Get data up to current date (a prefix view, not a masked copy)
+                data_up_to_date = historical_data.iloc[:historical_data.index.searchsorted(current_date, side='right')]
                 
                 if len(data_up_to_date) < 50:
                     current_date += timedelta(days=1)
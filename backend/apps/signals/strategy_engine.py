@@ -17,7 +17,7 @@ from django.utils import timezone
 
 from apps.trading.models import Symbol
 from apps.signals.models import TradingSignal, SignalType
-from apps.data.models import MarketData
+from apps.data.candle_store import get_candle_store
 from apps.data.services import TechnicalAnalysisService, EconomicDataService
 from apps.signals.timeframe_analysis_service import TimeframeAnalysisService
 
@@ -40,15 +40,18 @@ class StrategyEngine:
         self.ta_service = TechnicalAnalysisService()
         self.timeframe_service = TimeframeAnalysisService()
         self.economic_service = EconomicDataService()
+        self.candle_store = get_candle_store()
 
     def evaluate_symbol(self, symbol: Symbol) -> List[TradingSignal]:
         try:
-            current_md = MarketData.objects.filter(symbol=symbol).order_by('-timestamp').first()
-            if not current_md:
+            # Freshest close across the timeframes analysed below; this also warms the
+            # shared candle store so each timeframe costs one query for the whole evaluation
+            latest = self.candle_store.latest_close(symbol)
+            if not latest:
                 logger.warning(f"No market data for {symbol.symbol}")
                 return []
 
-            current_price = float(current_md.close_price)
+            current_price = latest[1]
 
             # 1) Market context on 1D (trend + zones)
             analysis_1d = self.timeframe_service.analyze_timeframe(symbol, '1D', current_price)
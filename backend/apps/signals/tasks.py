@@ -1,12 +1,22 @@
 import logging
+import os
+import signal as os_signal
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Set
-from celery import shared_task
+from typing import List, Dict, Optional, Set
+from celery import chord, group, shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.result import AsyncResult
+from django.conf import settings
 from django.utils import timezone
 from django.db.models import Q
 from django.core.management import call_command
 from django.core.cache import cache
 
+from apps.signals import signal_cache
+from apps.signals.model_registry import get_model_registry
+from apps.signals.signal_lifecycle import SignalLifecycleEngine
 from apps.signals.models import (
     TradingSignal, SignalType, SignalAlert, SignalPerformance,
     MarketRegime, HourlyBestSignal
@@ -127,6 +137,292 @@ RUNS_PER_DAY = 6
 MAX_BEST_SIGNALS_PER_DAY = BEST_SIGNALS_PER_RUN * RUNS_PER_DAY  # 30
 
 
+def _signal_generation_settings() -> Dict:
+    """Fan-out configuration for the 4h run (SIGNAL_GENERATION_SETTINGS in settings.py)."""
+    options = {
+        'FANOUT_MODE': 'serial',  # serial | process | chord
+        'MAX_WORKERS': 0,  # process pool size; 0 = os.cpu_count()
+        'SYMBOL_TIME_BUDGET_SECONDS': 45,  # per-symbol budget in fan-out modes; 0 = unbounded
+        'MAX_CANDIDATES_SERIAL': 50,  # cap for the in-process loop
+        'MAX_CANDIDATES_FANOUT': 0,  # 0 = score every eligible coin
+    }
+    options.update(getattr(settings, 'SIGNAL_GENERATION_SETTINGS', None) or {})
+    return options
+
+
+def _candidate_score(signal: TradingSignal) -> float:
+    """Ranking score for a candidate: equal blend of quality and confidence."""
+    return (float(signal.quality_score) if signal.quality_score else 0) * 0.5 + (
+        float(signal.confidence_score) if signal.confidence_score else 0
+    ) * 0.5
+
+
+class SymbolTimeBudgetExceeded(Exception):
+    """Raised when generating candidates for one symbol overruns its time budget."""
+
+
+@contextmanager
+def _symbol_time_budget(seconds: float):
+    """
+    Bound one symbol's generation with SIGALRM. Only armed in the main thread of a
+    POSIX process (pool workers); elsewhere it is a no-op and the caller's own limits apply.
+    """
+    if (
+        not seconds
+        or not hasattr(os_signal, 'SIGALRM')
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def _on_alarm(signum, frame):
+        raise SymbolTimeBudgetExceeded(f"exceeded {seconds}s budget")
+
+    previous_handler = os_signal.signal(os_signal.SIGALRM, _on_alarm)
+    os_signal.setitimer(os_signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        os_signal.setitimer(os_signal.ITIMER_REAL, 0)
+        os_signal.signal(os_signal.SIGALRM, previous_handler)
+
+
+def _generate_candidate(symbol_id: int, time_budget: float = 0,
+                        signal_service: Optional[SignalGenerationService] = None) -> Optional[Dict]:
+    """
+    Generate signals for one symbol and return its best one as a picklable candidate
+    ({'signal_id', 'symbol_id', 'score'}), or None. Runs in-process, in a pool worker
+    or inside a Celery subtask, so only IDs cross the boundary.
+    """
+    started_at = timezone.now()
+    symbol_label = symbol_id
+    try:
+        symbol = Symbol.objects.get(id=symbol_id)
+        symbol_label = symbol.symbol
+        service = signal_service or SignalGenerationService()
+        with _symbol_time_budget(time_budget):
+            signals = service.generate_signals_for_symbol(symbol)
+    except (SymbolTimeBudgetExceeded, SoftTimeLimitExceeded):
+        # Signals persisted before the budget ran out were never ranked; don't leave them live.
+        discarded = TradingSignal.objects.filter(
+            symbol_id=symbol_id, created_at__gte=started_at, is_valid=True
+        ).update(is_valid=False)
+        logger.warning(
+            f"[Signal Queue] {symbol_label} exceeded its {time_budget}s budget; "
+            f"discarded {discarded} partial signal(s)."
+        )
+        return None
+    except Exception as e:
+        logger.error(f"[Signal Queue] Error generating for {symbol_label}: {e}")
+        return None
+
+    if not signals or signals[0].pk is None:
+        return None
+    best = signals[0]
+    return {'signal_id': best.pk, 'symbol_id': best.symbol_id, 'score': _candidate_score(best)}
+
+
+def _gather_candidates_serial(symbol_ids: List[int]) -> List[Dict]:
+    """Original in-process loop: one SignalGenerationService, one symbol at a time."""
+    signal_service = SignalGenerationService()
+    results = []
+    for symbol_id in symbol_ids:
+        candidate = _generate_candidate(symbol_id, signal_service=signal_service)
+        if candidate:
+            results.append(candidate)
+    return results
+
+
+def _generate_candidate_in_thread(symbol_id: int, time_budget: float = 0) -> Optional[Dict]:
+    """``_generate_candidate`` for a pool thread; closes the thread's own DB connections after."""
+    from django.db import connections
+    try:
+        return _generate_candidate(symbol_id, time_budget)
+    finally:
+        connections.close_all()
+
+
+def _gather_candidates_process_pool(symbol_ids: List[int], max_workers: int,
+                                    time_budget: float) -> List[Dict]:
+    """
+    Spread candidate generation over a forked process pool. The parent closes its DB
+    connections first so no child inherits a live socket; each child opens its own.
+
+    Prefork Celery workers are daemonic and may not start child processes, so there a
+    thread pool is used instead (and logged). SIGALRM only fires in a main thread, so
+    the per-symbol time budget is not enforced for threads; the task's own time limits
+    still bound the run.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+    from django.db import connections
+
+    workers = max_workers or os.cpu_count() or 1
+    if multiprocessing.current_process().daemon:
+        logger.info(
+            f"[Signal Queue] Running in a daemonic worker process; scoring with {workers} threads "
+            f"instead of a process pool (per-symbol time budget not enforced)."
+        )
+        executor = ThreadPoolExecutor(max_workers=workers)
+        work = _generate_candidate_in_thread
+    else:
+        connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+        work = _generate_candidate
+
+    results = []
+    with executor:
+        futures = {
+            executor.submit(work, symbol_id, time_budget): symbol_id
+            for symbol_id in symbol_ids
+        }
+        for future in as_completed(futures):
+            try:
+                candidate = future.result()
+            except Exception as e:
+                logger.error(f"[Signal Queue] Pool worker failed for symbol {futures[future]}: {e}")
+                continue
+            if candidate:
+                results.append(candidate)
+    return results
+
+
+def _load_candidates(candidate_results: List[Optional[Dict]]) -> List[tuple]:
+    """Turn gathered candidate dicts back into (score, TradingSignal) pairs with one query."""
+    candidate_results = [c for c in (candidate_results or []) if c and c.get('signal_id')]
+    signals_by_id = TradingSignal.objects.select_related('symbol', 'signal_type').in_bulk(
+        [c['signal_id'] for c in candidate_results]
+    )
+    return [
+        (c['score'], signals_by_id[c['signal_id']])
+        for c in candidate_results
+        if c['signal_id'] in signals_by_id
+    ]
+
+
+def _persist_best_signals_for_slot(candidates: List[tuple], today: date, slot_hour: int,
+                                   eligible_count: int, binance_filter_active: bool) -> Dict:
+    """
+    Rank the gathered (score, signal) candidates, balance BUY/SELL, persist the slot's
+    HourlyBestSignal rows and invalidate the rest. Runs once per slot over all candidates,
+    whichever fan-out mode produced them.
+    """
+    from django.db import transaction, IntegrityError
+
+    # Sort by score descending; then take only symbols not already in this slot's best (no duplicate coin per slot/day)
+    candidates.sort(key=lambda x: x[0], reverse=True)
+    existing_in_slot = _symbol_ids_in_hourly_best_for_slot(today, slot_hour)
+    score_by_id = {s.id: sc for sc, s in candidates}
+    to_add: List[TradingSignal] = []
+    for _, s in candidates:
+        if s.symbol_id in existing_in_slot:
+            continue
+        to_add.append(s)
+        existing_in_slot.add(s.symbol_id)
+        if len(to_add) >= BEST_SIGNALS_PER_RUN:
+            break
+    # Balanced mix: ensure at least one BUY-type and one SELL-type in the batch when both exist in candidates
+    if len(to_add) == BEST_SIGNALS_PER_RUN:
+        has_buy = any(_is_buy_type(s) for s in to_add)
+        has_sell = any(_is_sell_type(s) for s in to_add)
+        if not (has_buy and has_sell):
+            other_type_is_buy = not has_buy
+            other_candidates = [
+                (sc, s) for sc, s in candidates
+                if (_is_buy_type(s) if other_type_is_buy else _is_sell_type(s))
+            ]
+            to_add_symbol_ids = {s.symbol_id for s in to_add}
+            if other_candidates:
+                worst_in_to_add = min(to_add, key=lambda s: score_by_id.get(s.id, 0))
+                to_add.remove(worst_in_to_add)
+                to_add_symbol_ids.discard(worst_in_to_add.symbol_id)
+                for _, s in other_candidates:
+                    if s.symbol_id in to_add_symbol_ids or s.symbol_id in existing_in_slot:
+                        continue
+                    to_add.append(s)
+                    to_add_symbol_ids.add(s.symbol_id)
+                    break
+                if len(to_add) < BEST_SIGNALS_PER_RUN:
+                    to_add.append(worst_in_to_add)
+    generated_signals = to_add
+    # Only use signals that are already persisted with valid id (do not save unsaved signals;
+    # they may have NULL required fields like quality_score and would cause IntegrityError)
+    generated_signals = [s for s in generated_signals if s.pk is not None]
+    if not generated_signals:
+        logger.warning("[Signal Queue] No signals with valid id to store in HourlyBestSignal; skipping.")
+        return {
+            'total_signals': 0,
+            'symbols_processed': eligible_count,
+            'signals_generated': 0,
+            'best_signals_selected': 0,
+            'binance_futures_filter_active': binance_filter_active,
+        }
+    generated_symbols = [s.symbol.symbol for s in generated_signals]
+
+    # Invalidate any other signals from this run that were not selected (only if already in DB)
+    chosen_ids = {s.id for s in generated_signals}
+    for _, s in candidates:
+        if s.id not in chosen_ids and s.pk is not None:
+            s.is_valid = False
+            s.save(update_fields=['is_valid'])
+            logger.debug(f"[Signal Queue] Invalidated extra signal {s.id} ({s.symbol.symbol}) from this run.")
+
+    # --- Persist: HourlyBestSignal (source of truth for display) + signal_date/signal_hour on TradingSignal ---
+    try:
+        with transaction.atomic():
+            for rank_one_based, s in enumerate(generated_signals, start=1):
+                signal_id = s.pk
+                if signal_id is None:
+                    logger.warning(f"[Signal Queue] Skipping HourlyBestSignal for {s.symbol.symbol}: signal has no id.")
+                    continue
+                HourlyBestSignal.objects.update_or_create(
+                    signal_date=today,
+                    signal_hour=slot_hour,
+                    symbol_id=s.symbol_id,
+                    defaults={
+                        "trading_signal_id": signal_id,
+                        "rank": rank_one_based,
+                        "quality_score": float(s.quality_score) if s.quality_score is not None else None,
+                    },
+                )
+                s.signal_date = today
+                s.signal_hour = slot_hour
+                s.save(update_fields=['signal_date', 'signal_hour'])
+    except IntegrityError as e:
+        logger.warning(f"[Signal Queue] DB constraint error (HourlyBestSignal): {e}. Slot may have been filled by another run.")
+        return {
+            'total_signals': 0,
+            'skipped': 'constraint',
+            'date': today.isoformat(),
+            'slot_hour': slot_hour,
+        }
+
+    logger.info(
+        f"[Signal Queue] Step 2 done – Selected best {len(generated_signals)} signals for slot {slot_hour} (HourlyBestSignal). "
+        f"Symbols: {generated_symbols}"
+    )
+
+    # CRITICAL: Clean up any duplicates that might have been created due to race conditions
+    # This ensures only the latest signal per symbol+type remains valid
+    try:
+        duplicates = SignalLifecycleEngine().resolve_duplicates()
+        if duplicates['updated'] > 0:
+            logger.warning(f"Cleaned up {duplicates['updated']} duplicate signals after generation")
+    except Exception as e:
+        logger.error(f"Error cleaning up duplicates: {e}")
+
+    # IMPORTANT: invalidate cached signals API responses so the UI updates immediately.
+    signal_cache.invalidate_signals()
+
+    return {
+        'total_signals': len(generated_signals),
+        'symbols_processed': eligible_count,
+        'signals_generated': len(generated_signals),
+        'best_signals_selected': len(generated_signals),
+        'binance_futures_filter_active': binance_filter_active,
+    }
+
+
 @shared_task
 def generate_signals_for_all_symbols():
     """
@@ -143,11 +439,12 @@ def generate_signals_for_all_symbols():
     1. Normalize to 4h slot (0,4,8,12,16,20). If not on slot, skip (beat runs only on slot).
     2. Acquire cache lock for (today, slot_hour). If slot already has 4, return.
     3. Exclude coins that already have a signal today. Generate candidates, take top 5.
+       Candidates are generated according to SIGNAL_GENERATION_SETTINGS['FANOUT_MODE']:
+       'serial' (in-process loop), 'process' (forked pool, threads inside daemonic workers)
+       or 'chord' (Celery group of generate_signal_candidate subtasks with
+       finalize_signal_slot as the callback and abort_signal_slot as its errback).
     4. Persist to HourlyBestSignal and set signal_date/signal_hour on TradingSignal.
     """
-    from datetime import date
-    from django.db import transaction, IntegrityError
-
     now = timezone.now()
     today = now.date()
     hour = now.hour  # 0-23 UTC
@@ -166,6 +463,8 @@ def generate_signals_for_all_symbols():
             'slot_hour': slot_hour,
         }
 
+    # In chord mode the callback owns the lock and releases it once the slot is persisted
+    release_lock = True
     try:
         # --- Never regenerate: if this slot already has 4, skip ---
         existing_count = _count_signals_for_slot(today, slot_hour)
@@ -222,8 +521,8 @@ def generate_signals_for_all_symbols():
         if exclude_symbol_ids:
             active_symbols_qs = active_symbols_qs.exclude(id__in=exclude_symbol_ids)
 
-        active_symbols = list(active_symbols_qs.order_by('?'))
-        eligible_count = len(active_symbols)
+        active_symbol_ids = list(active_symbols_qs.order_by('?').values_list('id', flat=True))
+        eligible_count = len(active_symbol_ids)
         logger.info(f"[Signal Queue] Step 2 – Eligible coins for this hour: {eligible_count} (not yet signaled today).")
 
         if eligible_count == 0:
@@ -236,186 +535,106 @@ def generate_signals_for_all_symbols():
                 'binance_futures_filter_active': bool(valid_base_assets),
             }
 
-        signal_service = SignalGenerationService()
-        max_candidates_to_try = 50  # Cap to avoid long runs; from these we pick best N per run
-        # Generate one best signal per symbol (candidate), then pick best 4 by quality
-        candidates: List[tuple] = []  # (score, signal)
+        # --- Step 3: Generate one best signal per symbol (candidate), then pick best N by quality ---
+        gen_settings = _signal_generation_settings()
+        fanout_mode = str(gen_settings['FANOUT_MODE']).lower()
+        time_budget = float(gen_settings['SYMBOL_TIME_BUDGET_SECONDS'] or 0)
+        max_candidates_to_try = int(
+            gen_settings['MAX_CANDIDATES_SERIAL'] if fanout_mode == 'serial' else gen_settings['MAX_CANDIDATES_FANOUT']
+        ) or None
+        candidate_symbol_ids = active_symbol_ids[:max_candidates_to_try]
+        logger.info(
+            f"[Signal Queue] Step 3 – Scoring {len(candidate_symbol_ids)} coin(s) in '{fanout_mode}' mode."
+        )
 
-        for symbol in active_symbols[:max_candidates_to_try]:
+        candidate_results = None
+        if fanout_mode == 'chord':
             try:
-                signals = signal_service.generate_signals_for_symbol(symbol)
-                if not signals:
-                    continue
-                best = signals[0]
-                score = (float(best.quality_score) if best.quality_score else 0) * 0.5 + (
-                    float(best.confidence_score) if best.confidence_score else 0
-                ) * 0.5
-                candidates.append((score, best))
+                options = {'soft_time_limit': time_budget, 'time_limit': time_budget + 30} if time_budget else {}
+                header = group(
+                    generate_signal_candidate.s(symbol_id, time_budget).set(**options)
+                    for symbol_id in candidate_symbol_ids
+                )
+                # Fix the subtask ids up front so the errback can collect what did finish
+                candidate_task_ids = [result.id for result in header.freeze().results]
+                slot_args = (today.isoformat(), slot_hour, eligible_count, bool(valid_base_assets), lock_key)
+                callback = finalize_signal_slot.s(*slot_args)
+                # A failed or timed-out subtask skips the callback; the errback persists and unlocks instead
+                callback.link_error(abort_signal_slot.s(*slot_args, candidate_task_ids))
+                chord(header)(callback)
+                release_lock = False
+                return {
+                    'total_signals': 0,
+                    'dispatched': len(candidate_symbol_ids),
+                    'fanout_mode': fanout_mode,
+                    'date': today.isoformat(),
+                    'slot_hour': slot_hour,
+                }
             except Exception as e:
-                logger.error(f"[Signal Queue] Error generating for {symbol.symbol}: {e}")
-
-        # Sort by score descending; then take only symbols not already in this slot's best (no duplicate coin per slot/day)
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        existing_in_slot = _symbol_ids_in_hourly_best_for_slot(today, slot_hour)
-        score_by_id = {s.id: sc for sc, s in candidates}
-        to_add: List[TradingSignal] = []
-        for _, s in candidates:
-            if s.symbol_id in existing_in_slot:
-                continue
-            to_add.append(s)
-            existing_in_slot.add(s.symbol_id)
-            if len(to_add) >= BEST_SIGNALS_PER_RUN:
-                break
-        # Balanced mix: ensure at least one BUY-type and one SELL-type in the batch when both exist in candidates
-        if len(to_add) == BEST_SIGNALS_PER_RUN:
-            has_buy = any(_is_buy_type(s) for s in to_add)
-            has_sell = any(_is_sell_type(s) for s in to_add)
-            if not (has_buy and has_sell):
-                other_type_is_buy = not has_buy
-                other_candidates = [
-                    (sc, s) for sc, s in candidates
-                    if (_is_buy_type(s) if other_type_is_buy else _is_sell_type(s))
-                ]
-                to_add_symbol_ids = {s.symbol_id for s in to_add}
-                if other_candidates:
-                    worst_in_to_add = min(to_add, key=lambda s: score_by_id.get(s.id, 0))
-                    to_add.remove(worst_in_to_add)
-                    to_add_symbol_ids.discard(worst_in_to_add.symbol_id)
-                    for _, s in other_candidates:
-                        if s.symbol_id in to_add_symbol_ids or s.symbol_id in existing_in_slot:
-                            continue
-                        to_add.append(s)
-                        to_add_symbol_ids.add(s.symbol_id)
-                        break
-                    if len(to_add) < BEST_SIGNALS_PER_RUN:
-                        to_add.append(worst_in_to_add)
-        generated_signals = to_add
-        # Only use signals that are already persisted with valid id (do not save unsaved signals;
-        # they may have NULL required fields like quality_score and would cause IntegrityError)
-        generated_signals = [s for s in generated_signals if s.pk is not None]
-        if not generated_signals:
-            logger.warning("[Signal Queue] No signals with valid id to store in HourlyBestSignal; skipping.")
-            return {
-                'total_signals': 0,
-                'symbols_processed': eligible_count,
-                'signals_generated': 0,
-                'best_signals_selected': 0,
-                'binance_futures_filter_active': bool(valid_base_assets),
-            }
-        generated_symbols = [s.symbol.symbol for s in generated_signals]
+                logger.warning(f"[Signal Queue] Chord dispatch failed ({e}); generating in-process instead.")
+        elif fanout_mode == 'process':
+            try:
+                candidate_results = _gather_candidates_process_pool(
+                    candidate_symbol_ids, int(gen_settings['MAX_WORKERS'] or 0), time_budget
+                )
+            except Exception as e:
+                logger.warning(f"[Signal Queue] Process pool unavailable ({e}); generating in-process instead.")
 
-        # Invalidate any other signals from this run that were not selected (only if already in DB)
-        chosen_ids = {s.id for s in generated_signals}
-        for _, s in candidates:
-            if s.id not in chosen_ids and s.pk is not None:
-                s.is_valid = False
-                s.save(update_fields=['is_valid'])
-                logger.debug(f"[Signal Queue] Invalidated extra signal {s.id} ({s.symbol.symbol}) from this run.")
+        if candidate_results is None:
+            candidate_results = _gather_candidates_serial(candidate_symbol_ids)
 
-        # --- Persist: HourlyBestSignal (source of truth for display) + signal_date/signal_hour on TradingSignal ---
-        try:
-            with transaction.atomic():
-                for rank_one_based, s in enumerate(generated_signals, start=1):
-                    signal_id = s.pk
-                    if signal_id is None:
-                        logger.warning(f"[Signal Queue] Skipping HourlyBestSignal for {s.symbol.symbol}: signal has no id.")
-                        continue
-                    HourlyBestSignal.objects.update_or_create(
-                        signal_date=today,
-                        signal_hour=slot_hour,
-                        symbol_id=s.symbol_id,
-                        defaults={
-                            "trading_signal_id": signal_id,
-                            "rank": rank_one_based,
-                            "quality_score": float(s.quality_score) if s.quality_score is not None else None,
-                        },
-                    )
-                    s.signal_date = today
-                    s.signal_hour = slot_hour
-                    s.save(update_fields=['signal_date', 'signal_hour'])
-        except IntegrityError as e:
-            logger.warning(f"[Signal Queue] DB constraint error (HourlyBestSignal): {e}. Slot may have been filled by another run.")
-            return {
-                'total_signals': 0,
-                'skipped': 'constraint',
-                'date': today.isoformat(),
-                'slot_hour': slot_hour,
-            }
+        return _persist_best_signals_for_slot(
+            _load_candidates(candidate_results), today, slot_hour, eligible_count, bool(valid_base_assets)
+        )
+    finally:
+        if release_lock:
+            cache.delete(lock_key)
 
-        logger.info(
-            f"[Signal Queue] Step 2 done – Selected best {len(generated_signals)} signals for slot {slot_hour} (HourlyBestSignal). "
-            f"Symbols: {generated_symbols}"
+
+@shared_task
+def generate_signal_candidate(symbol_id: int, time_budget: float = 0):
+    """Fan-out subtask: best candidate for one symbol (see generate_signals_for_all_symbols)."""
+    return _generate_candidate(symbol_id, time_budget)
+
+
+@shared_task
+def finalize_signal_slot(candidate_results, signal_date: str, slot_hour: int, eligible_count: int,
+                         binance_filter_active: bool, lock_key: str):
+    """Chord callback: rank and persist the gathered candidates for one 4h slot, then release its lock."""
+    try:
+        return _persist_best_signals_for_slot(
+            _load_candidates(candidate_results),
+            date.fromisoformat(signal_date),
+            slot_hour,
+            eligible_count,
+            binance_filter_active,
         )
+    finally:
+        cache.delete(lock_key)
 
-        # CRITICAL: Clean up any duplicates that might have been created due to race conditions
-        # This ensures only the latest signal per symbol+type remains valid
-        try:
-            from django.db.models import Count, Max
-            
-            with transaction.atomic():
-                # Find all symbol+type combinations with multiple valid signals
-                duplicates = TradingSignal.objects.values('symbol', 'signal_type').annotate(
-                    count=Count('id')
-                ).filter(count__gt=1, is_valid=True, is_executed=False)
-                
-                cleaned_count = 0
-                for dup in duplicates:
-                    symbol_id = dup['symbol']
-                    signal_type_id = dup['signal_type']
-                    
-                    # Get all valid signals, keep only the latest
-                    all_signals = TradingSignal.objects.filter(
-                        symbol_id=symbol_id,
-                        signal_type_id=signal_type_id,
-                        is_valid=True,
-                        is_executed=False
-                    ).order_by('-created_at', '-id')
-                    
-                    if all_signals.count() > 1:
-                        latest = all_signals.first()
-                        others = all_signals.exclude(id=latest.id)
-                        count = others.update(is_valid=False)
-                        cleaned_count += count
-                
-                if cleaned_count > 0:
-                    logger.warning(f"Cleaned up {cleaned_count} duplicate signals after generation")
-        except Exception as e:
-            logger.error(f"Error cleaning up duplicates: {e}")
-        
-        # IMPORTANT: invalidate cached signals API responses so the UI updates immediately.
-        try:
-            cache_keys_to_clear = [
-                "signal_statistics",
-                "signals_api_None_None_true_50",
-                "signals_api_None_None_True_50",
-            ]
-            cleared = 0
-            for key in cache_keys_to_clear:
-                if cache.get(key) is not None:
-                    cache.delete(key)
-                    cleared += 1
-
-            # Also clear a few common variants (mirrors clear-cache endpoint logic)
-            for symbol_val in [None, 'None']:
-                for signal_type_val in [None, 'None']:
-                    for is_valid_val in [True, 'True', 'true']:
-                        for limit_val in [50, '50']:
-                            cache_key = f"signals_api_{symbol_val}_{signal_type_val}_{is_valid_val}_{limit_val}"
-                            if cache.get(cache_key) is not None:
-                                cache.delete(cache_key)
-                                cleared += 1
-
-            logger.info(f"Invalidated {cleared} signal cache key(s) after generation")
-        except Exception as e:
-            logger.warning(f"Failed to invalidate signals cache after generation: {e}")
 
-        return {
-            'total_signals': len(generated_signals),
-            'symbols_processed': eligible_count,
-            'signals_generated': len(generated_signals),
-            'best_signals_selected': len(generated_signals),
-            'binance_futures_filter_active': bool(valid_base_assets),
-        }
+@shared_task
+def abort_signal_slot(request, exc, traceback, signal_date: str, slot_hour: int, eligible_count: int,
+                      binance_filter_active: bool, lock_key: str, candidate_task_ids: List[str]):
+    """
+    Chord errback: a generate_signal_candidate subtask failed or hit its time limit, so
+    finalize_signal_slot never ran. Persist the candidates the other subtasks returned,
+    then release the slot lock instead of leaving it held until its TTL.
+    """
+    day = date.fromisoformat(signal_date)
+    logger.warning(f"[Signal Queue] Fan-out for {signal_date} {slot_hour}:00 failed ({exc!r}); persisting partial results.")
+    try:
+        if _count_signals_for_slot(day, slot_hour) >= BEST_SIGNALS_PER_RUN:
+            return {'total_signals': 0, 'skipped': 'slot_full', 'date': signal_date, 'slot_hour': slot_hour}
+        partial = []
+        for task_id in candidate_task_ids:
+            result = AsyncResult(task_id)
+            if result.successful():
+                partial.append(result.result)
+        logger.info(f"[Signal Queue] {len(partial)} of {len(candidate_task_ids)} candidate subtask(s) finished.")
+        return _persist_best_signals_for_slot(
+            _load_candidates(partial), day, slot_hour, eligible_count, binance_filter_active
+        )
     finally:
         cache.delete(lock_key)
 
@@ -445,6 +664,20 @@ def generate_signals_for_symbol(symbol_id: int):
         return {'error': str(e)}
 
 
+@shared_task
+def run_backtest_job_task(job_id: int):
+    """Run a queued BacktestJob (see apps.signals.backtest_jobs)"""
+    from apps.signals.backtest_jobs import backtest_job_service
+    from apps.signals.models import BacktestJob
+    try:
+        job = backtest_job_service.run(job_id)
+        logger.info(f"Backtest job {job.id} finished with status {job.status}")
+        return {'job_id': job.id, 'status': job.status}
+    except BacktestJob.DoesNotExist:
+        logger.error(f"Backtest job {job_id} not found")
+        return {'error': 'Backtest job not found'}
+
+
 @shared_task
 def detect_market_regimes():
     """Detect market regimes for all active symbols"""
@@ -505,43 +738,13 @@ def cleanup_expired_signals():
     """Clean up expired signals and update their status"""
     logger.info("Starting expired signal cleanup...")
     
-    now = timezone.now()
-    # Expired if:
-    # - expires_at is in the past, OR
-    # - expires_at is NULL (legacy/sample rows) AND created_at older than the default expiry window.
-    #   (SignalGenerationService default expiry is 48 hours.)
-    legacy_expiry_cutoff = now - timedelta(hours=48)
-    expired_signals = TradingSignal.objects.filter(
-        is_valid=True
-    ).filter(
-        Q(expires_at__lt=now) |
-        Q(expires_at__isnull=True, created_at__lt=legacy_expiry_cutoff)
-    )
-    
-    expired_count = expired_signals.count()
+    metrics = SignalLifecycleEngine().expire_signals()
     
-    # Mark signals as invalid
-    expired_signals.update(is_valid=False)
-    
-    # Create alerts for expired signals
-    alerts_created = 0
-    for signal in expired_signals:
-        try:
-            SignalAlert.objects.create(
-                alert_type='SIGNAL_EXPIRED',
-                priority='MEDIUM',
-                title=f"Signal Expired for {signal.symbol.symbol}",
-                message=f"{signal.signal_type.name} signal has expired",
-                signal=signal
-            )
-            alerts_created += 1
-        except Exception as e:
-            logger.error(f"Error creating expired signal alert: {e}")
-    
-    logger.info(f"Expired signal cleanup completed. Expired: {expired_count}, Alerts: {alerts_created}")
+    logger.info(f"Expired signal cleanup completed. Expired: {metrics['updated']}, Alerts: {metrics['created']}")
     return {
-        'expired_signals': expired_count,
-        'alerts_created': alerts_created
+        'expired_signals': metrics['updated'],
+        'alerts_created': metrics['created'],
+        'rows_touched': metrics['rows_touched']
     }
 
 
@@ -847,7 +1050,8 @@ def signal_health_check():
             'issues': issues,
             'recent_signals': recent_signals,
             'unread_alerts': unread_alerts,
-            'expired_signals': expired_signals
+            'expired_signals': expired_signals,
+            'ml_models': get_model_registry().report()
         }
         
         logger.info(f"Signal health check completed - Score: {health_score}, Status: {health_status}")
@@ -1,3 +1,815 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from unittest import mock
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.utils import timezone
+from decimal import Decimal
+from pathlib import Path
 
-# Create your tests here.
+from apps.signals import pattern_kernels as kernels
+from apps.signals import outcome_engine
+from apps.signals import signal_cache
+from apps.signals import ml_dataset_store
+from apps.signals import model_registry
+from apps.signals.outcome_engine import PriceBars, SignalOutcomeEngine
+from apps.signals.backtest_jobs import BacktestJobService
+from apps.signals.models import BacktestJob, SignalAlert, SignalType, TradingSignal
+from apps.signals.outcome_tracker import OpenSignal, SignalOutcomeTracker
+from apps.signals.signal_lifecycle import SignalLifecycleEngine
+from apps.signals.strategy_backtesting_service import StrategyBacktestingService
+from apps.analytics.models import SentimentData
+from apps.data.models import MarketData
+from apps.trading.models import Symbol
+
+
+class PatternKernelsTestCase(TestCase):
+    """Kernels must agree with the straightforward per-bar definitions"""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, 400))
+        self.high = self.close + np.abs(rng.normal(0, 0.5, 400))
+        self.low = self.close - np.abs(rng.normal(0, 0.5, 400))
+        self.volume = rng.lognormal(3, 0.8, 400)
+
+    def test_window_kernels_match_brute_force(self):
+        """Test trailing/leading extremes, strict peaks and previous-index lookups"""
+        values, n = self.high, len(self.high)
+        for i in range(n):
+            if i >= 10:
+                self.assertEqual(kernels.trailing_max(values, 10)[i], values[i-10:i].max())
+            self.assertEqual(kernels.leading_min(values, 9)[i], values[i+1:i+10].min() if i < n - 1 else np.inf)
+
+        peaks = kernels.strict_peaks(values, 5)
+        expected = [5 <= i < n - 5 and all(values[i] > values[j] for j in range(i - 5, i + 6) if j != i)
+                    for i in range(n)]
+        self.assertEqual(peaks.tolist(), expected)
+
+        previous = kernels.previous_true_index(peaks)
+        for i in range(n):
+            earlier = [j for j in range(i) if peaks[j]]
+            self.assertEqual(previous[i], earlier[-1] if earlier else -1)
+
+    def test_rsi_and_stochastic_match_loops(self):
+        """Test SMA RSI and the stochastic transform against per-bar loops"""
+        rsi = kernels.sma_rsi(self.close, 14)
+        gains = np.maximum(np.diff(self.close), 0)
+        losses = np.maximum(-np.diff(self.close), 0)
+        self.assertTrue(np.isnan(rsi[:14]).all())
+        for i in range(14, len(self.close)):
+            avg_loss = np.mean(losses[i-14:i])
+            expected = 100 if avg_loss == 0 else 100 - 100 / (1 + np.mean(gains[i-14:i]) / avg_loss)
+            self.assertAlmostEqual(rsi[i], expected, places=9)
+
+        stoch = kernels.stochastic(rsi, 14)
+        for i in range(27, len(rsi)):
+            window = rsi[i-13:i+1]
+            self.assertAlmostEqual(stoch[i], (rsi[i] - window.min()) / (window.max() - window.min()) * 100, places=9)
+
+    def test_smc_detectors_match_loops(self):
+        """Test BOS and liquidity-sweep masks against the per-bar rules"""
+        avg_volume = pd.Series(self.volume).rolling(window=10).mean()
+        breaks = kernels.structure_breaks(self.high, self.low, self.volume, 20, 0.001, 1.2)
+        expected = [i for i in range(20, len(self.high))
+                    if self.high[i] > self.high[i-20:i].max() * 1.001 and self.volume[i] >= avg_volume[i] * 1.2]
+        self.assertEqual(np.flatnonzero(breaks['bullish']).tolist(), expected)
+
+        sweeps = kernels.liquidity_sweeps(self.high, self.low, self.close, self.volume, 15, 0.0005, 1.2)
+        expected = []
+        for i in range(15, len(self.low)):
+            support = self.low[i-15:i].min()
+            if ((support - self.low[i]) / support > 0.0005 and self.volume[i] / avg_volume[i] >= 1.2
+                    and self.close[i] > support):
+                expected.append(i)
+        self.assertEqual(np.flatnonzero(sweeps['bullish']).tolist(), expected)
+
+    def test_advanced_indicator_result_shapes(self):
+        """Test the vectorised AdvancedIndicatorsService keeps its result dicts"""
+        from apps.signals.advanced_indicators import AdvancedIndicatorsService
+        df = pd.DataFrame({
+            'timestamp': pd.date_range('2025-01-01', periods=len(self.close), freq='h', tz='UTC'),
+            'open': self.close, 'high': self.high, 'low': self.low, 'close': self.close, 'volume': self.volume,
+        })
+        symbol = mock.Mock(symbol='TEST')
+        service = AdvancedIndicatorsService()
+        with mock.patch.object(service, '_get_candles_df', side_effect=lambda s, bars: df.tail(bars).reset_index(drop=True)):
+            fvg = service.calculate_fair_value_gap(symbol, lookback=400)
+            swings = service.calculate_liquidity_swings(symbol, lookback=400)
+            divergence = service.calculate_rsi_divergence(symbol, lookback=400)
+            stoch_rsi = service.calculate_stochastic_rsi(symbol)
+
+        self.assertEqual(fvg['fvg_count'], len(fvg['fvg_data']))
+        for gap in fvg['fvg_data']:
+            self.assertEqual(set(gap), {'type', 'start', 'end', 'strength', 'timestamp'})
+            self.assertLess(gap['start'], gap['end'])
+        self.assertTrue(swings['swing_highs'])
+        self.assertEqual(swings['latest_swing_high'], swings['swing_highs'][-1])
+        self.assertEqual(set(swings['swing_lows'][0]), {'price', 'timestamp', 'strength'})
+        self.assertEqual(divergence['divergence_count'], len(divergence['divergences']))
+        self.assertEqual(set(stoch_rsi), {'stoch_rsi', 'timestamp', 'overbought', 'oversold'})
+        self.assertTrue(0 <= stoch_rsi['stoch_rsi'] <= 100)
+
+
+class SignalOutcomeEngineTestCase(TestCase):
+    """Batch resolution must match scanning each signal's window bar by bar"""
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        close = 100 + np.cumsum(rng.normal(0, 1, 600))
+        self.df = pd.DataFrame({
+            'high': close + np.abs(rng.normal(0, 0.8, 600)),
+            'low': close - np.abs(rng.normal(0, 0.8, 600)),
+            'close': close,
+        }, index=pd.date_range('2024-01-01', periods=600, freq='h', tz='UTC'))
+        picks = rng.integers(0, 620, 150)
+        self.times = [self.df.index[0] + pd.Timedelta(hours=int(h)) for h in picks]
+        self.is_long = rng.random(150) < 0.5
+        entry = np.interp(picks, np.arange(600), close)
+        move = rng.uniform(0.5, 6, 150)
+        self.targets = np.where(self.is_long, entry + move, entry - move)
+        self.stops = np.where(self.is_long, entry - move / 2, entry + move / 2)
+
+    def _loop(self, time, is_long, target, stop, window, include_end):
+        end = time + window
+        rows = [(i, row) for i, (ts, row) in enumerate(self.df.iterrows())
+                if ts >= time and (ts <= end if include_end else ts < end)]
+        for i, row in rows:
+            if (row['high'] >= target) if is_long else (row['low'] <= target):
+                return outcome_engine.TARGET_HIT, i, target
+            if (row['low'] <= stop) if is_long else (row['high'] >= stop):
+                return outcome_engine.STOP_HIT, i, stop
+        if rows:
+            return outcome_engine.WINDOW_CLOSE, rows[-1][0], rows[-1][1]['close']
+        return outcome_engine.NO_DATA, -1, None
+
+    def test_matches_per_signal_scan(self):
+        """Test both window conventions, with a cell budget small enough to force chunking"""
+        engine = SignalOutcomeEngine(PriceBars.from_dataframe(self.df), max_cells=500)
+        for window, include_end in ((timedelta(hours=36), True), (timedelta(days=1), False)):
+            outcomes = engine.resolve(self.times, self.is_long, self.targets, self.stops, window, include_end)
+            for k in range(len(self.times)):
+                expected = self._loop(self.times[k], self.is_long[k], self.targets[k], self.stops[k], window, include_end)
+                self.assertEqual((outcomes.status[k], outcomes.bar[k]), expected[:2])
+                if expected[2] is not None:
+                    self.assertEqual(outcomes.exit_price[k], expected[2])
+            self.assertIn(outcome_engine.NO_DATA, outcomes.status)
+            self.assertIn(outcome_engine.TARGET_HIT, outcomes.status)
+            self.assertIn(outcome_engine.STOP_HIT, outcomes.status)
+
+    def test_target_wins_on_same_bar(self):
+        """Test a bar touching both levels resolves to the target"""
+        bars = PriceBars.from_mapping({
+            pd.Timestamp('2024-01-01 00:00', tz='UTC'): {'high': 101, 'low': 99, 'close': 100},
+            pd.Timestamp('2024-01-01 01:00', tz='UTC'): {'high': 110, 'low': 90, 'close': 100},
+        })
+        outcomes = SignalOutcomeEngine(bars).resolve(
+            [pd.Timestamp('2024-01-01', tz='UTC')] * 2, [True, False], [105, 95], [95, 105], timedelta(days=7)
+        )
+        self.assertEqual(outcomes.status.tolist(), [outcome_engine.TARGET_HIT] * 2)
+        self.assertEqual(outcomes.bar.tolist(), [1, 1])
+        self.assertEqual(outcomes.exit_price.tolist(), [105.0, 95.0])
+
+
+
+class BacktestJobServiceTestCase(TestCase):
+    """Backtest results are keyed by request and data version and reused for identical requests"""
+
+    def setUp(self):
+        self.symbol = Symbol.objects.create(symbol='BTC', name='Bitcoin', symbol_type='CRYPTO', exchange='Binance')
+        self.start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        self.end = datetime(2024, 1, 31, tzinfo=dt_timezone.utc)
+        self.service = BacktestJobService()
+        self._add_candle(self.start)
+
+    def _add_candle(self, timestamp):
+        MarketData.objects.create(
+            symbol=self.symbol, timestamp=timestamp, timeframe='1d',
+            open_price=Decimal('100'), high_price=Decimal('110'), low_price=Decimal('90'),
+            close_price=Decimal('105'), volume=Decimal('1000')
+        )
+
+    def test_run_cached_reuses_identical_requests(self):
+        """Test only a change of parameters or data triggers a new run"""
+        runner = mock.Mock(return_value={'success': True, 'total_signals': 3})
+        run = lambda data: self.service.run_cached('backtest', self.symbol, self.start, self.end, data, runner)
+
+        self.assertEqual(run({'leverage': '10'}), {'success': True, 'total_signals': 3})
+        self.assertEqual(run({'leverage': '10', 'async': 'false', 'start_date': '2024-01-01'}), {'success': True, 'total_signals': 3})
+        self.assertEqual(runner.call_count, 1)
+
+        run({})
+        self.assertEqual(runner.call_count, 2)
+
+        self._add_candle(self.start + timedelta(days=1))
+        run({'leverage': '10'})
+        self.assertEqual(runner.call_count, 3)
+
+    def test_submitted_job_runs_and_is_reused(self):
+        """Test submit queues once, run stores the payload, and an identical submit gets the finished job"""
+        with mock.patch('apps.signals.tasks.run_backtest_job_task') as task, self.captureOnCommitCallbacks(execute=True):
+            task.delay.return_value.id = 'task-1'
+            job, reused = self.service.submit('fixed', self.symbol, self.start, self.end, {})
+        task.delay.assert_called_once_with(job.id)
+        self.assertFalse(reused)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.task_id), ('PENDING', 'task-1'))
+
+        progress = []
+
+        def execute(job, report):
+            report(40, 'Verifying signal executions')
+            progress.append(job.progress)
+            return {'success': True, 'backtest_results': {'total_signals': 0}}
+
+        with mock.patch.object(self.service, '_execute', side_effect=execute):
+            job = self.service.run(job.id)
+        self.assertEqual(progress, [40])
+        self.assertEqual((job.status, job.progress), ('COMPLETED', 100))
+        self.assertEqual(job.result, {'success': True, 'backtest_results': {'total_signals': 0}})
+
+        with mock.patch('apps.signals.tasks.run_backtest_job_task'), self.captureOnCommitCallbacks() as enqueued:
+            again, reused = self.service.submit('fixed', self.symbol, self.start, self.end, {'async': True})
+        self.assertEqual(enqueued, [])
+        self.assertTrue(reused)
+        self.assertEqual(again.id, job.id)
+
+    def test_jobs_are_visible_to_their_requester_only(self):
+        """Test another user's job is a 404 and an identical submit gets the stored result in its own job"""
+        from django.contrib.auth.models import User
+        from django.test import RequestFactory
+        from apps.signals.backtesting_api import BacktestJobAPIView
+        owner, other = User.objects.create(username='owner'), User.objects.create(username='other')
+        with mock.patch('apps.signals.tasks.run_backtest_job_task'):
+            job, _ = self.service.submit('fixed', self.symbol, self.start, self.end, {}, user=owner)
+
+        def status(user):
+            request = RequestFactory().get(f'/api/backtests/jobs/{job.id}/')
+            request.user = user
+            return BacktestJobAPIView.as_view()(request, job_id=job.id).status_code
+
+        self.assertEqual((status(owner), status(other)), (200, 404))
+
+        with mock.patch('apps.signals.tasks.run_backtest_job_task'):
+            pending, reused = self.service.submit('fixed', self.symbol, self.start, self.end, {}, user=other)
+        self.assertFalse(reused)
+        self.assertNotEqual(pending.id, job.id)
+
+        BacktestJob.objects.filter(id=job.id).update(status='COMPLETED', result={'success': True})
+        with mock.patch('apps.signals.tasks.run_backtest_job_task'), self.captureOnCommitCallbacks() as enqueued:
+            copy, reused = self.service.submit('fixed', self.symbol, self.start, self.end, {}, user=other)
+        self.assertEqual(enqueued, [])
+        self.assertTrue(reused)
+        self.assertNotEqual(copy.id, job.id)
+        self.assertEqual((copy.requested_by, copy.status, copy.result), (other, 'COMPLETED', {'success': True}))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'signal-fanout-tests'}})
+class SignalSlotFanoutTestCase(TestCase):
+    """Fan-out paths of the 4h run: time budget, pool choice and chord failure"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.btc = Symbol.objects.create(symbol='BTC', name='Bitcoin', symbol_type='CRYPTO', exchange='Binance',
+                                         is_crypto_symbol=True)
+        self.eth = Symbol.objects.create(symbol='ETH', name='Ethereum', symbol_type='CRYPTO', exchange='Binance',
+                                         is_crypto_symbol=True)
+
+    def _signal(self, symbol):
+        return TradingSignal.objects.create(
+            symbol=symbol,
+            signal_type=SignalType.objects.get_or_create(name='BUY')[0],
+            strength='STRONG', confidence_score=0.8, confidence_level='HIGH', quality_score=0.8,
+            entry_price=Decimal('100'), target_price=Decimal('110'), stop_loss=Decimal('95'),
+        )
+
+    def test_time_budget_discards_partial_signals(self):
+        """Test a symbol that overruns its budget yields no candidate and leaves no live signals"""
+        import time
+        from apps.signals.tasks import _generate_candidate
+
+        def slow(symbol):
+            self._signal(symbol)
+            time.sleep(2)
+            return []
+
+        service = mock.Mock(generate_signals_for_symbol=mock.Mock(side_effect=slow))
+        started = time.monotonic()
+        self.assertIsNone(_generate_candidate(self.btc.id, 0.2, signal_service=service))
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertFalse(TradingSignal.objects.filter(symbol=self.btc, is_valid=True).exists())
+
+    def test_pool_uses_threads_inside_daemonic_worker(self):
+        """Test a daemonic (prefork worker) process scores in threads instead of forking"""
+        from apps.signals.tasks import _gather_candidates_process_pool
+        candidate = lambda symbol_id, budget: {'signal_id': symbol_id, 'symbol_id': symbol_id, 'score': 1.0}
+        with mock.patch('multiprocessing.current_process', return_value=mock.Mock(daemon=True)), \
+                mock.patch('concurrent.futures.ProcessPoolExecutor', side_effect=AssertionError), \
+                mock.patch('apps.signals.tasks._generate_candidate', side_effect=candidate), \
+                self.assertLogs('apps.signals.tasks', 'INFO') as logs:
+            results = _gather_candidates_process_pool([1, 2, 3], 2, 45)
+        self.assertEqual(sorted(c['signal_id'] for c in results), [1, 2, 3])
+        self.assertIn('threads', logs.output[0])
+
+    def test_chord_failure_persists_partial_results_and_releases_lock(self):
+        """Test the chord errback stores the finished candidates and frees the slot"""
+        from django.core.cache import cache
+        from apps.signals.models import HourlyBestSignal
+        from apps.signals.tasks import abort_signal_slot, generate_signals_for_all_symbols
+        fanout = {'FANOUT_MODE': 'chord', 'MAX_WORKERS': 0, 'SYMBOL_TIME_BUDGET_SECONDS': 45,
+                    'MAX_CANDIDATES_SERIAL': 50, 'MAX_CANDIDATES_FANOUT': 0}
+        with mock.patch('apps.signals.tasks._signal_generation_settings', return_value=fanout), \
+                mock.patch('apps.trading.binance_futures_service.sync_binance_futures_symbols',
+                           return_value={'status': 'error'}), \
+                mock.patch('apps.signals.tasks.group') as group, \
+                mock.patch('apps.signals.tasks.chord') as chord:
+            # Freezing a real group would reach the configured result backend
+            group.return_value.freeze.return_value.results = [mock.Mock(id='btc-task'), mock.Mock(id='eth-task')]
+            result = generate_signals_for_all_symbols()
+        self.assertEqual(result['dispatched'], 2)
+        self.assertEqual(len(list(group.call_args[0][0])), 2)
+        chord.assert_called_once_with(group.return_value)
+
+        callback = chord.return_value.call_args[0][0]
+        [errback] = callback.options['link_error']
+        self.assertEqual(errback['task'], abort_signal_slot.name)
+        *_, lock_key, task_ids = errback['args']
+        self.assertEqual(task_ids, ['btc-task', 'eth-task'])
+        self.assertIsNotNone(cache.get(lock_key))
+
+        # One subtask finished, the other hit its time limit
+        signal = self._signal(self.eth)
+        finished = {task_ids[0]: {'signal_id': signal.id, 'symbol_id': self.eth.id, 'score': 0.8}}
+        results = lambda task_id: mock.Mock(successful=mock.Mock(return_value=task_id in finished),
+                                            result=finished.get(task_id))
+        with mock.patch('apps.signals.tasks.AsyncResult', side_effect=results):
+            outcome = abort_signal_slot(None, TimeoutError(), None, *errback['args'])
+
+        self.assertEqual(outcome['total_signals'], 1)
+        self.assertEqual(list(HourlyBestSignal.objects.values_list('trading_signal_id', flat=True)), [signal.id])
+        self.assertIsNone(cache.get(lock_key))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'signal-cache-tests'}})
+class SignalCacheTestCase(TestCase):
+    """Writes move read keys to a new generation instead of deleting known spellings"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_keys_are_normalised(self):
+        """Test every spelling of the same request maps to one key"""
+        self.assertEqual(signal_cache.signals_api_key('btcusdt', None, True, '50'),
+                         signal_cache.signals_api_key('BTCUSDT', None, 1, 50))
+
+    def test_symbol_write_invalidates_only_its_lists(self):
+        """Test a per-symbol write moves that symbol, the unfiltered lists and the statistics"""
+        btc, eth = (signal_cache.signals_api_key(symbol, None, True, 50) for symbol in ('BTCUSDT', 'ETHUSDT'))
+        unfiltered = signal_cache.signals_api_key(None, 'BUY', False, 10)
+        statistics = signal_cache.statistics_key()
+
+        self.assertEqual(signal_cache.invalidate_signals(['btcusdt']), 3)
+        self.assertNotEqual(signal_cache.signals_api_key('BTCUSDT', None, True, 50), btc)
+        self.assertEqual(signal_cache.signals_api_key('ETHUSDT', None, True, 50), eth)
+        self.assertNotEqual(signal_cache.signals_api_key(None, 'BUY', False, 10), unfiltered)
+        self.assertNotEqual(signal_cache.statistics_key(), statistics)
+
+    def test_global_write_invalidates_everything(self):
+        """Test a bulk write moves every list, including ones for symbols not named"""
+        keys = [signal_cache.signals_api_key(symbol, None, True, 50) for symbol in ('BTCUSDT', None)]
+        signal_cache.invalidate_signals()
+        self.assertTrue(all(
+            signal_cache.signals_api_key(symbol, None, True, 50) != key
+            for symbol, key in zip(('BTCUSDT', None), keys)
+        ))
+
+    def test_lost_counter_does_not_reuse_old_generation(self):
+        """Test a counter recreated after eviction never matches a generation already used"""
+        from django.core.cache import cache
+        with mock.patch.object(signal_cache.time, 'time', return_value=1000.0):
+            key = signal_cache.signals_api_key(None, None, True, 50)
+            signal_cache.invalidate_signals()
+        cache.clear()
+        with mock.patch.object(signal_cache.time, 'time', return_value=1000.5):
+            self.assertNotEqual(signal_cache.signals_api_key(None, None, True, 50), key)
+
+
+class WalkForwardSignalsTestCase(TestCase):
+    """The single-pass walk-forward must emit exactly the signals of the per-day slicing loop"""
+
+    def setUp(self):
+        rng = np.random.default_rng(21)
+        # Three years of daily bars plus a few missing days, so some calendar days reuse a bar
+        index = pd.date_range('2021-01-01', periods=1100, freq='D', tz='UTC').delete([200, 201, 650])
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, len(index))))
+        open_ = close * (1 + rng.normal(0, 0.015, len(index)))
+        df = pd.DataFrame({
+            'open': open_,
+            'high': np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, len(index)))),
+            'low': np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, len(index)))),
+            'close': close,
+            'volume': rng.uniform(1000, 5000, len(index)),
+        }, index=index)
+        self.service = StrategyBacktestingService()
+        self.service.enable_debug_logging = False
+        self.data = self.service._calculate_technical_indicators(df)
+        self.symbol = Symbol(symbol='TESTUSDT')
+        self.start = datetime(2021, 1, 1, 12, tzinfo=dt_timezone.utc)
+        self.end = datetime(2024, 1, 10, tzinfo=dt_timezone.utc)
+
+    def _signals(self, single_pass):
+        self.service.single_pass = single_pass
+        sentiment = lambda symbol, day: {'score': 0.3 if day.day % 7 == 0 else 0.6}
+        ml = lambda symbol, day: {'direction': 'BUY' if day.day % 2 else 'SELL', 'confidence': 0.7}
+        with mock.patch.object(self.service, '_get_sentiment_for_date', side_effect=sentiment), \
+                mock.patch.object(self.service, '_get_ml_prediction_for_date', side_effect=ml):
+            if single_pass:
+                return self.service._generate_walk_forward_signals(self.symbol, self.data, self.start, self.end)
+            return self.service._generate_sliced_signals(self.symbol, self.data, self.start, self.end)
+
+    def test_matches_sliced_loop(self):
+        """Test identical signals with default and relaxed confirmation thresholds"""
+        for min_confirmations in (2, 1):
+            self.service.min_confirmations = min_confirmations
+            expected = self._signals(single_pass=False)
+            self.assertGreater(len(expected), 5)
+            self.assertEqual(self._signals(single_pass=True), expected)
+            self.assertEqual({s['signal_type'] for s in expected}, {'BUY', 'SELL'})
+
+
+class OnlineFeatureCacheTestCase(TestCase):
+    """Feature rows topped up bar by bar must match a rebuild over the whole history"""
+
+    def setUp(self):
+        from apps.signals.ml_feature_cache import OnlineFeatureCache
+        rng = np.random.default_rng(8)
+        index = pd.date_range('2024-01-01', periods=700, freq='h', tz='UTC')
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+        self.bars = pd.DataFrame({
+            'open': close * (1 + rng.normal(0, 0.002, len(index))),
+            'high': close * 1.004,
+            'low': close * 0.996,
+            'close': close,
+            'volume': rng.uniform(1000, 5000, len(index)),
+        }, index=index)
+        self.visible = 600
+        self.cache = OnlineFeatureCache(refresh_seconds=0)
+        service = self.cache.data_service
+        market = lambda symbol, start, end: self.bars.iloc[:self.visible][lambda df: df.index >= start]
+        self.patches = [
+            mock.patch.object(service, '_get_market_data', side_effect=market),
+            mock.patch.object(service, '_get_technical_indicators', return_value=pd.DataFrame()),
+            mock.patch.object(service, '_get_sentiment_data', return_value=pd.DataFrame()),
+            mock.patch('apps.signals.ml_feature_cache.timezone.now', return_value=index[-1].to_pydatetime()),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.symbol = Symbol(id=1, symbol='TESTUSDT')
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def _rebuilt(self, steps):
+        full = self.cache.data_service._generate_features(self.bars.iloc[:self.visible].copy())
+        return full.tail(steps)
+
+    def test_incremental_rows_match_full_rebuild(self):
+        """Test new bars are appended and only the warm-up window is regenerated"""
+        columns = ['sma_50', 'ema_20', 'rsi', 'macd', 'close_lag_10', 'close_kurt_20', 'momentum_20']
+        for visible in (600, 601, 640):
+            self.visible = visible
+            rows = self.cache.latest_features(self.symbol, steps=3)
+            np.testing.assert_allclose(rows[columns].to_numpy(), self._rebuilt(3)[columns].to_numpy(),
+                                       rtol=1e-6, atol=1e-6)
+        self.assertEqual(self.cache.stats['full_loads'], 1)
+        self.assertEqual(self.cache.stats['incremental_loads'], 2)
+
+    def test_feature_matrix_stacks_symbols(self):
+        """Test one row per symbol, missing features as 0, sequences as a 3-D block"""
+        other = Symbol(id=2, symbol='OTHERUSDT')
+        symbols, X = self.cache.feature_matrix([self.symbol, other], ['rsi', 'not_a_feature'])
+        self.assertEqual([s.symbol for s in symbols], ['TESTUSDT', 'OTHERUSDT'])
+        self.assertEqual(X.shape, (2, 2))
+        self.assertTrue((X[:, 1] == 0).all())
+        self.assertAlmostEqual(X[0, 0], self._rebuilt(1)['rsi'].iloc[-1])
+        _, sequences = self.cache.feature_matrix([self.symbol], ['rsi'], steps=5)
+        self.assertEqual(sequences.shape, (1, 5, 1))
+
+    def test_slow_symbol_does_not_block_others(self):
+        """Test one symbol's features are served while another symbol is still loading"""
+        import threading
+        started, release = threading.Event(), threading.Event()
+        market = self.cache.data_service._get_market_data.side_effect
+
+        def slow_market(symbol, start, end):
+            if symbol.id == 2:
+                started.set()
+                release.wait(5)
+            return market(symbol, start, end)
+
+        self.cache.data_service._get_market_data.side_effect = slow_market
+        loader = threading.Thread(target=self.cache.latest_features, args=(Symbol(id=2, symbol='OTHERUSDT'),))
+        loader.start()
+        try:
+            self.assertTrue(started.wait(5))
+            self.assertEqual(len(self.cache.latest_features(self.symbol)), 1)
+            self.assertTrue(loader.is_alive())
+        finally:
+            release.set()
+            loader.join(5)
+        self.assertEqual(self.cache.stats['full_loads'], 2)
+
+
+class DatasetSnapshotStoreTestCase(TestCase):
+    """Snapshots must return what the database holds and only fetch candles newer than they store"""
+
+    def setUp(self):
+        import tempfile
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = ml_dataset_store.DatasetSnapshotStore(root=self.directory.name, max_parts=2, verify_seconds=0)
+        self.symbol = Symbol.objects.create(symbol='BTC', name='Bitcoin', symbol_type='CRYPTO', exchange='Binance')
+        self.start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        self._add_candles(0, 48)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _add_candles(self, first, last):
+        MarketData.objects.bulk_create([
+            MarketData(
+                symbol=self.symbol, timestamp=self.start + timedelta(hours=i),
+                open_price=Decimal(100 + i), high_price=Decimal(101 + i), low_price=Decimal(99 + i),
+                close_price=Decimal(100 + i), volume=Decimal(1000)
+            )
+            for i in range(first, last)
+        ])
+
+    def _load(self, hours, **kwargs):
+        bars = self.store.load([self.symbol], self.start, self.start + timedelta(hours=hours),
+                               indicators=False, sentiment=False, **kwargs)
+        return bars[self.symbol.id]
+
+    def test_appends_only_new_candles(self):
+        """Test a later range reads the snapshot and fetches only the candles after it"""
+        self.assertEqual(self._load(47)['close'].tolist(), [100.0 + i for i in range(48)])
+        self._add_candles(48, 60)
+        with mock.patch.object(ml_dataset_store, 'read_market_data', wraps=ml_dataset_store.read_market_data) as read:
+            bars = self._load(59)
+            self.assertEqual(read.call_args[0][1], self.start + timedelta(hours=47))
+        self.assertEqual(bars['close'].tolist(), [100.0 + i for i in range(60)])
+        self.assertEqual(self.store.stats['appends'], 1)
+
+        # Within the stored range nothing is queried
+        with mock.patch.object(ml_dataset_store, 'read_market_data') as read:
+            self.assertEqual(len(self._load(24, columns=['close'])), 25)
+            read.assert_not_called()
+
+    def test_compacts_and_rebuilds_earlier_ranges(self):
+        """Test parts are merged past MAX_PARTS and an earlier start rebuilds the snapshot"""
+        for hour in range(49, 53):
+            self._add_candles(hour - 1, hour)
+            self._load(hour)
+        self.assertGreaterEqual(self.store.stats['compactions'], 1)
+        self.assertEqual(self._load(52)['close'].tolist(), [100.0 + i for i in range(52)])
+
+        earlier = self.store.load([self.symbol], self.start - timedelta(days=1), self.start + timedelta(hours=5),
+                                  indicators=False, sentiment=False)
+        self.assertEqual(len(earlier[self.symbol.id]), 6)
+        self.assertEqual(self.store.stats['builds'], 2)
+
+    def test_corrections_and_backfills_rebuild(self):
+        """Test a candle corrected in place or backfilled into the stored range is picked up"""
+        self._load(47)
+        MarketData.objects.filter(symbol=self.symbol, timestamp=self.start + timedelta(hours=10)).update(
+            close_price=Decimal('1')
+        )
+        self.assertEqual(self._load(47)['close'].iloc[10], 1.0)
+        self.assertEqual(self.store.stats['builds'], 2)
+
+        MarketData.objects.filter(symbol=self.symbol, timestamp=self.start + timedelta(hours=20)).delete()
+        self.assertEqual(len(self._load(47)), 47)
+        self._add_candles(20, 21)
+        self.assertEqual(len(self._load(47)), 48)
+        self.assertEqual(self.store.stats['builds'], 4)
+
+        # The last bar is re-read by an append instead of a rebuild
+        MarketData.objects.filter(symbol=self.symbol, timestamp=self.start + timedelta(hours=47)).update(
+            close_price=Decimal('2')
+        )
+        self.assertEqual(self._load(47)['close'].iloc[-1], 2.0)
+        self.assertEqual((self.store.stats['builds'], self.store.stats['appends']), (4, 1))
+
+        # Unchanged data is served from the snapshot
+        with mock.patch.object(ml_dataset_store, 'read_market_data') as read:
+            self._load(30)
+            read.assert_not_called()
+
+    def test_late_sentiment_rebuilds(self):
+        """Test sentiment stored after the snapshot was built is joined onto the bars"""
+        def load():
+            return self.store.load([self.symbol], self.start, self.start + timedelta(hours=47))[self.symbol.id]
+
+        self.assertNotIn('compound_score', load().columns)
+        SentimentData.objects.create(symbol='BTC', timestamp=self.start + timedelta(hours=3), compound_score=0.5,
+                                     positive_score=0.6, negative_score=0.1, neutral_score=0.3)
+        self.assertEqual(load()['compound_score'].iloc[0], 0.5)
+        self.assertEqual(self.store.stats['builds'], 2)
+
+    def test_verified_snapshot_skips_the_fingerprint(self):
+        """Test a recently verified snapshot costs one id lookup until a row is added or the check expires"""
+        self.store.verify_seconds = 300
+        self._load(47)
+        with self.assertNumQueries(1):
+            self._load(47)
+
+        MarketData.objects.filter(symbol=self.symbol, timestamp=self.start + timedelta(hours=10)).update(
+            close_price=Decimal('1')
+        )
+        self.assertEqual(self._load(47)['close'].iloc[10], 110.0)
+        clock = ml_dataset_store.time.monotonic() + 301
+        with mock.patch.object(ml_dataset_store.time, 'monotonic', return_value=clock):
+            self.assertEqual(self._load(47)['close'].iloc[10], 1.0)
+            self._add_candles(48, 49)
+            MarketData.objects.filter(symbol=self.symbol, timestamp=self.start + timedelta(hours=5)).delete()
+            self.assertEqual(len(self._load(47)), 47)
+        self.assertEqual(self.store.stats['builds'], 3)
+
+    def test_holds_a_file_lock_on_the_snapshot(self):
+        """Test loads take an exclusive flock so other processes cannot rebuild underneath them"""
+        import fcntl
+        with mock.patch.object(ml_dataset_store.fcntl, 'flock', wraps=fcntl.flock) as flock:
+            self._load(47)
+        self.assertEqual([c[0][1] for c in flock.call_args_list], [fcntl.LOCK_EX, fcntl.LOCK_UN])
+        self.assertTrue(flock.call_args[0][0].name.endswith('.lock'))
+
+
+class ModelRegistryTestCase(TestCase):
+    """Artifacts are loaded once per process, memory-mapped and replaced when the files change"""
+
+    def setUp(self):
+        import tempfile
+        import joblib
+        self.directory = tempfile.TemporaryDirectory()
+        self.model_dir = Path(self.directory.name)
+        joblib.dump({'weights': np.arange(200000, dtype=np.float64)}, self.model_dir / 'toy_model.pkl')
+        joblib.dump({'mean': np.zeros(4)}, self.model_dir / 'toy_scaler.pkl')
+        self.registry = model_registry.ModelRegistry(mmap_mode='r')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_loads_once_and_reports_footprint(self):
+        """Test repeated lookups share one mapped artifact and the report carries its cost"""
+        with mock.patch.object(model_registry, 'SIGNAL_MODEL_DIR', self.model_dir):
+            first = self.registry.get_signal_model('toy')
+            second = self.registry.get_signal_model('toy')
+        self.assertIs(first.model, second.model)
+        self.assertIsInstance(first.model['weights'], np.memmap)
+
+        [report] = self.registry.report()
+        self.assertEqual(report['hits'], 2)
+        self.assertGreaterEqual(report['mapped_bytes'], 200000 * 8)
+        self.assertGreater(report['file_bytes'], 0)
+        self.assertGreaterEqual(report['load_seconds'], 0)
+
+    def test_replaced_files_evict_the_old_version(self):
+        """Test a retrained model on disk is loaded as a new version and the old one dropped"""
+        import os
+        with mock.patch.object(model_registry, 'SIGNAL_MODEL_DIR', self.model_dir):
+            old = self.registry.get_signal_model('toy')
+            stat = os.stat(self.model_dir / 'toy_model.pkl')
+            os.utime(self.model_dir / 'toy_model.pkl', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            new = self.registry.get_signal_model('toy')
+        self.assertIsNot(old.model, new.model)
+        self.assertEqual([r['version'] for r in self.registry.report()], [new.version])
+
+
+class SignalOutcomeTrackerTestCase(TestCase):
+    """Ticks resolve open signals through the sorted level index"""
+
+    def setUp(self):
+        self.symbol = Symbol.objects.create(symbol='BTC', name='Bitcoin', symbol_type='CRYPTO', exchange='Binance')
+        self.broadcaster = mock.Mock()
+        self.tracker = SignalOutcomeTracker(broadcaster=self.broadcaster)
+
+    def _signal(self, signal_type, entry, target, stop):
+        return TradingSignal.objects.create(
+            symbol=self.symbol,
+            signal_type=SignalType.objects.get_or_create(name=signal_type)[0],
+            strength='STRONG', confidence_score=0.8, confidence_level='HIGH', quality_score=0.8,
+            entry_price=Decimal(entry), target_price=Decimal(target), stop_loss=Decimal(stop),
+        )
+
+    def test_ticks_match_a_full_scan(self):
+        """Test every tick hits exactly the levels a scan over all open signals would"""
+        rng = np.random.default_rng(7)
+        signals = []
+        for i in range(300):
+            entry = float(rng.uniform(90, 110))
+            is_long = bool(i % 2)
+            target, stop = (entry * 1.05, entry * 0.97) if is_long else (entry * 0.95, entry * 1.03)
+            signals.append(OpenSignal(i, 'BTC', is_long, entry, target, stop))
+        self.tracker.rebuild(signals)
+
+        remaining = {signal.signal_id: signal for signal in signals}
+        for price in 100 + np.cumsum(rng.normal(0, 1.5, 200)):
+            expected = set()
+            for signal in list(remaining.values()):
+                up, down = (signal.target_price, signal.stop_loss) if signal.is_long else (signal.stop_loss, signal.target_price)
+                if price >= up or price <= down:
+                    expected.add(signal.signal_id)
+                    del remaining[signal.signal_id]
+            hits = self.tracker.on_price('btc', price)
+            self.assertEqual({hit.signal_id for hit in hits}, expected)
+        self.assertEqual(len(self.tracker), len(remaining))
+
+    def test_hits_are_persisted_and_broadcast(self):
+        """Test a tick records the outcome on the signal and pushes it once"""
+        long = self._signal('BUY', '100', '110', '95')
+        short = self._signal('SELL', '100', '90', '105')
+        done = self._signal('BUY', '100', '101', '99')
+        TradingSignal.objects.filter(id=done.id).update(is_executed=True)
+
+        self.assertEqual(self.tracker.reload(), 2)
+        self.assertEqual(self.tracker.on_price('BTC', 104), [])
+        self.assertEqual({hit.signal_id for hit in self.tracker.on_price('BTC', 111)}, {long.id, short.id})
+        self.assertEqual(self.tracker.flush(), 2)
+
+        long.refresh_from_db()
+        self.assertTrue(long.is_executed)
+        self.assertTrue(long.is_profitable)
+        self.assertEqual((long.execution_price, long.profit_loss), (Decimal('110'), Decimal('10')))
+        short.refresh_from_db()
+        self.assertFalse(short.is_profitable)
+        self.assertEqual((short.execution_price, short.profit_loss), (Decimal('105'), Decimal('-5')))
+        self.assertEqual(self.broadcaster.broadcast_signal_outcome.call_count, 2)
+
+        # Executed signals stay out of later reloads
+        self.assertEqual(self.tracker.reload(), 0)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'signal-lifecycle-tests'}})
+class SignalLifecycleEngineTestCase(TestCase):
+    """Expiry and duplicate passes work on the whole set at once"""
+
+    def setUp(self):
+        self.btc = Symbol.objects.create(symbol='BTC', name='Bitcoin', symbol_type='CRYPTO', exchange='Binance')
+        self.eth = Symbol.objects.create(symbol='ETH', name='Ethereum', symbol_type='CRYPTO', exchange='Binance')
+        self.buy = SignalType.objects.create(name='BUY')
+        self.sell = SignalType.objects.create(name='SELL')
+        self.engine = SignalLifecycleEngine()
+
+    def _signal(self, symbol, signal_type, created_at, **fields):
+        signal = TradingSignal.objects.create(
+            symbol=symbol, signal_type=signal_type, strength='STRONG', confidence_score=0.8,
+            confidence_level='HIGH', quality_score=0.8, **fields,
+        )
+        TradingSignal.objects.filter(id=signal.id).update(created_at=created_at)
+        return signal
+
+    def test_expire_signals_creates_one_alert_each(self):
+        """Test expired and legacy rows are invalidated with an alert, and others are untouched"""
+        now = timezone.now()
+        expired = self._signal(self.btc, self.buy, now, expires_at=now - timedelta(minutes=1))
+        legacy = self._signal(self.eth, self.sell, now - timedelta(hours=49))
+        live = self._signal(self.eth, self.buy, now, expires_at=now + timedelta(hours=1))
+
+        with self.assertNumQueries(5):  # select, update, savepoint/release around bulk_create
+            metrics = self.engine.expire_signals(now)
+
+        self.assertEqual((metrics['selected'], metrics['updated'], metrics['created']), (2, 2, 2))
+        self.assertEqual(metrics['rows_touched'], 4)
+        self.assertEqual(
+            set(TradingSignal.objects.filter(is_valid=True).values_list('id', flat=True)), {live.id}
+        )
+        self.assertEqual(
+            sorted(SignalAlert.objects.values_list('signal_id', 'title', 'message')),
+            sorted([(expired.id, 'Signal Expired for BTC', 'BUY signal has expired'),
+                    (legacy.id, 'Signal Expired for ETH', 'SELL signal has expired')]),
+        )
+        self.assertEqual(self.engine.expire_signals(now)['rows_touched'], 0)
+
+    def test_resolve_duplicates_keeps_latest_per_group(self):
+        """Test only the newest valid, unexecuted signal of each (symbol, type) stays valid"""
+        now = timezone.now()
+        old = self._signal(self.btc, self.buy, now - timedelta(hours=2))
+        older = self._signal(self.btc, self.buy, now - timedelta(hours=3))
+        latest = self._signal(self.btc, self.buy, now - timedelta(hours=1))
+        executed = self._signal(self.btc, self.buy, now, is_executed=True)
+        other_type = self._signal(self.btc, self.sell, now - timedelta(hours=5))
+        other_symbol = self._signal(self.eth, self.buy, now - timedelta(hours=5))
+
+        metrics = self.engine.resolve_duplicates()
+
+        self.assertEqual((metrics['selected'], metrics['updated']), (2, 2))
+        self.assertEqual(
+            set(TradingSignal.objects.filter(is_valid=True).values_list('id', flat=True)),
+            {latest.id, executed.id, other_type.id, other_symbol.id},
+        )
+        self.assertFalse(TradingSignal.objects.filter(id__in=[old.id, older.id], is_valid=True).exists())
@@ -15,6 +15,7 @@ import numpy as np
 
 from apps.trading.models import Symbol
 from apps.data.models import MarketData, TechnicalIndicator
+from apps.data.candle_store import get_candle_store
 
 logger = logging.getLogger(__name__)
 
@@ -173,28 +174,13 @@ class TimeframeAnalysisService:
             else:
                 lookback = 100
             
-            # Get market data for specific timeframe
-            market_data = MarketData.objects.filter(
-                symbol=symbol,
-                timeframe=timeframe.lower()
-            ).order_by('-timestamp')[:lookback]
-            
-            if not market_data:
+            # Get market data for specific timeframe (shared candle store: one query per timeframe)
+            window = get_candle_store().get_window(symbol, timeframe.lower(), lookback)
+            if not len(window):
                 return None
             
-            # Convert to list of dicts
-            data_list = []
-            for data in reversed(market_data):  # Oldest first
-                data_list.append({
-                    'timestamp': data.timestamp,
-                    'open': float(data.open_price),
-                    'high': float(data.high_price),
-                    'low': float(data.low_price),
-                    'close': float(data.close_price),
-                    'volume': float(data.volume)
-                })
-            
-            return data_list
+            # Oldest first
+            return window.to_records()
             
         except Exception as e:
             logger.error(f"Error getting timeframe data for {symbol.symbol} {timeframe}: {e}")
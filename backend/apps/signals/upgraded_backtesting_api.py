@@ -14,6 +14,8 @@ from django.db.models import Q
 
 from apps.trading.models import Symbol
 from apps.signals.models import TradingSignal
+from apps.signals.backtest_jobs import backtest_job_service, wants_async
+from apps.signals.backtesting_api import backtest_job_response, request_user
 from apps.signals.upgraded_backtesting_service import upgraded_backtesting_service
 
 logger = logging.getLogger(__name__)
@@ -63,40 +65,16 @@ class UpgradedBacktestAPIView(View):
                     'error': f'Symbol {symbol_name} not found or not active'
                 }, status=404)
             
-            # Run upgraded backtest
-            logger.info(f"Running upgraded backtest for {symbol_name} from {start_date.date()} to {end_date.date()}")
+            # Long ranges can run as a background job ("async": true); either way an
+            # identical earlier run is served from its stored result
+            if wants_async(data):
+                return backtest_job_response(request, 'upgraded', symbol, start_date, end_date, data)
             
-            backtest_results = upgraded_backtesting_service.backtest_signals(
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date
-            )
-            
-            # Generate summary
-            summary = upgraded_backtesting_service.get_backtest_summary(backtest_results)
-            
-            # Prepare response
-            response_data = {
-                'success': True,
-                'backtest_results': backtest_results,
-                'summary': summary,
-                'metadata': {
-                    'symbol': symbol_name,
-                    'start_date': start_date.isoformat(),
-                    'end_date': end_date.isoformat(),
-                    'backtest_timestamp': timezone.now().isoformat(),
-                    'upgraded_features': {
-                        'signal_expiration_days': 7,
-                        'take_profit_percentage': 60,
-                        'stop_loss_percentage': 40,
-                        'description': 'Signals expire after 7 days, TP=60% of capital, SL=40% of capital'
-                    }
-                }
-            }
-            
-            logger.info(f"Upgraded backtest completed for {symbol_name}: {backtest_results['total_signals']} signals processed")
-            
-            return JsonResponse(response_data)
+            return JsonResponse(backtest_job_service.run_cached(
+                'upgraded', symbol, start_date, end_date, data,
+                lambda: self.build_response(symbol, start_date, end_date),
+                user=request_user(request)
+            ))
             
         except json.JSONDecodeError:
             return JsonResponse({
@@ -110,6 +88,43 @@ class UpgradedBacktestAPIView(View):
                 'error': f'Backtest failed: {str(e)}'
             }, status=500)
 
+    def build_response(self, symbol: Symbol, start_date: datetime, end_date: datetime) -> dict:
+        """Run the upgraded backtest with enhanced signal management and build the response payload"""
+        # Run upgraded backtest
+        logger.info(f"Running upgraded backtest for {symbol.symbol} from {start_date.date()} to {end_date.date()}")
+        
+        backtest_results = upgraded_backtesting_service.backtest_signals(
+            symbol=symbol,
+            start_date=start_date,
+            end_date=end_date
+        )
+        
+        # Generate summary
+        summary = upgraded_backtesting_service.get_backtest_summary(backtest_results)
+        
+        # Prepare response
+        response_data = {
+            'success': True,
+            'backtest_results': backtest_results,
+            'summary': summary,
+            'metadata': {
+                'symbol': symbol.symbol,
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+                'backtest_timestamp': timezone.now().isoformat(),
+                'upgraded_features': {
+                    'signal_expiration_days': 7,
+                    'take_profit_percentage': 60,
+                    'stop_loss_percentage': 40,
+                    'description': 'Signals expire after 7 days, TP=60% of capital, SL=40% of capital'
+                }
+            }
+        }
+        
+        logger.info(f"Upgraded backtest completed for {symbol.symbol}: {backtest_results['total_signals']} signals processed")
+        
+        return response_data
+
     def get(self, request):
         """Get backtest configuration and available symbols"""
         try:
@@ -14,6 +14,8 @@ import pandas as pd
 from apps.trading.models import Symbol
 from apps.data.models import MarketData
 from apps.signals.models import TradingSignal
+from apps.signals import outcome_engine
+from apps.signals.outcome_engine import PriceBars, SignalOutcomeEngine, is_long_signal
 
 logger = logging.getLogger(__name__)
 
@@ -41,147 +43,130 @@ class UpgradedBacktestingService:
         Returns:
             Dict with execution details
         """
-        try:
-            # Ensure signal timestamp is UTC
-            signal_time = signal.created_at
-            if signal_time.tzinfo is None:
-                signal_time = signal_time.replace(tzinfo=dt_timezone.utc)
-            
-            # Calculate position size based on capital
-            current_capital = self.initial_capital  # In real implementation, track current capital
-            position_size = current_capital * self.position_size_percentage
-            
-            entry_price = float(signal.entry_price)
-            signal_type = signal.signal_type.upper()
-            
-            # Calculate take profit and stop loss based on capital percentages
-            if signal_type in ['BUY', 'STRONG_BUY']:
-                # For buy signals: TP = entry + (60% of capital), SL = entry - (40% of capital)
-                take_profit_price = entry_price + (entry_price * self.take_profit_percentage)
-                stop_loss_price = entry_price - (entry_price * self.stop_loss_percentage)
-            else:  # SELL or STRONG_SELL
-                # For sell signals: TP = entry - (60% of capital), SL = entry + (40% of capital)
-                take_profit_price = entry_price - (entry_price * self.take_profit_percentage)
-                stop_loss_price = entry_price + (entry_price * self.stop_loss_percentage)
-            
-            # 7-day execution window
-            execution_window = timedelta(days=self.signal_expiration_days)
-            end_time = signal_time + execution_window
-            
-            logger.info(f"Signal {signal.id}: Entry=${entry_price:.2f}, TP=${take_profit_price:.2f}, SL=${stop_loss_price:.2f}")
-            logger.info(f"Execution window: {signal_time.date()} to {end_time.date()}")
-            
-            # Find relevant price data within execution window
-            relevant_data = historical_data[
-                (historical_data.index >= signal_time) & 
-                (historical_data.index <= end_time)
-            ].copy()
-            
-            if relevant_data.empty:
-                return {
-                    'signal_id': signal.id,
-                    'is_executed': False,
-                    'execution_status': 'NO_DATA_IN_WINDOW',
-                    'executed_at': None,
-                    'execution_price': None,
-                    'take_profit_price': take_profit_price,
-                    'stop_loss_price': stop_loss_price,
-                    'profit_loss_percentage': 0.0,
-                    'profit_loss_amount': 0.0,
-                    'capital_used': 0.0,
-                    'reason': 'No price data available in 7-day window'
-                }
-            
-            # Process each day chronologically to find execution
-            execution_price = None
-            execution_time = None
-            execution_status = 'NOT_EXECUTED'
+        return self.simulate_signals_execution([signal], PriceBars.from_dataframe(historical_data))[0]
+
+    def simulate_signals_execution(self, signals: List[TradingSignal], price_bars: PriceBars) -> List[Dict]:
+        """
+        Simulate execution of a batch of signals against the same price history
+        
+        All signals are resolved in one outcome-engine call: take profit is checked before
+        stop loss on each bar of the 7-day window, and signals that touch neither expire.
+        
+        Args:
+            signals: TradingSignals to simulate
+            price_bars: Historical price data as sorted arrays
             
-            for timestamp, row in relevant_data.iterrows():
-                high_price = float(row['high'])
-                low_price = float(row['low'])
-                close_price = float(row['close'])
+        Returns:
+            List of execution dicts, one per signal
+        """
+        # Calculate position size based on capital
+        current_capital = self.initial_capital  # In real implementation, track current capital
+        position_size = current_capital * self.position_size_percentage
+        
+        results = [None] * len(signals)
+        pending, times, longs, entries, take_profits, stop_losses = [], [], [], [], [], []
+        for i, signal in enumerate(signals):
+            try:
+                # Ensure signal timestamp is UTC
+                signal_time = signal.created_at
+                if signal_time.tzinfo is None:
+                    signal_time = signal_time.replace(tzinfo=dt_timezone.utc)
+                
+                entry_price = float(signal.entry_price)
+                is_long = is_long_signal(signal.signal_type)
                 
-                if signal_type in ['BUY', 'STRONG_BUY']:
-                    # Check take profit first (higher priority)
-                    if high_price >= take_profit_price:
-                        execution_price = take_profit_price
-                        execution_time = timestamp
-                        execution_status = 'TAKE_PROFIT_HIT'
-                        break
-                    # Then check stop loss
-                    elif low_price <= stop_loss_price:
-                        execution_price = stop_loss_price
-                        execution_time = timestamp
-                        execution_status = 'STOP_LOSS_HIT'
-                        break
+                # Calculate take profit and stop loss based on capital percentages
+                if is_long:
+                    # For buy signals: TP = entry + (60% of capital), SL = entry - (40% of capital)
+                    take_profit_price = entry_price + (entry_price * self.take_profit_percentage)
+                    stop_loss_price = entry_price - (entry_price * self.stop_loss_percentage)
                 else:  # SELL or STRONG_SELL
-                    # Check take profit first (lower price for sell)
-                    if low_price <= take_profit_price:
-                        execution_price = take_profit_price
-                        execution_time = timestamp
-                        execution_status = 'TAKE_PROFIT_HIT'
-                        break
-                    # Then check stop loss
-                    elif high_price >= stop_loss_price:
-                        execution_price = stop_loss_price
-                        execution_time = timestamp
-                        execution_status = 'STOP_LOSS_HIT'
-                        break
-            
-            # If no TP/SL hit within 7 days, mark as expired
-            if execution_price is None:
-                return {
-                    'signal_id': signal.id,
-                    'is_executed': False,
-                    'execution_status': 'EXPIRED_7_DAYS',
-                    'executed_at': None,
-                    'execution_price': None,
-                    'take_profit_price': take_profit_price,
-                    'stop_loss_price': stop_loss_price,
-                    'profit_loss_percentage': 0.0,
-                    'profit_loss_amount': 0.0,
-                    'capital_used': 0.0,
-                    'reason': f'Signal expired after {self.signal_expiration_days} days without execution'
-                }
+                    # For sell signals: TP = entry - (60% of capital), SL = entry + (40% of capital)
+                    take_profit_price = entry_price - (entry_price * self.take_profit_percentage)
+                    stop_loss_price = entry_price + (entry_price * self.stop_loss_percentage)
+                
+                logger.debug(f"Signal {signal.id}: Entry=${entry_price:.2f}, TP=${take_profit_price:.2f}, SL=${stop_loss_price:.2f}")
+            except Exception as e:
+                logger.error(f"Error simulating signal execution for signal {signal.id}: {e}")
+                results[i] = self._unexecuted_result(signal, 'ERROR', None, None, f'Error: {str(e)}')
+                continue
+            
+            pending.append(i)
+            times.append(signal_time)
+            longs.append(is_long)
+            entries.append(entry_price)
+            take_profits.append(take_profit_price)
+            stop_losses.append(stop_loss_price)
+        
+        if not pending:
+            return results
+        
+        # 7-day execution window, both ends inclusive
+        outcomes = SignalOutcomeEngine(price_bars).resolve(
+            times, longs, take_profits, stop_losses, timedelta(days=self.signal_expiration_days)
+        )
+        
+        for k, i in enumerate(pending):
+            signal = signals[i]
+            status = outcomes.status[k]
+            if status == outcome_engine.NO_DATA:
+                results[i] = self._unexecuted_result(
+                    signal, 'NO_DATA_IN_WINDOW', take_profits[k], stop_losses[k],
+                    'No price data available in 7-day window'
+                )
+                continue
+            if status == outcome_engine.WINDOW_CLOSE:
+                # If no TP/SL hit within 7 days, mark as expired
+                results[i] = self._unexecuted_result(
+                    signal, 'EXPIRED_7_DAYS', take_profits[k], stop_losses[k],
+                    f'Signal expired after {self.signal_expiration_days} days without execution'
+                )
+                continue
+            
+            execution_status = 'TAKE_PROFIT_HIT' if status == outcome_engine.TARGET_HIT else 'STOP_LOSS_HIT'
+            execution_price = float(outcomes.exit_price[k])
+            entry_price = entries[k]
             
             # Calculate profit/loss
-            if signal_type in ['BUY', 'STRONG_BUY']:
+            if longs[k]:
                 profit_loss_percentage = (execution_price - entry_price) / entry_price * 100
-                profit_loss_amount = (execution_price - entry_price) * (position_size / entry_price)
+                profit_loss_amount = (execution_price - entry_price) * (float(position_size) / entry_price)
             else:  # SELL or STRONG_SELL
                 profit_loss_percentage = (entry_price - execution_price) / entry_price * 100
-                profit_loss_amount = (entry_price - execution_price) * (position_size / entry_price)
+                profit_loss_amount = (entry_price - execution_price) * (float(position_size) / entry_price)
             
-            return {
+            results[i] = {
                 'signal_id': signal.id,
                 'is_executed': True,
                 'execution_status': execution_status,
-                'executed_at': execution_time,
+                'executed_at': price_bars.timestamp_at(outcomes.bar[k]),
                 'execution_price': execution_price,
-                'take_profit_price': take_profit_price,
-                'stop_loss_price': stop_loss_price,
+                'take_profit_price': take_profits[k],
+                'stop_loss_price': stop_losses[k],
                 'profit_loss_percentage': profit_loss_percentage,
-                'profit_loss_amount': float(profit_loss_amount),
+                'profit_loss_amount': profit_loss_amount,
                 'capital_used': float(position_size),
                 'reason': f'Executed via {execution_status.lower().replace("_", " ")}'
             }
-            
-        except Exception as e:
-            logger.error(f"Error simulating signal execution for signal {signal.id}: {e}")
-            return {
-                'signal_id': signal.id,
-                'is_executed': False,
-                'execution_status': 'ERROR',
-                'executed_at': None,
-                'execution_price': None,
-                'take_profit_price': None,
-                'stop_loss_price': None,
-                'profit_loss_percentage': 0.0,
-                'profit_loss_amount': 0.0,
-                'capital_used': 0.0,
-                'reason': f'Error: {str(e)}'
-            }
+        
+        return results
+
+    @staticmethod
+    def _unexecuted_result(signal: TradingSignal, execution_status: str, take_profit_price: Optional[float],
+                           stop_loss_price: Optional[float], reason: str) -> Dict:
+        return {
+            'signal_id': signal.id,
+            'is_executed': False,
+            'execution_status': execution_status,
+            'executed_at': None,
+            'execution_price': None,
+            'take_profit_price': take_profit_price,
+            'stop_loss_price': stop_loss_price,
+            'profit_loss_percentage': 0.0,
+            'profit_loss_amount': 0.0,
+            'capital_used': 0.0,
+            'reason': reason
+        }
 
     def backtest_signals(self, symbol: Symbol, start_date: datetime, end_date: datetime) -> Dict:
         """
@@ -247,8 +232,8 @@ class UpgradedBacktestingService:
             total_capital_used = 0.0
             winning_trades = 0
             
-            for signal in signals:
-                result = self.simulate_signal_execution(signal, historical_data)
+            signal_list = list(signals.select_related('signal_type'))
+            for result in self.simulate_signals_execution(signal_list, PriceBars.from_dataframe(historical_data)):
                 results.append(result)
                 
                 if result['is_executed']:
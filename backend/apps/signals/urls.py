@@ -27,6 +27,7 @@ urlpatterns = [
     
     # Backtesting API endpoints
     path('api/backtests/', backtesting_api.BacktestAPIView.as_view(), name='backtest_api'),
+    path('api/backtests/jobs/<int:job_id>/', backtesting_api.BacktestJobAPIView.as_view(), name='backtest_job_api'),
     path('api/backtests/search/', backtesting_api.BacktestSearchAPIView.as_view(), name='backtest_search_api'),
     path('api/backtests/tradingview/', backtesting_api.TradingViewExportAPIView.as_view(), name='backtest_tradingview_export'),
     path('api/backtests/history-export/', backtesting_api.BacktestingHistoryExportAPIView.as_view(), name='backtesting_history_export'),
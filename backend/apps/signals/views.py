@@ -23,6 +23,7 @@ from apps.signals.models import (
 from apps.signals.services import (
     SignalGenerationService, MarketRegimeService, SignalPerformanceService
 )
+from apps.signals import signal_cache
 from apps.trading.models import Symbol
 
 logger = logging.getLogger(__name__)
@@ -84,8 +85,8 @@ class SignalAPIView(View):
         if mode == 'top5':
             return self._get_top5_signals_last_hour(request)
 
-        # Create cache key based on parameters
-        cache_key = f"signals_api_{symbol}_{signal_type}_{is_valid}_{limit}"
+        # Create cache key based on parameters (stamped with the signal data generation)
+        cache_key = signal_cache.signals_api_key(symbol, signal_type, is_valid, limit)
         cached_data = cache.get(cache_key)
         
         # Only return cached data if it's not empty (empty cache might be stale)
@@ -286,9 +287,8 @@ class SignalAPIView(View):
                     'cached_at': timezone.now().isoformat()
                 }
                 
-                # Cache the response for only 30 seconds to ensure fresh data
-                # Reduced from 5 minutes to prevent showing stale signals
-                cache_timeout = 30 if len(signal_data) > 0 else 10
+                # Writes move the key to a new generation, so the TTL only bounds price staleness
+                cache_timeout = signal_cache.LIST_TTL if len(signal_data) > 0 else signal_cache.EMPTY_LIST_TTL
                 cache.set(cache_key, response_data, cache_timeout)
                 logger.info(f"Cached response with {len(signal_data)} signals for {cache_timeout} seconds")
                 
@@ -525,7 +525,7 @@ class SignalAPIView(View):
                 'count': len(signal_data),
                 'cached_at': timezone.now().isoformat()
             }
-            cache.set(cache_key, response_data, 30)  # Reduced from 300 to 30 seconds for fresh data
+            cache.set(cache_key, response_data, signal_cache.LIST_TTL)
         except Exception as e:
             logger.debug(f"Background cache refresh failed: {e}")
     
@@ -555,15 +555,7 @@ class SignalAPIView(View):
             signals = signal_service.generate_signals_for_symbol(symbol)
             
             # Invalidate related caches to ensure data consistency
-            cache_keys_to_delete = [
-                "signal_statistics",
-                f"signals_api_{symbol.symbol}_None_true_50",
-                f"signals_api_None_None_true_50"
-            ]
-            
-            for cache_key in cache_keys_to_delete:
-                cache.delete(cache_key)
-                logger.info(f"Invalidated cache key: {cache_key}")
+            signal_cache.invalidate_signals([symbol.symbol])
             
             return JsonResponse({
                 'success': True,
@@ -1459,7 +1451,7 @@ def signal_statistics(request):
     """Get signal statistics"""
     try:
         # Check cache first
-        cache_key = "signal_statistics"
+        cache_key = signal_cache.statistics_key()
         cached_stats = cache.get(cache_key)
         
         if cached_stats:
@@ -1516,7 +1508,7 @@ def signal_statistics(request):
         }
         
         # Cache the statistics for 60 seconds (reduced from 600 for fresh data)
-        cache.set(cache_key, response_data, 60)
+        cache.set(cache_key, response_data, signal_cache.STATISTICS_TTL)
         
         return JsonResponse(response_data)
         
@@ -1568,15 +1560,7 @@ def execute_signal(request, signal_id):
         signal.save()
         
         # Invalidate related caches to ensure data consistency
-        cache_keys_to_delete = [
-            "signal_statistics",
-            f"signals_api_{signal.symbol.symbol}_None_true_50",
-            f"signals_api_None_None_true_50"
-        ]
-        
-        for cache_key in cache_keys_to_delete:
-            cache.delete(cache_key)
-            logger.info(f"Invalidated cache key: {cache_key}")
+        signal_cache.invalidate_signals([signal.symbol.symbol])
         
         # Log the execution
         logger.info(f"Signal {signal_id} executed successfully for {signal.symbol.symbol}")
@@ -1763,23 +1747,8 @@ def generate_signals_manual(request):
                     'details': 'An unexpected error occurred during signal generation.'
                 }, status=500)
         
-        # Invalidate related caches to ensure data consistency
-        try:
-            cache_keys_to_delete = [
-                "signal_statistics",
-                f"signals_api_{symbol.symbol}_None_true_50",
-                f"signals_api_None_None_true_50"
-            ]
-            
-            for cache_key in cache_keys_to_delete:
-                try:
-                    cache.delete(cache_key)
-                    logger.debug(f"Invalidated cache key: {cache_key}")
-                except Exception as cache_error:
-                    logger.warning(f"Failed to invalidate cache key {cache_key}: {cache_error}")
-        except Exception as cache_error:
-            logger.warning(f"Error invalidating caches: {cache_error}")
-            # Don't fail the request if cache invalidation fails
+        # Invalidate related caches to ensure data consistency (never fails the request)
+        signal_cache.invalidate_signals([symbol.symbol])
         
         # Return success response
         return JsonResponse({
@@ -1836,14 +1805,7 @@ def reset_signals_for_testing(request):
         )
         
         # Clear related caches
-        cache_keys_to_delete = [
-            "signal_statistics",
-            "signals_api_None_None_true_50"
-        ]
-        
-        for cache_key in cache_keys_to_delete:
-            cache.delete(cache_key)
-            logger.info(f"Invalidated cache key: {cache_key}")
+        signal_cache.invalidate_signals()
         
         logger.info(f"Reset {signals_updated} signals for testing")
         
@@ -1887,13 +1849,7 @@ def sync_signal_prices(request):
                 logger.warning(f"Error syncing signal {signal.id}: {e}")
         
         # Clear signal caches to force refresh
-        cache_keys_to_delete = [
-            "signal_statistics",
-            "signals_api_None_None_true_50"
-        ]
-        
-        for cache_key in cache_keys_to_delete:
-            cache.delete(cache_key)
+        signal_cache.invalidate_signals()
         
         logger.info(f"Successfully synchronized prices for {synced_count} signals")
         
@@ -1923,39 +1879,14 @@ def clear_signals_cache(request):
     """Clear signals cache - useful when signals are not loading"""
     try:
         
-        # Clear all signal-related cache keys
-        cache_keys_to_clear = [
-            "signal_statistics",
-            "signals_api_None_None_true_50",
-            "signals_api_None_None_True_50",
-        ]
-        
-        # Try to find and clear all signals_api_* keys (if possible)
-        # Note: Django cache doesn't support key pattern matching easily,
-        # so we clear known patterns
-        cleared_count = 0
-        for key in cache_keys_to_clear:
-            if cache.get(key):
-                cache.delete(key)
-                cleared_count += 1
-                logger.info(f"Cleared cache key: {key}")
-        
-        # Also try to clear with None values for symbol/signal_type
-        for symbol_val in [None, 'None']:
-            for signal_type_val in [None, 'None']:
-                for is_valid_val in [True, 'True', 'true']:
-                    for limit_val in [50, '50']:
-                        cache_key = f"signals_api_{symbol_val}_{signal_type_val}_{is_valid_val}_{limit_val}"
-                        if cache.get(cache_key):
-                            cache.delete(cache_key)
-                            cleared_count += 1
-                            logger.info(f"Cleared cache key: {cache_key}")
-        
-        logger.info(f"Cleared {cleared_count} cache keys")
+        # Start new generations for every signal list and the statistics; all variants miss at once
+        cleared_count = signal_cache.invalidate_signals()
+        
+        logger.info(f"Invalidated {cleared_count} signal cache generation(s)")
         
         return JsonResponse({
             'success': True,
-            'message': f'Cleared {cleared_count} cache key(s)',
+            'message': f'Invalidated {cleared_count} signal cache generation(s)',
             'cleared_count': cleared_count
         })
         
@@ -2030,7 +1961,7 @@ def signals_diagnostic(request):
             api_query_count = valid_count
         
         # Check cache status
-        cache_key = "signals_api_None_None_true_50"
+        cache_key = signal_cache.signals_api_key(None, None, True, 50)
         cached_data = cache.get(cache_key)
         cache_status = {
             'exists': cached_data is not None,
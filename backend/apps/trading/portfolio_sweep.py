@@ -0,0 +1,220 @@
+"""
+Vectorised risk and auto-close sweep over open positions.
+
+``PositionManager.auto_close_positions`` walked a portfolio's positions one at a time,
+with a metrics save, an exit check and a close (a ``Trade`` insert plus another save)
+for each. ``PortfolioSweepEngine`` loads every open ``Position`` once, across any
+number of portfolios, into NumPy arrays. It then evaluates PnL, take profit and stop
+loss for all of them against a ``{symbol: price}`` map in one step:
+
+- A long position hits its take profit at ``price >= take_profit`` and its stop at
+  ``price <= stop_loss``. A short position is the mirror image. A missing level never
+  triggers. As in the backtests, the take profit wins if both are met.
+- PnL is ``(price - entry) * quantity``, negated for shorts. The capital is the entry
+  notional (``entry * quantity``), because ``Position`` stores no separate allocation.
+
+``sweep`` applies the result in one transaction. Every priced position gets its
+``current_price`` with one ``bulk_update``. The closed positions get
+``is_open``/``closed_at`` in a second one, and their closing ``Trade`` rows are written
+with one ``bulk_create``. It returns the ``checked``/``closed``/``errors``/``details``
+structure of ``auto_close_positions``.
+"""
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from apps.trading.models import Position, Trade
+
+
+logger = logging.getLogger(__name__)
+
+TAKE_PROFIT_REASON = "Take profit target reached"
+STOP_LOSS_REASON = "Stop loss limit reached"
+
+
+def _decimal_array(values: Iterable) -> np.ndarray:
+    """float64 array; ``None`` becomes NaN"""
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class PositionArrays:
+    """Open positions as parallel arrays, in ``positions`` order"""
+    positions: List[Position]
+    symbols: np.ndarray  # object array of symbol strings
+    portfolio_ids: np.ndarray
+    is_long: np.ndarray
+    quantity: np.ndarray
+    entry_price: np.ndarray
+    stop_loss: np.ndarray  # NaN when not set
+    take_profit: np.ndarray  # NaN when not set
+    current_price: np.ndarray  # last stored price, NaN when not set
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[Position]) -> 'PositionArrays':
+        positions = list(positions)
+        return cls(
+            positions=positions,
+            symbols=np.array([p.symbol.symbol for p in positions], dtype=object),
+            portfolio_ids=np.array([p.portfolio_id for p in positions], dtype=np.int64),
+            is_long=np.array([p.position_type == 'LONG' for p in positions], dtype=bool),
+            quantity=_decimal_array(p.quantity for p in positions),
+            entry_price=_decimal_array(p.entry_price for p in positions),
+            stop_loss=_decimal_array(p.stop_loss for p in positions),
+            take_profit=_decimal_array(p.take_profit for p in positions),
+            current_price=_decimal_array(p.current_price for p in positions),
+        )
+
+
+@dataclass(frozen=True)
+class SweepEvaluation:
+    """Per-position results of one price map"""
+    price: np.ndarray  # NaN where the symbol had no price
+    has_price: np.ndarray
+    capital: np.ndarray
+    pnl: np.ndarray
+    pnl_percentage: np.ndarray
+    take_profit_hit: np.ndarray
+    stop_loss_hit: np.ndarray
+
+    @property
+    def should_exit(self) -> np.ndarray:
+        return self.take_profit_hit | self.stop_loss_hit
+
+
+class PortfolioSweepEngine:
+    """Loads open positions once and evaluates/closes them together"""
+
+    @staticmethod
+    def load(portfolios: Optional[Iterable] = None) -> PositionArrays:
+        """Open positions of ``portfolios`` (Portfolio objects or ids), or of every portfolio"""
+        queryset = Position.objects.filter(is_open=True).select_related('symbol').order_by('id')
+        if portfolios is not None:
+            queryset = queryset.filter(portfolio_id__in=[getattr(p, 'id', p) for p in portfolios])
+        return PositionArrays.from_positions(queryset)
+
+    @staticmethod
+    def evaluate(arrays: PositionArrays, prices: Optional[Dict[str, float]] = None) -> SweepEvaluation:
+        """PnL and exit flags for every position; without ``prices`` the stored current prices are used"""
+        if prices is None:
+            price = arrays.current_price
+        else:
+            price = np.array([prices.get(symbol, np.nan) for symbol in arrays.symbols], dtype=np.float64)
+        has_price = ~np.isnan(price)
+        direction = np.where(arrays.is_long, 1.0, -1.0)
+
+        capital = arrays.entry_price * arrays.quantity
+        pnl = np.where(has_price, (price - arrays.entry_price) * arrays.quantity * direction, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pnl_percentage = np.where(capital > 0, pnl / capital * 100, 0.0)
+
+        # Comparisons against NaN are False, so unset levels and missing prices never trigger
+        with np.errstate(invalid='ignore'):
+            take_profit_hit = np.where(arrays.is_long, price >= arrays.take_profit, price <= arrays.take_profit)
+            stop_loss_hit = np.where(arrays.is_long, price <= arrays.stop_loss, price >= arrays.stop_loss)
+        stop_loss_hit &= ~take_profit_hit
+
+        return SweepEvaluation(price, has_price, capital, pnl, pnl_percentage, take_profit_hit, stop_loss_hit)
+
+    def sweep(self, prices: Dict[str, float], portfolios: Optional[Iterable] = None) -> Dict:
+        """Mark every open position to ``prices`` and close those at take profit or stop loss"""
+        arrays = self.load(portfolios)
+        evaluation = self.evaluate(arrays, prices)
+        results = {'checked': len(arrays), 'closed': 0, 'errors': 0, 'details': []}
+        if not len(arrays):
+            return results
+
+        now = timezone.now()
+        priced, closing, trades = [], [], []
+        for i in np.flatnonzero(evaluation.has_price):
+            position = arrays.positions[i]
+            position.current_price = Decimal(str(evaluation.price[i]))
+            priced.append(position)
+            if evaluation.should_exit[i]:
+                position.is_open = False
+                position.closed_at = now
+                closing.append(position)
+                trades.append(Trade(
+                    portfolio_id=position.portfolio_id,
+                    symbol_id=position.symbol_id,
+                    trade_type='SELL' if position.position_type == 'LONG' else 'BUY',
+                    quantity=position.quantity,
+                    price=position.current_price,
+                    notes=f"Position closed: {self._reason(evaluation, i)}",
+                ))
+
+        try:
+            with transaction.atomic():
+                Position.objects.bulk_update(priced, ['current_price'], batch_size=500)
+                Position.objects.bulk_update(closing, ['is_open', 'closed_at'], batch_size=500)
+                Trade.objects.bulk_create(trades, batch_size=500)
+        except Exception as e:
+            logger.error(f"Error applying position sweep: {e}")
+            for position in closing:
+                position.is_open, position.closed_at = True, None
+            closed_ok = False
+        else:
+            closed_ok = True
+
+        for i, position in enumerate(arrays.positions):
+            detail = {'position': position.symbol.symbol, 'position_id': position.id,
+                      'portfolio_id': position.portfolio_id}
+            if not evaluation.has_price[i]:
+                results['errors'] += 1
+                detail.update(action='skipped', reason='No current price available')
+            elif not evaluation.should_exit[i]:
+                detail.update(action='monitored', reason='No exit conditions met')
+            elif closed_ok:
+                results['closed'] += 1
+                detail.update(action='closed', reason=self._reason(evaluation, i),
+                              pnl=float(evaluation.pnl[i]), exit_price=float(evaluation.price[i]))
+            else:
+                results['errors'] += 1
+                detail.update(action='failed_to_close', reason='Close operation failed')
+            results['details'].append(detail)
+
+        if results['closed']:
+            logger.info(f"Position sweep closed {results['closed']} of {results['checked']} positions")
+        return results
+
+    def portfolio_metrics(self, portfolio, prices: Optional[Dict[str, float]] = None) -> Dict:
+        """Totals and per-position PnL for one portfolio's open positions"""
+        arrays = self.load([portfolio])
+        evaluation = self.evaluate(arrays, prices)
+        total_capital = float(evaluation.capital.sum())
+        total_pnl = float(evaluation.pnl.sum())
+        status = np.where(evaluation.take_profit_hit, 'PROFIT_TARGET_HIT',
+                          np.where(evaluation.stop_loss_hit, 'LOSS_LIMIT_HIT', 'ACTIVE'))
+        return {
+            'total_positions': len(arrays),
+            'total_capital_allocated': total_capital,
+            'total_current_pnl': total_pnl,
+            'portfolio_pnl_percentage': (total_pnl / total_capital * 100) if total_capital > 0 else 0,
+            'profit_target_hit_count': int(evaluation.take_profit_hit.sum()),
+            'loss_limit_hit_count': int(evaluation.stop_loss_hit.sum()),
+            'positions': [
+                {
+                    'symbol': arrays.symbols[i],
+                    'position_type': position.position_type,
+                    'capital_allocation': float(evaluation.capital[i]),
+                    'current_pnl': float(evaluation.pnl[i]),
+                    'pnl_percentage': float(evaluation.pnl_percentage[i]),
+                    'status': str(status[i]),
+                    'is_profit_target_hit': bool(evaluation.take_profit_hit[i]),
+                    'is_loss_limit_hit': bool(evaluation.stop_loss_hit[i]),
+                }
+                for i, position in enumerate(arrays.positions)
+            ],
+        }
+
+    @staticmethod
+    def _reason(evaluation: SweepEvaluation, i: int) -> str:
+        return TAKE_PROFIT_REASON if evaluation.take_profit_hit[i] else STOP_LOSS_REASON
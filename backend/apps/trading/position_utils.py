@@ -11,6 +11,7 @@ from django.db import transaction
 from django.utils import timezone
 from apps.trading.models import Position, Trade, Portfolio, Symbol
 from apps.data.services import RiskManagementService
+from apps.trading.portfolio_sweep import PortfolioSweepEngine
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,7 @@ class PositionManager:
     
     def __init__(self):
         self.risk_service = RiskManagementService()
+        self.sweep_engine = PortfolioSweepEngine()
     
     def create_capital_based_position(self, 
                                     portfolio: Portfolio,
@@ -199,38 +201,11 @@ class PositionManager:
             logger.error(f"Error getting positions for monitoring: {e}")
             return []
     
-    def calculate_portfolio_capital_metrics(self, portfolio: Portfolio) -> Dict:
+    def calculate_portfolio_capital_metrics(self, portfolio: Portfolio,
+                                            current_prices: Optional[Dict[str, float]] = None) -> Dict:
         """Calculate portfolio-wide capital-based metrics"""
         try:
-            positions = self.get_positions_needing_monitoring(portfolio)
-            
-            total_capital = sum(float(p.capital_allocation) for p in positions if p.capital_allocation)
-            total_current_pnl = sum(float(p.current_profit_loss_amount or 0) for p in positions)
-            
-            metrics = {
-                'total_positions': len(positions),
-                'total_capital_allocated': total_capital,
-                'total_current_pnl': total_current_pnl,
-                'portfolio_pnl_percentage': (total_current_pnl / total_capital * 100) if total_capital > 0 else 0,
-                'profit_target_hit_count': sum(1 for p in positions if p.is_profit_target_hit),
-                'loss_limit_hit_count': sum(1 for p in positions if p.is_loss_limit_hit),
-                'positions': []
-            }
-            
-            # Add individual position details
-            for position in positions:
-                metrics['positions'].append({
-                    'symbol': position.symbol.symbol,
-                    'position_type': position.position_type,
-                    'capital_allocation': float(position.capital_allocation),
-                    'current_pnl': float(position.current_profit_loss_amount or 0),
-                    'pnl_percentage': float(position.current_profit_loss_percentage or 0),
-                    'status': position.capital_based_status,
-                    'is_profit_target_hit': position.is_profit_target_hit,
-                    'is_loss_limit_hit': position.is_loss_limit_hit
-                })
-            
-            return metrics
+            return self.sweep_engine.portfolio_metrics(portfolio, current_prices)
             
         except Exception as e:
             logger.error(f"Error calculating portfolio metrics: {e}")
@@ -239,62 +214,20 @@ class PositionManager:
     def auto_close_positions(self, portfolio: Portfolio, current_prices: Dict[str, float]) -> Dict:
         """Automatically close positions that meet exit conditions"""
         try:
-            positions = self.get_positions_needing_monitoring(portfolio)
-            results = {
-                'checked': len(positions),
-                'closed': 0,
-                'errors': 0,
-                'details': []
-            }
-            
-            for position in positions:
-                symbol_key = position.symbol.symbol
-                
-                if symbol_key not in current_prices:
-                    results['errors'] += 1
-                    results['details'].append({
-                        'position': position.symbol.symbol,
-                        'action': 'skipped',
-                        'reason': 'No current price available'
-                    })
-                    continue
-                
-                current_price = current_prices[symbol_key]
-                
-                # Check exit conditions
-                exit_check = self.check_exit_conditions(position, current_price)
-                
-                if exit_check.get('should_exit'):
-                    closed = self.close_position(position, current_price, exit_check['reason'])
-                    
-                    if closed:
-                        results['closed'] += 1
-                        results['details'].append({
-                            'position': position.symbol.symbol,
-                            'action': 'closed',
-                            'reason': exit_check['reason'],
-                            'pnl': exit_check.get('pnl_amount', 0),
-                            'exit_price': current_price
-                        })
-                    else:
-                        results['errors'] += 1
-                        results['details'].append({
-                            'position': position.symbol.symbol,
-                            'action': 'failed_to_close',
-                            'reason': 'Close operation failed'
-                        })
-                else:
-                    results['details'].append({
-                        'position': position.symbol.symbol,
-                        'action': 'monitored',
-                        'reason': 'No exit conditions met'
-                    })
-            
-            return results
+            return self.sweep_engine.sweep(current_prices, portfolios=[portfolio])
             
         except Exception as e:
             logger.error(f"Error in auto_close_positions: {e}")
             return {'error': str(e)}
+    
+    def auto_close_all_positions(self, current_prices: Dict[str, float]) -> Dict:
+        """Automatically close positions that meet exit conditions, across every portfolio"""
+        try:
+            return self.sweep_engine.sweep(current_prices)
+            
+        except Exception as e:
+            logger.error(f"Error in auto_close_all_positions: {e}")
+            return {'error': str(e)}
 
 
 # Utility functions for easy integration
@@ -1,3 +1,72 @@
 from django.test import TestCase
+from django.contrib.auth.models import User
+from decimal import Decimal
 
-# Create your tests here.
+from apps.trading.models import Portfolio, Position, Symbol, Trade
+from apps.trading.portfolio_sweep import PortfolioSweepEngine
+
+
+class PortfolioSweepEngineTestCase(TestCase):
+    """One sweep marks, evaluates and closes positions across portfolios"""
+
+    def setUp(self):
+        self.btc = Symbol.objects.create(symbol='BTC', name='Bitcoin', symbol_type='CRYPTO', exchange='Binance')
+        self.eth = Symbol.objects.create(symbol='ETH', name='Ethereum', symbol_type='CRYPTO', exchange='Binance')
+        self.sol = Symbol.objects.create(symbol='SOL', name='Solana', symbol_type='CRYPTO', exchange='Binance')
+        self.first = Portfolio.objects.create(user=User.objects.create(username='first'), name='First')
+        self.second = Portfolio.objects.create(user=User.objects.create(username='second'), name='Second')
+        self.engine = PortfolioSweepEngine()
+
+    def _position(self, portfolio, symbol, position_type, entry, stop=None, target=None, quantity='2'):
+        return Position.objects.create(
+            portfolio=portfolio, symbol=symbol, position_type=position_type,
+            quantity=Decimal(quantity), entry_price=Decimal(entry),
+            stop_loss=Decimal(stop) if stop else None, take_profit=Decimal(target) if target else None,
+        )
+
+    def test_sweep_closes_hits_and_marks_the_rest(self):
+        """Test target and stop hits close with a Trade while others only get the new price"""
+        long_target = self._position(self.first, self.btc, 'LONG', '100', stop='90', target='110')
+        short_stop = self._position(self.second, self.eth, 'SHORT', '50', stop='55', target='40')
+        open_long = self._position(self.second, self.btc, 'LONG', '100', stop='80', target='130')
+        unpriced = self._position(self.first, self.sol, 'LONG', '20', stop='10', target='30')
+
+        results = self.engine.sweep({'BTC': 112.0, 'ETH': 56.0})
+
+        self.assertEqual((results['checked'], results['closed'], results['errors']), (4, 2, 1))
+        details = {detail['position_id']: detail for detail in results['details']}
+        self.assertEqual(details[long_target.id]['reason'], 'Take profit target reached')
+        self.assertEqual(details[long_target.id]['pnl'], 24.0)
+        self.assertEqual(details[short_stop.id]['reason'], 'Stop loss limit reached')
+        self.assertEqual(details[short_stop.id]['pnl'], -12.0)
+        self.assertEqual(details[open_long.id]['action'], 'monitored')
+        self.assertEqual(details[unpriced.id]['action'], 'skipped')
+
+        self.assertEqual(
+            set(Position.objects.filter(is_open=False).values_list('id', flat=True)),
+            {long_target.id, short_stop.id},
+        )
+        open_long.refresh_from_db()
+        self.assertEqual(open_long.current_price, Decimal('112'))
+        self.assertEqual(
+            sorted(Trade.objects.values_list('trade_type', 'price')),
+            [('BUY', Decimal('56')), ('SELL', Decimal('112'))],
+        )
+
+        # Closed positions are not swept again
+        self.assertEqual(self.engine.sweep({'BTC': 112.0, 'ETH': 56.0})['closed'], 0)
+
+    def test_portfolio_metrics(self):
+        """Test totals are computed over one portfolio only"""
+        self._position(self.first, self.btc, 'LONG', '100', stop='90', target='110')
+        self._position(self.first, self.eth, 'SHORT', '50', stop='55', target='40')
+        self._position(self.second, self.btc, 'LONG', '100')
+
+        metrics = self.engine.portfolio_metrics(self.first, {'BTC': 105.0, 'ETH': 40.0})
+
+        self.assertEqual(metrics['total_positions'], 2)
+        self.assertEqual(metrics['total_capital_allocated'], 300.0)
+        self.assertEqual(metrics['total_current_pnl'], 30.0)
+        self.assertEqual(metrics['portfolio_pnl_percentage'], 10.0)
+        self.assertEqual((metrics['profit_target_hit_count'], metrics['loss_limit_hit_count']), (1, 0))
+        self.assertEqual([p['status'] for p in metrics['positions']], ['ACTIVE', 'PROFIT_TARGET_HIT'])
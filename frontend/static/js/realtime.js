@@ -164,6 +164,10 @@ class RealTimeManager {
                     this.updateMarketData(message);
                     break;
                     
+                case 'market_batch':
+                    message.updates.forEach(update => this.updateMarketData(update));
+                    break;
+                    
                 case 'price_alert':
                     this.showPriceAlert(message);
                     break;
@@ -245,7 +249,9 @@ class RealTimeManager {
         if (signalElement) {
             const updateElement = signalElement.querySelector('.update-info');
             if (updateElement) {
-                updateElement.textContent = `${data.update_type}: ${data.new_value}`;
+                updateElement.textContent = data.update_type === 'outcome'
+                    ? `${data.new_value.status}: ${data.new_value.pnl.toFixed(2)}%`
+                    : `${data.update_type}: ${data.new_value}`;
                 updateElement.className = 'update-info updated';
             }
         }
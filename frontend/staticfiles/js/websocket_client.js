@@ -142,6 +142,10 @@ class WebSocketClient {
                 this.handleMarketUpdate(data);
                 break;
                 
+            case 'market_batch':
+                data.updates.forEach(update => this.handleMarketUpdate(update));
+                break;
+                
             case 'new_signal':
                 this.handleNewSignal(data);
                 break;